@@ -54,7 +54,8 @@ from mrjob.util import cmd_line
 from mrjob.util import shlex_split
 from mrjob.util import unique
 from mrjob.util import which
-from mrjob.util import zip_dir
+from mrjob.util import _dir_files
+from mrjob.util import _zip_files
 
 log = logging.getLogger(__name__)
 
@@ -536,7 +537,10 @@ class MRJobBinRunner(MRJobRunner):
 
             log.debug('archiving %s -> %s as %s' % (
                 mrjob_dir, zip_path, os.path.join('mrjob', '')))
-            zip_dir(mrjob_dir, zip_path, filter=filter_path, prefix='mrjob')
+            self._write_archive(
+                _zip_files,
+                _dir_files(mrjob_dir, filter=filter_path, prefix='mrjob'),
+                zip_path)
 
             self._mrjob_zip_path = zip_path
 
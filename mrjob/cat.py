@@ -20,6 +20,8 @@ compressed files. It it used by :py:mod:`local <mrjob.local>` mode and can
 function without the rest of the mrjob library.
 """
 import zlib
+from binascii import hexlify
+from binascii import unhexlify
 
 try:
     import bz2
@@ -100,6 +102,122 @@ def decompress(readable, path, bufsize=1024):
         return to_chunks(readable, bufsize=bufsize)
 
 
+# magic numbers that start each block, and mark the end of each stream, in a
+# bzip2 file. These are bit-aligned, not byte-aligned.
+_BZ2_BLOCK_MAGIC = 0x314159265359
+_BZ2_EOS_MAGIC = 0x177245385090
+
+_BZ2_MAGIC_BITS = 48
+_BZ2_MAGIC_MASK = (1 << _BZ2_MAGIC_BITS) - 1
+_BZ2_CRC_BITS = 32
+
+# the magic numbers, shifted so that they start 0-7 bits into a byte,
+# padded out to 8 bytes
+_BZ2_SHIFTED_MAGICS = [
+    (shift, magic, unhexlify('%016x' % (magic << (16 - shift))))
+    for magic in (_BZ2_BLOCK_MAGIC, _BZ2_EOS_MAGIC)
+    for shift in range(8)
+]
+
+
+def find_bz2_blocks(fileobj, bufsize=1024 * 1024):
+    """Scan a bzip2 file for blocks, which can be decompressed
+    independently (see :py:func:`bunzip2_block`). This is what allows Hadoop
+    to split ``.bz2`` files.
+
+    Returns a list of ``(start_bit, end_bit)`` for each block, where
+    *start_bit* is the bit offset of the block's magic number, and *end_bit*
+    is the offset of the next block's (or the end of the stream's) magic
+    number.
+
+    Like Hadoop, we assume that the magic numbers never occur by chance
+    in compressed data.
+    """
+    markers = []  # (bit offset, is block start)
+
+    buf = b''
+    buf_offset = 0  # byte offset of start of *buf* in *fileobj*
+
+    while True:
+        chunk = fileobj.read(bufsize)
+        buf += chunk
+
+        # leave room for a full magic number at the end, unless we're done
+        if chunk:
+            limit = max(len(buf) - 8, 0)
+        else:
+            limit = len(buf)
+            buf += b'\0' * 8
+
+        for shift, magic, pattern in _BZ2_SHIFTED_MAGICS:
+            # bytes 1-5 of the pattern are entirely within the magic number
+            needle = pattern[1:6]
+
+            i = buf.find(needle, 1)
+            while -1 < i <= limit:
+                start = i - 1
+                value = int(hexlify(buf[start:start + 8]), 16)
+                if (value >> (16 - shift)) & _BZ2_MAGIC_MASK == magic:
+                    markers.append((
+                        (buf_offset + start) * 8 + shift,
+                        magic == _BZ2_BLOCK_MAGIC))
+
+                i = buf.find(needle, i + 1)
+
+        if not chunk:
+            break
+
+        buf = buf[limit:]
+        buf_offset += limit
+
+    markers.sort()
+
+    return [
+        (offset, next_offset)
+        for (offset, is_block), (next_offset, _) in zip(markers, markers[1:])
+        if is_block
+    ]
+
+
+def bunzip2_block(fileobj, start_bit, end_bit):
+    """Decompress a single block from a bzip2 file, given its *start_bit*
+    and *end_bit* (see :py:func:`find_bz2_blocks`), and return the
+    decompressed bytes.
+
+    We do this by wrapping the block in a stream of its own.
+    """
+    if bz2 is None:
+        raise Exception(
+            'bz2 module was not successfully imported (likely not installed).')
+
+    start_byte = start_bit // 8
+    end_byte = (end_bit + 7) // 8
+
+    fileobj.seek(start_byte)
+    data = fileobj.read(end_byte - start_byte)
+
+    num_bits = end_bit - start_bit
+    block = (int(hexlify(data), 16) >> (end_byte * 8 - end_bit)) & (
+        (1 << num_bits) - 1)
+
+    # the block's CRC follows its magic number. A stream's CRC is just the
+    # CRC of its only block
+    crc = (block >> (num_bits - _BZ2_MAGIC_BITS - _BZ2_CRC_BITS)) & (
+        (1 << _BZ2_CRC_BITS) - 1)
+
+    stream = (block << _BZ2_MAGIC_BITS | _BZ2_EOS_MAGIC) << _BZ2_CRC_BITS | crc
+    num_bits += _BZ2_MAGIC_BITS + _BZ2_CRC_BITS
+
+    # pad to a whole number of bytes
+    padding = -num_bits % 8
+    stream <<= padding
+    num_bits += padding
+
+    # use the largest block size (900k) so that any block will fit
+    return bz2.decompress(
+        b'BZh9' + unhexlify('%0*x' % (num_bits // 4, stream)))
+
+
 def is_compressed(path):
     return path.endswith('.bz2') or path.endswith('.gz')
 
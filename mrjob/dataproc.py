@@ -310,7 +310,9 @@ class DataprocJobRunner(HadoopInTheCloudJobRunner, LogInterpretationMixin):
         # manage local files that we want to upload to GCS. We'll add them
         # to this manager just before we need them.
         fs_files_dir = self._job_tmpdir + 'files/'
-        self._upload_mgr = UploadDirManager(fs_files_dir)
+        self._upload_mgr = UploadDirManager(
+            fs_files_dir,
+            cas_prefix=self._upload_cas_prefix(self._job_tmpdir))
 
         # when did our particular task start?
         self._dataproc_job_start = None
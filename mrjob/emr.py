@@ -390,7 +390,9 @@ class EMRJobRunner(HadoopInTheCloudJobRunner, LogInterpretationMixin):
         # manage local files that we want to upload to S3. We'll add them
         # to this manager just before we need them.
         s3_files_dir = self._cloud_tmp_dir + 'files/'
-        self._upload_mgr = UploadDirManager(s3_files_dir)
+        self._upload_mgr = UploadDirManager(
+            s3_files_dir,
+            cas_prefix=self._upload_cas_prefix(self._cloud_tmp_dir))
 
         # master node setup script (handled later by
         # _add_master_node_setup_files_for_upload())
@@ -745,14 +747,23 @@ class EMRJobRunner(HadoopInTheCloudJobRunner, LogInterpretationMixin):
 
         self._launch_emr_job()
 
-    def _check_input_path(self, path):
+    def _check_input_paths(self):
         """Add a custom check for S3 paths to ensure they're not in
         Glacier (which causes a cryptic error). See #1887."""
-        # handle non-S3 paths the usual way
-        if not is_s3_uri(path):
-            super(EMRJobRunner, self)._check_input_path(path)
+        if not self._opts['check_input_paths']:
             return
 
+        for path in self._input_paths:
+            if is_s3_uri(path):
+                self._check_s3_input_path(path)
+
+        # handle non-S3 paths the usual way
+        self._check_input_paths_exist(
+            [path for path in self._input_paths if not is_s3_uri(path)])
+
+    def _check_s3_input_path(self, path):
+        """Raise :py:class:`IOError` if *path* doesn't exist, or is
+        archived in Glacier."""
         exists = False
 
         for uri, obj in self.fs.s3._ls(path):
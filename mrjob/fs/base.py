@@ -16,6 +16,8 @@
 import logging
 import os.path
 import posixpath
+import time
+from multiprocessing.pool import ThreadPool
 
 from mrjob.parse import is_uri
 from mrjob.parse import urlparse
@@ -39,6 +41,8 @@ class Filesystem(object):
     * :py:class:`mrjob.fs.local.LocalFilesystem`: paths and ``file://`` URIs
     * :py:class:`mrjob.fs.s3.S3Filesystem`: ``s3://``, ``s3a://``, ``s3n://``,
     * :py:class:`mrjob.fs.ssh.SSHFilesystem`: ``ssh://``
+    * :py:class:`mrjob.fs.webhdfs.WebHDFSFilesystem`: ``webhdfs://``,
+      ``swebhdfs://`` (and ``hdfs://``, if configured)
 
     .. versionchanged:: 0.6.12
 
@@ -65,6 +69,15 @@ class Filesystem(object):
             for line in self._cat_file(filename):
                 yield line
 
+    def _cat_many(self, paths_and_dests):
+        """Write the contents of several files (decompressing if
+        necessary, like :py:meth:`cat`) to local files. *paths_and_dests*
+        is a list of ``(path, dest)``, where *path* is a single file.
+        Override this if your filesystem can download several files at
+        once."""
+        for path, dest in paths_and_dests:
+            _cat_to_file(self._cat_file, path, dest)
+
     def du(self, path_glob):
         """Get the total size of files matching ``path_glob``
 
@@ -94,6 +107,12 @@ class Filesystem(object):
         """
         raise NotImplementedError
 
+    def _exists_many(self, path_globs):
+        """Return a list of booleans indicating whether each of
+        *path_globs* exists. Override this if your filesystem can check
+        several paths at once."""
+        return [self.exists(path_glob) for path_glob in path_globs]
+
     def join(self, path, *paths):
         """Join *paths* onto *path* (which may be a URI)"""
         all_paths = (path,) + paths
@@ -119,6 +138,12 @@ class Filesystem(object):
         """
         raise NotImplementedError
 
+    def _mkdir_many(self, paths):
+        """Create several directories (see :py:meth:`mkdir`). Override
+        this if your filesystem can create several directories at once."""
+        for path in paths:
+            self.mkdir(path)
+
     def put(self, src, path):
         """Upload a file on the local filesystem (*src*) to *path*.
         Like with :py:func:`shutil.copyfile`, *path* should be the full path
@@ -130,6 +155,13 @@ class Filesystem(object):
         """
         raise NotImplementedError
 
+    def _put_many(self, srcs_and_paths):
+        """Upload several files. *srcs_and_paths* is a list of
+        ``(src, path)``, as you would pass to :py:meth:`put`. Override
+        this if your filesystem can upload several files at once."""
+        for src, path in srcs_and_paths:
+            self.put(src, path)
+
     def rm(self, path_glob):
         """Recursively delete the given file/directory, if it exists
 
@@ -137,6 +169,12 @@ class Filesystem(object):
         """
         raise NotImplementedError
 
+    def _rm_many(self, path_globs):
+        """Recursively delete several files/directories. Override this if
+        your filesystem can delete several paths at once."""
+        for path_glob in path_globs:
+            self.rm(path_glob)
+
     def touchz(self, path):
         """Make an empty file in the given location. Raises an error if
         a non-zero length file already exists in that location.
@@ -148,3 +186,99 @@ class Filesystem(object):
     def md5sum(self, path):
         """Generate the md5 sum of the file at *path*"""
         raise NotImplementedError
+
+
+def _put_in_threads(put, srcs_and_paths, num_threads):
+    """Call ``put(src, path)`` for each of *srcs_and_paths*, using up
+    to *num_threads* threads, and log throughput when done.
+
+    Larger files are started first, so that one big file doesn't hold up
+    the end of the batch.
+    """
+    src_to_size = dict((src, os.path.getsize(src))
+                       for src, _ in srcs_and_paths)
+
+    srcs_and_paths = sorted(srcs_and_paths,
+                            key=lambda s_p: -src_to_size[s_p[0]])
+    if not srcs_and_paths:
+        return
+
+    num_threads = max(min(num_threads or 1, len(srcs_and_paths)), 1)
+
+    def put_one(src_and_path):
+        put(*src_and_path)
+        return src_and_path
+
+    start = time.time()
+
+    if num_threads == 1:
+        for src_and_path in srcs_and_paths:
+            put_one(src_and_path)
+    else:
+        pool = ThreadPool(num_threads)
+        try:
+            for i, (src, path) in enumerate(
+                    pool.imap_unordered(put_one, srcs_and_paths), 1):
+                log.debug('  uploaded %s (%d/%d)' % (
+                    path, i, len(srcs_and_paths)))
+        finally:
+            pool.terminate()
+            pool.join()
+
+    elapsed = max(time.time() - start, 0.001)
+    total_mb = sum(src_to_size.values()) / 1024.0 / 1024.0
+
+    log.info('  uploaded %d file%s (%.1f MiB) in %.1fs (%.1f MiB/s,'
+             ' %d thread%s)' % (
+                 len(srcs_and_paths), '' if len(srcs_and_paths) == 1 else 's',
+                 total_mb, elapsed, total_mb / elapsed,
+                 num_threads, '' if num_threads == 1 else 's'))
+
+
+def _cat_to_file(cat_file, path, dest):
+    """Write the chunks yielded by ``cat_file(path)`` to the local file
+    *dest*."""
+    with open(dest, 'wb') as f:
+        for chunk in cat_file(path):
+            f.write(chunk)
+
+
+def _cat_in_threads(cat_file, paths_and_dests, num_threads):
+    """Write the contents of each *path* in *paths_and_dests*
+    (as yielded by ``cat_file(path)``) to the local file *dest*, using up
+    to *num_threads* threads, and log throughput when done."""
+    if not paths_and_dests:
+        return
+
+    num_threads = max(min(num_threads or 1, len(paths_and_dests)), 1)
+
+    def cat_one(path_and_dest):
+        _cat_to_file(cat_file, *path_and_dest)
+        return path_and_dest
+
+    start = time.time()
+
+    if num_threads == 1:
+        for path_and_dest in paths_and_dests:
+            cat_one(path_and_dest)
+    else:
+        pool = ThreadPool(num_threads)
+        try:
+            for i, (path, dest) in enumerate(
+                    pool.imap_unordered(cat_one, paths_and_dests), 1):
+                log.debug('  downloaded %s (%d/%d)' % (
+                    path, i, len(paths_and_dests)))
+        finally:
+            pool.terminate()
+            pool.join()
+
+    elapsed = max(time.time() - start, 0.001)
+    total_mb = sum(os.path.getsize(dest)
+                   for _, dest in paths_and_dests) / 1024.0 / 1024.0
+
+    log.info('  downloaded %d file%s (%.1f MiB) in %.1fs (%.1f MiB/s,'
+             ' %d thread%s)' % (
+                 len(paths_and_dests),
+                 '' if len(paths_and_dests) == 1 else 's',
+                 total_mb, elapsed, total_mb / elapsed,
+                 num_threads, '' if num_threads == 1 else 's'))
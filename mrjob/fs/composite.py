@@ -119,6 +119,53 @@ class CompositeFilesystem(Filesystem):
 
         raise IOError("Can't handle path: %s" % path_to_handle)
 
+    def _handle_many(self, name, items, get_path):
+        """Like :py:meth:`_handle`, but for a list of *items* (paths, or
+        tuples containing a path, which *get_path* extracts).
+
+        Each item goes to the first (non-disabled) filesystem that can
+        handle its path, and we call method *name* once per filesystem, on
+        a list of the items it can handle. Return a list of
+        ``(indexes, result)`` for each call, where *indexes* are the indexes
+        of the items passed to it."""
+        results = []
+        unhandled = list(range(len(items)))
+
+        for fs_name in self._fs_names:
+            if not unhandled:
+                break
+
+            if fs_name in self._disabled:
+                continue
+
+            fs = getattr(self, fs_name)
+            indexes = [i for i in unhandled
+                       if fs.can_handle_path(get_path(items[i]))]
+            if not indexes:
+                continue
+
+            try:
+                result = getattr(fs, name)([items[i] for i in indexes])
+            except Exception as ex:
+                if (fs_name in self._disable_if and
+                        self._disable_if[fs_name](ex)):
+                    log.debug('disabling %s fs: %r' % (fs_name, ex))
+
+                    self._disabled.add(fs_name)
+                    continue
+                else:
+                    raise
+
+            results.append((indexes, result))
+            handled = set(indexes)
+            unhandled = [i for i in unhandled if i not in handled]
+
+        if unhandled:
+            raise IOError("Can't handle path: %s" %
+                          get_path(items[unhandled[0]]))
+
+        return results
+
     def _do(self, name, path):
         """Handle the common case, where a method operates on a single path."""
         return self._handle(name, path, path)
@@ -132,6 +179,9 @@ class CompositeFilesystem(Filesystem):
         # mrjob/runner.py accesses this directly for efficiency
         return self._do('_cat_file', path)
 
+    def _cat_many(self, paths_and_dests):
+        self._handle_many('_cat_many', paths_and_dests, lambda p_d: p_d[0])
+
     def du(self, path_glob):
         return self._do('du', path_glob)
 
@@ -141,18 +191,37 @@ class CompositeFilesystem(Filesystem):
     def exists(self, path_glob):
         return self._do('exists', path_glob)
 
+    def _exists_many(self, path_globs):
+        results = [None] * len(path_globs)
+
+        for indexes, fs_results in self._handle_many(
+                '_exists_many', path_globs, lambda p: p):
+            for i, exists in zip(indexes, fs_results):
+                results[i] = exists
+
+        return results
+
     def mkdir(self, path):
         return self._do('mkdir', path)
 
+    def _mkdir_many(self, paths):
+        self._handle_many('_mkdir_many', paths, lambda p: p)
+
     def join(self, path, *paths):
         return self._handle('join', path, path, *paths)
 
     def put(self, src, path):
         return self._handle('put', path, src, path)
 
+    def _put_many(self, srcs_and_paths):
+        self._handle_many('_put_many', srcs_and_paths, lambda s_p: s_p[1])
+
     def rm(self, path_glob):
         return self._do('rm', path_glob)
 
+    def _rm_many(self, path_globs):
+        self._handle_many('_rm_many', path_globs, lambda p: p)
+
     def touchz(self, path):
         return self._do('touchz', path)
 
@@ -22,6 +22,8 @@ from base64 import b64decode
 
 from mrjob.cat import decompress
 from mrjob.fs.base import Filesystem
+from mrjob.fs.base import _cat_in_threads
+from mrjob.fs.base import _put_in_threads
 from mrjob.parse import urlparse
 from mrjob.runner import GLOB_RE
 
@@ -37,6 +39,9 @@ log = logging.getLogger(__name__)
 # download this many bytes at once from cat()
 _CAT_CHUNK_SIZE = 8192
 
+# default number of files to upload at once in _put_many()
+_DEFAULT_UPLOAD_THREADS = 8
+
 
 def _path_glob_to_parsed_gcs_uri(path_glob):
     # support globs
@@ -64,6 +69,8 @@ class GCSFilesystem(Filesystem):
     :param part_size: Part size for multi-part uploading, in bytes, or ``None``
     :param location: Default location to use when creating a bucket
     :param object_ttl_days: Default object expiry for newly created buckets
+    :param upload_threads: Max number of files to upload (or download) at
+                           once
 
     .. versionchanged:: 0.7.0
 
@@ -75,12 +82,14 @@ class GCSFilesystem(Filesystem):
        *object_ttl_days*
     """
     def __init__(self, credentials=None, project_id=None,
-                 part_size=None, location=None, object_ttl_days=None):
+                 part_size=None, location=None, object_ttl_days=None,
+                 upload_threads=None):
         self._credentials = credentials
         self._project_id = project_id
         self._part_size = part_size
         self._location = location
         self._object_ttl_days = object_ttl_days
+        self._upload_threads = upload_threads or _DEFAULT_UPLOAD_THREADS
 
     @property
     def client(self):
@@ -156,6 +165,10 @@ class GCSFilesystem(Filesystem):
     def _cat_file(self, path):
         return decompress(self._cat_blob(path), path)
 
+    def _cat_many(self, paths_and_dests):
+        """Download several files at once, in threads."""
+        _cat_in_threads(self._cat_file, paths_and_dests, self._upload_threads)
+
     def _cat_blob(self, gcs_uri):
         """:py:meth:`cat_file`, minus decompression."""
         blob = self._get_blob(gcs_uri)
@@ -191,6 +204,12 @@ class GCSFilesystem(Filesystem):
         except google.api_core.exceptions.NotFound:
             self.create_bucket(bucket_name)
 
+    def _mkdir_many(self, paths):
+        """Create each bucket in *paths* that doesn't exist, checking each
+        bucket only once."""
+        for bucket_name in sorted(set(parse_gcs_uri(p)[0] for p in paths)):
+            self.mkdir('gs://%s/' % bucket_name)
+
     def exists(self, path_glob):
         """Does the given path exist?
 
@@ -234,6 +253,32 @@ class GCSFilesystem(Filesystem):
 
         self._blob(path, chunk_size=part_size).upload_from_filename(src)
 
+    def _put_many(self, srcs_and_paths):
+        """Upload several files at once, in threads.
+
+        All uploads share one client, and we look up each bucket only once.
+        """
+        client = self.client
+
+        buckets = {}
+        for _, path in srcs_and_paths:
+            bucket_name, _ = parse_gcs_uri(path)
+            if bucket_name not in buckets:
+                buckets[bucket_name] = client.get_bucket(bucket_name)
+
+        def put(src, path):
+            bucket_name, blob_name = parse_gcs_uri(path)
+            bucket = buckets[bucket_name]
+
+            if bucket.get_blob(blob_name):
+                raise IOError('File already exists: %s' % path)
+
+            bucket.blob(
+                blob_name, chunk_size=self._part_size).upload_from_filename(
+                    src)
+
+        _put_in_threads(put, srcs_and_paths, self._upload_threads)
+
     def get_all_bucket_names(self, prefix=None):
         """Yield the names of all buckets associated with this client.
 
@@ -16,6 +16,7 @@
 # limitations under the License.
 import logging
 import os.path
+import posixpath
 import re
 from io import BytesIO
 from subprocess import Popen
@@ -25,6 +26,8 @@ from subprocess import CalledProcessError
 from mrjob.cat import decompress
 from mrjob.compat import uses_yarn
 from mrjob.fs.base import Filesystem
+from mrjob.fs.base import _cat_in_threads
+from mrjob.logs.log4j import _HADOOP_LOG4J_LINE_RE
 from mrjob.py2 import to_unicode
 from mrjob.parse import is_uri
 from mrjob.parse import urlparse
@@ -35,15 +38,34 @@ from mrjob.util import which
 
 log = logging.getLogger(__name__)
 
-# used by mkdir()
+# used by _mkdir_many(), on each line of stderr
 _HADOOP_FILE_EXISTS_RE = re.compile(br'.*File exists.*')
 
 # used by ls() and exists()
 _HADOOP_LS_NO_SUCH_FILE = re.compile(br'^lsr?: .*No such file.*$')
 
+# used by _exists_many(). Hadoop 1 and 2 report missing paths differently
+_HADOOP_LS_MISSING_PATH_RE = re.compile(
+    br"^lsr?: (?:`(?P<quoted_path>.*)'|Cannot access (?P<path>.*)):"
+    br" No such file.*$")
+
+# used by _put_many(), when the destination directory doesn't exist. This
+# may come after log4j warnings, so it's searched for on any line
+_HADOOP_PUT_NO_SUCH_DIR_RE = re.compile(
+    br'^put: .*(No such file|not exist)', re.M)
+
+# log4j levels that don't mean a hadoop fs command failed (see _exists_many())
+_HARMLESS_LOG4J_LEVELS = ('DEBUG', 'INFO', 'WARN')
+
 # used by rm() (see below)
 _HADOOP_RM_NO_SUCH_FILE = re.compile(br'^rmr?: .*No such file.*$')
 
+# max number of paths to pass to a single hadoop fs command
+_MAX_PATHS_PER_HADOOP_CMD = 500
+
+# max number of hadoop fs -cat processes to run at once in _cat_many()
+_DOWNLOAD_THREADS = 4
+
 # find version string in "Hadoop 0.20.203" etc.
 _HADOOP_VERSION_RE = re.compile(br'^.*?(?P<version>(\d|\.)+).*?$')
 
@@ -147,8 +169,9 @@ class HadoopFilesystem(Filesystem):
         ok_returncodes -- a list/tuple/set of return codes we expect to
             get back from hadoop (e.g. [0,1]). By default, we only expect 0.
             If we get an unexpected return code, we raise a CalledProcessError.
-        ok_stderr -- don't log STDERR or raise CalledProcessError if stderr
-            matches a regex in this list (even if the returncode is bad)
+        ok_stderr -- don't log STDERR or raise CalledProcessError if a regex
+            in this list matches at the start of stderr (or anywhere, for
+            regexes compiled with re.M), even if the returncode is bad
         return_stdout -- return the stdout from the hadoop command rather
             than logging it. If this is False, we return the returncode
             instead.
@@ -169,7 +192,7 @@ class HadoopFilesystem(Filesystem):
         stderr_is_ok = False
         if ok_stderr:
             for stderr_re in ok_stderr:
-                if stderr_re.match(stderr):
+                if _stderr_matches(stderr_re, stderr):
                     stderr_is_ok = True
                     break
 
@@ -283,19 +306,52 @@ class HadoopFilesystem(Filesystem):
         if returncode != 0:
             raise IOError("Could not stream %s" % path)
 
+    def _cat_many(self, paths_and_dests):
+        """Download several files at once. Each ``hadoop fs -cat`` is
+        its own process, so we just run several at a time."""
+        _cat_in_threads(self._cat_file, paths_and_dests,
+                        _DOWNLOAD_THREADS)
+
     def mkdir(self, path):
+        self._mkdir_many([path])
+
+    def _mkdir_many(self, paths):
+        """Create several directories, with one ``hadoop fs`` call."""
         version = self.get_hadoop_version()
 
         # use -p on Hadoop 2 (see #991, #845)
         if uses_yarn(version):
-            args = ['fs', '-mkdir', '-p', path]
+            mkdir_args = ['fs', '-mkdir', '-p']
         else:
-            args = ['fs', '-mkdir', path]
+            mkdir_args = ['fs', '-mkdir']
 
-        try:
-            self.invoke_hadoop(args, ok_stderr=[_HADOOP_FILE_EXISTS_RE])
-        except CalledProcessError:
-            raise IOError("Could not mkdir %s" % path)
+        for chunk in _chunks(paths):
+            args = self.get_hadoop_bin() + mkdir_args + chunk
+
+            log.debug('> %s' % cmd_line(args))
+
+            proc = Popen(args, stdout=PIPE, stderr=PIPE)
+            _, stderr = proc.communicate()
+
+            log_func = log.debug if proc.returncode == 0 else log.error
+            file_exists = False
+            other_error = False
+
+            # without -p, hadoop fs -mkdir complains about dirs that
+            # already exist, but that shouldn't hide other errors
+            for line in BytesIO(stderr):
+                line = line.rstrip(b'\r\n')
+
+                if _HADOOP_FILE_EXISTS_RE.match(line):
+                    file_exists = True
+                elif line:
+                    log_func('STDERR: ' + to_unicode(line))
+
+                    if not _is_harmless_log4j_line(line):
+                        other_error = True
+
+            if proc.returncode != 0 and (other_error or not file_exists):
+                raise IOError("Could not mkdir %s" % ' '.join(chunk))
 
     def exists(self, path_glob):
         """Does the given path exist?
@@ -313,6 +369,78 @@ class HadoopFilesystem(Filesystem):
         except CalledProcessError:
             raise IOError("Could not check path %s" % path_glob)
 
+    def _exists_many(self, path_globs):
+        """Check whether several paths exist with a single
+        ``hadoop fs -ls``, and return a list of booleans.
+
+        ``hadoop fs -ls`` reports each missing path on stderr and keeps
+        going, so we can tell which ones don't exist. If it also reports
+        some other error, we check each path we didn't see reported
+        missing with :py:meth:`exists`.
+        """
+        missing = set()
+        # paths whose status we couldn't tell from hadoop fs -ls
+        unknown = set()
+
+        for chunk in _chunks(path_globs):
+            args = self.get_hadoop_bin() + ['fs', '-ls'] + chunk
+
+            log.debug('> %s' % cmd_line(args))
+
+            proc = Popen(args, stdout=PIPE, stderr=PIPE)
+            _, stderr = proc.communicate()
+
+            log_func = log.debug if proc.returncode == 0 else log.error
+            chunk_missing = set()
+            num_missing_lines = 0
+            other_error = False
+
+            for line in BytesIO(stderr):
+                line = line.rstrip(b'\r\n')
+
+                m = _HADOOP_LS_MISSING_PATH_RE.match(line)
+                if m:
+                    num_missing_lines += 1
+                    path = to_unicode(
+                        m.group('quoted_path') or m.group('path'))
+
+                    # hadoop may echo back a different form of the path
+                    # (e.g. a fully qualified URI)
+                    if path in chunk:
+                        chunk_missing.add(path)
+                    else:
+                        log_func('STDERR: ' + to_unicode(line))
+                        other_error = True
+                elif line:
+                    log_func('STDERR: ' + to_unicode(line))
+
+                    if not _is_harmless_log4j_line(line):
+                        other_error = True
+
+            if num_missing_lines != len(chunk_missing):
+                other_error = True
+
+            if proc.returncode != 0:
+                # if hadoop failed for some other reason, don't guess
+                if not num_missing_lines:
+                    raise IOError(
+                        'Could not check paths %s' % ' '.join(chunk))
+
+                # if there's more going on than missing paths, don't assume
+                # that the paths we didn't see are there
+                if other_error:
+                    unknown.update(
+                        p for p in chunk if p not in chunk_missing)
+
+            missing.update(chunk_missing)
+
+        # check paths with unknown status one by one
+        for path_glob in sorted(unknown):
+            if not self.exists(path_glob):
+                missing.add(path_glob)
+
+        return [path_glob not in missing for path_glob in path_globs]
+
     def put(self, src, path):
         # don't inadvertently support cp syntax
         if path.endswith('/'):
@@ -320,25 +448,110 @@ class HadoopFilesystem(Filesystem):
 
         self.invoke_hadoop(['fs', '-put', src, path])
 
+    def _put_many(self, srcs_and_paths):
+        """Upload several files, running ``hadoop fs -put`` once per
+        destination directory.
+
+        ``hadoop fs -put`` can only copy several files at once if they
+        keep their names, so files that are renamed are uploaded one by one.
+        Destination directories are created as needed.
+        """
+        # map from destination dir to map from filename to local path
+        dir_to_name_to_src = {}
+        # (src, path) for files that have to be uploaded one by one
+        renamed = []
+
+        for src, path in srcs_and_paths:
+            if path.endswith('/'):
+                raise ValueError('put() destination may not be a directory')
+
+            dest_dir, name = posixpath.split(path)
+            name_to_src = dir_to_name_to_src.setdefault(dest_dir, {})
+
+            if os.path.basename(src) == name and name not in name_to_src:
+                name_to_src[name] = src
+            else:
+                renamed.append((src, path))
+
+        for dest_dir, name_to_src in sorted(dir_to_name_to_src.items()):
+            srcs = [src for _, src in sorted(name_to_src.items())]
+
+            if len(srcs) == 1:
+                self._put_into_dir(
+                    ['fs', '-put', srcs[0], posixpath.join(
+                        dest_dir, os.path.basename(srcs[0]))], dest_dir)
+                continue
+
+            for chunk in _chunks(srcs):
+                self._put_into_dir(['fs', '-put'] + chunk + [dest_dir],
+                                   dest_dir)
+
+        # do these last, so their directories are more likely to exist
+        for src, path in renamed:
+            self._put_into_dir(['fs', '-put', src, path],
+                               posixpath.dirname(path))
+
+    def _put_into_dir(self, args, dest_dir):
+        """Run *args* (a ``hadoop fs -put`` command). If *dest_dir*
+        doesn't exist, create it and try again."""
+        returncode = self.invoke_hadoop(
+            args, ok_stderr=[_HADOOP_PUT_NO_SUCH_DIR_RE])
+
+        # hadoop fs -put doesn't create missing directories
+        if returncode != 0:
+            self.mkdir(dest_dir)
+            self.invoke_hadoop(args)
+
     def rm(self, path_glob):
         if not is_uri(path_glob):
             super(HadoopFilesystem, self).rm(path_glob)
 
+        self._rm_many([path_glob])
+
+    def _rm_many(self, path_globs):
+        """Recursively delete several paths, with one ``hadoop fs`` call."""
         version = self.get_hadoop_version()
         if uses_yarn(version):
-            args = ['fs', '-rm', '-R', '-f', '-skipTrash', path_glob]
+            rm_args = ['fs', '-rm', '-R', '-f', '-skipTrash']
         else:
-            args = ['fs', '-rmr', '-skipTrash', path_glob]
+            rm_args = ['fs', '-rmr', '-skipTrash']
 
-        try:
-            self.invoke_hadoop(
-                args,
-                return_stdout=True, ok_stderr=[_HADOOP_RM_NO_SUCH_FILE])
-        except CalledProcessError:
-            raise IOError("Could not rm %s" % path_glob)
+        for chunk in _chunks(path_globs):
+            try:
+                self.invoke_hadoop(
+                    rm_args + chunk,
+                    return_stdout=True, ok_stderr=[_HADOOP_RM_NO_SUCH_FILE])
+            except CalledProcessError:
+                raise IOError("Could not rm %s" % ' '.join(chunk))
 
     def touchz(self, path):
         try:
             self.invoke_hadoop(['fs', '-touchz', path])
         except CalledProcessError:
             raise IOError("Could not touchz %s" % path)
+
+
+def _stderr_matches(stderr_re, stderr):
+    """Does *stderr_re* match *stderr*? Regexes compiled with
+    :py:data:`re.M` can match at the start of any line."""
+    if stderr_re.flags & re.M:
+        return bool(stderr_re.search(stderr))
+    else:
+        return bool(stderr_re.match(stderr))
+
+
+def _is_harmless_log4j_line(line):
+    """Is *line* (from stderr) a log4j message that doesn't indicate an
+    error (e.g. a warning about native libraries)?"""
+    m = _HADOOP_LOG4J_LINE_RE.match(to_unicode(line))
+
+    return bool(m and m.group('level') in _HARMLESS_LOG4J_LEVELS)
+
+
+def _chunks(paths):
+    """Split *paths* into lists short enough to pass to one ``hadoop fs``
+    command."""
+    paths = list(paths)
+
+    for i in range(0, len(paths), _MAX_PATHS_PER_HADOOP_CMD):
+        yield paths[i:i + _MAX_PATHS_PER_HADOOP_CMD]
@@ -38,6 +38,8 @@ from mrjob.aws import _S3_REGION_WITH_NO_LOCATION_CONSTRAINT
 from mrjob.aws import _wrap_aws_client
 from mrjob.cat import decompress
 from mrjob.fs.base import Filesystem
+from mrjob.fs.base import _cat_in_threads
+from mrjob.fs.base import _put_in_threads
 from mrjob.parse import is_uri
 from mrjob.parse import is_s3_uri
 from mrjob.parse import parse_s3_uri
@@ -52,6 +54,9 @@ _CHUNK_SIZE = 8192
 # used to disable multipart upload
 _HUGE_PART_SIZE = 2 ** 256
 
+# default number of files to upload at once in _put_many()
+_DEFAULT_UPLOAD_THREADS = 8
+
 
 def _endpoint_url(host_or_uri):
     """If *host_or_uri* is non-empty and isn't a URI, prepend ``'https://'``.
@@ -88,12 +93,14 @@ class S3Filesystem(Filesystem):
                       newly created buckets.
     :param part_size: Part size for multi-part uploading, in bytes, or
                       ``None``
+    :param upload_threads: Max number of files to upload (or download) at
+                           once
 
     .. versionchanged:: 0.6.8 added *part_size*
     """
     def __init__(self, aws_access_key_id=None, aws_secret_access_key=None,
                  aws_session_token=None, s3_endpoint=None, s3_region=None,
-                 part_size=None):
+                 part_size=None, upload_threads=None):
         super(S3Filesystem, self).__init__()
         self._s3_endpoint_url = _endpoint_url(s3_endpoint)
         self._s3_region = s3_region
@@ -101,6 +108,7 @@ class S3Filesystem(Filesystem):
         self._aws_secret_access_key = aws_secret_access_key
         self._aws_session_token = aws_session_token
         self._part_size = part_size
+        self._upload_threads = upload_threads or _DEFAULT_UPLOAD_THREADS
 
     def can_handle_path(self, path):
         return is_s3_uri(path)
@@ -201,19 +209,77 @@ class S3Filesystem(Filesystem):
 
             self.create_bucket(bucket_name)
 
+    def _mkdir_many(self, paths):
+        """Create each bucket in *paths* that doesn't exist, checking each
+        bucket only once."""
+        for bucket_name in sorted(set(parse_s3_uri(p)[0] for p in paths)):
+            self.mkdir('s3://%s/' % bucket_name)
+
     def put(self, src, path):
         """Uploads a local file to a specific destination."""
         s3_key = self._get_s3_key(path)
 
+        s3_key.upload_file(src, Config=self._transfer_config())
+
+    def _put_many(self, srcs_and_paths):
+        """Upload several files at once, in threads.
+
+        We look up each bucket's region only once, and share one
+        (thread-safe) client per region between threads.
+        """
+        bucket_to_client = self._bucket_to_client(
+            path for _, path in srcs_and_paths)
+
+        config = self._transfer_config()
+
+        def put(src, path):
+            bucket_name, key_name = parse_s3_uri(path)
+            bucket_to_client[bucket_name].upload_file(
+                src, bucket_name, key_name, Config=config)
+
+        _put_in_threads(put, srcs_and_paths, self._upload_threads)
+
+    def _cat_many(self, paths_and_dests):
+        """Download several files at once, in threads, sharing clients
+        like :py:meth:`_put_many`."""
+        bucket_to_client = self._bucket_to_client(
+            path for path, _ in paths_and_dests)
+
+        def cat_file(path):
+            bucket_name, key_name = parse_s3_uri(path)
+            body = bucket_to_client[bucket_name].get_object(
+                Bucket=bucket_name, Key=key_name)['Body']
+
+            return decompress(body, path)
+
+        _cat_in_threads(cat_file, paths_and_dests, self._upload_threads)
+
+    def _bucket_to_client(self, paths):
+        """Map the name of each bucket in *paths* to a client for its
+        region, looking up each bucket's region only once."""
+        bucket_to_client = {}
+        region_to_client = {}
+
+        for path in paths:
+            bucket_name, _ = parse_s3_uri(path)
+            if bucket_name not in bucket_to_client:
+                region_name = self._get_bucket_region_name(bucket_name)
+                if region_name not in region_to_client:
+                    region_to_client[region_name] = self.make_s3_client(
+                        region_name)
+                bucket_to_client[bucket_name] = region_to_client[region_name]
+
+        return bucket_to_client
+
+    def _transfer_config(self):
+        """Return the :py:class:`boto3.s3.transfer.TransferConfig` to
+        use for uploads."""
         # if part_size is None or 0, disable multipart upload
         part_size = self._part_size or _HUGE_PART_SIZE
 
-        s3_key.upload_file(
-            src,
-            Config=boto3.s3.transfer.TransferConfig(
-                multipart_chunksize=part_size,
-                multipart_threshold=part_size,
-            ),
+        return boto3.s3.transfer.TransferConfig(
+            multipart_chunksize=part_size,
+            multipart_threshold=part_size,
         )
 
     def rm(self, path_glob):
@@ -298,10 +364,18 @@ class S3Filesystem(Filesystem):
     def get_bucket(self, bucket_name):
         """Get the (:py:mod:`boto3`) bucket, connecting through the
         appropriate endpoint."""
+        region_name = self._get_bucket_region_name(bucket_name)
+
+        resource = self.make_s3_resource(region_name)
+        return resource.Bucket(bucket_name)
+
+    def _get_bucket_region_name(self, bucket_name):
+        """Get the region to connect to for the given bucket, or ``None``
+        if we can't find out."""
         client = self.make_s3_client()
 
         try:
-            region_name = _get_bucket_region(client, bucket_name)
+            return _get_bucket_region(client, bucket_name)
         except botocore.exceptions.ClientError as ex:
             # it's possible to have access to a bucket but not access
             # to its location metadata. This happens on the 'elasticmapreduce'
@@ -310,10 +384,7 @@ class S3Filesystem(Filesystem):
                 raise
             log.warning('Could not infer endpoint for bucket %s; '
                         'assuming defaults', bucket_name)
-            region_name = None
-
-        resource = self.make_s3_resource(region_name)
-        return resource.Bucket(bucket_name)
+            return None
 
     def _get_s3_key(self, uri):
         """Get the boto3 s3.Object matching the given S3 uri, or
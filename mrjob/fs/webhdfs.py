@@ -0,0 +1,544 @@
+# Copyright 2020 Affirm, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import fnmatch
+import getpass
+import json
+import logging
+import os
+import posixpath
+import re
+import socket
+import threading
+from multiprocessing.pool import ThreadPool
+
+from mrjob.cat import decompress
+from mrjob.fs.base import Filesystem
+from mrjob.fs.base import _cat_in_threads
+from mrjob.parse import urlparse
+from mrjob.py2 import HTTPConnection
+from mrjob.py2 import HTTPException
+from mrjob.py2 import HTTPSConnection
+from mrjob.py2 import quote
+from mrjob.py2 import to_unicode
+from mrjob.py2 import urlencode
+
+log = logging.getLogger(__name__)
+
+# path of the WebHDFS REST API on the namenode's HTTP server
+_WEBHDFS_PATH = '/webhdfs/v1'
+
+# URI schemes WebHDFS URIs, and the protocol we use for each
+_WEBHDFS_SCHEME_TO_PROTOCOL = {
+    'webhdfs': 'http',
+    'swebhdfs': 'https',
+}
+
+# download this many bytes at once from _cat_file()
+_CAT_CHUNK_SIZE = 64 * 1024
+
+# keep at most this many idle connections open to each host
+_MAX_IDLE_CONNECTIONS = 8
+
+# default number of directories to list at once in ls()
+_DEFAULT_LIST_THREADS = 8
+
+# namenodes redirect reads and writes to datanodes. don't follow more
+# redirects than this
+_MAX_REDIRECTS = 5
+
+# HTTP status codes that mean "go over there"
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# characters that make a path component a glob (see _glob())
+_GLOB_CHARS_RE = re.compile(r'[*?[]')
+
+
+class WebHDFSFilesystem(Filesystem):
+    """Filesystem for HDFS that talks to the namenode's
+    `WebHDFS REST API <https://hadoop.apache.org/docs/stable/hadoop-project-dist/hadoop-hdfs/WebHDFS.html>`__
+    directly, rather than running ``hadoop fs`` (and starting up a JVM) for
+    every call.
+
+    This always handles ``webhdfs://`` and ``swebhdfs://`` URIs. If you set
+    *webhdfs_url*, it handles ``hdfs://`` URIs on the same cluster as well
+    (those with no host, or the same host as *webhdfs_url*; URIs for other
+    clusters are left to ``hadoop fs``). Typically you will
+    get one of these via ``HadoopJobRunner().fs``, ahead of
+    :py:class:`~mrjob.fs.hadoop.HadoopFilesystem`, which it falls back to
+    if the WebHDFS server can't be reached.
+
+    HTTP connections are kept open and re-used, and :py:meth:`ls` lists
+    several directories at once. Only "simple" authentication (passing
+    ``user.name``) is supported, not Kerberos.
+    """
+    def __init__(self, webhdfs_url=None, user_name=None, list_threads=None,
+                 timeout=None):
+        """
+        :param webhdfs_url: URL of the namenode's HTTP server (e.g.
+                            ``http://namenode:9870``) to send requests for
+                            ``hdfs://`` URIs to
+        :param user_name: user to act as. Defaults to
+                          ``$HADOOP_USER_NAME``, or the current user
+        :param list_threads: how many directories to list at once
+        :param timeout: socket timeout, in seconds
+        """
+        super(WebHDFSFilesystem, self).__init__()
+
+        self._webhdfs_url = webhdfs_url
+        self._user_name = (user_name or os.environ.get('HADOOP_USER_NAME') or
+                           getpass.getuser())
+        self._list_threads = list_threads or _DEFAULT_LIST_THREADS
+        self._timeout = timeout
+
+        # map from (protocol, netloc) to a list of idle connections
+        self._idle_conns = {}
+        self._idle_conns_lock = threading.Lock()
+
+    def can_handle_path(self, path):
+        parsed = urlparse(path)
+
+        if parsed.scheme in _WEBHDFS_SCHEME_TO_PROTOCOL:
+            return True
+
+        return parsed.scheme == 'hdfs' and self._can_handle_hdfs_uri(parsed)
+
+    def _can_handle_hdfs_uri(self, parsed_uri):
+        """Can we send requests for the (parsed) ``hdfs://`` URI
+        *parsed_uri* to *webhdfs_url*? Only if it has no host (i.e. it's
+        on the default filesystem) or the same host as *webhdfs_url*. The
+        namenode's RPC and HTTP ports differ, so we ignore ports."""
+        if not self._webhdfs_url:
+            return False
+
+        if not parsed_uri.netloc:
+            return True
+
+        return parsed_uri.hostname == urlparse(self._webhdfs_url).hostname
+
+    def du(self, path_glob):
+        """Get the size of a file or directory (recursively), or 0
+        if it doesn't exist."""
+        total = 0
+
+        for uri, status in self._glob(path_glob):
+            if status['type'] == 'DIRECTORY':
+                summary = self._json_op('GET', uri, 'GETCONTENTSUMMARY')
+                if summary:
+                    total += summary['ContentSummary']['length']
+            else:
+                total += status['length']
+
+        return total
+
+    def ls(self, path_glob):
+        # list everything up front, so that if we can't reach the server,
+        # CompositeFilesystem can fall back to another filesystem
+        return iter([uri for uri, _ in self._ls(path_glob)])
+
+    def _ls(self, path_glob):
+        """Return a sorted list of ``(uri, file_status)`` for every file
+        matching *path_glob*, and every file in every directory matching
+        it (recursively).
+
+        Directories at the same depth are listed in parallel.
+        """
+        results = []
+        dir_uris = []
+
+        for uri, status in self._glob(path_glob):
+            if status['type'] == 'DIRECTORY':
+                dir_uris.append(uri)
+            else:
+                results.append((uri, status))
+
+        while dir_uris:
+            listings = self._map(self._list_dir, dir_uris)
+            dir_uris = []
+
+            for listing in listings:
+                for uri, status in listing:
+                    if status['type'] == 'DIRECTORY':
+                        dir_uris.append(uri)
+                    else:
+                        results.append((uri, status))
+
+        return sorted(results, key=lambda u_s: u_s[0])
+
+    def _cat_file(self, path):
+        # open the file now, so errors are raised before we return
+        conn_key, conn, resp = self._open(
+            'GET', self._op_url(path, 'OPEN'), ok_statuses=(200,))
+
+        return decompress(
+            self._read_chunks(conn_key, conn, resp), path)
+
+    def _cat_many(self, paths_and_dests):
+        """Download several files at once, in threads (one connection
+        each)."""
+        _cat_in_threads(self._cat_file, paths_and_dests,
+                        _MAX_IDLE_CONNECTIONS)
+
+    def _read_chunks(self, conn_key, conn, resp):
+        """Stream the (possibly compressed) body of *resp*."""
+        try:
+            while True:
+                chunk = resp.read(_CAT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        except:
+            conn.close()
+            raise
+
+        self._release_conn(conn_key, conn, resp)
+
+    def exists(self, path_glob):
+        """Does the given path/URI exist?
+
+        Like ``hadoop fs -ls``, this is true for empty directories.
+        """
+        for _ in self._glob(path_glob):
+            return True
+
+        return False
+
+    def mkdir(self, path):
+        self._json_op('PUT', path, 'MKDIRS')
+
+    def put(self, src, path):
+        # don't inadvertently support cp syntax
+        if path.endswith('/'):
+            raise ValueError('put() destination may not be a directory')
+
+        with open(src, 'rb') as f:
+            self._write(path, f, os.fstat(f.fileno()).st_size,
+                        overwrite=False)
+
+    def rm(self, path_glob):
+        for uri, _ in self._glob(path_glob):
+            self._json_op('DELETE', uri, 'DELETE', recursive='true')
+
+    def touchz(self, path):
+        status = self._get_status(path)
+
+        if status and (status['type'] != 'FILE' or status['length']):
+            raise IOError('Non-empty file %r already exists!' % (path,))
+
+        self._write(path, b'', 0, overwrite=True)
+
+    # globbing and listing
+
+    def _glob(self, path_glob):
+        """Yield ``(uri, file_status)`` for each file or directory matching
+        *path_glob*, without recursing into directories.
+
+        Like ``hadoop fs``, a glob in one path component only matches
+        that component (e.g. ``/data/*`` doesn't match ``/data/a/b``).
+        """
+        prefix, path = _split_uri(path_glob)
+
+        components = [c for c in path.split('/') if c]
+
+        # look up the part of the path that isn't a glob directly
+        num_plain = 0
+        while (num_plain < len(components) and
+               not _GLOB_CHARS_RE.search(components[num_plain])):
+            num_plain += 1
+
+        base_uri = prefix + '/' + '/'.join(components[:num_plain])
+
+        base_status = self._get_status(base_uri)
+        if not base_status:
+            return
+
+        matches = [(base_uri, base_status)]
+
+        for component in components[num_plain:]:
+            if _GLOB_CHARS_RE.search(component):
+                listings = self._map(
+                    self._list_dir,
+                    [uri for uri, status in matches
+                     if status['type'] == 'DIRECTORY'])
+
+                matches = [
+                    (uri, status)
+                    for listing in listings
+                    for uri, status in listing
+                    if fnmatch.fnmatchcase(posixpath.basename(uri), component)
+                ]
+            else:
+                child_uris = [
+                    posixpath.join(uri, component)
+                    for uri, status in matches
+                    if status['type'] == 'DIRECTORY']
+
+                matches = [
+                    (uri, status) for uri, status in
+                    zip(child_uris, self._map(self._get_status, child_uris))
+                    if status
+                ]
+
+        for uri, status in sorted(matches, key=lambda u_s: u_s[0]):
+            yield uri, status
+
+    def _get_status(self, uri):
+        """Return the ``FileStatus`` dictionary for *uri*, or ``None`` if
+        it doesn't exist."""
+        result = self._json_op('GET', uri, 'GETFILESTATUS', missing_ok=True)
+
+        if result:
+            return result['FileStatus']
+        else:
+            return None
+
+    def _list_dir(self, uri):
+        """Return a list of ``(uri, file_status)`` for the contents of the
+        directory at *uri* (or an empty list if it doesn't exist)."""
+        result = self._json_op('GET', uri, 'LISTSTATUS', missing_ok=True)
+        if not result:
+            return []
+
+        listing = []
+
+        for status in result['FileStatuses']['FileStatus']:
+            # if *uri* is a file, its only entry has an empty pathSuffix
+            if status['pathSuffix']:
+                child_uri = posixpath.join(uri, status['pathSuffix'])
+            else:
+                child_uri = uri
+
+            listing.append((child_uri, status))
+
+        return listing
+
+    def _map(self, func, args):
+        """Call *func* on each of *args*, several at a time, and return
+        a list of the results."""
+        args = list(args)
+
+        if len(args) <= 1 or self._list_threads <= 1:
+            return [func(arg) for arg in args]
+
+        pool = ThreadPool(min(len(args), self._list_threads))
+        try:
+            return pool.map(func, args)
+        finally:
+            pool.close()
+            pool.join()
+
+    # REST API
+
+    def _op_url(self, uri, op, **params):
+        """Return ``(protocol, netloc, path_and_query)`` for an HTTP request
+        that runs *op* on *uri*."""
+        if urlparse(uri).scheme == 'hdfs':
+            if not self._can_handle_hdfs_uri(urlparse(uri)):
+                raise IOError("Can't handle path: %s" % uri)
+
+            http_uri = urlparse(self._webhdfs_url)
+            protocol = http_uri.scheme
+            netloc = http_uri.netloc
+            api_path = http_uri.path.rstrip('/')
+            if not api_path.endswith(_WEBHDFS_PATH):
+                api_path += _WEBHDFS_PATH
+        else:
+            parsed = urlparse(uri)
+            protocol = _WEBHDFS_SCHEME_TO_PROTOCOL[parsed.scheme]
+            netloc = parsed.netloc
+            api_path = _WEBHDFS_PATH
+
+        _, path = _split_uri(uri)
+
+        params['op'] = op
+        params['user.name'] = self._user_name
+
+        return protocol, netloc, '%s%s?%s' % (
+            api_path, quote(path or '/'), urlencode(sorted(params.items())))
+
+    def _json_op(self, method, uri, op, missing_ok=False, **params):
+        """Run *op* on *uri*, and return the decoded JSON response (or
+        ``None`` if there isn't one).
+
+        If *missing_ok* is true, return ``None`` if *uri* doesn't exist.
+        """
+        ok_statuses = (200, 201, 404) if missing_ok else (200, 201)
+
+        conn_key, conn, resp = self._open(
+            method, self._op_url(uri, op, **params), ok_statuses=ok_statuses)
+
+        body = resp.read()
+        self._release_conn(conn_key, conn, resp)
+
+        if resp.status == 404 or not body:
+            return None
+
+        return json.loads(to_unicode(body))
+
+    def _write(self, uri, data, length, overwrite=False):
+        """Write *data* (bytes or a file object) of the given *length* to
+        *uri*.
+
+        The namenode redirects us to a datanode, so we don't send any data
+        until we know where it's going.
+        """
+        url = self._op_url(uri, 'CREATE',
+                           overwrite=str(bool(overwrite)).lower())
+
+        conn_key, conn, resp = self._open(
+            'PUT', url, ok_statuses=(201,), redirect_body=data,
+            headers={'Content-Type': 'application/octet-stream',
+                     'Content-Length': str(length)})
+
+        resp.read()
+        self._release_conn(conn_key, conn, resp)
+
+    def _open(self, method, url, ok_statuses, redirect_body=None,
+              headers=None):
+        """Send an HTTP request, following redirects (sending
+        *redirect_body* to the location we're redirected to), and
+        return ``(conn_key, conn, response)``.
+
+        Raise :py:class:`IOError` if the final response's status isn't in
+        *ok_statuses*.
+        """
+        protocol, netloc, path_and_query = url
+        body = None
+
+        for _ in range(_MAX_REDIRECTS + 1):
+            conn_key = (protocol, netloc)
+            conn, resp = self._request(
+                conn_key, method, path_and_query, body=body,
+                headers=headers if body is not None else None)
+
+            if resp.status not in _REDIRECT_STATUSES:
+                break
+
+            location = urlparse(resp.getheader('Location'))
+            resp.read()
+            self._release_conn(conn_key, conn, resp)
+
+            protocol = location.scheme or protocol
+            netloc = location.netloc or netloc
+            path_and_query = location.path
+            if location.query:
+                path_and_query += '?' + location.query
+
+            if redirect_body is not None:
+                body = redirect_body
+        else:
+            conn.close()
+            raise IOError('Too many redirects from WebHDFS')
+
+        if resp.status not in ok_statuses:
+            error_body = resp.read()
+            conn.close()
+            raise IOError('WebHDFS %s request failed (%d): %s' % (
+                method, resp.status, _remote_exception_message(error_body)))
+
+        return conn_key, conn, resp
+
+    def _request(self, conn_key, method, path_and_query, body=None,
+                 headers=None):
+        """Send a request on a pooled connection, and return
+        ``(conn, response)``. If a pooled connection turns out to have been
+        closed by the server, retry once on a fresh one."""
+        log.debug('> WebHDFS %s %s://%s%s' % (
+            method, conn_key[0], conn_key[1], path_and_query))
+
+        conn, reused = self._get_conn(conn_key)
+
+        try:
+            conn.request(method, path_and_query, body=body,
+                         headers=headers or {})
+            return conn, conn.getresponse()
+        except Exception:
+            conn.close()
+
+            # retrying a file upload could be tricky, but we only get here
+            # if the server hung up before reading our request
+            if not reused:
+                raise
+
+            if hasattr(body, 'seek'):
+                body.seek(0)
+
+        conn = self._new_conn(conn_key)
+        conn.request(method, path_and_query, body=body,
+                     headers=headers or {})
+        return conn, conn.getresponse()
+
+    def _get_conn(self, conn_key):
+        """Return ``(conn, reused)``, where *conn* is an idle connection
+        from our pool if there is one, or a new one."""
+        with self._idle_conns_lock:
+            idle_conns = self._idle_conns.get(conn_key)
+            if idle_conns:
+                return idle_conns.pop(), True
+
+        return self._new_conn(conn_key), False
+
+    def _new_conn(self, conn_key):
+        protocol, netloc = conn_key
+
+        if protocol == 'https':
+            conn_class = HTTPSConnection
+        else:
+            conn_class = HTTPConnection
+
+        if self._timeout is None:
+            return conn_class(netloc)
+        else:
+            return conn_class(netloc, timeout=self._timeout)
+
+    def _release_conn(self, conn_key, conn, resp):
+        """Put *conn* back in the pool, once we've read all of *resp*."""
+        if resp.will_close:
+            conn.close()
+            return
+
+        with self._idle_conns_lock:
+            idle_conns = self._idle_conns.setdefault(conn_key, [])
+            if len(idle_conns) < _MAX_IDLE_CONNECTIONS:
+                idle_conns.append(conn)
+                return
+
+        conn.close()
+
+
+def _is_unreachable(ex):
+    """Does the exception *ex* mean we couldn't talk to the WebHDFS server
+    at all (rather than that it returned an error)? Used as *disable_if*
+    with :py:class:`~mrjob.fs.composite.CompositeFilesystem`."""
+    if isinstance(ex, (HTTPException, socket.timeout)):
+        return True
+
+    # IOErrors we raise ourselves don't have an errno
+    return isinstance(ex, socket.error) and ex.errno is not None
+
+
+def _split_uri(uri):
+    """Split a URI into its ``scheme://netloc`` prefix and its path."""
+    parsed = urlparse(uri)
+
+    return '%s://%s' % (parsed.scheme, parsed.netloc), parsed.path
+
+
+def _remote_exception_message(body):
+    """Get the error message from a WebHDFS error response, which is
+    usually JSON describing a ``RemoteException``."""
+    try:
+        e = json.loads(to_unicode(body))['RemoteException']
+        return '%s: %s' % (e['exception'], e['message'])
+    except (ValueError, KeyError, TypeError):
+        return to_unicode(body)
@@ -35,6 +35,8 @@ from mrjob.conf import combine_dicts
 from mrjob.fs.composite import CompositeFilesystem
 from mrjob.fs.hadoop import HadoopFilesystem
 from mrjob.fs.local import LocalFilesystem
+from mrjob.fs.webhdfs import WebHDFSFilesystem
+from mrjob.fs.webhdfs import _is_unreachable
 from mrjob.logs.counters import _pick_counters
 from mrjob.logs.errors import _log_probable_cause_of_failure
 from mrjob.logs.mixin import LogInterpretationMixin
@@ -132,6 +134,7 @@ class HadoopJobRunner(MRJobBinRunner, LogInterpretationMixin):
         'hadoop_tmp_dir',
         'spark_deploy_mode',
         'spark_master',
+        'webhdfs_url',
     }
 
     # supports everything (so far)
@@ -152,7 +155,9 @@ class HadoopJobRunner(MRJobBinRunner, LogInterpretationMixin):
         # Keep track of local files to upload to HDFS. We'll add them
         # to this manager just before we need them.
         hdfs_files_dir = posixpath.join(self._hadoop_tmp_dir, 'files', '')
-        self._upload_mgr = UploadDirManager(hdfs_files_dir)
+        self._upload_mgr = UploadDirManager(
+            hdfs_files_dir,
+            cas_prefix=self._upload_cas_prefix(self._hadoop_tmp_dir))
 
         # Set output dir if it wasn't set explicitly
         self._output_dir = fully_qualify_hdfs_path(
@@ -199,6 +204,11 @@ class HadoopJobRunner(MRJobBinRunner, LogInterpretationMixin):
             # fs.set_hadoop_bin() is called (used for running hadoop over SSH).
             hadoop_bin = self._opts['hadoop_bin'] or None
 
+            # try WebHDFS first; it's much faster than running hadoop fs,
+            # but fall back to hadoop fs if the server isn't reachable
+            self._fs.add_fs('webhdfs',
+                            WebHDFSFilesystem(self._opts['webhdfs_url']),
+                            disable_if=_is_unreachable)
             self._fs.add_fs('hadoop',
                             HadoopFilesystem(hadoop_bin))
             self._fs.add_fs('local', LocalFilesystem())
@@ -20,7 +20,13 @@
 process. Useful for debugging."""
 import logging
 import os
+import pickle
+import signal
 import sys
+import time
+import traceback
+from os.path import exists
+from os.path import join
 
 from mrjob.job import MRJob
 from mrjob.runner import _fix_env
@@ -32,6 +38,11 @@ from mrjob.util import save_sys_std
 
 log = logging.getLogger(__name__)
 
+# how long to wait between polling forked tasks, in seconds. We start
+# with the minimum and back off to the maximum
+_MIN_FORKED_TASK_POLL_INTERVAL = 0.001
+_MAX_FORKED_TASK_POLL_INTERVAL = 0.05
+
 
 class InlineMRJobRunner(SimMRJobRunner):
     """Runs an :py:class:`~mrjob.job.MRJob` in the same process, so it's easy
@@ -55,15 +66,23 @@ class InlineMRJobRunner(SimMRJobRunner):
     """
     alias = 'inline'
 
+    OPT_NAMES = SimMRJobRunner.OPT_NAMES | {
+        'fork_tasks',
+    }
+
     def __init__(self, mrjob_cls=None, **kwargs):
         """:py:class:`~mrjob.inline.InlineMRJobRunner` takes the same keyword
         args as :py:class:`~mrjob.runner.MRJobRunner`. However, please note
         that
-        *hadoop_input_format*, *hadoop_output_format*, and *partitioner*
-        are ignored
+        *hadoop_input_format* and *hadoop_output_format* are ignored
         because they require Java. If you need to test these, consider
         starting up a standalone Hadoop instance and running your job with
-        ``-r hadoop``."""
+        ``-r hadoop``. *partitioner* is simulated for ``HashPartitioner``
+        and ``KeyFieldBasedPartitioner``, and ignored otherwise.
+
+        If you set *fork_tasks*, tasks run in parallel (up to
+        *num_cores* at a time) in processes forked from this one. If a task
+        fails, we still raise the actual exception."""
         super(InlineMRJobRunner, self).__init__(**kwargs)
         # if we run python -m mrjob.job, mrjob_cls is __main__.MRJob
         # which is identical to (but not a subclass of) mrjob.job.MRJob
@@ -85,6 +104,10 @@ class InlineMRJobRunner(SimMRJobRunner):
         if self._opts['setup']:
             log.warning("inline runner can't run setup commands")
 
+        if self._opts['fork_tasks'] and not hasattr(os, 'fork'):
+            log.warning("can't fork tasks on this platform,"
+                        " running them one at a time")
+
     def _check_step(self, step, step_num):
         """Don't try to run steps that include commands."""
         super(InlineMRJobRunner, self)._check_step(step, step_num)
@@ -140,13 +163,126 @@ class InlineMRJobRunner(SimMRJobRunner):
                     if input_uri:  # from manifest
                         self._error_while_reading_from = input_uri
                     else:
-                        self._error_while_reading_from = self._task_input_path(
-                            task_type, step_num, task_num)
+                        self._error_while_reading_from = (
+                            self._task_input_path_for_error(
+                                task_type, step_num, task_num))
 
                     raise
 
         return invoke_task
 
+    def _run_multiple(self, funcs, num_processes=None):
+        """If *fork_tasks* is set, run *funcs* in parallel, each in its own
+        forked process. Because we fork, *funcs* don't need to be
+        pickleable, and we don't need to re-import the job.
+
+        If a task fails, kill the others and raise its exception (with its
+        traceback as the exception's ``__cause__``).
+        """
+        if not (self._opts['fork_tasks'] and hasattr(os, 'fork')):
+            return super(InlineMRJobRunner, self)._run_multiple(
+                funcs, num_processes)
+
+        max_procs = num_processes or self._num_cores()
+
+        pids = set()
+
+        try:
+            for func in funcs:
+                while len(pids) >= max_procs:
+                    self._wait_for_forked_task(pids)
+
+                pids.add(self._fork_task(func))
+
+            while pids:
+                self._wait_for_forked_task(pids)
+        except:
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                except OSError:
+                    pass
+            raise
+
+    def _fork_task(self, func):
+        """Call *func()* in a forked process, and return its PID.
+
+        If *func()* raises an exception, the child pickles it (see
+        :py:meth:`_forked_task_error_path`) and exits with status 1.
+        """
+        pid = os.fork()
+
+        if pid:
+            return pid
+
+        returncode = 1
+        try:
+            try:
+                func()
+                returncode = 0
+            except BaseException as ex:
+                self._save_forked_task_error(ex)
+        finally:
+            os._exit(returncode)
+
+    def _forked_task_error_path(self, pid):
+        return join(self._get_local_tmp_dir(), 'task-error-%d.pickle' % pid)
+
+    def _save_forked_task_error(self, ex):
+        """Pickle *ex* (in the forked process), along with its traceback and
+        the path we were reading from."""
+        tb = traceback.format_exc()
+
+        with open(self._forked_task_error_path(os.getpid()), 'wb') as f:
+            error = (ex, tb, self._error_while_reading_from)
+            try:
+                pickle.dump(error, f)
+            except Exception:
+                # fall back to an exception we know we can pickle
+                f.seek(0)
+                f.truncate()
+                pickle.dump((Exception(tb), tb, error[2]), f)
+
+    def _wait_for_forked_task(self, pids):
+        """Wait for any process in *pids* to finish, and remove it. If
+        it failed, raise the exception that caused it to fail.
+
+        We poll each process in *pids* rather than calling :py:func:`os.wait`
+        so that we don't reap other children of this process (e.g.
+        subprocesses started by the job, or by code that's running us),
+        and lose their exit status.
+        """
+        poll_interval = _MIN_FORKED_TASK_POLL_INTERVAL
+
+        while True:
+            pid, status = _reap_any(pids)
+            if pid:
+                break
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2,
+                                _MAX_FORKED_TASK_POLL_INTERVAL)
+
+        pids.remove(pid)
+
+        if not status:
+            return
+
+        error_path = self._forked_task_error_path(pid)
+
+        if not exists(error_path):
+            raise Exception('task process %d exited with status %d' % (
+                pid, status))
+
+        with open(error_path, 'rb') as f:
+            ex, tb, self._error_while_reading_from = pickle.load(f)
+
+        os.remove(error_path)
+
+        ex.__cause__ = _RemoteTraceback(tb)
+        raise ex
+
     def _run_step_on_spark(self, step, step_num):
         """Set up a fake working directory and environment, and call the Spark
         method."""
@@ -198,3 +334,24 @@ class InlineMRJobRunner(SimMRJobRunner):
 
     def _wd_mirror(self):
         return None  # no need for this, we set up the working dir (Spark too)
+
+
+def _reap_any(pids):
+    """If any process in *pids* has exited, reap it and return
+    ``(pid, status)``. Otherwise, return ``(0, 0)``."""
+    for pid in pids:
+        reaped_pid, status = os.waitpid(pid, os.WNOHANG)
+        if reaped_pid:
+            return reaped_pid, status
+
+    return 0, 0
+
+
+class _RemoteTraceback(Exception):
+    """Wraps the traceback of an exception from a forked task, so it can
+    be displayed as the ``__cause__`` of the re-raised exception."""
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
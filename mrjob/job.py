@@ -26,6 +26,7 @@ import os
 import os.path
 import sys
 import time
+from contextlib import contextmanager
 from io import BytesIO
 from argparse import ArgumentParser
 from argparse import ArgumentTypeError
@@ -45,6 +46,8 @@ from mrjob.options import _print_help_for_runner
 from mrjob.options import _RUNNER_OPTS
 from mrjob.protocol import JSONProtocol
 from mrjob.protocol import RawValueProtocol
+from mrjob.protocol import _KeyCachingProtocol
+from mrjob.protocol import _has_consistent_method
 from mrjob.py2 import integer_types
 from mrjob.py2 import string_types
 from mrjob.runner import _runner_class
@@ -63,6 +66,14 @@ log = logging.getLogger(__name__)
 # sentinel value; used when running MRJob as a script
 _READ_ARGS_FROM_SYS_ARGV = '_READ_ARGS_FROM_SYS_ARGV'
 
+# how many lines/records to decode or encode at once, for protocols that
+# support read_many() and write_many()
+_PROTOCOL_BATCH_SIZE = 1000
+
+# while running a task, how often (in seconds) to write out counters
+# that have been incremented
+_COUNTER_FLUSH_INTERVAL = 1.0
+
 
 class UsageError(Exception):
     pass
@@ -141,6 +152,11 @@ class MRJob(object):
         self._stdout = None
         self._stderr = None
 
+        # while running a task, counter increments that haven't been
+        # written to stderr yet. See _coalesce_counters()
+        self._pending_counters = None
+        self._next_counter_flush = None
+
     # by default, self.stdin, self.stdout, and self.stderr are sys.std*.buffer
     # if it exists, and otherwise sys.std* otherwise (they should always deal
     # with bytes, not Unicode).
@@ -373,6 +389,44 @@ class MRJob(object):
         """
         raise NotImplementedError
 
+    def mapper_batch(self, keys, values):
+        """Re-define this to have your mapper process input in blocks,
+        rather than one record at a time (for example, to use vectorized
+        operations from :py:mod:`numpy`).
+
+        Yields one or more tuples of ``(out_key, out_value)``.
+
+        :param keys: a list of keys parsed from input
+        :param values: a list of the corresponding values
+
+        Each call receives up to :py:attr:`BATCH_SIZE` records. Lists are
+        easy to convert, e.g. ``numpy.asarray(values)``.
+        """
+        raise NotImplementedError
+
+    def combiner_batch(self, key, values):
+        """Like :py:meth:`combiner`, except that *values* is a list rather
+        than a generator (see :py:meth:`reducer_batch`).
+        """
+        raise NotImplementedError
+
+    def reducer_batch(self, key, values):
+        """Re-define this to have your reducer receive all the values for
+        each key at once, as a list (rather than a generator), for
+        example so that you can use vectorized operations from
+        :py:mod:`numpy` on them.
+
+        Yields one or more tuples of ``(out_key, out_value)``.
+
+        :param key: A key which was yielded by the mapper
+        :param values: A list of all values yielded by the mapper which
+                       correspond to ``key``.
+
+        Since all values for *key* are loaded into memory, this isn't
+        suitable for keys with a very large number of values.
+        """
+        raise NotImplementedError
+
     def reducer_init(self):
         """Re-define this to define an action to run before the reducer
         processes any input.
@@ -556,6 +610,10 @@ class MRJob(object):
 
         Commas in ``counter`` or ``group`` will be automatically replaced
         with semicolons (commas confuse Hadoop streaming).
+
+        While running a task, increments of the same counter are added
+        together and written out periodically (and when the task finishes),
+        rather than on every call.
         """
         # don't allow people to pass in floats
         if not isinstance(amount, integer_types):
@@ -567,6 +625,18 @@ class MRJob(object):
         if not isinstance(counter, string_types):
             counter = str(counter)
 
+        if self._pending_counters is not None:
+            key = (group, counter)
+            self._pending_counters[key] = (
+                self._pending_counters.get(key, 0) + amount)
+
+            if time.time() >= self._next_counter_flush:
+                self._flush_counters()
+        else:
+            self._write_counter(group, counter, amount)
+
+    def _write_counter(self, group, counter, amount):
+        """Write a counter increment to stderr."""
         # Extra commas screw up hadoop and there's no way to escape them. So
         # replace them with the next best thing: semicolons!
         #
@@ -589,6 +659,9 @@ class MRJob(object):
         long time between outputs; Hadoop streaming usually times out jobs
         that give no output for longer than 10 minutes.
         """
+        # keep counters and status in order
+        self._flush_counters()
+
         line = 'reporter:status:%s\n' % (msg,)
         if not isinstance(line, bytes):
             line = line.encode('utf_8')
@@ -596,6 +669,33 @@ class MRJob(object):
         self.stderr.write(line)
         self.stderr.flush()
 
+    @contextmanager
+    def _coalesce_counters(self):
+        """While running a task, add up counter increments, and write them
+        out periodically, and when the task finishes (see
+        :py:meth:`increment_counter`)."""
+        self._pending_counters = {}
+        self._next_counter_flush = time.time() + _COUNTER_FLUSH_INTERVAL
+
+        try:
+            yield
+        finally:
+            self._flush_counters()
+            self._pending_counters = None
+
+    def _flush_counters(self):
+        """Write out pending counter increments, if any."""
+        if not self._pending_counters:
+            return
+
+        pending_counters = self._pending_counters
+        self._pending_counters = {}
+
+        for (group, counter), amount in sorted(pending_counters.items()):
+            self._write_counter(group, counter, amount)
+
+        self._next_counter_flush = time.time() + _COUNTER_FLUSH_INTERVAL
+
     ### Running the job ###
 
     @classmethod
@@ -668,9 +768,31 @@ class MRJob(object):
         else:
             return self.options.cat_output
 
+    def worker_init(self):
+        """Re-define this to do expensive one-time setup (e.g. loading a
+        model into ``self``) that can be shared by every task a process
+        runs.
+
+        This is called once per job instance, before it runs any tasks.
+        With Hadoop Streaming and the local runners, that's once per task,
+        so it's no different from :py:meth:`mapper_init` etc. However, the
+        Spark harness caches configured job instances, so this is only
+        called once per step per Python worker, rather than once per
+        partition.
+
+        Unlike :py:meth:`mapper_init`, this can't yield key-value pairs.
+        Don't use it to set up per-task state; Spark may run many tasks
+        on the same job instance.
+        """
+        pass
+
     def execute(self):
         # MRJob does Hadoop Streaming stuff, or defers to its superclass
         # (MRJobLauncher) if not otherwise instructed
+        if (self.options.run_mapper or self.options.run_combiner or
+                self.options.run_reducer):
+            self.worker_init()
+
         if self.options.run_mapper:
             self.run_mapper(self.options.step_num)
 
@@ -755,10 +877,10 @@ class MRJob(object):
         directly from automated tests.
         """
         # pick input and output protocol
-        read_lines, write_line = self._wrap_protocols(step_num, 'mapper')
+        read_lines, write_lines = self._wrap_protocols(step_num, 'mapper')
 
-        for k, v in self.map_pairs(read_lines(), step_num=step_num):
-            write_line(k, v)
+        with self._coalesce_counters():
+            write_lines(self.map_pairs(read_lines(), step_num=step_num))
 
     def run_combiner(self, step_num=0):
         """Run the combiner for the given step.
@@ -775,10 +897,17 @@ class MRJob(object):
         directly from automated tests.
         """
         # pick input and output protocol
-        read_lines, write_line = self._wrap_protocols(step_num, 'combiner')
+        read_lines, write_lines = self._wrap_protocols(step_num, 'combiner')
+
+        with self._coalesce_counters():
+            groups = self._read_groups(step_num, 'combiner')
 
-        for k, v in self.combine_pairs(read_lines(), step_num=step_num):
-            write_line(k, v)
+            if groups is None:
+                write_lines(
+                    self.combine_pairs(read_lines(), step_num=step_num))
+            else:
+                write_lines(self._combine_or_reduce_groups(
+                    groups, 'combiner', step_num))
 
     def run_reducer(self, step_num=0):
         """Run the reducer for the given step.
@@ -790,14 +919,21 @@ class MRJob(object):
         directly from automated tests.
         """
         # pick input and output protocol
-        read_lines, write_line = self._wrap_protocols(step_num, 'reducer')
+        read_lines, write_lines = self._wrap_protocols(step_num, 'reducer')
+
+        with self._coalesce_counters():
+            groups = self._read_groups(step_num, 'reducer')
 
-        for k, v in self.reduce_pairs(read_lines(), step_num=step_num):
-            write_line(k, v)
+            if groups is None:
+                write_lines(self.reduce_pairs(read_lines(), step_num=step_num))
+            else:
+                write_lines(self._combine_or_reduce_groups(
+                    groups, 'reducer', step_num))
 
     def map_pairs(self, pairs, step_num=0):
         """Runs :py:meth:`mapper_init`,
-        :py:meth:`mapper`/:py:meth:`mapper_raw`, and :py:meth:`mapper_final`
+        :py:meth:`mapper`/:py:meth:`mapper_raw`/:py:meth:`mapper_batch`,
+        and :py:meth:`mapper_final`
         for one map task in one step.
 
         Takes in a sequence of (key, value) pairs as input, and yields
@@ -812,6 +948,7 @@ class MRJob(object):
 
         mapper = step['mapper']
         mapper_raw = step['mapper_raw']
+        mapper_batch = step['mapper_batch']
         mapper_init = step['mapper_init']
         mapper_final = step['mapper_final']
 
@@ -825,6 +962,12 @@ class MRJob(object):
             input_path, input_uri = self.options.args
             for k, v in mapper_raw(input_path, input_uri) or ():
                 yield k, v
+        elif mapper_batch:
+            for batch in _batches(pairs, self.BATCH_SIZE):
+                keys = [key for key, _ in batch]
+                values = [value for _, value in batch]
+                for k, v in mapper_batch(keys, values) or ():
+                    yield k, v
         else:
             for key, value in pairs:
                 for k, v in mapper(key, value) or ():
@@ -868,9 +1011,27 @@ class MRJob(object):
 
     def _combine_or_reduce_pairs(self, pairs, mrc, step_num=0):
         """Helper for :py:meth:`combine_pairs` and :py:meth:`reduce_pairs`."""
+        # group all values of the same key together
+        #
+        # be careful to use generators for everything, to allow for
+        # very large groupings of values
+        groups = (
+            (key, (value for _, value in pairs_for_key))
+            for key, pairs_for_key in itertools.groupby(
+                pairs, lambda k_v: k_v[0]))
+
+        for k, v in self._combine_or_reduce_groups(groups, mrc, step_num):
+            yield k, v
+
+    def _combine_or_reduce_groups(self, groups, mrc, step_num=0):
+        """Run :py:meth:`combiner_init`, :py:meth:`combiner` (or
+        :py:meth:`combiner_batch`), and :py:meth:`combiner_final` (or the
+        reducer equivalents) on *groups*, an iterable of
+        ``(key, values)``."""
         step = self._get_step(step_num, MRStep)
 
         task = step[mrc]
+        task_batch = step[mrc + '_batch']
         task_init = step[mrc + '_init']
         task_final = step[mrc + '_final']
         if task is None:
@@ -880,14 +1041,14 @@ class MRJob(object):
             for k, v in task_init() or ():
                 yield k, v
 
-        # group all values of the same key together, and pass to the reducer
-        #
-        # be careful to use generators for everything, to allow for
-        # very large groupings of values
-        for key, pairs_for_key in itertools.groupby(pairs, lambda k_v: k_v[0]):
-            values = (value for _, value in pairs_for_key)
-            for k, v in task(key, values) or ():
-                yield k, v
+        if task_batch:
+            for key, values in groups:
+                for k, v in task_batch(key, list(values)) or ():
+                    yield k, v
+        else:
+            for key, values in groups:
+                for k, v in task(key, values) or ():
+                    yield k, v
 
         if task_final:
             for k, v in task_final() or ():
@@ -953,12 +1114,16 @@ class MRJob(object):
         """Pick the protocol classes to use for reading and writing
         for the given step.
 
-        Returns a tuple of ``(read_lines, write_line)``
+        Returns a tuple of ``(read_lines, write_lines)``
 
         ``read_lines()`` is a function that reads lines from input, decodes
             them, and yields key, value pairs.
-        ``write_line()`` is a function that takes key and value as args,
-            encodes them, and writes a line to output.
+        ``write_lines()`` is a function that takes an iterable of key, value
+            pairs, encodes them, and writes them to output (in chunks of
+            about :py:attr:`OUTPUT_BUFFER_SIZE` bytes).
+
+        If the protocols have ``read_many()`` and ``write_many()`` methods,
+        we use them to decode and encode lines in batches.
 
         :param step_num: which step to run (e.g. 0)
         :param step_type: ``'mapper'``, ``'reducer'``, or ``'combiner'`` from
@@ -966,16 +1131,75 @@ class MRJob(object):
         """
         read, write = self.pick_protocols(step_num, step_type)
 
+        read_many = _batch_protocol_method(read, 'read_many')
+        write_many = _batch_protocol_method(write, 'write_many')
+
         def read_lines():
-            for line in self._read_input():
-                key, value = read(line.rstrip(b'\r\n'))
-                yield key, value
+            if read_many:
+                for lines in _batches(self._read_input(),
+                                      _PROTOCOL_BATCH_SIZE):
+                    for key, value in read_many(
+                            [line.rstrip(b'\r\n') for line in lines]):
+                        yield key, value
+            else:
+                for line in self._read_input():
+                    key, value = read(line.rstrip(b'\r\n'))
+                    yield key, value
+
+        buffer_size = self.OUTPUT_BUFFER_SIZE
 
-        def write_line(key, value):
-            self.stdout.write(write(key, value))
-            self.stdout.write(b'\n')
+        def write_lines(pairs):
+            buf = bytearray()
 
-        return read_lines, write_line
+            try:
+                if write_many:
+                    for batch in _batches(pairs, _PROTOCOL_BATCH_SIZE):
+                        buf += b'\n'.join(write_many(batch))
+                        buf += b'\n'
+
+                        if len(buf) >= buffer_size:
+                            self.stdout.write(bytes(buf))
+                            del buf[:]
+                else:
+                    for key, value in pairs:
+                        buf += write(key, value)
+                        buf += b'\n'
+
+                        if len(buf) >= buffer_size:
+                            self.stdout.write(bytes(buf))
+                            del buf[:]
+            finally:
+                # write whatever we encoded, even if the task failed
+                if buf:
+                    self.stdout.write(bytes(buf))
+
+        return read_lines, write_lines
+
+    def _read_groups(self, step_num, step_type):
+        """Read input for the given combiner or reducer, grouped by the
+        raw bytes of each key, rather than decoding every line and then
+        grouping by decoded key (see :py:func:`_group_lines_by_raw_key`).
+
+        Returns ``None`` if we can't do this, because the input protocol
+        doesn't encode key and value separately, or because you overrode
+        :py:meth:`combine_pairs`, :py:meth:`reduce_pairs`, or the
+        protocol's ``read()`` method.
+        """
+        pairs_method = dict(
+            combiner='combine_pairs', reducer='reduce_pairs')[step_type]
+        if (_im_func(getattr(self, pairs_method)) is not
+                _im_func(getattr(MRJob, pairs_method))):
+            return None
+
+        read, _ = self.pick_protocols(step_num, step_type)
+
+        protocol = getattr(read, '__self__', None)
+        if not (isinstance(protocol, _KeyCachingProtocol) and
+                read.__name__ == 'read' and
+                _has_consistent_method(protocol, '_loads', 'read')):
+            return None
+
+        return _group_lines_by_raw_key(self._read_input(), protocol._loads)
 
     def _step_key(self, step_num, step_type):
         return '%d-%s' % (step_num, step_type)
@@ -1290,6 +1514,17 @@ class MRJob(object):
     #: See :py:data:`mrjob.protocol` for the full list of protocols.
     OUTPUT_PROTOCOL = JSONProtocol
 
+    #: How many records to pass to :py:meth:`mapper_batch` at a time.
+    #: Default: 1000.
+    BATCH_SIZE = 1000
+
+    #: When running a task, how many bytes of encoded output to collect
+    #: before writing them to stdout. Default: 64 KiB.
+    #:
+    #: Larger values mean fewer, bigger writes; smaller values mean output
+    #: appears sooner and the task uses less memory.
+    OUTPUT_BUFFER_SIZE = 64 * 1024
+
     def parse_output(self, chunks):
         """Parse the final output of this MRJob (as a stream of byte chunks)
         into a stream of ``(key, value)``.
@@ -1656,5 +1891,78 @@ class MRJob(object):
         return self
 
 
+def _batch_protocol_method(method, batch_name):
+    """If *method* is the ``read()`` or ``write()`` method of a protocol
+    with a consistent batch version (e.g. ``read_many()``), return that.
+    Otherwise, return ``None``."""
+    protocol = getattr(method, '__self__', None)
+    if protocol is None:
+        return None
+
+    if not _has_consistent_method(protocol, batch_name, method.__name__):
+        return None
+
+    return getattr(protocol, batch_name)
+
+
+def _group_lines_by_raw_key(lines, loads):
+    """Group *lines* (each an encoded key and value, separated by a tab)
+    by the raw bytes of their key, and yield ``(key, values)`` for each
+    group.
+
+    We decode each key exactly once with *loads()*, and only decode values
+    as they are iterated over. As with :py:func:`itertools.groupby`,
+    values that aren't consumed before moving on to the next group are
+    skipped (without decoding them).
+    """
+    lines = iter(lines)
+
+    # the line we're currently looking at (None when we run out), and
+    # which group it's in. *group_num* lets values() know that we've
+    # moved on, even if the next group has the same key
+    state = dict(line=None, group_num=0)
+
+    def advance():
+        state['line'] = next(lines, None)
+
+        if state['line'] is not None and b'\t' not in state['line']:
+            raise ValueError('no tab in input line: %r' % state['line'])
+
+    def values(prefix, group_num):
+        while (state['group_num'] == group_num and
+               state['line'] is not None and
+               state['line'].startswith(prefix)):
+            line = state['line']
+            advance()
+            yield loads(line[len(prefix):].rstrip(b'\r\n'))
+
+    advance()
+
+    while state['line'] is not None:
+        line = state['line']
+        # raw key plus tab
+        prefix = line[:line.index(b'\t') + 1]
+
+        yield loads(prefix[:-1]), values(prefix, state['group_num'])
+
+        # skip values that weren't consumed
+        while (state['line'] is not None and
+               state['line'].startswith(prefix)):
+            advance()
+
+        state['group_num'] += 1
+
+
+def _batches(iterable, batch_size):
+    """Yield lists of up to *batch_size* items from *iterable*."""
+    iterator = iter(iterable)
+
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
 if __name__ == '__main__':
     MRJob.run()
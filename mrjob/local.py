@@ -18,13 +18,22 @@
 """Run an MRJob locally by forking off a bunch of processes and piping
 them together. Useful for testing, not terrible for running medium-sized
 jobs on all CPUs."""
+import ast
+import errno
 import logging
 import math
 import os
 import platform
+import sys
+import threading
+import traceback
+import types
+from contextlib import contextmanager
 from functools import partial
 from multiprocessing import Pool
 from subprocess import CalledProcessError
+from subprocess import PIPE
+from subprocess import Popen
 from subprocess import check_call
 
 try:
@@ -34,21 +43,32 @@ except ImportError:
     pty = None
 
 from mrjob.bin import MRJobBinRunner
+from mrjob.job import MRJob
 from mrjob.logs.errors import _log_probable_cause_of_failure
 from mrjob.logs.errors import _pick_error
 from mrjob.logs.step import _log_log4j_record
 from mrjob.logs.task import _parse_task_stderr
 from mrjob.py2 import string_types
 from mrjob.sim import SimMRJobRunner
-from mrjob.sim import _sort_lines_in_memory
+from mrjob.sim import _sort_lines_externally
 from mrjob.step import StepFailedException
 from mrjob.util import cmd_line
+from mrjob.util import save_cwd
+from mrjob.util import save_sys_path
 
 log = logging.getLogger(__name__)
 
 
 _DEFAULT_EXECUTOR_MEMORY = '1g'
 
+# map from path of job script to a function that runs its __main__ block,
+# so that each worker process only has to load the script once (see
+# _load_job_script())
+_script_path_to_main = {}
+
+# how many bytes to read at a time when piping a task's output
+_PIPE_BUFSIZE = 64 * 1024
+
 
 class _TaskFailedException(StepFailedException):
     """Extension of :py:class:`~mrjob.step.StepFailedException` that
@@ -100,22 +120,66 @@ class LocalMRJobRunner(SimMRJobRunner, MRJobBinRunner):
         * *cmdenv* is combined with :py:func:`~mrjob.conf.combine_local_envs`
         * *python_bin* defaults to ``sys.executable`` (the current python
           interpreter)
-        * *hadoop_input_format*, *hadoop_output_format*,
-          and *partitioner* are ignored because they
-          require Java. If you need to test these, consider starting up a
-          standalone Hadoop instance and running your job with ``-r hadoop``.
+        * *hadoop_input_format* and *hadoop_output_format* are ignored
+          because they require Java. If you need to test these, consider
+          starting up a standalone Hadoop instance and running your job with
+          ``-r hadoop``.
+        * *partitioner* is simulated for ``HashPartitioner`` and
+          ``KeyFieldBasedPartitioner``, and ignored otherwise.
+
+        Tasks are forked from a pool of worker processes that is reused
+        for the entire job, unless they need a subprocess (e.g. because of
+        *setup* or *python_bin*, or on Windows).
         """
         super(LocalMRJobRunner, self).__init__(**kwargs)
 
+        # pool of worker processes, created by _run_multiple()
+        # and kept until cleanup()
+        self._pool = None
+
     def _invoke_task_func(self, task_type, step_num, task_num):
         args = self._substep_args(step_num, task_type)
         num_steps = self._num_steps()
 
         # stdin, stdout, stderr, wd, and env will be passed in later
-        return partial(
-            _invoke_task_in_subprocess,
-            task_type, step_num, task_num,
-            args, num_steps)
+        if self._can_run_task_in_worker(task_type, step_num):
+            return partial(
+                _invoke_task_in_worker,
+                task_type, step_num, task_num,
+                args, num_steps, self._script_path,
+                self._working_dir_mgr.name('file', self._script_path),
+                self._args_for_task(step_num, task_type))
+        else:
+            return partial(
+                _invoke_task_in_subprocess,
+                task_type, step_num, task_num,
+                args, num_steps)
+
+    def _can_run_task_in_worker(self, task_type, step_num):
+        """Can we run the given task directly in a worker process, rather
+        than a subprocess? We can if the task would just run the job script
+        with the same Python interpreter (and mrjob library) that we're
+        using, without a setup wrapper script.
+        """
+        step = self._get_step(step_num)
+        substep = step[task_type]
+
+        if substep['type'] != 'script' or 'pre_filter' in substep:
+            return False
+
+        # these all require a setup wrapper script. We don't need one to
+        # bootstrap mrjob unless the user explicitly asked for it
+        if (self._setup or self._opts['py_files'] or
+                self._opts['bootstrap_mrjob'] or
+                (task_type == 'mapper' and step.get('input_manifest'))):
+            return False
+
+        # we fork a child process for each task
+        if not hasattr(os, 'fork'):
+            return False
+
+        return bool(sys.executable) and (
+            self._task_python_bin() == [sys.executable])
 
     def _run_step_on_spark(self, step, step_num):
         if self._opts['upload_archives']:
@@ -141,29 +205,49 @@ class LocalMRJobRunner(SimMRJobRunner, MRJobBinRunner):
                 num_steps=self._num_steps())
 
     def _run_multiple(self, funcs, num_processes=None):
-        """Use multiprocessing to run in parallel."""
-        pool = Pool(processes=self._opts['num_cores'])
-
-        try:
-            results = [
-                pool.apply_async(partial(_pickle_safe, func))
-                for func in funcs
-            ]
+        """Use multiprocessing to run in parallel. The same pool of
+        worker processes is used for every step.
 
-            for result in results:
-                result.get()
+        Tasks start in the order of *funcs* (the sim runner puts the
+        biggest ones first), each as soon as a worker is free. We handle
+        results as tasks finish, so if any task fails, we don't wait for
+        the ones that started before it.
+        """
+        if self._pool is None:
+            self._pool = Pool(processes=self._opts['num_cores'])
 
-        # make sure that the pool (and its file descriptors, etc.)
-        # don't stay open. This doesn't matter much for individual jobs,
-        # but it makes our automated tasks run out of file descriptors.
+        # set up every task in this process before handing them off
+        funcs = list(funcs)
 
-            pool.close()
+        try:
+            for _ in self._pool.imap_unordered(_pickle_safe, funcs):
+                pass
         except:
             # if there's an error in one task, terminate all others
-            pool.terminate()
+            self._close_pool(terminate=True)
             raise
+
+    def _close_pool(self, terminate=False):
+        """Shut down our pool of worker processes, if we have one."""
+        if self._pool is None:
+            return
+
+        try:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
         finally:
-            pool.join()
+            self._pool.join()
+            self._pool = None
+
+    def cleanup(self, mode=None):
+        super(LocalMRJobRunner, self).cleanup(mode=mode)
+
+        # make sure that the pool (and its file descriptors, etc.)
+        # don't stay open. This doesn't matter much for individual jobs,
+        # but it makes our automated tasks run out of file descriptors.
+        self._close_pool()
 
     def _log_cause_of_error(self, ex):
         if not isinstance(ex, _TaskFailedException):
@@ -176,7 +260,7 @@ class LocalMRJobRunner(SimMRJobRunner, MRJobBinRunner):
         if not self._opts['read_logs']:
             return
 
-        input_path = self._task_input_path(
+        input_path = self._task_input_path_for_error(
             ex.task_type, ex.step_num, ex.task_num)
         stderr_path = self._task_stderr_path(
             ex.task_type, ex.step_num, ex.task_num)
@@ -202,16 +286,50 @@ class LocalMRJobRunner(SimMRJobRunner, MRJobBinRunner):
         return super(LocalMRJobRunner, self)._default_python_bin(
             local=True)
 
-    def _sort_input_func(self):
+    def _sort_input_func(self, step_num):
         """Try sorting with the :command:`sort` binary before falling
-        back to in-memory sort."""
+        back to sorting in Python."""
         if platform.system() == 'Windows':  # we assume Unix sort
-            return super(LocalMRJobRunner, self)._sort_input_func()
+            return super(LocalMRJobRunner, self)._sort_input_func(step_num)
         else:
             return partial(
                 _sort_lines_with_sort_bin,
                 sort_bin=self._sort_bin(),
-                tmp_dir=self._get_local_tmp_dir())
+                sort_values=self._sort_values,
+                tmp_dir=self._get_local_tmp_dir(),
+                **self._sort_buffer_kwargs(step_num))
+
+    def _combiner_sort_buffer_kwargs(self, step_num):
+        """If the user set *sort_bin*, use it to sort combiner input."""
+        if self._opts['sort_bin']:
+            return None
+        else:
+            return super(LocalMRJobRunner, self)._combiner_sort_buffer_kwargs(
+                step_num)
+
+    def _merge_input_func(self, step_num):
+        """Merge reducer input with :command:`sort -m`, so that it's in
+        the same order that :py:meth:`_sort_input_func` sorted each map
+        task's partitions in.
+
+        If the user set *sort_bin*, we can't assume we know what order
+        it sorts lines in (or that it can merge), so use it to sort
+        reducer input into a file from scratch."""
+        if platform.system() == 'Windows':  # map tasks sorted in Python
+            return super(LocalMRJobRunner, self)._merge_input_func(step_num)
+        elif self._opts['sort_bin']:
+            sort_input = self._sort_input_func(step_num)
+        else:
+            # if sort -m fails, this falls back to sorting in Python,
+            # which doesn't care what order the partitions are in
+            sort_input = partial(
+                _sort_lines_with_sort_bin,
+                sort_bin=self._sort_bin() + ['-m'],
+                sort_values=self._sort_values,
+                tmp_dir=self._get_local_tmp_dir(),
+                **self._sort_buffer_kwargs(step_num))
+
+        return partial(_merge_lines_with_sort_input, sort_input=sort_input)
 
     def _sort_bin(self):
         """The binary to use to sort input.
@@ -263,12 +381,22 @@ def _invoke_task_in_subprocess(
         task_type, step_num, task_num,
         args, num_steps,
         stdin, stdout, stderr, wd, env):
-    """A pickleable function that invokes a task in a subprocess."""
+    """A pickleable function that invokes a task in a subprocess.
+
+    *stdin* is usually a file, but may also be an iterable of lines
+    (e.g. a merge of sorted map output), which we pipe to the task.
+    Similarly, *stdout* may be any object with a ``write()`` method
+    (e.g. a sort buffer).
+    """
     log.debug('> %s' % cmd_line(args))
 
     try:
-        check_call(args, stdin=stdin, stdout=stdout, stderr=stderr,
-                   cwd=wd, env=env)
+        if hasattr(stdin, 'fileno') and hasattr(stdout, 'fileno'):
+            check_call(args, stdin=stdin, stdout=stdout, stderr=stderr,
+                       cwd=wd, env=env)
+        else:
+            _check_call_with_pipes(
+                args, stdin, stdout, stderr=stderr, cwd=wd, env=env)
     except Exception as ex:
         raise _TaskFailedException(
             reason=str(ex),
@@ -279,6 +407,313 @@ def _invoke_task_in_subprocess(
         )
 
 
+def _invoke_task_in_worker(
+        task_type, step_num, task_num,
+        args, num_steps, script_path, script_name, task_args,
+        stdin, stdout, stderr, wd, env):
+    """A pickleable function that runs a task in a child forked from the
+    current (worker) process, as if we'd run *args* in a subprocess.
+
+    This avoids starting a new Python interpreter and re-importing mrjob
+    and the job's modules for every task. Each worker process loads the
+    job script (*script_path*, copied to *script_name* in *wd*) once (see
+    :py:func:`_load_job_script`), and tasks just run its ``__main__``
+    block. Forking means that tasks can't interfere with each other or take
+    down the worker (e.g. with :py:func:`os._exit`).
+    """
+    log.debug('> %s (in worker process)' % cmd_line(args))
+
+    if script_path not in _script_path_to_main:
+        _script_path_to_main[script_path] = _load_job_script(
+            script_path, script_name, wd)
+
+    run_main = _script_path_to_main[script_path]
+
+    # if stdout isn't a real file, have the child write to a pipe
+    stdout_pipe = None
+    if not hasattr(stdout, 'fileno'):
+        stdout_pipe = os.pipe()
+
+    pid = os.fork()
+
+    if not pid:
+        returncode = 1
+        try:
+            if stdout_pipe:
+                os.close(stdout_pipe[0])
+                stdout = os.fdopen(stdout_pipe[1], 'wb')
+
+            returncode = _run_job_script(
+                run_main, script_name, task_args,
+                stdin, stdout, stderr, wd, env)
+        finally:
+            os._exit(returncode)
+
+    if stdout_pipe:
+        os.close(stdout_pipe[1])
+        with os.fdopen(stdout_pipe[0], 'rb') as child_stdout:
+            _copy_pipe(child_stdout, stdout)
+
+    _, status = os.waitpid(pid, 0)
+
+    if os.WIFSIGNALED(status):
+        returncode = -os.WTERMSIG(status)
+    else:
+        returncode = os.WEXITSTATUS(status)
+
+    if returncode:
+        raise _TaskFailedException(
+            reason=str(CalledProcessError(returncode, args)),
+            step_num=step_num,
+            num_steps=num_steps,
+            task_type=task_type,
+            task_num=task_num,
+        )
+
+
+def _load_job_script(script_path, script_name, wd):
+    """Load the job script at *script_path* into this (worker) process,
+    and return a no-args function that runs its ``__main__`` block.
+
+    If the ``__main__`` block is just ``SomeJob.run()`` (the usual case),
+    we run the rest of the script here, with *wd* as the working
+    directory, so that tasks forked from this process only have to call
+    ``SomeJob.run()``. Otherwise (or if the script raises an exception),
+    each task runs the whole script.
+
+    Either way, the script runs in a real module that tasks install as
+    ``sys.modules['__main__']``, so that :py:mod:`pickle` can find classes
+    the script defines.
+    """
+    with open(script_path, 'rb') as f:
+        tree = ast.parse(f.read(), script_name)
+
+    job_cls_name = _job_cls_name_from_main_block(tree)
+
+    if job_cls_name:
+        main_block = tree.body.pop()
+
+        main_module = _new_main_module(script_name)
+        try:
+            with save_cwd(), save_sys_path(), _save_main_module():
+                os.chdir(wd)
+                sys.path = [wd] + sys.path
+                sys.modules['__main__'] = main_module
+
+                _exec_code(compile(tree, script_name, 'exec'),
+                           main_module.__dict__)
+        except Exception as ex:
+            log.debug('  loading %s failed: %r' % (script_name, ex))
+        else:
+            job_cls = getattr(main_module, job_cls_name, None)
+
+            if isinstance(job_cls, type) and issubclass(job_cls, MRJob):
+                return partial(_run_job_cls, main_module, job_cls)
+
+        tree.body.append(main_block)
+
+    return partial(_exec_job_script, compile(tree, script_name, 'exec'),
+                   script_name)
+
+
+def _job_cls_name_from_main_block(tree):
+    """If the last statement in *tree* (a parsed job script) is
+    ``if __name__ == '__main__': SomeJob.run()``, return ``'SomeJob'``.
+    Otherwise, return ``None``.
+    """
+    if not tree.body:
+        return None
+
+    stmt = tree.body[-1]
+
+    if not (isinstance(stmt, ast.If) and len(stmt.body) == 1 and
+            not stmt.orelse):
+        return None
+
+    test = stmt.test
+
+    if not (isinstance(test, ast.Compare) and
+            isinstance(test.left, ast.Name) and
+            test.left.id == '__name__' and
+            len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq) and
+            _ast_str(test.comparators[0]) == '__main__'):
+        return None
+
+    expr = stmt.body[0]
+
+    if not (isinstance(expr, ast.Expr) and isinstance(expr.value, ast.Call)):
+        return None
+
+    call = expr.value
+
+    if (call.args or call.keywords or getattr(call, 'starargs', None) or
+            getattr(call, 'kwargs', None)):
+        return None
+
+    if not (isinstance(call.func, ast.Attribute) and
+            call.func.attr == 'run' and
+            isinstance(call.func.value, ast.Name)):
+        return None
+
+    return call.func.value.id
+
+
+def _ast_str(node):
+    """The value of *node* if it's a string literal, else ``None``."""
+    # ast.Str is deprecated in favor of ast.Constant in Python 3.8+
+    if type(node).__name__ == 'Constant':
+        value = node.value
+    else:
+        value = getattr(node, 's', None)
+
+    return value if isinstance(value, string_types) else None
+
+
+def _exec_code(code, namespace):
+    """Run compiled *code* in the dictionary *namespace*."""
+    exec(code, namespace)
+
+
+def _exec_job_script(code, script_name):
+    """Run the compiled job script *code* as ``__main__``."""
+    main_module = _new_main_module(script_name)
+    sys.modules['__main__'] = main_module
+
+    _exec_code(code, main_module.__dict__)
+
+
+def _run_job_cls(main_module, job_cls):
+    """Run *job_cls*, defined by the job script loaded into
+    *main_module*, with *main_module* as ``__main__``."""
+    sys.modules['__main__'] = main_module
+
+    job_cls.run()
+
+
+def _new_main_module(script_name):
+    """Make an empty module to run the job script *script_name* in."""
+    main_module = types.ModuleType('__main__')
+    main_module.__file__ = script_name
+
+    return main_module
+
+
+@contextmanager
+def _save_main_module():
+    """Restore ``sys.modules['__main__']`` on exit."""
+    main_module = sys.modules.get('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
+
+
+def _run_job_script(
+        run_main, script_name, task_args, stdin, stdout, stderr, wd, env):
+    """Run the job script's ``__main__`` block (by calling *run_main*;
+    see :py:func:`_load_job_script`) and return its exit status. Helper
+    for :py:func:`_invoke_task_in_worker`."""
+    returncode = 0
+
+    os.environ.clear()
+    os.environ.update(env)
+    os.chdir(wd)
+    sys.path = [wd] + sys.path
+    sys.argv = [script_name] + list(task_args)
+
+    sys.stdin = stdin
+    sys.stdout = stdout
+    sys.stderr = stderr
+
+    try:
+        run_main()
+    except SystemExit as ex:
+        if ex.code is None or isinstance(ex.code, int):
+            returncode = ex.code or 0
+        else:
+            stderr.write(('%s\n' % ex.code).encode('utf_8'))
+            returncode = 1
+    except:
+        stderr.write(traceback.format_exc().encode('utf_8'))
+        returncode = 1
+
+    stdout.flush()
+    stderr.flush()
+
+    return returncode
+
+
+def _check_call_with_pipes(args, stdin, stdout, **kwargs):
+    """Like :py:func:`~subprocess.check_call`, except that *stdin* may be
+    an iterable of lines, which we write to the subprocess's stdin, and
+    *stdout* may be any object with a ``write()`` method, which we copy
+    the subprocess's stdout to."""
+    pipe_stdin = not hasattr(stdin, 'fileno')
+    pipe_stdout = not hasattr(stdout, 'fileno')
+
+    proc = Popen(args,
+                 stdin=(PIPE if pipe_stdin else stdin),
+                 stdout=(PIPE if pipe_stdout else stdout),
+                 **kwargs)
+
+    writer = None
+    write_errors = []
+
+    if pipe_stdin:
+        if pipe_stdout:
+            # write input in a separate thread, so that neither end of the
+            # subprocess can get stuck waiting for us
+            def write_input():
+                try:
+                    _write_lines_to_proc(proc, stdin)
+                except Exception as ex:
+                    write_errors.append(ex)
+
+            writer = threading.Thread(target=write_input)
+            writer.start()
+        else:
+            _write_lines_to_proc(proc, stdin)
+
+    if pipe_stdout:
+        _copy_pipe(proc.stdout, stdout)
+        proc.stdout.close()
+
+    if writer:
+        writer.join()
+        if write_errors:
+            raise write_errors[0]
+
+    returncode = proc.wait()
+    if returncode:
+        raise CalledProcessError(returncode, args)
+
+
+def _write_lines_to_proc(proc, lines):
+    """Write *lines* to *proc*'s stdin, and close it. If something goes
+    wrong, kill *proc*."""
+    try:
+        try:
+            proc.stdin.writelines(lines)
+        finally:
+            proc.stdin.close()
+    except IOError as ex:
+        # it's okay for the task to exit without reading all its input
+        if ex.errno != errno.EPIPE:
+            proc.kill()
+            proc.wait()
+            raise
+
+
+def _copy_pipe(src, dest):
+    """Copy everything from the pipe *src* to *dest* (any object with
+    a ``write()`` method)."""
+    while True:
+        chunk = src.read(_PIPE_BUFSIZE)
+        if not chunk:
+            return
+        dest.write(chunk)
+
+
 def _pickle_safe(func):
     """Call no-args function *func*, returning *None* and ensuring
     that any exception raised is pickleable."""
@@ -292,10 +727,25 @@ def _pickle_safe(func):
 
 # other utilities
 
+@contextmanager
+def _merge_lines_with_sort_input(input_paths, task_input_path, sort_input):
+    """Sort lines from *input_paths* into *task_input_path* with
+    *sort_input*, and yield it as an open file.
+
+    This is a helper for :py:meth:`LocalMRJobRunner._merge_input_func`.
+    """
+    sort_input(input_paths, task_input_path)
+
+    with open(task_input_path, 'rb') as input:
+        yield input
+
+
 def _sort_lines_with_sort_bin(input_paths, output_path, sort_bin,
-                              sort_values=False, tmp_dir=None):
+                              sort_values=False, tmp_dir=None,
+                              buffer_size=None, merge_factor=None):
     """Sort lines the given *input_paths* into *output_path*,
-    using *sort_bin*. If there is a problem, fall back to in-memory sort.
+    using *sort_bin*. If there is a problem, fall back to sorting
+    in Python (see :py:func:`~mrjob.sim._sort_lines_externally`).
 
     This is a helper for :py:meth:`LocalMRJobRunner._sort_input_func`.
 
@@ -322,10 +772,12 @@ def _sort_lines_with_sort_bin(input_paths, output_path, sort_bin,
                 return
             except CalledProcessError:
                 log.error(
-                    '`%s` failed, falling back to in-memory sort' %
+                    '`%s` failed, falling back to sorting in Python' %
                     cmd_line(sort_bin))
             except OSError:
                 log.error(
-                    'no sort binary, falling back to in-memory sort')
+                    'no sort binary, falling back to sorting in Python')
 
-    _sort_lines_in_memory(input_paths, output_path, sort_values=sort_values)
+    _sort_lines_externally(input_paths, output_path, sort_values=sort_values,
+                           tmp_dir=tmp_dir, buffer_size=buffer_size,
+                           merge_factor=merge_factor)
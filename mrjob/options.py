@@ -341,6 +341,35 @@ _RUNNER_OPTS = dict(
             )),
         ],
     ),
+    archive_cache=dict(
+        switches=[
+            (['--archive-cache'], dict(
+                action='store_true',
+                help=('Keep copies of archives mrjob builds (mrjob.zip and'
+                      ' archives of local directories) in --cache-dir, and'
+                      " re-use them if the files they contain haven't"
+                      ' changed'),
+            )),
+            (['--no-archive-cache'], dict(
+                action='store_false',
+                help='Build archives from scratch for every job (the default)',
+            )),
+        ],
+    ),
+    auto_tune_tasks=dict(
+        switches=[
+            (['--auto-tune-tasks'], dict(
+                action='store_true',
+                help=('Sample input to pick map split sizes and the number'
+                      ' of reducers (local and inline runners only)'),
+            )),
+            (['--no-auto-tune-tasks'], dict(
+                action='store_false',
+                help=('Split input by size on disk, and run one reducer'
+                      ' per core'),
+            )),
+        ],
+    ),
     aws_access_key_id=dict(
         cloud_role='connect',
     ),
@@ -425,6 +454,15 @@ _RUNNER_OPTS = dict(
             )),
         ],
     ),
+    cache_dir=dict(
+        combiner=combine_paths,
+        switches=[
+            (['--cache-dir'], dict(
+                help=('Local directory for data mrjob keeps between runs'
+                      ' (default: ~/.cache/mrjob)'),
+            )),
+        ],
+    ),
     check_input_paths=dict(
         switches=[
             (['--check-input-paths'], dict(
@@ -717,6 +755,34 @@ _RUNNER_OPTS = dict(
             )),
         ],
     ),
+    fork_tasks=dict(
+        switches=[
+            (['--fork-tasks'], dict(
+                action='store_true',
+                help=('Run tasks in parallel, in processes forked from the'
+                      ' current one (inline runner only)'),
+            )),
+            (['--no-fork-tasks'], dict(
+                action='store_false',
+                help='Run tasks one at a time, in the current process',
+            )),
+        ],
+    ),
+    fuse_steps=dict(
+        switches=[
+            (['--fuse-steps'], dict(
+                action='store_true',
+                help=("Pass key-value pairs directly from each step's reducer"
+                      " to the next step's mapper (and between mapper-only"
+                      " steps), rather than encoding and decoding them with"
+                      " the job's internal protocol"),
+            )),
+            (['--no-fuse-steps'], dict(
+                action='store_false',
+                help='Use internal protocols between steps as usual',
+            )),
+        ],
+    ),
     gcloud_bin=dict(
         combiner=combine_cmds,
         switches=[
@@ -1423,6 +1489,21 @@ _RUNNER_OPTS = dict(
             )),
         ],
     ),
+    upload_cache=dict(
+        switches=[
+            (['--upload-cache'], dict(
+                action='store_true',
+                help=('Upload local files to a directory shared between'
+                      ' jobs, named after a hash of their contents, and'
+                      " don't re-upload files that are already there"),
+            )),
+            (['--no-upload-cache'], dict(
+                action='store_false',
+                help=('Upload local files to a new directory for each job'
+                      ' (the default)'),
+            )),
+        ],
+    ),
     upload_dirs=dict(
         combiner=combine_path_lists,
         switches=[
@@ -1447,6 +1528,15 @@ _RUNNER_OPTS = dict(
             )),
         ],
     ),
+    webhdfs_url=dict(
+        switches=[
+            (['--webhdfs-url'], dict(
+                help=('URL of the namenode\'s WebHDFS server (e.g.'
+                      ' http://namenode:9870). If set, talk to HDFS'
+                      ' over HTTP rather than running hadoop fs'),
+            )),
+        ],
+    ),
     zone=dict(
         cloud_role='launch',
         switches=[
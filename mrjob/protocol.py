@@ -23,6 +23,11 @@ However, protocols with ``Value`` in their name ignore
 keys and simply read/write values (with key read in as ``None``), allowing
 you to read and write data in arbitrary formats.
 
+Protocols may also define ``read_many()`` and ``write_many()`` methods,
+which decode and encode a whole list of lines or ``(key, value)`` pairs at
+a time. Jobs use these automatically when available, since per-record
+overhead can dominate the run time of simple jobs.
+
 For more information, see :ref:`job-protocols` and :ref:`writing-protocols`.
 """
 # This is one of the few places where efficiency really matters; to that end,
@@ -31,7 +36,10 @@ For more information, see :ref:`job-protocols` and :ref:`writing-protocols`.
 
 # don't add imports here that aren't part of the standard Python library,
 # since MRJobs need to run in Amazon's generic EMR environment
+import inspect
 import json
+import marshal
+import re
 
 try:
     import cPickle as pickle  # Python 2 only
@@ -42,6 +50,18 @@ from mrjob.py2 import PY2
 from mrjob.util import safeeval
 
 
+try:
+    import msgspec.json
+    msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+    orjson
+except ImportError:
+    orjson = None
+
 try:
     import rapidjson
     rapidjson
@@ -61,6 +81,72 @@ except ImportError:
     ujson = None
 
 
+def _has_consistent_method(obj, name, base_name):
+    """Does *obj* have a method *name* that is consistent with its method
+    *base_name*? That is, is *name* defined in the same class as
+    *base_name*, or a subclass of it? This way, if you override
+    :py:meth:`read` in a subclass of a protocol, we don't use the
+    ``read_many()`` it inherited."""
+    cls = _defining_class(obj, name)
+    base_cls = _defining_class(obj, base_name)
+
+    return (cls is not None and base_cls is not None and
+            issubclass(cls, base_cls))
+
+
+def _defining_class(obj, name):
+    """The class in *obj*'s MRO that defines the attribute *name*,
+    or ``None``."""
+    for cls in inspect.getmro(obj.__class__):
+        if name in cls.__dict__:
+            return cls
+
+    return None
+
+
+# matches a JSON string, for _json_is_balanced()
+_JSON_STRING_RE = re.compile(br'"(?:[^"\\]|\\.)*"')
+
+
+def _json_loads_many(loads, raw_values):
+    """Decode a list of JSONs with a single call to *loads()*, by wrapping
+    them in a JSON list.
+
+    Joining malformed JSONs can yield a valid list (e.g. ``[1`` and
+    ``2]``), so we raise :py:class:`ValueError` unless each raw value has
+    balanced brackets and no unterminated string, and we got back the
+    right number of values. (If its brackets are balanced, a raw value
+    can't swallow the comma after it, so if it holds more than one JSON,
+    we'd get back too many values.)
+    """
+    if not raw_values:
+        return []
+
+    for raw_value in raw_values:
+        if not _json_is_balanced(raw_value):
+            raise ValueError('not a single JSON: %r' % raw_value)
+
+    values = loads(b'[' + b','.join(raw_values) + b']')
+
+    if len(values) != len(raw_values):
+        raise ValueError('expected %d values, got %d' % (
+            len(raw_values), len(values)))
+
+    return values
+
+
+def _json_is_balanced(raw_value):
+    """Does *raw_value* have no unterminated strings, and as many opening
+    brackets and braces as closing ones (outside of strings)?"""
+    if b'"' in raw_value:
+        raw_value = _JSON_STRING_RE.sub(b'', raw_value)
+        if b'"' in raw_value:
+            return False
+
+    return (raw_value.count(b'[') + raw_value.count(b'{') ==
+            raw_value.count(b']') + raw_value.count(b'}'))
+
+
 class _KeyCachingProtocol(object):
     """Protocol that caches the last decoded key.
 
@@ -95,6 +181,64 @@ class _KeyCachingProtocol(object):
             self._last_key_decoded = self._loads(raw_key)
         return (self._last_key_decoded, self._loads(raw_value))
 
+    def read_many(self, lines):
+        """Decode a list of lines of input.
+
+        :type lines: list of str
+        :param lines: Lines of raw input to the job, without trailing
+                      newlines.
+
+        :return: A list of ``(key, value)`` tuples."""
+        try:
+            return self._read_many(lines)
+        except Exception:
+            # decode one line at a time, so we raise the same
+            # exception as read()
+            return [self.read(line) for line in lines]
+
+    def _read_many(self, lines):
+        if not _has_consistent_method(self, '_loads_many', '_loads'):
+            # read() already decodes each run of identical keys once
+            read = self.read
+            return [read(line) for line in lines]
+
+        raw_keys = []
+        raw_values = []
+        for line in lines:
+            raw_key, raw_value = line.split(b'\t', 1)
+            raw_keys.append(raw_key)
+            raw_values.append(raw_value)
+
+        # only decode each run of identical keys once
+        distinct_raw_keys = []
+        last_raw_key = self._last_key_encoded
+        for raw_key in raw_keys:
+            if raw_key != last_raw_key:
+                distinct_raw_keys.append(raw_key)
+                last_raw_key = raw_key
+
+        # decode keys and values with a single call to _loads_many()
+        decoded = self._loads_many(distinct_raw_keys + raw_values)
+
+        keys = decoded[:len(distinct_raw_keys)]
+        values = decoded[len(distinct_raw_keys):]
+
+        pairs = []
+        i = 0
+        last_raw_key = self._last_key_encoded
+        key = self._last_key_decoded
+        for raw_key, value in zip(raw_keys, values):
+            if raw_key != last_raw_key:
+                last_raw_key = raw_key
+                key = keys[i]
+                i += 1
+            pairs.append((key, value))
+
+        self._last_key_encoded = last_raw_key
+        self._last_key_decoded = key
+
+        return pairs
+
     def write(self, key, value):
         """Encode a key and value.
 
@@ -105,6 +249,16 @@ class _KeyCachingProtocol(object):
         :return: A line, without trailing newline."""
         return self._dumps(key) + b'\t' + self._dumps(value)
 
+    def write_many(self, pairs):
+        """Encode a list of keys and values.
+
+        :param pairs: A list of ``(key, value)`` tuples yielded by a
+                      mapper/reducer
+
+        :return: A list of lines, without trailing newlines."""
+        dumps = self._dumps
+        return [dumps(key) + b'\t' + dumps(value) for key, value in pairs]
+
 
 # JSONProtocol (below) is just an alias, but we treat it as a class for the
 # purpose of documentation. It encodes key and value as two JSONs separated
@@ -127,6 +281,9 @@ class StandardJSONProtocol(_KeyCachingProtocol):
         def _loads(self, value):
             return json.loads(value)
 
+        def _loads_many(self, values):
+            return _json_loads_many(json.loads, values)
+
         def _dumps(self, value):
             return json.dumps(value)
     else:
@@ -134,10 +291,21 @@ class StandardJSONProtocol(_KeyCachingProtocol):
             # Python 3's json module does not accept bytes
             return json.loads(value.decode('utf_8'))
 
+        def _loads_many(self, values):
+            return _json_loads_many(_json_loads_bytes, values)
+
         def _dumps(self, value):
             return json.dumps(value).encode('utf_8')
 
 
+def _json_loads_bytes(value):
+    return json.loads(value.decode('utf_8'))
+
+
+def _json_dumps_bytes(value):
+    return json.dumps(value).encode('utf_8')
+
+
 class StandardJSONValueProtocol(object):
     """Implements :py:class:`JSONValueProtocol` using Python's built-in JSON
     library.
@@ -146,16 +314,142 @@ class StandardJSONValueProtocol(object):
         def read(self, line):
             return (None, json.loads(line))
 
+        def read_many(self, lines):
+            return _json_value_read_many(self, json.loads, lines)
+
         def write(self, key, value):
             return json.dumps(value)
+
+        def write_many(self, pairs):
+            return [json.dumps(value) for _, value in pairs]
     else:
         def read(self, line):
             # Python 3's json module does not accept bytes
             return (None, json.loads(line.decode('utf_8')))
 
+        def read_many(self, lines):
+            return _json_value_read_many(self, _json_loads_bytes, lines)
+
         def write(self, key, value):
             return json.dumps(value).encode('utf_8')
 
+        def write_many(self, pairs):
+            return [json.dumps(value).encode('utf_8') for _, value in pairs]
+
+
+def _json_value_read_many(protocol, loads, lines):
+    """Implementation of ``read_many()`` for JSON value protocols. Decode
+    all lines with a single call to *loads()* if possible; otherwise fall
+    back to *protocol*'s ``read()`` method."""
+    try:
+        return [(None, value) for value in _json_loads_many(loads, lines)]
+    except Exception:
+        return [protocol.read(line) for line in lines]
+
+
+class OrJSONProtocol(_KeyCachingProtocol):
+    """Implements :py:class:`JSONProtocol` using the :py:mod:`orjson`
+    library, which reads and writes bytes directly.
+
+    Values that :py:mod:`orjson` can't handle but the built-in ``json``
+    library can (integers outside the 64-bit range, ``NaN`` and
+    ``Infinity``) are handed off to ``json``, so this reads anything
+    :py:class:`StandardJSONProtocol` writes.
+
+    .. note::
+
+        Like :py:mod:`ujson`, :py:mod:`orjson` doesn't add spaces to its
+        JSONs. It also encodes ``NaN`` and ``Infinity`` as ``null``.
+    """
+    # orjson only exists in Python 3, so no special cases for Python 3
+
+    def _loads(self, value):
+        try:
+            return orjson.loads(value)
+        except ValueError:
+            return _json_loads_bytes(value)
+
+    def _loads_many(self, values):
+        return _json_loads_many(orjson.loads, values)
+
+    def _dumps(self, value):
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _json_dumps_bytes(value)
+
+
+class OrJSONValueProtocol(object):
+    """Implements :py:class:`JSONValueProtocol` using the :py:mod:`orjson`
+    library (see :py:class:`OrJSONProtocol`).
+    """
+    # orjson only exists in Python 3, so no special cases for Python 3
+
+    def read(self, line):
+        try:
+            return (None, orjson.loads(line))
+        except ValueError:
+            return (None, _json_loads_bytes(line))
+
+    def read_many(self, lines):
+        return _json_value_read_many(self, orjson.loads, lines)
+
+    def write(self, key, value):
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _json_dumps_bytes(value)
+
+    def write_many(self, pairs):
+        dumps = orjson.dumps
+        option = orjson.OPT_NON_STR_KEYS
+        try:
+            return [dumps(value, option=option) for _, value in pairs]
+        except TypeError:
+            return [self.write(key, value) for key, value in pairs]
+
+
+class MsgspecJSONProtocol(_KeyCachingProtocol):
+    """Implements :py:class:`JSONProtocol` using the :py:mod:`msgspec`
+    library, which reads and writes bytes directly.
+
+    .. warning::
+
+        Like :py:mod:`ujson`, :py:mod:`msgspec` is more willing to encode
+        things that aren't strictly JSON-encodable (for example, it encodes
+        sets as lists).
+    """
+    # msgspec only exists in Python 3, so no special cases for Python 3
+
+    def _loads(self, value):
+        return msgspec.json.decode(value)
+
+    def _loads_many(self, values):
+        return _json_loads_many(msgspec.json.decode, values)
+
+    def _dumps(self, value):
+        return msgspec.json.encode(value)
+
+
+class MsgspecJSONValueProtocol(object):
+    """Implements :py:class:`JSONValueProtocol` using the :py:mod:`msgspec`
+    library.
+    """
+    # msgspec only exists in Python 3, so no special cases for Python 3
+
+    def read(self, line):
+        return (None, msgspec.json.decode(line))
+
+    def read_many(self, lines):
+        return _json_value_read_many(self, msgspec.json.decode, lines)
+
+    def write(self, key, value):
+        return msgspec.json.encode(value)
+
+    def write_many(self, pairs):
+        encode = msgspec.json.encode
+        return [encode(value) for _, value in pairs]
+
 
 class RapidJSONProtocol(_KeyCachingProtocol):
     """Implements :py:class:`JSONProtocol` using the :py:mod:`rapidjson`
@@ -166,6 +460,9 @@ class RapidJSONProtocol(_KeyCachingProtocol):
     def _loads(self, value):
         return rapidjson.loads(value)
 
+    def _loads_many(self, values):
+        return _json_loads_many(rapidjson.loads, values)
+
     def _dumps(self, value):
         return rapidjson.dumps(value).encode('utf_8')
 
@@ -179,9 +476,16 @@ class RapidJSONValueProtocol(object):
     def read(self, line):
         return (None, rapidjson.loads(line))
 
+    def read_many(self, lines):
+        return _json_value_read_many(self, rapidjson.loads, lines)
+
     def write(self, key, value):
         return rapidjson.dumps(value).encode('utf_8')
 
+    def write_many(self, pairs):
+        dumps = rapidjson.dumps
+        return [dumps(value).encode('utf_8') for _, value in pairs]
+
 
 class SimpleJSONProtocol(_KeyCachingProtocol):
     """Implements :py:class:`JSONProtocol` using the :py:mod:`simplejson`
@@ -190,6 +494,9 @@ class SimpleJSONProtocol(_KeyCachingProtocol):
         # simplejson can handle bytes even in Python 3
         return simplejson.loads(value)
 
+    def _loads_many(self, values):
+        return _json_loads_many(simplejson.loads, values)
+
     if PY2:
         def _dumps(self, value):
             return simplejson.dumps(value)
@@ -206,13 +513,23 @@ class SimpleJSONValueProtocol(object):
         # simplejson can handle bytes even in Python 3
         return (None, simplejson.loads(line))
 
+    def read_many(self, lines):
+        return _json_value_read_many(self, simplejson.loads, lines)
+
     if PY2:
         def write(self, key, value):
             return simplejson.dumps(value)
+
+        def write_many(self, pairs):
+            return [simplejson.dumps(value) for _, value in pairs]
     else:
         def write(self, key, value):
             return simplejson.dumps(value).encode('utf_8')
 
+        def write_many(self, pairs):
+            dumps = simplejson.dumps
+            return [dumps(value).encode('utf_8') for _, value in pairs]
+
 
 class UltraJSONProtocol(_KeyCachingProtocol):
     """Implements :py:class:`JSONProtocol` using the :py:mod:`ujson` library.
@@ -238,6 +555,9 @@ class UltraJSONProtocol(_KeyCachingProtocol):
         # ujson can handle bytes even in Python 3
         return ujson.loads(value)
 
+    def _loads_many(self, values):
+        return _json_loads_many(ujson.loads, values)
+
     if PY2:
         def _dumps(self, value):
             return ujson.dumps(value)
@@ -254,13 +574,23 @@ class UltraJSONValueProtocol(object):
         # ujson can handle bytes even in Python 3
         return (None, ujson.loads(line))
 
+    def read_many(self, lines):
+        return _json_value_read_many(self, ujson.loads, lines)
+
     if PY2:
         def write(self, key, value):
             return ujson.dumps(value)
+
+        def write_many(self, pairs):
+            return [ujson.dumps(value) for _, value in pairs]
     else:
         def write(self, key, value):
             return ujson.dumps(value).encode('utf_8')
 
+        def write_many(self, pairs):
+            dumps = ujson.dumps
+            return [dumps(value).encode('utf_8') for _, value in pairs]
+
 
 # use ujson by default if available
 if ujson:
@@ -280,6 +610,21 @@ else:
     JSONProtocol = StandardJSONProtocol
     JSONValueProtocol = StandardJSONValueProtocol
 
+# FastJSONProtocol is the same idea, except that it tries the libraries
+# that work directly on bytes first, and skips the slower ones
+if orjson and not PY2:
+    FastJSONProtocol = OrJSONProtocol
+    FastJSONValueProtocol = OrJSONValueProtocol
+elif msgspec and not PY2:
+    FastJSONProtocol = MsgspecJSONProtocol
+    FastJSONValueProtocol = MsgspecJSONValueProtocol
+elif ujson:
+    FastJSONProtocol = UltraJSONProtocol
+    FastJSONValueProtocol = UltraJSONValueProtocol
+else:
+    FastJSONProtocol = StandardJSONProtocol
+    FastJSONValueProtocol = StandardJSONValueProtocol
+
 
 class PickleProtocol(_KeyCachingProtocol):
     """Encode ``(key, value)`` as two string-escaped pickles separated
@@ -340,6 +685,91 @@ class PickleValueProtocol(object):
                 'latin_1').encode('unicode_escape')
 
 
+# marshal format used for keys. Equal keys must encode to the same bytes,
+# or grouping by key would break. Starting with version 3, marshal refers
+# back to objects it has already seen. On Python 2, version 1 and later
+# write interned strs with a different type code than other strs
+if PY2:
+    _MARSHAL_KEY_VERSION = 0
+else:
+    _MARSHAL_KEY_VERSION = 2
+
+# byte used to escape tabs and newlines in marshalled data. Unlike \x00, it
+# rarely shows up in marshalled data, so escaping seldom makes data bigger
+_MARSHAL_ESC = b'\x7f'
+
+
+def _escape_marshal(data):
+    """Escape *data* so it contains no tabs or newlines, using
+    ``\\x7f`` followed by a code byte."""
+    return data.replace(
+        _MARSHAL_ESC, b'\x7f\x01').replace(
+        b'\t', b'\x7f\x02').replace(
+        b'\n', b'\x7f\x03').replace(
+        b'\r', b'\x7f\x04')
+
+
+def _unescape_marshal(data):
+    """Reverse :py:func:`_escape_marshal`. Since every escape byte in
+    escaped data starts an escape sequence, we can safely do this with
+    one ``replace()`` per sequence, as long as we un-escape the escape
+    byte itself last."""
+    return data.replace(
+        b'\x7f\x02', b'\t').replace(
+        b'\x7f\x03', b'\n').replace(
+        b'\x7f\x04', b'\r').replace(
+        b'\x7f\x01', _MARSHAL_ESC)
+
+
+class MarshalProtocol(_KeyCachingProtocol):
+    """Encode ``(key, value)`` in Python's compact binary :py:mod:`marshal`
+    format, separated by a tab. Tabs and newlines inside the binary data are
+    escaped, so sorting and partitioning by key (in Hadoop or in mrjob's
+    ``local`` and ``inline`` runners) work as usual.
+
+    This is meant as an :py:attr:`~mrjob.job.MRJob.INTERNAL_PROTOCOL`, for
+    passing data between steps. It's faster than :py:class:`PickleProtocol`
+    and, unlike JSON, preserves tuples, bytes, sets, and dictionaries with
+    non-string keys. It can only encode built-in types.
+
+    .. warning::
+
+        The :py:mod:`marshal` format can change between versions of Python,
+        so every task in your job should use the same version of Python. Like
+        pickle, marshal is not safe to use on untrusted data.
+    """
+    def _loads(self, value):
+        return marshal.loads(_unescape_marshal(value))
+
+    def _dumps(self, value):
+        return _escape_marshal(marshal.dumps(value))
+
+    def _dumps_key(self, key):
+        return _escape_marshal(marshal.dumps(key, _MARSHAL_KEY_VERSION))
+
+    def write(self, key, value):
+        return self._dumps_key(key) + b'\t' + self._dumps(value)
+
+    def write_many(self, pairs):
+        dumps_key = self._dumps_key
+        dumps = self._dumps
+        return [dumps_key(key) + b'\t' + dumps(value)
+                for key, value in pairs]
+
+
+class MarshalValueProtocol(object):
+    """Encode ``value`` in :py:mod:`marshal` format and discard ``key``
+    (``key`` is read in as ``None``).
+
+    See :py:class:`MarshalProtocol` for details.
+    """
+    def read(self, line):
+        return (None, marshal.loads(_unescape_marshal(line)))
+
+    def write(self, key, value):
+        return _escape_marshal(marshal.dumps(value))
+
+
 # RawValueProtocol (below) is just an alias, but we treat it as a class for the
 # purpose of documentation. All it does is output the value (key is read as
 # ``None``).
@@ -365,9 +795,16 @@ class BytesProtocol(object):
 
         return tuple(key_value)
 
+    def read_many(self, lines):
+        return [_split_key_value(line, b'\t') for line in lines]
+
     def write(self, key, value):
         return b'\t'.join(x for x in (key, value) if x is not None)
 
+    def write_many(self, pairs):
+        write = self.write
+        return [write(key, value) for key, value in pairs]
+
 
 class BytesValueProtocol(object):
     """Read line (without trailing newline) directly into ``value`` (``key``
@@ -386,9 +823,15 @@ class BytesValueProtocol(object):
     def read(self, line):
         return (None, line)
 
+    def read_many(self, lines):
+        return [(None, line) for line in lines]
+
     def write(self, key, value):
         return value
 
+    def write_many(self, pairs):
+        return [value for _, value in pairs]
+
 
 class TextProtocol(object):
     """UTF-8 encode ``key`` and ``value`` (unicode strings) and join them
@@ -415,10 +858,18 @@ class TextProtocol(object):
 
         return tuple(key_value)
 
+    def read_many(self, lines):
+        return [_split_key_value(line, u'\t')
+                for line in _decode_lines(lines)]
+
     def write(self, key, value):
         return b'\t'.join(
             x.encode('utf_8') for x in (key, value) if x is not None)
 
+    def write_many(self, pairs):
+        write = self.write
+        return [write(key, value) for key, value in pairs]
+
 
 class TextValueProtocol(object):
     """Attempt to UTF-8 decode line (without trailing newline) into ``value``,
@@ -447,9 +898,49 @@ class TextValueProtocol(object):
         except UnicodeDecodeError:
             return (None, line.decode('latin_1'))
 
+    def read_many(self, lines):
+        return [(None, line) for line in _decode_lines(lines)]
+
     def write(self, key, value):
         return value.encode('utf_8')
 
+    def write_many(self, pairs):
+        return [value.encode('utf_8') for _, value in pairs]
+
+
+def _split_key_value(line, tab):
+    """Split *line* into a key and value on the first *tab*. If there
+    is no tab, value is ``None``."""
+    key_value = line.split(tab, 1)
+    if len(key_value) == 1:
+        key_value.append(None)
+
+    return tuple(key_value)
+
+
+def _decode_lines(lines):
+    """Decode a list of lines (without newlines) as UTF-8, falling back
+    to latin-1 for lines that aren't valid UTF-8. Usually decodes all the
+    lines at once."""
+    if not lines:
+        return []
+
+    try:
+        decoded = b'\n'.join(lines).decode('utf_8').split(u'\n')
+        if len(decoded) == len(lines):
+            return decoded
+    except UnicodeDecodeError:
+        pass
+
+    return [_decode_line(line) for line in lines]
+
+
+def _decode_line(line):
+    try:
+        return line.decode('utf_8')
+    except UnicodeDecodeError:
+        return line.decode('latin_1')
+
 
 # RawValueProtocol is the default way of reading input. Historically
 # (in Python 2), it's always read raw bytes, but Python 3 is pickier about
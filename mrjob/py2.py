@@ -142,21 +142,40 @@ xrange  # quiet, pyflakes
 if PY2:
     from urlparse import ParseResult
     from urllib import pathname2url
+    from urllib import quote
+    from urllib import urlencode
     from urlparse import urljoin
     from urllib2 import urlopen
     from urlparse import urlparse
 else:
     from urllib.parse import ParseResult
     from urllib.request import pathname2url
+    from urllib.parse import quote
+    from urllib.parse import urlencode
     from urllib.parse import urljoin
     from urllib.request import urlopen
     from urllib.parse import urlparse
 ParseResult
 pathname2url
+quote
+urlencode
 urljoin
 urlopen
 urlparse
 
+# HTTP connections
+if PY2:
+    from httplib import HTTPConnection
+    from httplib import HTTPException
+    from httplib import HTTPSConnection
+else:
+    from http.client import HTTPConnection
+    from http.client import HTTPException
+    from http.client import HTTPSConnection
+HTTPConnection
+HTTPException
+HTTPSConnection
+
 
 def to_unicode(s):
     """Convert ``bytes`` to unicode.
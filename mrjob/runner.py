@@ -19,6 +19,8 @@
 import copy
 import datetime
 import getpass
+import hashlib
+import json
 import logging
 import os
 import os.path
@@ -26,8 +28,8 @@ import posixpath
 import pprint
 import re
 import sys
-import tarfile
 import tempfile
+from shutil import copyfile
 from shutil import rmtree
 
 from mrjob.compat import translate_jobconf
@@ -53,6 +55,8 @@ from mrjob.step import INPUT
 from mrjob.step import OUTPUT
 from mrjob.step import _is_spark_step_type
 from mrjob.step import _is_pyspark_step_type
+from mrjob.util import _tar_and_gzip_files
+from mrjob.util import file_ext
 
 
 log = logging.getLogger(__name__)
@@ -73,6 +77,9 @@ _SORT_VALUES_JOBCONF = {
 _SORT_VALUES_PARTITIONER = \
     'org.apache.hadoop.mapred.lib.KeyFieldBasedPartitioner'
 
+# file in cache_dir recording files we uploaded with upload_cache
+_UPLOAD_CACHE_INDEX = 'uploads.json'
+
 
 class MRJobRunner(object):
     """Abstract base class for all runners"""
@@ -91,7 +98,9 @@ class MRJobRunner(object):
     # libjars is only here because the job can set it; might want to
     # handle this with a warning from the launcher instead
     OPT_NAMES = {
+        'archive_cache',
         'bootstrap_mrjob',
+        'cache_dir',
         'check_input_paths',
         'cleanup',
         'cleanup_on_failure',
@@ -106,6 +115,7 @@ class MRJobRunner(object):
         'read_logs',
         'setup',
         'upload_archives',
+        'upload_cache',
         'upload_dirs',
         'upload_files'
     }
@@ -1024,41 +1034,93 @@ class MRJobRunner(object):
         if not os.path.isdir(os.path.dirname(tar_gz_path)):
             os.makedirs(os.path.dirname(tar_gz_path))
 
+        log.info('Archiving %s -> %s' % (dir_path, tar_gz_path))
+
+        paths_and_names = []
+        uris_and_dests = []
+
         # for remote files
-        tmp_download_path = os.path.join(
+        tmp_download_dir = os.path.join(
             self._get_local_tmp_dir(), 'tmp-download')
 
-        log.info('Archiving %s -> %s' % (dir_path, tar_gz_path))
+        for path in self.fs.ls(dir_path):
+            # fs.ls() only lists files
+            if path == dir_path:
+                raise OSError('%s is a file, not a directory!' % dir_path)
 
-        with tarfile.open(tar_gz_path, mode='w:gz') as tar_gz:
-            for path in self.fs.ls(dir_path):
-                # fs.ls() only lists files
-                if path == dir_path:
-                    raise OSError('%s is a file, not a directory!' % dir_path)
-
-                # TODO: do we need this?
-                if os.path.realpath(path) == os.path.realpath(tar_gz_path):
-                    raise OSError(
-                        'attempted to archive %s into itself!' % tar_gz_path)
-
-                if is_uri(path):
-                    path_in_tar_gz = path[len(dir_path):].lstrip('/')
-
-                    log.info('  downloading %s -> %s' % (
-                        path, tmp_download_path))
-                    with open(tmp_download_path, 'wb') as f:
-                        for chunk in self.fs.cat(path):
-                            f.write(chunk)
-                    local_path = tmp_download_path
-                else:
-                    path_in_tar_gz = path[len(dir_path):].lstrip(os.sep)
-                    local_path = path
+            # TODO: do we need this?
+            if os.path.realpath(path) == os.path.realpath(tar_gz_path):
+                raise OSError(
+                    'attempted to archive %s into itself!' % tar_gz_path)
+
+            if is_uri(path):
+                path_in_tar_gz = path[len(dir_path):].lstrip('/')
+
+                local_path = os.path.join(
+                    tmp_download_dir, str(len(uris_and_dests)))
+                uris_and_dests.append((path, local_path))
+            else:
+                path_in_tar_gz = path[len(dir_path):].lstrip(os.sep)
+                local_path = path
+
+            paths_and_names.append((local_path, path_in_tar_gz))
+
+        paths_and_names.sort(key=lambda p_n: p_n[1])
+
+        if uris_and_dests:
+            # download remote files all at once
+            if not os.path.isdir(tmp_download_dir):
+                os.makedirs(tmp_download_dir)
+
+            log.info('  downloading %d file%s from %s' % (
+                len(uris_and_dests), '' if len(uris_and_dests) == 1 else 's',
+                dir_path))
+            self.fs._cat_many(uris_and_dests)
 
-                log.debug('  adding %s to %s' % (path, tar_gz_path))
-                tar_gz.add(local_path, path_in_tar_gz, recursive=False)
+            _tar_and_gzip_files(paths_and_names, tar_gz_path)
+
+            rmtree(tmp_download_dir)
+        else:
+            self._write_archive(
+                _tar_and_gzip_files, paths_and_names, tar_gz_path)
 
         self._dir_archives_created.add(tar_gz_path)
 
+    def _write_archive(self, write, paths_and_names, out_path):
+        """Call ``write(paths_and_names, out_path)`` to archive local files.
+
+        If :mrjob-opt:`archive_cache` is set, look for an archive of the
+        same files (same paths, names, sizes, mtimes, and permissions) in
+        :mrjob-opt:`cache_dir`, and copy it instead. Otherwise, save a copy
+        of the archive we wrote there for next time.
+        """
+        if not self._opts['archive_cache']:
+            write(paths_and_names, out_path)
+            return
+
+        ext = file_ext(os.path.basename(out_path))
+        key = _files_key(paths_and_names, ext)
+        cached_path = os.path.join(
+            self._get_cache_dir(), 'archives', key + ext)
+
+        if os.path.exists(cached_path):
+            log.debug('  using cached archive %s' % cached_path)
+            copyfile(cached_path, out_path)
+            return
+
+        write(paths_and_names, out_path)
+
+        try:
+            if not os.path.isdir(os.path.dirname(cached_path)):
+                os.makedirs(os.path.dirname(cached_path))
+
+            # other jobs may be caching the same archive
+            tmp_path = '%s.%s' % (cached_path, self._job_key)
+            copyfile(out_path, tmp_path)
+            os.rename(tmp_path, cached_path)
+        except (IOError, OSError) as ex:
+            log.warning("Couldn't cache archive %s: %s" % (cached_path, ex))
+
     def _bootstrap_mrjob(self):
         """Should we bootstrap mrjob?"""
         if self._opts['bootstrap_mrjob'] is None:
@@ -1129,22 +1191,25 @@ class MRJobRunner(object):
         if not self._opts['check_input_paths']:
             return
 
-        for path in self._input_paths:
-            self._check_input_path(path)
+        self._check_input_paths_exist(self._input_paths)
 
-    def _check_input_path(self, path):
-        """Raise :py:class:`IOError` if the given input does not exist or
-        is otherwise invalid. Override this to provide custom check
-        behavior."""
-        if path == '-':
-            return  # STDIN always exists
+    def _check_input_paths_exist(self, paths):
+        """Raise :py:class:`IOError` if any of the given inputs do not
+        exist.
 
-        if not self.fs.can_handle_path(path):
-            return  # no way to check (e.g. non-S3 URIs on EMR)
+        All paths are checked with a single call to the filesystem, so
+        that e.g. :command:`hadoop fs` only has to run once."""
+        paths = [
+            path for path in paths
+            # STDIN always exists, and there's no way to check URIs
+            # our filesystem can't handle (e.g. non-S3 URIs on EMR)
+            if path != '-' and self.fs.can_handle_path(path)
+        ]
 
-        if not self.fs.exists(path):
-            raise IOError(
-                'Input path %s does not exist!' % (path,))
+        for path, exists in zip(paths, self.fs._exists_many(paths)):
+            if not exists:
+                raise IOError(
+                    'Input path %s does not exist!' % (path,))
 
     def _add_input_files_for_upload(self):
         """If there is an upload manager, add input files to it."""
@@ -1156,13 +1221,129 @@ class MRJobRunner(object):
         self._copy_files_to_wd_mirror()
 
         if self._upload_mgr:
-            self.fs.mkdir(self._upload_mgr.prefix)
+            upload_dir = self._upload_mgr.cas_prefix or self._upload_mgr.prefix
+            if not self._upload_mgr.cas_prefix:
+                self.fs.mkdir(upload_dir)
 
-            log.info('Copying other local files to %s' %
-                     self._upload_mgr.prefix)
-            for src_path, uri in self._upload_mgr.path_to_uri().items():
+            log.info('Copying other local files to %s' % upload_dir)
+            srcs_and_uris = sorted(self._upload_mgr.path_to_uri().items())
+            for src_path, uri in srcs_and_uris:
                 log.debug('  %s -> %s' % (src_path, uri))
-                self.fs.put(src_path, uri)
+            self._put_many(srcs_and_uris)
+
+    def _upload_cas_prefix(self, job_tmp_dir):
+        """If :mrjob-opt:`upload_cache` is set, return the URI of the
+        content-addressed directory to upload local files into (``cas/``
+        next to *job_tmp_dir*, this job's own temp dir). Otherwise,
+        return ``None``."""
+        if not self._opts['upload_cache']:
+            return None
+
+        tmp_dir = posixpath.dirname(job_tmp_dir.rstrip('/'))
+        return posixpath.join(tmp_dir, 'cas', '')
+
+    def _put_many(self, srcs_and_uris):
+        """Upload local files, as with :py:meth:`Filesystem._put_many`.
+
+        If :mrjob-opt:`upload_cache` is set, skip files that were already
+        uploaded to their content-addressed URIs by a previous job.
+
+        We keep an index of files we've uploaded (and their md5 sums) in
+        :mrjob-opt:`cache_dir`. We always check that files still exist
+        remotely (they may have expired), but we only compare md5 sums of
+        remote files that aren't in the index (e.g. uploaded by another
+        host, possibly only partially).
+        """
+        if not (self._upload_mgr and self._upload_mgr.cas_prefix):
+            self.fs._put_many(srcs_and_uris)
+            return
+
+        if not srcs_and_uris:
+            return
+
+        # several paths may have the same contents
+        uri_to_src = {}
+        for src, uri in srcs_and_uris:
+            uri_to_src.setdefault(uri, src)
+
+        uris = sorted(uri_to_src)
+        uri_to_md5 = dict((uri, self.fs.md5sum(uri_to_src[uri]))
+                          for uri in uris)
+
+        index = self._read_upload_cache_index()
+
+        to_upload = []
+        for uri, exists in zip(uris, self.fs._exists_many(uris)):
+            if exists and (index.get(uri) == uri_to_md5[uri] or
+                           self._cas_file_is_valid(uri, uri_to_md5[uri])):
+                log.debug('  %s already uploaded' % uri)
+            else:
+                to_upload.append((uri_to_src[uri], uri))
+
+        # each file goes in its own directory; create them all at once
+        # rather than having each upload fail and retry
+        if to_upload:
+            self.fs._mkdir_many(sorted(set(
+                posixpath.dirname(uri) for _, uri in to_upload)))
+
+        self.fs._put_many(to_upload)
+
+        index.update(uri_to_md5)
+        self._write_upload_cache_index(index)
+
+    def _cas_file_is_valid(self, uri, md5):
+        """Does the (existing) file at *uri* have the md5 sum *md5*? If
+        we can't get md5 sums, assume it does, since its URI already
+        includes a hash of its contents."""
+        try:
+            remote_md5 = self.fs.md5sum(uri)
+        except NotImplementedError:
+            return True
+        except IOError:
+            return False
+
+        # S3 ETags of multipart uploads aren't md5 sums
+        return remote_md5 == md5 or '-' in remote_md5
+
+    def _get_cache_dir(self):
+        """The local directory where we keep data between runs."""
+        return self._opts['cache_dir'] or _default_cache_dir()
+
+    def _read_upload_cache_index(self):
+        """Read our index of uploaded files (a map from URI to md5 sum).
+        If it doesn't exist or is corrupt, return ``{}``."""
+        path = os.path.join(self._get_cache_dir(), _UPLOAD_CACHE_INDEX)
+
+        try:
+            with open(path) as f:
+                index = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if not isinstance(index, dict):
+            return {}
+
+        return index
+
+    def _write_upload_cache_index(self, index):
+        """Atomically replace our index of uploaded files. Failing to
+        write it is not an error."""
+        cache_dir = self._get_cache_dir()
+        path = os.path.join(cache_dir, _UPLOAD_CACHE_INDEX)
+
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            # other jobs may be writing the index too; write to a
+            # uniquely named file and rename it into place
+            tmp_path = '%s.%s' % (path, self._job_key)
+            with open(tmp_path, 'w') as f:
+                json.dump(index, f, indent=0, sort_keys=True)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as ex:
+            log.warning("Couldn't write upload cache index %s: %s" %
+                        (path, ex))
 
     def _wd_mirror(self):
         """A directory to upload files belonging to
@@ -1202,6 +1383,10 @@ class MRJobRunner(object):
                 not self._wd_filenames_must_match()):
             return None
 
+        if (is_uri(dest_dir) and self._upload_mgr and
+                self._upload_mgr.cas_prefix):
+            return self._upload_mgr._cas_uri(path, name)
+
         return posixpath.join(dest_dir, name)
 
     def _copy_file_to_wd_mirror(self, path, name):
@@ -1252,13 +1437,21 @@ class MRJobRunner(object):
         log.info('%s working dir files to %s...' %
                  ('uploading' if is_uri(wd_mirror) else 'copying', wd_mirror))
 
-        for name, path in sorted(
-                self._working_dir_mgr.name_to_path('file').items()):
-            self._copy_file_to_wd_mirror(path, name)
+        # upload local files all at once, at the end
+        srcs_and_dests = []
+
+        for type in ('file', 'archive_file'):
+            for name, path in sorted(
+                    self._working_dir_mgr.name_to_path(type).items()):
+                dest = self._dest_in_wd_mirror(path, name)
+
+                if dest and not is_uri(path):
+                    log.debug('  %s -> %s' % (path, dest))
+                    srcs_and_dests.append((path, dest))
+                else:
+                    self._copy_file_to_wd_mirror(path, name)
 
-        for name, path in sorted(
-                self._working_dir_mgr.name_to_path('archive_file').items()):
-            self._copy_file_to_wd_mirror(path, name)
+        self._put_many(srcs_and_dests)
 
     def _upload_part_size(self):
         """Part size for uploads, in bytes, or ``None``,
@@ -1567,3 +1760,29 @@ def _basename(path_or_uri):
         return posixpath.basename(path_or_uri)
     else:
         return os.path.basename(path_or_uri)
+
+
+def _default_cache_dir():
+    """Default for :mrjob-opt:`cache_dir`: ``mrjob`` in
+    ``$XDG_CACHE_HOME`` (by default, ``~/.cache``)."""
+    cache_home = (os.environ.get('XDG_CACHE_HOME') or
+                  os.path.join(os.path.expanduser('~'), '.cache'))
+
+    return os.path.join(cache_home, 'mrjob')
+
+
+def _files_key(paths_and_names, *extra):
+    """Hash the paths, names, sizes, mtimes, and permissions of the local
+    files in *paths_and_names* (and any *extra* strings), to tell if we
+    need to re-archive them."""
+    sha256 = hashlib.sha256()
+
+    for s in extra:
+        sha256.update(repr(s).encode('utf_8'))
+
+    for path, name in paths_and_names:
+        st = os.stat(path)
+        sha256.update(repr((path, name, st.st_size, st.st_mtime,
+                            st.st_mode)).encode('utf_8'))
+
+    return sha256.hexdigest()
@@ -35,6 +35,7 @@ Hadoop can see them (HDFS or S3), we provide :py:class:`UploadDirManager`.
 Path dictionaries are meant to be immutable; all state is handled by
 manager classes.
 """
+import hashlib
 import itertools
 import logging
 import os
@@ -295,22 +296,35 @@ class UploadDirManager(object):
     filename in the path (for ease of debugging), but handles collisions
     gracefully.
 
+    If *cas_prefix* is set, local files instead go in a content-addressed
+    directory (``<cas_prefix>/<sha256>/<filename>``), so that a file
+    gets the same URI every time it's uploaded, as long as it doesn't
+    change.
+
     :py:class:`UploadDirManager` assumes URIs to not need to be uploaded
     and thus does not store them. :py:meth:`uri` maps URIs to themselves.
     """
-    def __init__(self, prefix):
+    def __init__(self, prefix, cas_prefix=None):
         """Make an :py:class`UploadDirManager`.
 
         :param string prefix: The URI for the directory (e.g.
                               `s3://bucket/dir/`). It doesn't matter if
                               *prefix* has a trailing slash; :py:meth:`uri`
                               will do the right thing.
+        :param string cas_prefix: optional URI for a content-addressed
+                                  directory to use instead of *prefix*
+                                  (e.g. `s3://bucket/tmp/cas/`). Unlike
+                                  *prefix*, this can be shared between jobs.
         """
         self.prefix = prefix
+        self.cas_prefix = cas_prefix
 
         self._path_to_name = {}
         self._names_taken = set()
 
+        # map from path to sha256 hexdigest, computed lazily
+        self._path_to_sha256 = {}
+
     def add(self, path):
         """Add a path. If *path* hasn't been added before, assign it a name.
                        If *path* is a URI don't add it; just return the URI.
@@ -322,30 +336,51 @@ class UploadDirManager(object):
         if path not in self._path_to_name:
             # use unhide so that input files won't be hidden from Hadoop,
             # see #1200
-            name = name_uniquely(
-                path, names_taken=self._names_taken, unhide=True)
-            self._names_taken.add(name)
+            if self.cas_prefix:
+                # each file gets its own directory, so names can't collide
+                name = name_uniquely(path, unhide=True)
+            else:
+                name = name_uniquely(
+                    path, names_taken=self._names_taken, unhide=True)
+                self._names_taken.add(name)
             self._path_to_name[path] = name
 
         return self.uri(path)
 
     def uri(self, path):
         """Get the URI for the given path. If *path* is a URI, just return it.
+
+        If we have a *cas_prefix*, this reads the file at *path* (once)
+        to compute its hash, so don't call it until the file is complete.
         """
         if is_uri(path):
             return path
 
-        if path in self._path_to_name:
-            return posixpath.join(self.prefix, self._path_to_name[path])
-        else:
+        if path not in self._path_to_name:
             raise ValueError('%r is not a URI or a known local file' % (path,))
 
+        if self.cas_prefix:
+            return self._cas_uri(path, self._path_to_name[path])
+        else:
+            return posixpath.join(self.prefix, self._path_to_name[path])
+
     def path_to_uri(self):
         """Get a map from path to URI for all paths that were added,
         so we can figure out which files we need to upload."""
         return dict((path, self.uri(path))
                     for path in self._path_to_name)
 
+    def _cas_uri(self, path, name):
+        """The content-addressed URI to upload the local file *path* to,
+        with the filename *name*."""
+        return posixpath.join(self.cas_prefix, self._sha256(path), name)
+
+    def _sha256(self, path):
+        if path not in self._path_to_sha256:
+            self._path_to_sha256[path] = _sha256_file(path)
+
+        return self._path_to_sha256[path]
+
 
 class WorkingDirManager(object):
     """Represents the working directory of hadoop/Spark tasks (or bootstrap
@@ -515,3 +550,17 @@ class WorkingDirManager(object):
         if type not in self._SUPPORTED_TYPES:
             raise ValueError('bad path type %r, must be one of: %s' % (
                 type, ', '.join(sorted(self._SUPPORTED_TYPES))))
+
+
+def _sha256_file(path, block_size=(512 ** 2)):  # 256K default
+    """Return the sha256 hexdigest of the contents of the file at *path*."""
+    sha256 = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            sha256.update(data)
+
+    return sha256.hexdigest()
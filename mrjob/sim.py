@@ -15,12 +15,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import itertools
+import heapq
 import logging
 import os
 import shutil
 import stat
 import platform
+import re
+import zlib
+from contextlib import contextmanager
 from copy import deepcopy
 from functools import partial
 from multiprocessing import cpu_count
@@ -30,9 +33,13 @@ from os.path import join
 from os.path import relpath
 from shutil import copy2
 from shutil import copytree
+from tempfile import mkstemp
 
+from mrjob.cat import bunzip2_block
 from mrjob.cat import decompress
+from mrjob.cat import find_bz2_blocks
 from mrjob.cat import is_compressed
+from mrjob.compat import jobconf_from_dict
 from mrjob.compat import translate_jobconf
 from mrjob.compat import translate_jobconf_for_all_versions
 from mrjob.conf import combine_dicts
@@ -43,10 +50,46 @@ from mrjob.parse import parse_mr_job_stderr
 from mrjob.runner import MRJobRunner
 from mrjob.runner import _fix_env
 from mrjob.step import _is_spark_step_type
+from mrjob.util import to_lines
 from mrjob.util import unarchive
 
 log = logging.getLogger(__name__)
 
+# partitioners that split map output by the entire key
+_HASH_PARTITIONERS = {
+    'org.apache.hadoop.mapred.lib.HashPartitioner',
+    'org.apache.hadoop.mapreduce.lib.partition.HashPartitioner',
+}
+
+# partitioners that split map output by fields within the key, configured
+# by mapreduce.partition.keypartitioner.options
+_KEY_FIELD_BASED_PARTITIONERS = {
+    'org.apache.hadoop.mapred.lib.KeyFieldBasedPartitioner',
+    'org.apache.hadoop.mapreduce.lib.partition.KeyFieldBasedPartitioner',
+}
+
+# matches one -k option in mapreduce.partition.keypartitioner.options
+# (we ignore character offsets and ordering options)
+_KEY_FIELD_OPTION_RE = re.compile(
+    r'-k\s*(?P<start>\d+)(\.\d+)?[a-zA-Z]*'
+    r'(,(?P<end>\d+)(\.\d+)?[a-zA-Z]*)?')
+
+# defaults for mapreduce.task.io.sort.mb and mapreduce.task.io.sort.factor,
+# which control how much data we sort in memory, and how many sorted
+# runs we merge at once
+_DEFAULT_SORT_BUFFER_MB = 100
+_DEFAULT_SORT_FACTOR = 10
+
+# with auto_tune_tasks, how many (decompressed) bytes of each input file we
+# read to estimate its size and its lines' size (see _sample_input_file())
+_SAMPLE_BYTES = 1024 * 1024
+
+# with auto_tune_tasks, the fewest lines we put in a map split, and the
+# fewest input bytes we give each reducer, so that tiny tasks don't spend
+# most of their time starting up
+_MIN_LINES_PER_SPLIT = 1000
+_MIN_BYTES_PER_REDUCER = 8 * 1024 * 1024
+
 
 # This class defers execution to a lot of other functions because of local
 # mode which uses :mod:`multiprocessing`, which relies on pickling.
@@ -59,7 +102,6 @@ class SimMRJobRunner(MRJobRunner):
     _IGNORED_HADOOP_KWARGS = [
         'hadoop_input_format',
         'hadoop_output_format',
-        'partitioner',
     ]
 
     # options that we ignore becaue they require real Hadoop.
@@ -68,6 +110,7 @@ class SimMRJobRunner(MRJobRunner):
     ]
 
     OPT_NAMES = MRJobRunner.OPT_NAMES | {
+        'auto_tune_tasks',
         'hadoop_version',
         'num_cores'
     }
@@ -79,6 +122,13 @@ class SimMRJobRunner(MRJobRunner):
 
         self._counters = []
 
+        # map step number to list of map splits (see _split_mapper_input())
+        self._step_to_map_splits = {}
+
+        # map step number to a map from input path to estimates of its
+        # size, etc. (see _sample_inputs())
+        self._step_to_input_samples = {}
+
         # warn about ignored keyword arguments
         for key in self._IGNORED_HADOOP_KWARGS:
             value = kwargs.get(key)
@@ -87,6 +137,14 @@ class SimMRJobRunner(MRJobRunner):
                     'ignoring %s keyword arg (requires real Hadoop): %r' %
                     (key, value))
 
+        # we can only simulate some partitioners
+        if self._partitioner and not (
+                self._partitioner in _HASH_PARTITIONERS or
+                self._partitioner in _KEY_FIELD_BASED_PARTITIONERS):
+            log.warning(
+                'ignoring partitioner keyword arg (requires real Hadoop): %r' %
+                self._partitioner)
+
         # TODO: libjars should just not be an option for local runners
         #
         # however, the job class can still set it; might want to handle
@@ -177,14 +235,13 @@ class SimMRJobRunner(MRJobRunner):
 
             map_splits = self._split_mapper_input(
                 self._input_paths_for_step(step_num), step_num)
+            self._step_to_map_splits[step_num] = map_splits
 
+            # map tasks also sort and partition their output for reducers
             self._run_mappers_and_combiners(step_num, map_splits)
 
-            if 'reducer' in step:
-                self._sort_reducer_input(step_num, len(map_splits))
-                num_reducer_tasks = self._split_reducer_input(step_num)
-
-                self._run_reducers(step_num, num_reducer_tasks)
+            if 'reducer' in step and not self._is_map_only(step_num):
+                self._run_reducers(step_num, len(map_splits))
 
             self._log_counters(step_num)
 
@@ -194,10 +251,16 @@ class SimMRJobRunner(MRJobRunner):
 
             raise
 
-    def _run_task_func(self, task_type, step_num, task_num, map_split=None):
+    def _run_task_func(self, task_type, step_num, task_num, map_split=None,
+                       sorted_input_paths=None):
         """Returns a no-args function that runs one mapper, reducer, or
          combiner.
 
+        If *sorted_input_paths* is set, the task reads a merge of those
+        (already sorted) files rather than its input file. Mappers
+        whose *map_split* doesn't have an input file read directly from
+        the original file.
+
         This sets up everything the task needs to run, then passes it off to
         :py:meth:`_invoke_task_func`.
         """
@@ -212,14 +275,50 @@ class SimMRJobRunner(MRJobRunner):
             _run_task,
             self._invoke_task_func(task_type, step_num, task_num),
             task_type, step_num, task_num,
-            input_path, output_path, stderr_path, wd, env)
+            input_path, output_path, stderr_path, wd, env,
+            self._open_input_func(
+                task_type, step_num, map_split, sorted_input_paths))
+
+    def _open_input_func(self, task_type, step_num,
+                         map_split=None, sorted_input_paths=None):
+        """Returns a function that takes the path of a task's input file,
+        and returns a context manager that yields the task's stdin, or
+        ``None`` if the task should just read its input file.
+
+        Mappers read (and decompress) their split directly from the
+        original input file, unless the split has its own input file.
+        Reducers read a merge of *sorted_input_paths* (see
+        :py:meth:`_merge_input_func`).
+        """
+        if sorted_input_paths is not None:
+            return partial(
+                self._merge_input_func(step_num), sorted_input_paths)
+        elif task_type != 'mapper' or not map_split or map_split.get(
+                'input'):
+            return None
+        elif map_split.get('bz2_blocks'):
+            return partial(_open_bz2_split, map_split['file'],
+                           map_split['bz2_blocks'],
+                           map_split['first_block'],
+                           map_split['num_blocks'])
+        elif is_compressed(map_split['file']):
+            return partial(_open_compressed_split, map_split['file'])
+        else:
+            return partial(_open_split, map_split['file'],
+                           map_split['start'], map_split['length'])
 
     def _run_mappers_and_combiners(self, step_num, map_splits):
+        # start the biggest tasks first, so that a big split doesn't
+        # start last and leave other cores idle
+        task_nums = _largest_first(
+            [self._map_split_size(step_num, map_split)
+             for map_split in map_splits])
+
         try:
             self._run_multiple(
                 self._run_mapper_and_combiner_func(
-                    step_num, task_num, map_split)
-                for task_num, map_split in enumerate(map_splits)
+                    step_num, task_num, map_splits[task_num])
+                for task_num in task_nums
             )
         finally:
             self._parse_task_counters('mapper', step_num)
@@ -250,8 +349,20 @@ class SimMRJobRunner(MRJobRunner):
 
     def _run_mapper_and_combiner_func(self, step_num, task_num, map_split):
         """Returns a no-args function that runs one mapper, plus the
-        corresponding combiner if there is one."""
+        corresponding combiner if there is one.
+
+        If the step has a reducer, the function also splits the map task's
+        output into one sorted partition per reducer.
+
+        If ``mapreduce.job.reduces`` is 0, the mapper's output goes
+        straight to the step's output, as in Hadoop (see
+        :py:meth:`_is_map_only`).
+        """
         step = self._get_step(step_num)
+        map_only = self._is_map_only(step_num)
+
+        # create mapper dir (we don't always create an input file in it)
+        self.fs.mkdir(self._task_dir('mapper', step_num, task_num))
 
         mapper_input_path = self._task_input_path(
             'mapper', step_num, task_num)
@@ -264,13 +375,13 @@ class SimMRJobRunner(MRJobRunner):
             run_mapper = self._run_task_func(
                 'mapper', step_num, task_num, map_split)
 
-        sort_input = self._sort_input_func()
+        sort_input = self._sort_input_func(step_num)
 
         combiner_input_path = None
         run_combiner = None
         # don't need combiner_output_path; *run_combiner* already knows it
 
-        if 'combiner' in step:
+        if 'combiner' in step and not map_only:
             # create combiner dir
             self.fs.mkdir(self._task_dir('combiner', step_num, task_num))
 
@@ -279,20 +390,58 @@ class SimMRJobRunner(MRJobRunner):
             run_combiner = self._run_task_func(
                 'combiner', step_num, task_num, map_split)
 
+        map_output_path = self._task_output_path(
+            'combiner' if run_combiner else 'mapper', step_num, task_num)
+
+        partition_paths = None
+        if 'reducer' in step and not map_only:
+            partition_paths = [
+                self._map_partition_path(step_num, task_num, reducer_num)
+                for reducer_num in range(self._num_reducers(step_num))
+            ]
+
         return partial(
             _run_mapper_and_combiner,
             run_mapper, sort_input, run_combiner,
-            mapper_input_path, mapper_output_path, combiner_input_path)
+            mapper_input_path, mapper_output_path, combiner_input_path,
+            map_output_path, partition_paths, self._partition_func(step_num),
+            self._open_input_func('mapper', step_num, map_split),
+            self._combiner_sort_buffer_kwargs(step_num))
+
+    def _run_reducers(self, step_num, num_map_tasks):
+        # start the reducers with the most input first (see
+        # _run_mappers_and_combiners())
+        task_nums = _largest_first([
+            sum(os.stat(path)[stat.ST_SIZE]
+                for path in self._reducer_input_paths(
+                    step_num, task_num, num_map_tasks)
+                if os.path.exists(path))
+            for task_num in range(self._num_reducers(step_num))
+        ])
 
-    def _run_reducers(self, step_num, num_reducer_tasks):
         try:
             self._run_multiple(
-                self._run_task_func('reducer', step_num, task_num)
-                for task_num in range(num_reducer_tasks)
+                self._run_reducer_func(step_num, task_num, num_map_tasks)
+                for task_num in task_nums
             )
         finally:
             self._parse_task_counters('reducer', step_num)
 
+    def _run_reducer_func(self, step_num, task_num, num_map_tasks):
+        """Returns a no-args function that runs one reducer, reading
+        a merge of the corresponding sorted partition from each map task."""
+        return self._run_task_func(
+            'reducer', step_num, task_num,
+            sorted_input_paths=self._reducer_input_paths(
+                step_num, task_num, num_map_tasks))
+
+    def _reducer_input_paths(self, step_num, task_num, num_map_tasks):
+        """The sorted partition for the given reducer from each map task."""
+        return [
+            self._map_partition_path(step_num, map_task_num, task_num)
+            for map_task_num in range(num_map_tasks)
+        ]
+
     def _create_dist_cache_dir(self, step_num):
         """Copy working directory files into a shared directory,
         simulating the way Hadoop's Distributed Cache works on nodes."""
@@ -409,82 +558,194 @@ class SimMRJobRunner(MRJobRunner):
         return self._num_cores()
 
     def _num_reducers(self, step_num):
-        # TODO: look up mapred.job.reduces in _jobconf_for_step()
-        return self._num_cores()
+        """The number of reducer tasks to run. This is
+        ``mapreduce.job.reduces`` if set, or the number of cores."""
+        num_reducers = jobconf_from_dict(
+            self._jobconf_for_step(step_num), 'mapreduce.job.reduces')
+
+        if num_reducers is None:
+            if self._opts['auto_tune_tasks']:
+                return self._pick_num_reducers(step_num)
+            else:
+                return self._num_cores()
+
+        num_reducers = int(num_reducers)
+
+        if num_reducers < 0:
+            raise ValueError(
+                'mapreduce.job.reduces must be at least 0, not %d' %
+                num_reducers)
+
+        return num_reducers
+
+    def _is_map_only(self, step_num):
+        """True if ``mapreduce.job.reduces`` is 0. Hadoop treats this as
+        a map-only job: it skips the combiner and reducer, and writes
+        the mapper's output directly."""
+        num_reducers = jobconf_from_dict(
+            self._jobconf_for_step(step_num), 'mapreduce.job.reduces')
+
+        return num_reducers is not None and int(num_reducers) == 0
+
+    def _pick_num_reducers(self, step_num):
+        """With *auto_tune_tasks*, pick a number of reducers based on
+        a sample of the step's input.
+
+        We don't know how big map output will be until the map tasks have
+        run (and partitioned it), so we assume it's about the size of the
+        input, and give each reducer at least
+        :py:data:`_MIN_BYTES_PER_REDUCER`. If the step has no mapper and
+        we sampled all of its input, we also don't run more reducers than
+        there are distinct keys.
+        """
+        samples = self._sample_inputs(
+            self._input_paths_for_step(step_num), step_num).values()
+
+        total_size = sum(s['uncompressed_size'] for s in samples)
+
+        # round up
+        num_reducers = min(
+            self._num_cores(),
+            (total_size + _MIN_BYTES_PER_REDUCER - 1) //
+            _MIN_BYTES_PER_REDUCER)
+
+        if ('mapper' not in self._get_step(step_num) and
+                all(s['complete'] for s in samples)):
+            keys = set()
+            for sample in samples:
+                keys.update(sample['keys'])
+
+            num_reducers = min(num_reducers, len(keys))
+
+        return max(num_reducers, 1)
+
+    def _partition_func(self, step_num):
+        """Returns a function that decides which reducer a line of map
+        output should go to, simulating the job's partitioner. It takes
+        the arguments *line* (with no trailing newline) and
+        *num_partitions*.
+
+        This needs to be pickleable, since map tasks call it.
+        """
+        partitioner = self._partitioner or self._sort_values_partitioner()
+
+        if partitioner in _KEY_FIELD_BASED_PARTITIONERS:
+            jobconf = self._jobconf_for_step(step_num)
+
+            return partial(
+                _key_field_partition,
+                key_fields=_parse_key_fields(jobconf_from_dict(
+                    jobconf, 'mapreduce.partition.keypartitioner.options')),
+                num_key_fields=int(jobconf_from_dict(
+                    jobconf, 'stream.num.map.output.key.fields', 1)),
+                field_separator=_to_separator(jobconf_from_dict(
+                    jobconf, 'mapreduce.map.output.key.field.separator')))
+        else:
+            return _hash_partition
 
     def _split_mapper_input(self, input_paths, step_num):
         """Take one or more input paths (which may be compressed) and split
-        it to create the input files for the map tasks.
+        them into input for the map tasks.
 
-        Yields "splits", which are dictionaries with the following keys:
+        Returns a list of "splits", which are dictionaries with the
+        following keys:
 
-        input: path of input for one mapper
         file: path of original file
-        start, length: chunk of original file in *input*
-
-        Uncompressed files will not be split (even ``.bz2`` files);
-        uncompressed files will be split as to to attempt to create
-        twice as many input files as there are mappers.
+        start, length: chunk of original file read by one mapper
+        input: path of a file containing input for one mapper (only set
+               if we had to create one)
+        bz2_blocks: bit offsets of all blocks in a ``.bz2`` file (see
+                    :py:func:`~mrjob.cat.find_bz2_blocks`)
+        first_block, num_blocks: which of *bz2_blocks* the mapper reads
+
+        Uncompressed files are split into byte ranges that start and end
+        on line boundaries, which map tasks read directly from the
+        original file, as to attempt to create twice as many splits as there
+        are mappers. ``.bz2`` files are split on block boundaries. Other
+        compressed files are not split. Either way, map tasks decompress
+        their own input, so that we decompress several files at once.
+
+        If *auto_tune_tasks* is set, we size splits by how big each file
+        is once decompressed, rather than how big it is on disk (see
+        :py:meth:`_pick_mapper_split_size`).
         """
         input_paths = list(input_paths)
         manifest = (step_num == 0 and self._uses_input_manifest())
 
-        # determine split size
         if manifest:
-            split_size = 1  # one line per mapper
-        else:
-            split_size = self._pick_mapper_split_size(input_paths, step_num)
+            return self._split_input_manifest(input_paths, step_num)
 
-        # yield output fileobjs as needed
-        split_fileobj_gen = self._yield_split_fileobjs('mapper', step_num)
+        split_size = self._pick_mapper_split_size(input_paths, step_num)
 
         results = []
 
+        samples = None
+        if self._opts['auto_tune_tasks']:
+            samples = self._sample_inputs(input_paths, step_num)
+
         for path in input_paths:
-            with open(path, 'rb') as src:
-                if is_compressed(path):
-                    if manifest:
-                        raise Exception('input manifest %s should not be'
-                                        ' compressed!' % path)
+            if path.endswith('.bz2'):
+                bz2_split_size = split_size
+                if samples:
+                    # split_size is in decompressed bytes; convert it to
+                    # compressed bytes
+                    sample = samples[path]
+                    bz2_split_size = (
+                        split_size * sample['size'] //
+                        max(sample['uncompressed_size'], 1))
+
+                results.extend(_split_bz2_file(path, bz2_split_size))
+            elif is_compressed(path):
+                # Hadoop tracks the compressed file's size
+                size = os.stat(path)[stat.ST_SIZE]
+
+                results.append(dict(
+                    file=path,
+                    start=0,
+                    length=size,
+                ))
+            else:
+                # otherwise, split into one or more byte ranges
+                for start, length in _split_file_on_lines(path, split_size):
+                    results.append(dict(
+                        file=path,
+                        start=start,
+                        length=length,
+                    ))
 
-                    # if file is compressed, uncompress it into a single split
+        return results
 
-                    # Hadoop tracks the compressed file's size
-                    size = os.stat(path)[stat.ST_SIZE]
+    def _split_input_manifest(self, input_paths, step_num):
+        """Like :py:meth:`_split_mapper_input`, except that we put each
+        line of the input manifest in its own input file, prefixed with
+        its byte offset (simulating ``NLineInputFormat``)."""
+        results = []
 
-                    with next(split_fileobj_gen) as dest:
-                        for chunk in decompress(src, path):
-                            dest.write(chunk)
+        for path in input_paths:
+            if is_compressed(path):
+                raise Exception('input manifest %s should not be'
+                                ' compressed!' % path)
+
+            with open(path, 'rb') as src:
+                start = 0
+
+                for line in src:
+                    input_path = self._task_input_path(
+                        'mapper', step_num, len(results))
+                    self.fs.mkdir(dirname(input_path))
+
+                    with open(input_path, 'wb') as dest:
+                        dest.write(('%d\t' % start).encode('ascii'))
+                        dest.write(line)
 
                     results.append(dict(
                         file=path,
-                        start=0,
-                        length=size,
+                        start=start,
+                        length=len(line),
+                        input=input_path,
                     ))
-                else:
-                    # otherwise, split into one or more input files
-                    start = 0
-                    length = 0
-
-                    for lines in _split_records(src, split_size):
-                        with next(split_fileobj_gen) as dest:
-                            for line in lines:
-                                # simulate NLinesInputFormat by prefixing
-                                # each line with byte number
-                                if manifest:
-                                    i = start + length
-                                    dest.write(('%d\t' % i).encode('ascii'))
-                                dest.write(line)
-                                length += len(line)
-
-                        results.append(dict(
-                            file=path,
-                            start=start,
-                            length=length,
-                        ))
-
-                        start += length
-                        length = 0
+
+                    start += len(line)
 
         return results
 
@@ -492,6 +753,9 @@ class SimMRJobRunner(MRJobRunner):
         if not isinstance(input_paths, list):
             raise TypeError
 
+        if self._opts['auto_tune_tasks']:
+            return self._pick_tuned_mapper_split_size(input_paths, step_num)
+
         target_num_splits = self._num_mappers(step_num) * 2
 
         # decide on a split size to approximate target_num_splits
@@ -499,7 +763,8 @@ class SimMRJobRunner(MRJobRunner):
         uncompressed_bytes = 0
 
         for path in input_paths:
-            if path.endswith('.gz') or path.endswith('.bz'):
+            # .bz2 files can be split on block boundaries
+            if is_compressed(path) and not path.endswith('.bz2'):
                 num_compressed += 1
             else:
                 uncompressed_bytes += os.stat(path)[stat.ST_SIZE]
@@ -507,45 +772,59 @@ class SimMRJobRunner(MRJobRunner):
         return uncompressed_bytes // max(
             target_num_splits - num_compressed, 1)
 
-    def _split_reducer_input(self, step_num):
-        """Split a single, uncompressed file containing sorted input for the
-        reducer into input files for each reducer task.
+    def _pick_tuned_mapper_split_size(self, input_paths, step_num):
+        """Pick a split size in decompressed bytes, so that each of the
+        (twice as many as there are mappers) splits has about the same
+        amount of work, based on a sample of each input file.
 
-        Yield the paths of the reducer input files."""
-        path = self._sorted_reducer_input_path(step_num)
+        Compressed files other than ``.bz2`` are a single split, however
+        big they are, so they count toward total work but we can't balance
+        them. We don't make splits smaller than
+        :py:data:`_MIN_LINES_PER_SPLIT` lines.
+        """
+        samples = self._sample_inputs(input_paths, step_num).values()
 
-        log.debug('splitting reducer input: %s' % path)
+        total_size = sum(s['uncompressed_size'] for s in samples)
+        total_lines = sum(s['num_lines'] for s in samples)
 
-        size = os.stat(path)[stat.ST_SIZE]
-        split_size = size // (self._num_reducers(step_num) * 2)
+        target_num_splits = self._num_mappers(step_num) * 2
 
-        # yield output fileobjs as needed
-        split_fileobj_gen = self._yield_split_fileobjs('reducer', step_num)
+        split_size = total_size // target_num_splits
 
-        def reducer_key(line):
-            return line.split(b'\t')[0]
+        if total_lines:
+            min_split_size = (
+                _MIN_LINES_PER_SPLIT * total_size // total_lines)
+            split_size = max(split_size, min_split_size)
 
-        num_reducer_tasks = 0
+        return split_size
 
-        with open(path, 'rb') as src:
-            for records in _split_records(src, split_size, reducer_key):
-                with next(split_fileobj_gen) as dest:
-                    for record in records:
-                        dest.write(record)
-                    num_reducer_tasks += 1
+    def _map_split_size(self, step_num, map_split):
+        """Estimate how many bytes of input the map task for *map_split*
+        will read, for scheduling. If we sampled the input file (see
+        :py:meth:`_sample_inputs`), this is in decompressed bytes;
+        otherwise it's just the size of the split on disk."""
+        size = map_split['length']
 
-        return num_reducer_tasks
+        sample = self._step_to_input_samples.get(step_num, {}).get(
+            map_split['file'])
 
-    def _yield_split_fileobjs(self, task_type, step_num):
-        """Used to split input for the given mapper/reducer.
+        if sample and sample['size']:
+            size = size * sample['uncompressed_size'] // sample['size']
 
-        Yields writeable fileobjs for input splits (check their *name*
-        attribute to get the path)
-        """
-        for task_num in itertools.count():
-            path = self._task_input_path(task_type, step_num, task_num)
-            self.fs.mkdir(dirname(path))
-            yield open(path, 'wb')
+        return size
+
+    def _sample_inputs(self, input_paths, step_num):
+        """Sample each of *input_paths* with :py:func:`_sample_input_file`
+        (once per step). Returns a map from path to sample."""
+        if step_num not in self._step_to_input_samples:
+            samples = {}
+
+            for path in input_paths:
+                samples[path] = _sample_input_file(path)
+
+            self._step_to_input_samples[step_num] = samples
+
+        return self._step_to_input_samples[step_num]
 
     def _setup_working_dir(self, task_type, step_num, task_num):
         wd = self._task_working_dir(task_type, step_num, task_num)
@@ -563,7 +842,9 @@ class SimMRJobRunner(MRJobRunner):
     def _last_task_type_in_step(self, step_num):
         step = self._get_step(step_num)
 
-        if step.get('reducer'):
+        if self._is_map_only(step_num):
+            return 'mapper'
+        elif step.get('reducer'):
             return 'reducer'
         elif step.get('combiner'):
             return 'combiner'
@@ -616,6 +897,27 @@ class SimMRJobRunner(MRJobRunner):
         return join(
             self._task_dir(task_type, step_num, task_num), 'input')
 
+    def _task_input_path_for_error(self, task_type, step_num, task_num):
+        """Path (or glob) of the input the given task was reading from,
+        to be included in error messages.
+
+        Mappers usually read directly from the original input file, and
+        reducers from partitions of their map tasks' output, so they don't
+        have an input file of their own.
+        """
+        input_path = self._task_input_path(task_type, step_num, task_num)
+
+        if os.path.exists(input_path):
+            return input_path
+        elif task_type == 'reducer':
+            return join(self._step_dir(step_num), 'mapper', '*',
+                        'partition-%05d' % task_num)
+        else:
+            map_splits = self._step_to_map_splits.get(step_num) or []
+            if task_num < len(map_splits):
+                return map_splits[task_num]['file']
+            return input_path
+
     def _task_stderr_path(self, task_type, step_num, task_num):
         return join(
             self._task_dir(task_type, step_num, task_num), 'stderr')
@@ -638,38 +940,69 @@ class SimMRJobRunner(MRJobRunner):
             return join(
                 self._task_dir(task_type, step_num, task_num), 'output')
 
+    # step/<step_num>/mapper/<task_num>/partition-<reducer_num>
+
+    def _map_partition_path(self, step_num, task_num, reducer_num):
+        """Where the given map task puts sorted output for the given
+        reducer."""
+        return join(self._task_dir('mapper', step_num, task_num),
+                    'partition-%05d' % reducer_num)
+
     # step/<step_num>/<task_type>/<task_num>/wd
 
     def _task_working_dir(self, task_type, step_num, task_num):
         return join(self._task_dir(task_type, step_num, task_num), 'wd')
 
-    # need this specifically since there's a global sort of reducer input
-
-    def _sorted_reducer_input_path(self, step_num):
-        return join(self._step_dir(step_num), 'reducer', 'sorted-input')
-
-    def _sort_input_func(self):
+    def _sort_input_func(self, step_num):
         """Returns a function that sorts lines from one or more input paths
         into a new file. Takes the arguments *input_path* and *output_path*.
 
-        By default, sorts in memory, but you can override this to
+        By default, sorts in Python, spilling sorted runs to disk when
+        input doesn't fit in memory, but you can override this to
         use the :command:`sort` binary, etc.
         """
-        return partial(_sort_lines_in_memory, sort_values=self._sort_values)
-
-    def _sort_reducer_input(self, step_num, num_map_tasks):
-        step = self._get_step(step_num)
-
-        output_path = self._sorted_reducer_input_path(step_num)
-        self.fs.mkdir(dirname(output_path))
-
-        prev_task_type = 'combiner' if step.get('combiner') else 'mapper'
-        input_paths = [
-            self._task_output_path(prev_task_type, step_num, task_num)
-            for task_num in range(num_map_tasks)
-        ]
+        return partial(_sort_lines_externally,
+                       sort_values=self._sort_values,
+                       tmp_dir=self._get_local_tmp_dir(),
+                       **self._sort_buffer_kwargs(step_num))
+
+    def _sort_buffer_kwargs(self, step_num):
+        """Keyword args for :py:func:`_sort_lines_externally` controlling
+        memory use, based on ``mapreduce.task.io.sort.mb`` and
+        ``mapreduce.task.io.sort.factor`` (as in Hadoop)."""
+        jobconf = self._jobconf_for_step(step_num)
+
+        sort_mb = jobconf_from_dict(
+            jobconf, 'mapreduce.task.io.sort.mb', _DEFAULT_SORT_BUFFER_MB)
+        sort_factor = jobconf_from_dict(
+            jobconf, 'mapreduce.task.io.sort.factor', _DEFAULT_SORT_FACTOR)
+
+        return dict(
+            buffer_size=int(float(sort_mb) * 1024 * 1024),
+            merge_factor=max(int(sort_factor), 2),
+        )
 
-        self._sort_input_func()(input_paths, output_path)
+    def _combiner_sort_buffer_kwargs(self, step_num):
+        """Keyword args for the :py:class:`_SortBuffer` that map tasks use
+        to hand off the mapper's output to the combiner in memory (bounded
+        by ``mapreduce.task.io.sort.mb``), or ``None`` to write the
+        mapper's output to disk and sort it with
+        :py:meth:`_sort_input_func` instead."""
+        return dict(
+            sort_values=self._sort_values,
+            tmp_dir=self._get_local_tmp_dir(),
+            **self._sort_buffer_kwargs(step_num))
+
+    def _merge_input_func(self, step_num):
+        """Returns a function that merges lines from already-sorted files
+        to produce input for a reducer. It takes the arguments *input_paths*
+        and *task_input_path* (where to put the merged input, if needed),
+        and returns a context manager that yields an iterable of lines.
+
+        By default, we stream a merge of the files without writing it
+        anywhere.
+        """
+        return partial(_merge_sorted_lines, sort_values=self._sort_values)
 
     def _log_counters(self, step_num):
         counters = self.counters()[step_num]
@@ -690,104 +1023,732 @@ def _chmod_u_rx(path, recursive=False):
             os.chmod(path, stat.S_IRUSR | stat.S_IXUSR)
 
 
-def _group_records_for_split(record_gen, split_size, reducer_key=None):
-    """Helper for _split_records()."""
-    split_num = 0
-    bytes_in_split = 0
+def _hash_partition(line, num_partitions):
+    """Pick a partition for the given line of map output (a bytestring
+    with no trailing newline) based on its key (everything up to the first
+    tab), like Hadoop's ``HashPartitioner``.
+
+    We use CRC32 rather than :py:func:`hash` so that every task process
+    agrees on the partition regardless of hash randomization.
+    """
+    return zlib.crc32(line.split(b'\t', 1)[0]) % num_partitions
+
+
+def _key_field_partition(line, num_partitions, key_fields=None,
+                         num_key_fields=1, field_separator=b'\t'):
+    """Pick a partition for the given line of map output based on some
+    of the fields in its key, like Hadoop's ``KeyFieldBasedPartitioner``.
+
+    The key is made of the first *num_key_fields* tab-separated fields of
+    *line*. It's split into fields on *field_separator*, and then we hash
+    the fields selected by *key_fields*, a list of 1-indexed
+    ``(start, end)`` tuples (*end* may be ``None``, meaning the end of the
+    key). If *key_fields* is empty, we hash the entire key.
+    """
+    key = b'\t'.join(line.split(b'\t', num_key_fields)[:num_key_fields])
+
+    if key_fields:
+        fields = key.split(field_separator)
+        key = field_separator.join(
+            field_separator.join(fields[start - 1:end])
+            for start, end in key_fields)
+
+    return zlib.crc32(key) % num_partitions
+
+
+def _parse_key_fields(options):
+    """Parse the ``-k`` options from
+    ``mapreduce.partition.keypartitioner.options`` (e.g. ``'-k1,2'``) into
+    a list of ``(start, end)`` tuples for :py:func:`_key_field_partition`.
+    """
+    key_fields = []
+
+    for m in _KEY_FIELD_OPTION_RE.finditer(options or ''):
+        start = int(m.group('start'))
+        end = int(m.group('end')) if m.group('end') else None
+        key_fields.append((start, end))
+
+    return key_fields
+
+
+def _to_separator(separator):
+    """Convert a field separator from jobconf to bytes, defaulting to tab."""
+    if not separator:
+        return b'\t'
+    elif isinstance(separator, bytes):
+        return separator
+    else:
+        return separator.encode('utf_8')
+
+
+@contextmanager
+def _merge_sorted_lines(input_paths, task_input_path=None, sort_values=False):
+    """Open the sorted files *input_paths*, and yield an iterator that
+    merges their lines.
+
+    This is the default merge function used by
+    :py:meth:`SimMRJobRunner._merge_input_func`; *task_input_path* is
+    ignored.
+    """
+    key = None if sort_values else _sort_key
+
+    inputs = []
+    try:
+        for input_path in input_paths:
+            inputs.append(open(input_path, 'rb'))
+
+        yield _merge(inputs, key)
+    finally:
+        for input in inputs:
+            input.close()
+
+
+@contextmanager
+def _open_split(path, start, length, task_input_path=None):
+    """Yield the lines in the given byte range of *path*, which must start
+    and end on line boundaries (see :py:func:`_split_file_on_lines`).
+
+    If the range goes to the end of the file, we yield the file itself,
+    positioned at *start*, so that it can be used directly as a
+    subprocess's stdin. Otherwise, we yield an iterator.
+
+    *task_input_path* is ignored; this is for compatibility with
+    :py:meth:`SimMRJobRunner._open_input_func`.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+
+        if start + length >= os.fstat(f.fileno()).st_size:
+            yield f
+        else:
+            yield _read_lines_in_range(f, length)
+
+
+def _read_lines_in_range(f, length):
+    """Yield lines from *f* until we've read *length* bytes."""
+    bytes_read = 0
+
+    for line in f:
+        if bytes_read >= length:
+            break
+
+        yield line
+        bytes_read += len(line)
+
+
+@contextmanager
+def _open_compressed_split(path, task_input_path=None):
+    """Yield the decompressed lines of *path*.
+
+    *task_input_path* is ignored, as in :py:func:`_open_split`.
+    """
+    with open(path, 'rb') as f:
+        yield to_lines(decompress(f, path))
+
+
+@contextmanager
+def _open_bz2_split(path, bz2_blocks, first_block, num_blocks,
+                    task_input_path=None):
+    """Yield the lines in the given blocks of the ``.bz2`` file at *path*.
+
+    Like Hadoop, if we're not reading the first block, we skip the first
+    (possibly partial) line, since the previous split reads it. Also, we keep
+    reading following blocks until we reach the end of the first line that
+    starts after our blocks.
+
+    *task_input_path* is ignored, as in :py:func:`_open_split`.
+    """
+    with open(path, 'rb') as f:
+        yield _read_bz2_split_lines(f, bz2_blocks, first_block, num_blocks)
+
+
+def _read_bz2_split_lines(f, bz2_blocks, first_block, num_blocks):
+    """Helper for :py:func:`_open_bz2_split`."""
+    # number of decompressed bytes in our own blocks. we decompress lazily,
+    # but each line we see starts in a block we've already decompressed
+    own_size = [0]
+
+    def chunks():
+        for i in range(first_block, len(bz2_blocks)):
+            chunk = bunzip2_block(f, *bz2_blocks[i])
+            if i < first_block + num_blocks:
+                own_size[0] += len(chunk)
+            if chunk:
+                yield chunk
 
-    last_key_value = None
+    pos = 0
+
+    for i, line in enumerate(to_lines(chunks())):
+        if pos > own_size[0]:
+            return
+
+        if i or not first_block:
+            yield line
+
+        pos += len(line)
+
+
+def _split_bz2_file(path, split_size):
+    """Split the ``.bz2`` file at *path* into groups of blocks totaling
+    about *split_size* compressed bytes. Yields splits (see
+    :py:meth:`SimMRJobRunner._split_mapper_input`).
+    """
+    with open(path, 'rb') as f:
+        bz2_blocks = find_bz2_blocks(f)
+
+    if not bz2_blocks:
+        # no data; let _open_compressed_split() handle it
+        yield dict(file=path, start=0, length=os.stat(path)[stat.ST_SIZE])
+        return
+
+    first_block = 0
+
+    for i, (start_bit, end_bit) in enumerate(bz2_blocks):
+        split_start = bz2_blocks[first_block][0] // 8
+        end = (end_bit + 7) // 8
+
+        if end - split_start >= split_size or i == len(bz2_blocks) - 1:
+            yield dict(
+                file=path,
+                start=split_start,
+                length=end - split_start,
+                bz2_blocks=bz2_blocks,
+                first_block=first_block,
+                num_blocks=i + 1 - first_block,
+            )
+
+            first_block = i + 1
+
+
+def _sample_input_file(path, sample_size=_SAMPLE_BYTES):
+    """Read (and decompress) up to *sample_size* bytes of lines from the
+    start of the file at *path*, and use them to estimate the file's size
+    once decompressed.
+
+    Returns a dictionary with the following keys:
+
+    size: size of the file on disk
+    uncompressed_size: estimated size of the file once decompressed
+    num_lines: estimated number of lines in the file
+    keys: set of distinct keys (everything up to the first tab) in the
+          lines we read
+    complete: true if we read the entire file (so the estimates are exact)
+    """
+    size = os.stat(path)[stat.ST_SIZE]
+
+    num_bytes = 0
+    num_lines = 0
+    keys = set()
+    complete = True
+
+    with open(path, 'rb') as f:
+        for line in to_lines(decompress(f, path)):
+            if num_bytes >= sample_size:
+                complete = False
+                break
+
+            num_bytes += len(line)
+            num_lines += 1
+            keys.add(line.split(b'\t', 1)[0].rstrip(b'\r\n'))
+
+        # how many compressed bytes it took to get *num_bytes*
+        bytes_read = f.tell() if is_compressed(path) else num_bytes
+
+    if complete:
+        uncompressed_size = num_bytes
+    else:
+        uncompressed_size = size * num_bytes // max(bytes_read, 1)
+        num_lines = uncompressed_size * num_lines // max(num_bytes, 1)
+
+    return dict(
+        size=size,
+        uncompressed_size=uncompressed_size,
+        num_lines=num_lines,
+        keys=keys,
+        complete=complete,
+    )
+
+
+def _largest_first(sizes):
+    """Given a list of task sizes, return the task numbers (indexes into
+    *sizes*), biggest task first. Tasks of the same size stay in
+    order."""
+    return sorted(range(len(sizes)), key=lambda i: -sizes[i])
+
+
+def _split_file_on_lines(path, split_size):
+    """Split the file at *path* into byte ranges of about *split_size*,
+    extending each one to the end of the line it falls in.
+
+    Yields ``(start, length)`` tuples. Empty files get a single empty range.
+    """
+    size = os.stat(path)[stat.ST_SIZE]
+
+    if not size:
+        yield 0, 0
+        return
+
+    with open(path, 'rb') as f:
+        start = 0
+
+        while start < size:
+            # read to the end of the line that contains the last byte
+            # of the split
+            f.seek(start + max(split_size, 1) - 1)
+            f.readline()
+            end = min(f.tell(), size)
+
+            yield start, end - start
+            start = end
 
-    for record in record_gen:
-        same_key = False
 
-        if reducer_key:
-            key_value = reducer_key(record)
-            same_key = (key_value == last_key_value)
-            last_key_value = key_value
+def _partition_lines(input_path, output_paths, partition=_hash_partition):
+    """Split lines from *input_path* between *output_paths*, using
+    *partition* (see :py:meth:`SimMRJobRunner._partition_func`)."""
+    outputs = []
+    try:
+        for output_path in output_paths:
+            outputs.append(open(output_path, 'wb'))
 
-        if bytes_in_split >= split_size and not same_key:
-            split_num += 1
-            bytes_in_split = 0
+        num_outputs = len(outputs)
 
-        yield split_num, record
-        bytes_in_split += len(record)
+        with open(input_path, 'rb') as input:
+            for line in input:
+                i = partition(line.rstrip(b'\r\n'), num_outputs)
+                outputs[i].write(line)
+    finally:
+        for output in outputs:
+            output.close()
 
 
 def _run_mapper_and_combiner(
         run_mapper, sort_input, run_combiner,
-        mapper_input_path, mapper_output_path, combiner_input_path):
-    """Helper for :py:meth:`SimMRJobRunner._run_mapper_and_combiner_func`."""
+        mapper_input_path, mapper_output_path, combiner_input_path,
+        map_output_path=None, partition_paths=None, partition=None,
+        open_mapper_input=None, sort_buffer_kwargs=None):
+    """Helper for :py:meth:`SimMRJobRunner._run_mapper_and_combiner_func`.
+
+    If *partition_paths* is set, split *map_output_path* (the output of the
+    mapper or combiner) into sorted partitions, one per reducer, using
+    the function *partition*.
+
+    If there's no mapper, and *open_mapper_input* is set, use it to read
+    the mapper's input (see :py:meth:`SimMRJobRunner._open_input_func`).
+
+    If there's a combiner and *sort_buffer_kwargs* is set, sort the mapper's
+    output in a :py:class:`_SortBuffer` and pipe it directly to the
+    combiner, rather than writing the mapper's output and the combiner's
+    input to disk. If *partition_paths* is also set, the combiner's output
+    goes straight into sorted partitions (see
+    :py:class:`_PartitionedSortBuffer`), so the partitions are the only
+    files the task writes.
+    """
     # we don't need *combiner_output_path* because *run_combiner* already
     # knows it
 
-    if run_mapper:
-        run_mapper()
+    if run_combiner and sort_buffer_kwargs is not None:
+        if partition_paths:
+            combiner_output = _PartitionedSortBuffer(
+                len(partition_paths), partition or _hash_partition,
+                **sort_buffer_kwargs)
+            try:
+                _run_mapper_and_combiner_in_memory(
+                    run_mapper, run_combiner, mapper_input_path,
+                    open_mapper_input, sort_buffer_kwargs,
+                    combiner_output=combiner_output)
+
+                combiner_output.write_partitions(partition_paths)
+            finally:
+                combiner_output.cleanup()
+
+            return
+
+        _run_mapper_and_combiner_in_memory(
+            run_mapper, run_combiner, mapper_input_path,
+            open_mapper_input, sort_buffer_kwargs)
     else:
-        _symlink_or_copy(mapper_input_path, mapper_output_path)
+        if run_mapper:
+            run_mapper()
+        elif open_mapper_input:
+            with open_mapper_input(mapper_input_path) as lines, \
+                    open(mapper_output_path, 'wb') as output:
+                output.writelines(lines)
+        else:
+            _symlink_or_copy(mapper_input_path, mapper_output_path)
+
+        if run_combiner:
+            sort_input([mapper_output_path], combiner_input_path)
+            run_combiner()
+
+    if partition_paths:
+        unsorted_paths = [path + '.unsorted' for path in partition_paths]
 
-    if run_combiner:
-        sort_input([mapper_output_path], combiner_input_path)
-        run_combiner()
+        _partition_lines(map_output_path, unsorted_paths,
+                         partition or _hash_partition)
+
+        for unsorted_path, partition_path in zip(
+                unsorted_paths, partition_paths):
+            sort_input([unsorted_path], partition_path)
+            os.remove(unsorted_path)
+
+
+def _run_mapper_and_combiner_in_memory(
+        run_mapper, run_combiner, mapper_input_path,
+        open_mapper_input, sort_buffer_kwargs, combiner_output=None):
+    """Run the mapper, writing its output into a :py:class:`_SortBuffer`,
+    and then run the combiner on its sorted output. If *combiner_output*
+    is set, the combiner writes to it rather than its output file. Helper
+    for :py:func:`_run_mapper_and_combiner`."""
+    mapper_output = _SortBuffer(**sort_buffer_kwargs)
+
+    try:
+        if run_mapper:
+            run_mapper(stdout=mapper_output)
+        else:
+            open_mapper_input = open_mapper_input or partial(open, mode='rb')
+
+            with open_mapper_input(mapper_input_path) as lines:
+                mapper_output.writelines(lines)
+
+        with mapper_output.sorted_lines() as lines:
+            run_combiner(stdin=lines, stdout=combiner_output)
+    finally:
+        mapper_output.cleanup()
 
 
 def _run_task(invoke_task,
               task_type, step_num, task_num,
-              input_path, output_path, stderr_path, wd, env):
+              input_path, output_path, stderr_path, wd, env,
+              open_input=None, stdin=None, stdout=None):
     """Set up filehandles and call *invoke_task()*.
 
+    If *open_input* is set, call it with *input_path*, and use the
+    file or iterable of lines it yields as the task's stdin.
+
+    If *stdin* or *stdout* is set, use it rather than reading from
+    *input_path* or writing to *output_path* (for example, an iterable
+    of lines or a :py:class:`_SortBuffer`).
+
     Helper for :py:meth:`SimMRJobRunner._run_task_func`.
     """
     log.debug('running step %d, %s %d' % (step_num, task_type, task_num))
 
-    with open(input_path, 'rb') as stdin, \
-            open(output_path, 'wb') as stdout, \
+    if stdin is not None:
+        open_input = partial(_as_context_manager, stdin)
+    elif not open_input:
+        open_input = partial(open, mode='rb')
+
+    if stdout is not None:
+        open_output = partial(_as_context_manager, stdout)
+    else:
+        open_output = partial(open, mode='wb')
+
+    with open_input(input_path) as stdin, \
+            open_output(output_path) as stdout, \
             open(stderr_path, 'wb') as stderr:
 
         invoke_task(
             stdin, stdout, stderr, wd, env)
 
 
-def _sort_lines_in_memory(input_paths, output_path, sort_values=False):
-    """Sort lines from *input_paths* and output them into *output_path*.
+@contextmanager
+def _as_context_manager(value, path=None):
+    """Yield *value*. *path* is ignored; this is a stand-in for
+    :py:func:`open`."""
+    yield value
+
+
+def _sort_lines_externally(input_paths, output_path, sort_values=False,
+                           tmp_dir=None, buffer_size=None, merge_factor=None):
+    """Sort lines from *input_paths* and output them into *output_path*,
+    using a bounded amount of memory (see :py:class:`_SortBuffer`).
 
     If *sort_values* is true, sort by the entire line; otherwise just sort
-    by everything up to the first tab.
+    by everything up to the first tab (keeping lines with the same key
+    in their original order, like ``sort -s``).
     """
-    log.debug('sorting in memory: %s -> %s' %
-              (', '.join(input_paths), output_path))
-    lines = []
+    log.debug('sorting: %s -> %s' % (', '.join(input_paths), output_path))
+
+    sort_buffer = _SortBuffer(sort_values=sort_values, tmp_dir=tmp_dir,
+                              buffer_size=buffer_size,
+                              merge_factor=merge_factor)
+    try:
+        for input_path in input_paths:
+            with open(input_path, 'rb') as input:
+                for line in input:
+                    sort_buffer.add_line(line)
+
+        with sort_buffer.sorted_lines() as lines, \
+                open(output_path, 'wb') as output:
+            output.writelines(lines)
+    finally:
+        sort_buffer.cleanup()
+
+
+class _LineBuffer(object):
+    """Base class for file-like objects that task output is written to.
+    Subclasses handle one line at a time by defining :py:meth:`add_line`.
+    """
+    def __init__(self):
+        self._partial_line = b''
 
-    for input_path in input_paths:
-        with open(input_path, 'rb') as input:
-            lines.extend(input)
+    def write(self, data):
+        """Add *data* to the buffer. *data* need not end on a line
+        boundary."""
+        if self._partial_line:
+            data = self._partial_line + data
+            self._partial_line = b''
 
-    if sort_values:
-        lines.sort()
-    else:
-        lines.sort(key=lambda line: line.split(b'\t')[0])
+        start = 0
+        while True:
+            end = data.find(b'\n', start) + 1
+            if not end:
+                break
+
+            self.add_line(data[start:end])
+            start = end
+
+        if start < len(data):
+            self._partial_line = data[start:]
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
 
-    with open(output_path, 'wb') as output:
+    def add_line(self, line):
+        """Add a single complete line to the buffer, adding a trailing
+        newline if it doesn't have one."""
+        raise NotImplementedError
+
+    def _add_partial_line(self):
+        """Add the final line, if it didn't end with a newline."""
+        if self._partial_line:
+            self.add_line(self._partial_line)
+            self._partial_line = b''
+
+
+class _SortBuffer(_LineBuffer):
+    """File-like object that collects lines in memory so that they can be
+    read back in sorted order, like Hadoop's map output buffer.
+
+    Lines are kept in memory until they total *buffer_size* bytes, at
+    which point they are sorted and spilled to a temp file in *tmp_dir*.
+    When reading, spilled runs are merged (*merge_factor* at a time) along
+    with whatever is still in memory. If everything fits in memory, nothing
+    is written to disk.
+
+    If *sort_values* is true, sort by the entire line; otherwise just sort
+    by everything up to the first tab, keeping lines with the same key in
+    the order they were written.
+
+    Call :py:meth:`cleanup` when done to remove spilled runs.
+    """
+    def __init__(self, sort_values=False, tmp_dir=None,
+                 buffer_size=None, merge_factor=None):
+        if buffer_size is None:
+            buffer_size = _DEFAULT_SORT_BUFFER_MB * 1024 * 1024
+        if merge_factor is None:
+            merge_factor = _DEFAULT_SORT_FACTOR
+
+        super(_SortBuffer, self).__init__()
+
+        self._key = None if sort_values else _sort_key
+        self._tmp_dir = tmp_dir
+        self._buffer_size = buffer_size
+        self._merge_factor = merge_factor
+
+        self._lines = []
+        self._num_bytes = 0
+
+        # sorted runs spilled to disk, in order
+        self._run_paths = []
+        # every temp file we create, so we can clean up
+        self._tmp_paths = []
+
+    def add_line(self, line):
+        if not line.endswith(b'\n'):
+            line += b'\n'
+
+        self._lines.append(line)
+        self._num_bytes += len(line)
+
+        if self._num_bytes >= self._buffer_size:
+            self._spill()
+
+    def _spill(self):
+        path = _spill_sorted_run(self._lines, self._key, self._tmp_dir)
+        self._tmp_paths.append(path)
+        self._run_paths.append(path)
+
+        self._lines = []
+        self._num_bytes = 0
+
+    @contextmanager
+    def sorted_lines(self):
+        """Yield an iterator over every line written to the buffer,
+        in sorted order."""
+        self._add_partial_line()
+
+        self._lines.sort(key=self._key)
+
+        if not self._run_paths:
+            # everything fit in memory
+            yield iter(self._lines)
+            return
+
+        log.debug('  merging %d sorted runs' % len(self._run_paths))
+
+        # merge in multiple passes if there are too many runs to open at
+        # once (leave room for the lines in memory). Merge adjacent runs so
+        # that the sort stays stable
+        while len(self._run_paths) > self._merge_factor - 1:
+            merged_run_paths = []
+
+            for i in range(0, len(self._run_paths), self._merge_factor):
+                batch = self._run_paths[i:i + self._merge_factor]
+
+                merged_path = _make_sort_run_path(self._tmp_dir)
+                self._tmp_paths.append(merged_path)
+                merged_run_paths.append(merged_path)
+
+                _merge_sorted_runs(batch, merged_path, self._key)
+
+                for path in batch:
+                    os.remove(path)
+
+            self._run_paths = merged_run_paths
+
+        runs = []
+        try:
+            for path in self._run_paths:
+                runs.append(open(path, 'rb'))
+
+            # lines in memory were written last
+            yield _merge(runs + [self._lines], self._key)
+        finally:
+            for run in runs:
+                run.close()
+
+    def cleanup(self):
+        """Remove any runs we spilled to disk, and free memory."""
+        for path in self._tmp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+        self._tmp_paths = []
+        self._run_paths = []
+        self._lines = []
+        self._num_bytes = 0
+
+
+class _PartitionedSortBuffer(_LineBuffer):
+    """File-like object that splits lines between *num_partitions* sort
+    buffers (see :py:class:`_SortBuffer`) using *partition* (see
+    :py:meth:`SimMRJobRunner._partition_func`), so that a map task's
+    output can be written straight to sorted partitions, one per reducer.
+
+    The partitions share *buffer_size* bytes of memory. Other keyword
+    arguments are passed through to :py:class:`_SortBuffer`.
+
+    Call :py:meth:`cleanup` when done.
+    """
+    def __init__(self, num_partitions, partition=_hash_partition,
+                 buffer_size=None, **sort_buffer_kwargs):
+        super(_PartitionedSortBuffer, self).__init__()
+
+        if buffer_size is None:
+            buffer_size = _DEFAULT_SORT_BUFFER_MB * 1024 * 1024
+
+        self._partition = partition
+        self._sort_buffers = [
+            _SortBuffer(buffer_size=max(buffer_size // num_partitions, 1),
+                        **sort_buffer_kwargs)
+            for _ in range(num_partitions)
+        ]
+
+    def add_line(self, line):
+        i = self._partition(line.rstrip(b'\r\n'), len(self._sort_buffers))
+        self._sort_buffers[i].add_line(line)
+
+    def write_partitions(self, output_paths):
+        """Write each partition, in sorted order, to the corresponding
+        path in *output_paths*."""
+        self._add_partial_line()
+
+        for sort_buffer, output_path in zip(self._sort_buffers, output_paths):
+            with sort_buffer.sorted_lines() as lines, \
+                    open(output_path, 'wb') as output:
+                output.writelines(lines)
+
+            # free memory as we go
+            sort_buffer.cleanup()
+
+    def cleanup(self):
+        """Remove any runs spilled to disk, and free memory."""
+        for sort_buffer in self._sort_buffers:
+            sort_buffer.cleanup()
+
+
+def _sort_key(line):
+    """Sort key for reducer input, used when we're not sorting by value."""
+    return line.split(b'\t', 1)[0]
+
+
+def _make_sort_run_path(tmp_dir):
+    """Return the path of a new, empty temp file for a sorted run."""
+    fd, path = mkstemp(prefix='sort-run-', dir=tmp_dir)
+    os.close(fd)
+    return path
+
+
+def _spill_sorted_run(lines, key, tmp_dir):
+    """Sort *lines* in place, write them to a temp file in *tmp_dir*,
+    and return its path. Helper for :py:class:`_SortBuffer`."""
+    lines.sort(key=key)
+
+    path = _make_sort_run_path(tmp_dir)
+    log.debug('  spilling %d lines to %s' % (len(lines), path))
+
+    with open(path, 'wb') as run:
         for line in lines:
-            output.write(line)
-
-
-def _split_records(record_gen, split_size, reducer_key=None):
-    """Given a stream of records (bytestrings, usually lines), yield groups of
-    records (as generators such that the total number of bytes in each group
-    only barely exceeds *split_size*, and, if *reducer_key* is set, consecutive
-    records with the same key will be in the same split."""
-    grouped_record_gen = _group_records_for_split(
-        record_gen, split_size, reducer_key)
-
-    num_records = 0
-    for group_id, grouped_records in itertools.groupby(
-            grouped_record_gen, key=lambda gr: gr[0]):
-        yield (record for _, record in grouped_records)
-        num_records += 1
-
-    if num_records == 0:
-        # special case for empty files
-        yield ()
+            run.write(line)
+            # don't let a final line with no newline run into the next one
+            if not line.endswith(b'\n'):
+                run.write(b'\n')
+
+    return path
+
+
+def _merge_sorted_runs(run_paths, output_path, key):
+    """Merge the sorted files *run_paths* into *output_path*. Equal lines
+    are output in the order of *run_paths*, so the merge is stable."""
+    runs = []
+    try:
+        for path in run_paths:
+            runs.append(open(path, 'rb'))
+
+        with open(output_path, 'wb') as output:
+            output.writelines(_merge(runs, key))
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _merge(iterables, key=None):
+    """Like ``heapq.merge(*iterables, key=key)``, which isn't available
+    before Python 3.5. Ties go to the earlier iterable."""
+    if key is None:
+        return heapq.merge(*iterables)
+
+    def decorate(i, iterable):
+        for item in iterable:
+            yield key(item), i, item
+
+    return (item for _, _, item in heapq.merge(
+        *(decorate(i, iterable) for i, iterable in enumerate(iterables))))
 
 
 def _symlink_or_copy(path, dest):
@@ -0,0 +1,45 @@
+# Copyright 2020 Affirm, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-process cache of job instances, used by the Spark harness.
+
+This lives outside :py:mod:`mrjob.spark.harness` because the harness is
+run as a script. Spark pickles functions defined in ``__main__`` along with
+the globals they use, so a cache there would start out empty in every task.
+Module-level state here persists for the life of each Python worker.
+"""
+from copy import copy
+
+# map from ``(job_class, tuple(args))`` to a job instance
+_JOB_CACHE = {}
+
+
+def _get_job(job_class, args):
+    """Return a copy of an instance of *job_class*, constructed with *args*.
+
+    The first time we're called with a given *job_class* and *args* in
+    this process, we construct the job (parsing its arguments) and call
+    its :py:meth:`~mrjob.job.MRJob.worker_init` method. After that, we
+    return shallow copies of the same instance, so that anything
+    :py:meth:`~mrjob.job.MRJob.worker_init` loaded is shared, but setting
+    attributes on the copy (e.g. in ``mapper_init()``) doesn't affect
+    other tasks.
+    """
+    key = (job_class, tuple(args))
+
+    if key not in _JOB_CACHE:
+        job = job_class(list(args))
+        job.worker_init()
+        _JOB_CACHE[key] = job
+
+    return copy(_JOB_CACHE[key])
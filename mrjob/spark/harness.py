@@ -21,9 +21,15 @@ from collections import defaultdict
 from importlib import import_module
 from itertools import chain
 
+from mrjob.job import _PROTOCOL_BATCH_SIZE
+from mrjob.job import _batch_protocol_method
+from mrjob.job import _batches
 from mrjob.parse import is_uri
+from mrjob.spark.cache import _get_job
 from mrjob.util import shlex_split
+from pyspark import TaskContext
 from pyspark.accumulators import AccumulatorParam
+from pyspark.rdd import portable_hash
 
 
 # tuples of (args, kwargs) for ArgumentParser.add_argument()
@@ -115,6 +121,14 @@ _PASSTHRU_OPTIONS = [
 ]
 
 
+# how many keys the combiner holds in memory in each partition before
+# passing on what it has so far
+_COMBINER_MAX_KEYS = 10000
+
+# counter group for statistics about how well the combiner worked
+_COMBINER_COUNTER_GROUP = 'Spark Harness Combiner'
+
+
 # Used to implement skip_internal_protocol
 # internal_protocol() method. pick_protocols() just expects a thing with
 # *read* and *write* attributes, and a class is the simplest way to get it.
@@ -214,9 +228,18 @@ def main(cmd_line_args=None):
         return increment_counter
 
     def make_mrc_job(mrc, step_num):
-        j = job_class(job_args + [
+        mrc_job_args = job_args + [
             '--%s' % mrc, '--step-num=%d' % step_num
-        ])
+        ]
+
+        if TaskContext.get() is None:
+            # in the driver, we just want to see if we can make the job
+            # (see _run_steps()); don't do worker setup here
+            j = job_class(mrc_job_args)
+        else:
+            # in a task, reuse the job instance (and whatever its
+            # worker_init() method loaded) for the life of the Python worker
+            j = _get_job(job_class, mrc_job_args)
 
         # patch increment_counter() to update the accumulator for this step
         j.increment_counter = make_increment_counter(step_num)
@@ -255,13 +278,13 @@ def main(cmd_line_args=None):
             rdd = sc.textFile(args.input_path, use_unicode=False)
 
         # run steps
-        for step_num, step in steps_to_run:
-            rdd = _run_step(
-                step, step_num, rdd,
-                make_mrc_job,
-                args.num_reducers, sort_values,
-                emulate_map_input_file,
-                args.skip_internal_protocol)
+        rdd = _run_steps(
+            steps_to_run, rdd,
+            make_mrc_job,
+            args.num_reducers, sort_values,
+            emulate_map_input_file,
+            args.skip_internal_protocol,
+            args.fuse_steps)
 
         # max_output_files: limit number of partitions
         if args.max_output_files:
@@ -325,78 +348,113 @@ def _text_file_with_path(sc, path):
     )
 
 
-def _run_step(
-        step, step_num, rdd, make_mrc_job,
+def _run_steps(
+        steps, rdd, make_mrc_job,
         num_reducers=None, sort_values=None,
         emulate_map_input_file=False,
-        skip_internal_protocol=False):
-    """Run the given step on the RDD and return the transformed RDD."""
-    _check_step(step, step_num)
+        skip_internal_protocol=False,
+        fuse_steps=False):
+    """Run the given steps (a list of ``(step_num, step_desc)``) on the RDD
+    and return the transformed RDD.
+
+    Map-side work that isn't separated by a shuffle (a reducer followed
+    by the next step's mapper, or consecutive mapper-only steps) is run in
+    a single ``mapPartitions()``; see :py:func:`_run_substeps`. A step
+    with a combiner but no reducer still runs its combiner (which
+    includes a shuffle).
+    """
+    # substeps we haven't run yet, as (mrc, step_num). These are either
+    # mappers, or a reducer followed by mappers
+    substeps = []
+
+    def run_substeps(rdd):
+        if not substeps:
+            return rdd
+
+        rdd_includes_input_path = (
+            emulate_map_input_file and substeps[0] == ('mapper', 0))
+
+        return _run_substeps(
+            make_mrc_job, substeps, rdd,
+            rdd_includes_input_path=rdd_includes_input_path,
+            num_reducers=num_reducers,
+            fuse_steps=fuse_steps)
+
+    for step_num, step in steps:
+        _check_step(step, step_num)
+
+        if step.get('mapper'):
+            substeps.append(('mapper', step_num))
+
+        # we try to avoid initializing job instances here in the driver (see
+        # #2044 for why). But combiners are optional! So we can check whether
+        # we can initialize a combiner job instance, and if we can't, just
+        # skip the combiner.
+        run_combiner = False
+        if step.get('combiner'):
+            try:
+                _check_substep(step, step_num, 'combiner')
+                make_mrc_job('combiner', step_num)
+                run_combiner = True
+            except Exception:
+                # if combiner needs to run subprocesses, or we can't
+                # initialize a job instance, just skip combiners
+                pass
+
+        if not (step.get('reducer') or run_combiner):
+            continue
+
+        rdd = run_substeps(rdd)
+
+        if run_combiner:
+            # _run_combiner() includes shuffle-and-sort
+            rdd = _run_combiner(
+                make_mrc_job, step_num, rdd,
+                sort_values=sort_values,
+                num_reducers=num_reducers)
+        else:
+            rdd = _shuffle_and_sort(
+                rdd, sort_values=sort_values, num_reducers=num_reducers,
+                skip_internal_protocol=skip_internal_protocol)
 
-    # we try to avoid initializing job instances here in the driver (see #2044
-    # for why). However, while we can get away with initializing one instance
-    # per partition in the mapper and reducer, that would be too inefficient
-    # for combiners, which run on *two* key-value pairs at a time.
-    #
-    # but combiners are optional! if we can't initialize a combiner job
-    # instance, we can just skip it!
-
-    # mapper
-    if step.get('mapper'):
-        rdd_includes_input_path = (emulate_map_input_file and step_num == 0)
-
-        rdd = _run_mapper(
-            make_mrc_job, step_num, rdd, rdd_includes_input_path)
-
-    # combiner/shuffle-and-sort
-    combiner_job = None
-    if step.get('combiner'):
-        try:
-            _check_substep(step, step_num, 'combiner')
-            combiner_job = make_mrc_job('combiner', step_num)
-        except Exception:
-            # if combiner needs to run subprocesses, or we can't
-            # initialize a job instance, just skip combiners
-            pass
-
-    if combiner_job:
-        # _run_combiner() includes shuffle-and-sort
-        rdd = _run_combiner(
-            combiner_job, rdd,
-            sort_values=sort_values,
-            num_reducers=num_reducers)
-    elif step.get('reducer'):
-        rdd = _shuffle_and_sort(
-            rdd, sort_values=sort_values, num_reducers=num_reducers,
-            skip_internal_protocol=skip_internal_protocol)
-
-    # reducer
-    if step.get('reducer'):
-        rdd = _run_reducer(
-            make_mrc_job, step_num, rdd, num_reducers=num_reducers)
-
-    return rdd
-
-
-def _run_mapper(make_mrc_job, step_num, rdd, rdd_includes_input_path):
-    """Run our job's mapper.
-
-    :param make_mrc_job: an instance of our job, instantiated to be the mapper
-                         for the step we wish to run
+        if step.get('reducer'):
+            substeps[:] = [('reducer', step_num)]
+        else:
+            # nothing more to do for a step with just a mapper and combiner
+            substeps[:] = []
+
+    return run_substeps(rdd)
+
+
+def _run_substeps(make_mrc_job, substeps, rdd, rdd_includes_input_path=False,
+                  num_reducers=None, fuse_steps=False):
+    """Run our job's mappers and/or reducer, one after another, in a single
+    ``mapPartitions()``.
+
+    :param make_mrc_job: function to make an instance of our job, given
+                         *mrc* (e.g. ``'mapper'``) and *step_num*
+    :param substeps: list of ``(mrc, step_num)``. Only the first may be
+                     a reducer.
     :param rdd: an RDD containing lines representing encoded key-value pairs
+                (if the first substep is a reducer, lines with the same key
+                must be adjacent and in the same partition)
     :param rdd_includes_input_path: if true, rdd contains pairs of
                                     (input_file_path, line). set
                                     $mapreduce_map_input_file to
                                     *input_file_path*.
+    :param num_reducers: if set, and *substeps* is just a reducer, preserve
+                         partitioning
+    :param fuse_steps: if true, pass key-value pairs directly from one
+                       substep to the next, rather than encoding and
+                       decoding them with the internal protocol
     :return: an RDD containing lines representing encoded key-value pairs
     """
-    # initialize job class inside mapPartitions(). this deals with jobs that
-    # can't be initialized in the Spark driver (see #2044)
-
-    def map_lines(lines):
-        job = make_mrc_job('mapper', step_num)
-
-        read, write = job.pick_protocols(step_num, 'mapper')
+    # initialize job classes inside mapPartitions(). this deals with jobs
+    # that can't be initialized in the Spark driver (see #2044)
+    def run_lines(lines):
+        # one job instance per substep per partition (make_mrc_job() may
+        # return copies of cached instances)
+        jobs = [make_mrc_job(mrc, step_num) for mrc, step_num in substeps]
 
         if rdd_includes_input_path:
             # rdd actually contains pairs of (input_path, line), convert
@@ -413,100 +471,271 @@ def _run_mapper(make_mrc_job, step_num, rdd, rdd_includes_input_path):
             # reconstruct *lines* (without dumping to memory)
             lines = chain([first_line], (line for _, line in path_line_pairs))
 
-        # decode lines into key-value pairs (as a generator, not a list)
-        #
-        # line -> (k, v)
-        if read:
-            pairs = (read(line) for line in lines)
-        else:
-            pairs = lines  # was never encoded
+        pairs = lines
+        write = None
 
-        # reduce_pairs() runs key-value pairs through mapper
-        #
-        # (k, v), ... -> (k, v), ...
-        for k, v in job.map_pairs(pairs, step_num):
-            # encode key-value pairs back into lines
+        for i, (job, (mrc, step_num)) in enumerate(zip(jobs, substeps)):
+            read, next_write = job.pick_protocols(step_num, mrc)
+
+            if i == 0 or not fuse_steps:
+                # encode key-value pairs from the previous substep
+                #
+                # (k, v) -> line
+                if write:
+                    pairs = _write_pairs(write, pairs)
+
+                # decode lines into key-value pairs (as a generator, not a
+                # list)
+                #
+                # line -> (k, v)
+                if read:
+                    pairs = _read_lines(read, pairs)
+
+            write = next_write
+
+            # map_pairs() and reduce_pairs() run key-value pairs through
+            # the mapper or reducer (including mapper_batch() etc., which
+            # get them in blocks)
             #
-            # (k, v) -> line
-            if write:
-                yield write(k, v)
+            # (k, v), ... -> (k, v), ...
+            if mrc == 'reducer':
+                pairs = job.reduce_pairs(pairs, step_num)
             else:
+                pairs = job.map_pairs(pairs, step_num)
+
+        # encode key-value pairs back into lines
+        #
+        # (k, v) -> line
+        if write:
+            for line in _write_pairs(write, pairs):
+                yield line
+        else:
+            for k, v in pairs:  # pairs are never encoded
                 yield k, v
 
-    return rdd.mapPartitions(map_lines)
+    # if *num_reducers* is set, a reducer doesn't re-partition. otherwise,
+    # doesn't matter
+    preserves_partitioning = bool(
+        num_reducers and len(substeps) == 1 and substeps[0][0] == 'reducer')
+
+    return rdd.mapPartitions(
+        run_lines, preservesPartitioning=preserves_partitioning)
 
 
-def _run_combiner(combiner_job, rdd, sort_values=False, num_reducers=None):
+def _run_combiner(make_mrc_job, step_num, rdd, sort_values=False,
+                  num_reducers=None, max_keys=_COMBINER_MAX_KEYS):
     """Run our job's combiner, and group lines with the same key together.
 
-    :param combiner_job: an instance of our job, instantiated to be the mapper
-                         for the step we wish to run
+    :param make_mrc_job: function to make an instance of our job, given
+                         *mrc* (e.g. ``'combiner'``) and *step_num*. Called
+                         in each partition, before and after the shuffle
+    :param step_num: which step's combiner to run
     :param rdd: an RDD containing lines representing encoded key-value pairs
     :param sort_values: if true, ensure all lines corresponding to a given key
                         are sorted (by their encoded value)
     :param num_reducers: limit the number of paratitions of output rdd, which
                          is similar to mrjob's limit on number of reducers.
+    :param max_keys: how many keys to hold in memory in each partition
+                     before combining
     :return: an RDD containing "reducer ready" lines representing encoded
              key-value pairs, that is, where all lines with the same key are
              adjacent and in the same partition
     """
-    step_num = combiner_job.options.step_num
+    def make_combine(combiner_job):
+        def combine(pairs):
+            return list(combiner_job.combine_pairs(pairs, step_num))
 
-    c_read, c_write = combiner_job.pick_protocols(step_num, 'combiner')
-
-    # decode lines into key-value pairs
-    #
-    # line -> (k, v)
-    if c_read:
-        rdd = rdd.map(c_read)
+        return combine
 
     # The common case for MRJob combiners is to yield a single key-value pair
     # (for example ``(key, sum(values))``. If the combiner does something
-    # else, just build a list of values so we don't end up running multiple
-    # values through the MRJob's combiner multiple times.
-    def combiner_helper(pairs1, pairs2):
-        if len(pairs1) == len(pairs2) == 1:
-            return list(
-                combiner_job.combine_pairs(pairs1 + pairs2, step_num),
-            )
+    # else for a key, we stop running it on that key, and just pass through
+    # its key-value pairs, so we don't end up running multiple values
+    # through the MRJob's combiner multiple times (or hold them in memory).
+    #
+    # First, combine values within each partition, holding at most
+    # one pair per key, for at most *max_keys* keys.
+    #
+    # line, ... -> (k, (combinable, [(k, v), ...])), ...
+    def combine_partition(lines):
+        combiner_job = make_mrc_job('combiner', step_num)
+        combine = make_combine(combiner_job)
+
+        # decode lines into key-value pairs
+        #
+        # line -> (k, v)
+        c_read, _ = combiner_job.pick_protocols(step_num, 'combiner')
+        if c_read:
+            pairs = _read_lines(c_read, lines)
         else:
-            pairs1.extend(pairs2)
-            return pairs1
+            pairs = lines
 
-    # include key in "value", so MRJob combiner can see it
-    #
-    # (k, v) -> (k, (k, v))
-    rdd = rdd.map(lambda k_v: (k_v[0], k_v))
+        stats = defaultdict(int)
 
-    # :py:meth:`pyspark.RDD.combineByKey()`, where the magic happens.
-    #
-    # (k, (k, v)), ... -> (k, ([(k, v1), (k, v2), ...]))
-    #
-    # Our "values" are key-value pairs, and our "combined values" are lists of
-    # key-value pairs (single-item lists in the common case).
-    #
-    # note that unlike Hadoop combiners, combineByKey() sees *all* the
-    # key-value pairs, essentially doing a shuffle-and-sort for free.
-    rdd = rdd.combineByKey(
-        createCombiner=lambda k_v: [k_v],
-        mergeValue=lambda k_v_list, k_v: combiner_helper(k_v_list, [k_v]),
-        mergeCombiners=combiner_helper,
-        numPartitions=num_reducers
-    )
+        for k_chunk in _combine_pairs_by_key(combine, pairs, max_keys, stats):
+            yield k_chunk
 
-    # encode lists of key-value pairs into lists of lines
+        _increment_combiner_counters(combiner_job, stats)
+
+    rdd = rdd.mapPartitions(combine_partition)
+
+    # shuffle chunks of key-value pairs to the partition for their key.
+    # unlike a list of key-value pairs for each key, this can spill to disk
     #
-    # (k, [(k, v1), (k, v2), ...]) -> (k, [line1, line2, ...])
-    if c_write:
-        rdd = rdd.mapValues(
-            lambda pairs: [c_write(*pair) for pair in pairs])
+    # (k, (combinable, [(k, v), ...])), ... -> (k, [chunk1, chunk2, ...]), ...
+    rdd = rdd.groupByKey(numPartitions=num_reducers)
 
-    # free the lines!
+    # combine the chunks for each key, and encode the results into lines
     #
-    # (k, [line1, line2, ...]) -> line1, line2, ...
-    rdd = _discard_key_and_flatten_values(rdd, sort_values=sort_values)
+    # (k, [chunk1, chunk2, ...]), ... -> line1, line2, ...
+    def merge_partition(keys_and_chunks):
+        combiner_job = make_mrc_job('combiner', step_num)
+        combine = make_combine(combiner_job)
+
+        _, c_write = combiner_job.pick_protocols(step_num, 'combiner')
+
+        stats = defaultdict(int)
+
+        for _, chunks in keys_and_chunks:
+            pairs = _merge_combined_chunks(combine, chunks, stats)
+
+            if c_write:
+                lines = (c_write(k, v) for k, v in pairs)
+            else:
+                lines = pairs
+
+            if sort_values:
+                lines = sorted(lines)
+
+            for line in lines:
+                yield line
+
+        _increment_combiner_counters(combiner_job, stats)
+
+    return rdd.mapPartitions(merge_partition, preservesPartitioning=True)
+
+
+def _combine_pairs_by_key(combine, pairs, max_keys, stats):
+    """Helper for :py:func:`_run_combiner`. Run *combine* on each key's
+    *pairs* as we read them, like :py:meth:`pyspark.RDD.combineByKey`
+    would, except that our memory use is bounded:
 
-    return rdd
+    * we run *combine()* on two pairs at a time, as long as it keeps returning
+      a single pair. If it returns several, we pass them on, and pass
+      through further pairs for that key without combining them
+    * if we're holding pairs for *max_keys* keys, we pass on the pairs
+      we've combined so far, and start over
+
+    We remember up to *max_keys* keys we stopped combining (and count each
+    of them once, as a "non-reducing key"), even after we start over.
+    Past that, we don't remember new ones, so they may be combined (and
+    counted) again.
+
+    Yields ``(key, (combinable, pairs))``, where *pairs* is a list of
+    key-value pairs and *combinable* is false for keys we stopped combining.
+    """
+    # map from key to a list of zero or one combined pairs
+    combined = {}
+    # keys we stopped combining
+    uncombinable = set()
+
+    for pair in pairs:
+        key = pair[0]
+
+        if key in uncombinable:
+            yield key, (False, [pair])
+            continue
+
+        if combined.get(key):
+            result = _combine_and_count(combine, combined[key] + [pair], stats)
+
+            if len(result) > 1:
+                stats['non-reducing keys'] += 1
+                del combined[key]
+                if len(uncombinable) < max_keys:
+                    uncombinable.add(key)
+                yield key, (False, result)
+            else:
+                combined[key] = result
+        else:
+            if key not in combined and len(combined) >= max_keys:
+                for k, k_pairs in combined.items():
+                    if k_pairs:
+                        yield k, (True, k_pairs)
+
+                combined.clear()
+
+            combined[key] = [pair]
+
+    for k, k_pairs in combined.items():
+        if k_pairs:
+            yield k, (True, k_pairs)
+
+
+def _merge_combined_chunks(combine, chunks, stats):
+    """Helper for :py:func:`_run_combiner`. Given *chunks* (pairs of
+    ``(combinable, pairs)``) for a single key, from
+    :py:func:`_combine_pairs_by_key`, merge them in the same way, and yield
+    the resulting key-value pairs.
+
+    Also count how many key-value pairs came in for the key in *stats*.
+    """
+    result = []
+    combinable = True
+    num_pairs = 0
+
+    for chunk_combinable, pairs in chunks:
+        num_pairs += len(pairs)
+
+        if not combinable:
+            for pair in pairs:
+                yield pair
+            continue
+
+        if chunk_combinable and len(result) == len(pairs) == 1:
+            result = _combine_and_count(combine, result + pairs, stats)
+
+            if len(result) > 1:
+                stats['non-reducing keys'] += 1
+        else:
+            result.extend(pairs)
+
+        if len(result) > 1 or not chunk_combinable:
+            combinable = False
+            for pair in result:
+                yield pair
+            result = []
+
+    for pair in result:
+        yield pair
+
+    stats[_fan_in_counter(num_pairs)] += 1
+
+
+def _combine_and_count(combine, pairs, stats):
+    """Call *combine(pairs)*, and keep track of the number of input and
+    output pairs in *stats*."""
+    result = combine(pairs)
+
+    stats['combine input records'] += len(pairs)
+    stats['combine output records'] += len(result)
+
+    return result
+
+
+def _fan_in_counter(num_pairs):
+    """Name of the counter for keys where *num_pairs* key-value pairs
+    came in to the final combine (e.g. ``'keys with 10-99 input records'``).
+    """
+    low = 10 ** (len(str(num_pairs)) - 1)
+
+    return 'keys with %d-%d input records' % (low, low * 10 - 1)
+
+
+def _increment_combiner_counters(combiner_job, stats):
+    for counter, amount in sorted(stats.items()):
+        combiner_job.increment_counter(
+            _COMBINER_COUNTER_GROUP, counter, amount)
 
 
 def _shuffle_and_sort(
@@ -530,66 +759,76 @@ def _shuffle_and_sort(
              adjacent and in the same partition
     """
     if skip_internal_protocol:
-        def key_func(k_v):
-            return k_v[0]
+        # decoded keys can't necessarily be sorted, so group them instead
+        rdd = rdd.groupBy(lambda k_v: k_v[0], numPartitions=num_reducers)
+        rdd = _discard_key_and_flatten_values(rdd, sort_values=sort_values)
+
+        return rdd
+
+    # partition lines by key, and sort each partition, so that lines with the
+    # same key are adjacent. Unlike groupBy(), this never has to hold all the
+    # lines for a key in memory (Spark spills sorted runs to disk), so the
+    # reducer can stream through them.
+    #
+    # sorting entire lines sorts by key and then by value
+    if sort_values:
+        def sort_key_func(line):
+            return line
     else:
-        def key_func(line):
-            return line.split(b'\t')[0]
+        sort_key_func = _line_key
 
-    rdd = rdd.groupBy(key_func, numPartitions=num_reducers)
-    rdd = _discard_key_and_flatten_values(rdd, sort_values=sort_values)
+    def partition_func(line):
+        return portable_hash(_line_key(line))
 
-    return rdd
+    # line -> (line, None)
+    rdd = rdd.map(lambda line: (line, None))
 
+    rdd = rdd.repartitionAndSortWithinPartitions(
+        numPartitions=num_reducers,
+        partitionFunc=partition_func,
+        keyfunc=sort_key_func)
 
-def _run_reducer(make_mrc_job, step_num, rdd, num_reducers=None):
-    """Run our job's combiner, and group lines with the same key together.
+    # (line, None) -> line
+    return rdd.map(lambda line_none: line_none[0], preservesPartitioning=True)
 
-    :param reducer_job: an instance of our job, instantiated to be the mapper
-                        for the step we wish to run
-    :param rdd: an RDD containing "reducer ready" lines representing encoded
-                key-value pairs, that is, where all lines with the same key are
-                adjacent and in the same partition
-    :param num_reducers: limit the number of paratitions of output rdd, which
-                         is similar to mrjob's limit on number of reducers.
-    :return: an RDD containing encoded key-value pairs
-    """
-    # initialize job class inside mapPartitions(). this deals with jobs that
-    # can't be initialized in the Spark driver (see #2044)
-    def reduce_lines(lines):
-        job = make_mrc_job('reducer', step_num)
 
-        read, write = job.pick_protocols(step_num, 'reducer')
+def _line_key(line):
+    """Get the encoded key from a line (everything before the first TAB)."""
+    return line.split(b'\t', 1)[0]
 
-        # decode lines into key-value pairs (as a generator, not a list)
-        #
-        # line -> (k, v)
-        if read:
-            pairs = (read(line) for line in lines)
-        else:
-            pairs = lines  # pairs were never encoded
 
-        # reduce_pairs() runs key-value pairs through reducer
-        #
-        # (k, v), ... -> (k, v), ...
-        for k, v in job.reduce_pairs(pairs, step_num):
-            # encode key-value pairs back into lines
-            #
-            # (k, v) -> line
-            if write:
-                yield write(k, v)
-            else:
+def _read_lines(read, lines):
+    """Decode *lines* into key-value pairs with *read*, a protocol's
+    ``read()`` method. If the protocol supports ``read_many()``, decode
+    lines in batches."""
+    read_many = _batch_protocol_method(read, 'read_many')
+
+    if read_many:
+        for batch in _batches(lines, _PROTOCOL_BATCH_SIZE):
+            for k, v in read_many(batch):
                 yield k, v
+    else:
+        for line in lines:
+            yield read(line)
 
-    # if *num_reducers* is set, don't re-partition. otherwise, doesn't matter
-    return rdd.mapPartitions(
-        reduce_lines,
-        preservesPartitioning=bool(num_reducers))
+
+def _write_pairs(write, pairs):
+    """Encode key-value pairs into lines with *write*, a protocol's
+    ``write()`` method. If the protocol supports ``write_many()``, encode
+    pairs in batches."""
+    write_many = _batch_protocol_method(write, 'write_many')
+
+    if write_many:
+        for batch in _batches(pairs, _PROTOCOL_BATCH_SIZE):
+            for line in write_many(batch):
+                yield line
+    else:
+        for k, v in pairs:
+            yield write(k, v)
 
 
 def _discard_key_and_flatten_values(rdd, sort_values=False):
-    """Helper function for :py:func:`_run_combiner` and
-    :py:func:`_shuffle_and_sort`.
+    """Helper function for :py:func:`_shuffle_and_sort`.
 
     Given an RDD containing (key, [line1, line2, ...]), discard *key*
     and return an RDD containing line1, line2, ...
@@ -683,6 +922,15 @@ def _make_arg_parser():
               " between tasks internal to the job, instead relying"
               " on Spark to encode and decode raw data structures.")
     )
+    parser.add_argument(
+        '--fuse-steps',
+        dest='fuse_steps',
+        action='store_true',
+        help=("Pass key-value pairs directly from each step's reducer to"
+              " the next step's mapper (and between mapper-only steps),"
+              " rather than encoding and decoding them with the job's"
+              " internal protocol.")
+    )
 
     for args, kwargs in _PASSTHRU_OPTIONS:
         parser.add_argument(*args, **kwargs)
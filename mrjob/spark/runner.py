@@ -77,6 +77,7 @@ class SparkMRJobRunner(MRJobBinRunner):
         'cloud_fs_sync_secs',
         'cloud_part_size_mb',
         'emulate_map_input_file',
+        'fuse_steps',
         'gcs_region',  # used when creating buckets on GCS
         'hadoop_bin',
         'project_id',  # used by GCS filesystem
@@ -118,7 +119,9 @@ class SparkMRJobRunner(MRJobBinRunner):
         # where local files are uploaded into Spark
         if is_uri(self._spark_tmp_dir):
             spark_files_dir = posixpath.join(self._spark_tmp_dir, 'files', '')
-            self._upload_mgr = UploadDirManager(spark_files_dir)
+            self._upload_mgr = UploadDirManager(
+                spark_files_dir,
+                cas_prefix=self._upload_cas_prefix(self._spark_tmp_dir))
 
         # where to put job output (if not set explicitly)
         if not self._output_dir:
@@ -471,6 +474,10 @@ class SparkMRJobRunner(MRJobBinRunner):
         if self._opts['skip_internal_protocol']:
             args.append('--skip-internal-protocol')
 
+        # --fuse-steps
+        if self._opts['fuse_steps']:
+            args.append('--fuse-steps')
+
         return args
 
     def _spark_harness_path(self):
@@ -32,11 +32,11 @@ STEP_TYPES = ('jar', 'spark', 'spark_jar', 'spark_script', 'streaming')
 
 # Function names mapping to mapper, reducer, and combiner operations
 _MAPPER_FUNCS = ('mapper', 'mapper_init', 'mapper_final', 'mapper_cmd',
-                 'mapper_pre_filter', 'mapper_raw')
+                 'mapper_pre_filter', 'mapper_raw', 'mapper_batch')
 _COMBINER_FUNCS = ('combiner', 'combiner_init', 'combiner_final',
-                   'combiner_cmd', 'combiner_pre_filter')
+                   'combiner_cmd', 'combiner_pre_filter', 'combiner_batch')
 _REDUCER_FUNCS = ('reducer', 'reducer_init', 'reducer_final', 'reducer_cmd',
-                  'reducer_pre_filter')
+                  'reducer_pre_filter', 'reducer_batch')
 _HADOOP_OPTS = ('jobconf',)
 
 # params to specify how to run the step. need at least one of these
@@ -166,13 +166,13 @@ class MRStep(object):
     Used by :py:meth:`MRJob.steps <mrjob.job.MRJob.steps>`.
     See :ref:`writing-multi-step-jobs` for sample usage.
 
-    Takes the following keyword arguments: `combiner`, `combiner_cmd`,
-    `combiner_final`, `combiner_init`, `combiner_pre_filter`, `mapper`,
-    `mapper_cmd`, `mapper_final`, `mapper_init`, `mapper_pre_filter`,
-    `mapper_raw`, `reducer`, `reducer_cmd`, `reducer_final`, `reducer_init`,
-    `reducer_pre_filter`. These should be set to ``None`` or a function
-    with the same signature as the corresponding method in
-    :py:class:`~mrjob.job.MRJob`.
+    Takes the following keyword arguments: `combiner`, `combiner_batch`,
+    `combiner_cmd`, `combiner_final`, `combiner_init`, `combiner_pre_filter`,
+    `mapper`, `mapper_batch`, `mapper_cmd`, `mapper_final`, `mapper_init`,
+    `mapper_pre_filter`, `mapper_raw`, `reducer`, `reducer_batch`,
+    `reducer_cmd`, `reducer_final`, `reducer_init`, `reducer_pre_filter`.
+    These should be set to ``None`` or a function with the same signature
+    as the corresponding method in :py:class:`~mrjob.job.MRJob`.
 
     Also accepts `jobconf`, a dictionary with custom jobconf arguments to pass
     to hadoop.
@@ -240,6 +240,9 @@ class MRStep(object):
 
         _check_conflict('mapper_cmd', _MAPPER_FUNCS)
         _check_conflict('mapper_raw', ('mapper', 'mapper_pre_filter'))
+        _check_conflict('mapper_batch', ('mapper', 'mapper_raw'))
+        _check_conflict('combiner_batch', ('combiner',))
+        _check_conflict('reducer_batch', ('reducer',))
         _check_conflict('combiner_cmd', _COMBINER_FUNCS)
         _check_conflict('reducer_cmd', _REDUCER_FUNCS)
 
@@ -17,6 +17,7 @@
 """
 # don't add imports here that aren't part of the standard Python library,
 # since MRJobs need to run in Amazon's generic EMR environment
+import gzip
 import logging
 import os
 import os.path
@@ -24,6 +25,7 @@ import pipes
 import random
 import shlex
 import shutil
+import stat
 import sys
 import tarfile
 from contextlib import contextmanager
@@ -33,6 +35,7 @@ from logging import getLogger
 from zipfile import ZIP_DEFLATED
 from zipfile import ZIP_STORED
 from zipfile import ZipFile
+from zipfile import ZipInfo
 from zipfile import is_zipfile
 
 from mrjob.py2 import PY2
@@ -40,6 +43,12 @@ from mrjob.py2 import PY2
 
 log = getLogger(__name__)
 
+# timestamp for every file in archives we create, so that archiving the
+# same files always produces the same bytes (this is the earliest time
+# a zip file can represent)
+_ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_ARCHIVE_MTIME = 315532800  # _ARCHIVE_DATE_TIME, in seconds since the epoch
+
 
 class NullHandler(logging.Handler):
     def emit(self, record):
@@ -390,6 +399,9 @@ def zip_dir(dir, out_path, filter=None, prefix=''):
 
     If we encounter symlinks, include the actual file, not the symlink.
 
+    Files are added in sorted order with a fixed timestamp, so zipping
+    the same files always produces the same zip file.
+
     :type dir: str
     :param dir: dir to tar up
     :type out_path: str
@@ -400,23 +412,82 @@ def zip_dir(dir, out_path, filter=None, prefix=''):
     :param prefix: subdirectory inside the tarball to put everything into (e.g.
                    ``'mrjob'``)
     """
+    _zip_files(_dir_files(dir, filter=filter, prefix=prefix), out_path)
+
+
+def _dir_files(dir, filter=None, prefix=''):
+    """Return a list of ``(path, name)`` for each file in *dir*, sorted
+    by *name*, where *path* is the real path of the file (we follow
+    symlinks) and *name* is its path relative to *dir*, joined to *prefix*.
+
+    *filter* is as in :py:func:`zip_dir`.
+    """
     if not os.path.isdir(dir):
         raise IOError('Not a directory: %r' % (dir,))
 
     if not filter:
         filter = lambda path: True
 
+    paths_and_names = []
+
+    for dirpath, dirnames, filenames in os.walk(dir, followlinks=True):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, dir)
+
+            if filter(rel_path):
+                # copy over real files, not symlinks
+                paths_and_names.append(
+                    (os.path.realpath(path), os.path.join(prefix, rel_path)))
+
+    return sorted(paths_and_names, key=lambda p_n: p_n[1])
+
+
+def _zip_files(paths_and_names, out_path):
+    """Write a reproducible zip file at *out_path* containing each *path*
+    in *paths_and_names* as *name* (in the order given)."""
     with _create_zip_file(out_path) as zip_file:
-        for dirpath, dirnames, filenames in os.walk(dir, followlinks=True):
-            for filename in filenames:
-                path = os.path.join(dirpath, filename)
-                rel_path = os.path.relpath(path, dir)
-
-                if filter(rel_path):
-                    # copy over real files, not symlinks
-                    real_path = os.path.realpath(path)
-                    path_in_zip_file = os.path.join(prefix, rel_path)
-                    zip_file.write(real_path, arcname=path_in_zip_file)
+        for path, name in paths_and_names:
+            zip_info = ZipInfo(name, date_time=_ARCHIVE_DATE_TIME)
+            zip_info.compress_type = zip_file.compression
+            zip_info.create_system = 3  # Unix, so permissions are kept
+            zip_info.external_attr = (
+                stat.S_IFREG | stat.S_IMODE(os.stat(path).st_mode)) << 16
+
+            with open(path, 'rb') as src:
+                # ZipFile.open() can only write starting in Python 3.6
+                if sys.version_info < (3, 6):
+                    zip_file.writestr(zip_info, src.read())
+                else:
+                    with zip_file.open(zip_info, mode='w') as dest:
+                        shutil.copyfileobj(src, dest)
+
+
+def _tar_and_gzip_files(paths_and_names, out_path):
+    """Write a reproducible ``.tar.gz`` file at *out_path* containing each
+    *path* in *paths_and_names* as *name* (in the order given).
+
+    Files have a fixed mtime and no owner, and the gzip header doesn't
+    record when the file was compressed.
+    """
+    def normalize(tar_info):
+        tar_info.mtime = _ARCHIVE_MTIME
+        tar_info.uid = tar_info.gid = 0
+        tar_info.uname = tar_info.gname = ''
+        return tar_info
+
+    with open(out_path, 'wb') as raw:
+        with gzip.GzipFile(
+                filename='', mode='wb', fileobj=raw, mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode='w') as tar:
+                for path, name in paths_and_names:
+                    tar_info = normalize(tar.gettarinfo(path, name))
+
+                    if tar_info.isreg():
+                        with open(path, 'rb') as f:
+                            tar.addfile(tar_info, f)
+                    else:
+                        tar.addfile(tar_info)
 
 
 # this is also used by spark runner
@@ -35,6 +35,8 @@ try:
                 'google-cloud-logging>=1.9.0',
                 'google-cloud-storage>=1.13.1',
             ],
+            'msgspec': ['msgspec'],
+            'orjson': ['orjson'],
             'rapidjson': ['python-rapidjson'],
             'simplejson': ['simplejson'],
             'ujson': ['ujson'],
@@ -45,6 +47,7 @@ try:
         'provides': ['mrjob'],
         'test_suite': 'tests',
         'tests_require': [
+            'orjson',
             'pyspark',
             'python-rapidjson',
             'simplejson',
@@ -59,9 +62,12 @@ try:
         setuptools_kwargs['extras_require']['google'].append(
             'grpcio<=1.10.0')
 
-    # rapidjson is not available on Python 2
+    # msgspec, orjson, and rapidjson are not available on Python 2
     if sys.version_info[0] == 2:
+        del setuptools_kwargs['extras_require']['msgspec']
+        del setuptools_kwargs['extras_require']['orjson']
         del setuptools_kwargs['extras_require']['rapidjson']
+        setuptools_kwargs['tests_require'].remove('orjson')
         setuptools_kwargs['tests_require'].remove('python-rapidjson')
 
     # limited Python 3.4 support
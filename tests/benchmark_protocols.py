@@ -0,0 +1,135 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare how fast the JSON protocols (and the binary protocols one might
+use as an internal protocol instead) encode and decode records.
+
+Run with ``python -m tests.benchmark_protocols [num_records]``. Protocols
+whose library isn't installed are skipped.
+"""
+import random
+import sys
+from timeit import default_timer
+
+from mrjob import protocol
+from mrjob.job import _PROTOCOL_BATCH_SIZE
+from mrjob.job import _batches
+from mrjob.protocol import MarshalProtocol
+from mrjob.protocol import MsgspecJSONProtocol
+from mrjob.protocol import OrJSONProtocol
+from mrjob.protocol import PickleProtocol
+from mrjob.protocol import RapidJSONProtocol
+from mrjob.protocol import SimpleJSONProtocol
+from mrjob.protocol import StandardJSONProtocol
+from mrjob.protocol import UltraJSONProtocol
+from mrjob.py2 import PY2
+
+# (protocol class, name of the library it requires)
+PROTOCOLS = [
+    (StandardJSONProtocol, None),
+    (SimpleJSONProtocol, 'simplejson'),
+    (UltraJSONProtocol, 'ujson'),
+    (RapidJSONProtocol, 'rapidjson'),
+    (MsgspecJSONProtocol, 'msgspec'),
+    (OrJSONProtocol, 'orjson'),
+    (PickleProtocol, None),
+    (MarshalProtocol, None),
+]
+
+# these libraries only exist in Python 3
+_PY3_ONLY = ('msgspec', 'orjson', 'rapidjson')
+
+DEFAULT_NUM_RECORDS = 100000
+
+_WORDS = ['apple', 'banana', 'cherry', 'durian', u'\xe9clair', 'fig']
+
+
+def make_records(num_records, seed=0):
+    """Make a list of ``(key, value)`` pairs typical of a job's
+    intermediate data: short string keys (sorted, so many repeat) and
+    small dictionaries as values."""
+    r = random.Random(seed)
+
+    records = []
+    for i in range(num_records):
+        key = r.choice(_WORDS)
+        value = dict(
+            count=r.randint(1, 1000),
+            score=r.random(),
+            tags=r.sample(_WORDS, 2),
+            id='%08x' % i,
+        )
+        records.append((key, value))
+
+    return sorted(records, key=lambda kv: kv[0])
+
+
+def time_protocol(p, records):
+    """Return seconds spent by *p* on ``write()``, ``read()``,
+    ``write_many()``, and ``read_many()`` on *records*. The batch methods
+    get the same size batches that jobs give them."""
+    start = default_timer()
+    lines = [p.write(k, v) for k, v in records]
+    write_time = default_timer() - start
+
+    start = default_timer()
+    for line in lines:
+        p.read(line)
+    read_time = default_timer() - start
+
+    start = default_timer()
+    for batch in _batches(records, _PROTOCOL_BATCH_SIZE):
+        p.write_many(batch)
+    write_many_time = default_timer() - start
+
+    p = p.__class__()  # clear cached key
+
+    start = default_timer()
+    for batch in _batches(lines, _PROTOCOL_BATCH_SIZE):
+        p.read_many(batch)
+    read_many_time = default_timer() - start
+
+    return write_time, read_time, write_many_time, read_many_time
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    num_records = int(args[0]) if args else DEFAULT_NUM_RECORDS
+    records = make_records(num_records)
+
+    print('%d records; thousands of records per second, and encoded size' %
+          num_records)
+    print('%-22s %10s %10s %10s %10s %10s' % (
+        'protocol', 'write', 'read', 'write_many', 'read_many', 'MB'))
+
+    for protocol_cls, lib in PROTOCOLS:
+        if lib and (getattr(protocol, lib) is None or
+                    (PY2 and lib in _PY3_ONLY)):
+            continue
+
+        p = protocol_cls()
+        times = time_protocol(p, records)
+        size = sum(len(line) + 1 for line in p.write_many(records))
+
+        print('%-22s %10.0f %10.0f %10.0f %10.0f %10.1f' % (
+            (protocol_cls.__name__,) +
+            tuple(num_records / t / 1000 for t in times) +
+            (size / 1e6,)))
+
+    print('FastJSONProtocol is %s' % protocol.FastJSONProtocol.__name__)
+
+
+if __name__ == '__main__':
+    main()
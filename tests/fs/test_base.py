@@ -13,10 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os.path
+import threading
 
 from mrjob.fs.base import Filesystem
+from mrjob.fs.base import _cat_in_threads
+from mrjob.fs.base import _put_in_threads
 
 from tests.py2 import Mock
+from tests.py2 import patch
 from tests.sandbox import SandboxedTestCase
 
 
@@ -63,3 +67,122 @@ class JoinTestCase(SandboxedTestCase):
                          'hdfs://host2/path')
         self.assertEqual(self.fs.join('/', 'hdfs://host2/path', 'subdir'),
                          'hdfs://host2/path/subdir')
+
+
+class PutInThreadsTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(PutInThreadsTestCase, self).setUp()
+
+        self.log = self.start(patch('mrjob.fs.base.log'))
+
+        self.srcs_and_paths = [
+            (self.makefile('file%d' % i, b'x' * i), 'remote://file%d' % i)
+            for i in range(10)
+        ]
+
+    def test_puts_every_file(self):
+        put = Mock()
+
+        _put_in_threads(put, self.srcs_and_paths, 4)
+
+        self.assertEqual(
+            sorted(args for args, _ in put.call_args_list),
+            sorted(self.srcs_and_paths))
+
+        self.assertTrue(self.log.info.called)
+
+    def test_biggest_first(self):
+        put = Mock()
+
+        _put_in_threads(put, self.srcs_and_paths, 1)
+
+        self.assertEqual(
+            [path for (_, path), _ in put.call_args_list],
+            ['remote://file%d' % i for i in range(9, -1, -1)])
+
+    def test_uses_threads(self):
+        thread_names = set()
+        lock = threading.Lock()
+
+        def put(src, path):
+            with lock:
+                thread_names.add(threading.current_thread().name)
+
+        _put_in_threads(put, self.srcs_and_paths, 4)
+
+        self.assertNotIn(threading.current_thread().name, thread_names)
+
+    def test_one_thread_runs_inline(self):
+        thread_names = set()
+
+        def put(src, path):
+            thread_names.add(threading.current_thread().name)
+
+        _put_in_threads(put, self.srcs_and_paths, 1)
+
+        self.assertEqual(thread_names, set([threading.current_thread().name]))
+
+    def test_error(self):
+        put = Mock(side_effect=IOError)
+
+        self.assertRaises(IOError, _put_in_threads,
+                          put, self.srcs_and_paths, 4)
+
+    def test_empty(self):
+        put = Mock()
+
+        _put_in_threads(put, [], 4)
+
+        self.assertFalse(put.called)
+        self.assertFalse(self.log.info.called)
+
+
+class CatInThreadsTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(CatInThreadsTestCase, self).setUp()
+
+        self.log = self.start(patch('mrjob.fs.base.log'))
+
+        self.paths_and_dests = [
+            ('remote://file%d' % i, os.path.join(self.tmp_dir, 'file%d' % i))
+            for i in range(10)
+        ]
+
+    def cat_file(self, path):
+        yield path.encode('ascii')
+        yield b'\n'
+
+    def test_cats_every_file(self):
+        _cat_in_threads(self.cat_file, self.paths_and_dests, 4)
+
+        for path, dest in self.paths_and_dests:
+            with open(dest, 'rb') as f:
+                self.assertEqual(f.read(), path.encode('ascii') + b'\n')
+
+        self.assertTrue(self.log.info.called)
+
+    def test_uses_threads(self):
+        thread_names = set()
+        lock = threading.Lock()
+
+        def cat_file(path):
+            with lock:
+                thread_names.add(threading.current_thread().name)
+            return []
+
+        _cat_in_threads(cat_file, self.paths_and_dests, 4)
+
+        self.assertNotIn(threading.current_thread().name, thread_names)
+
+    def test_error(self):
+        cat_file = Mock(side_effect=IOError)
+
+        self.assertRaises(IOError, _cat_in_threads,
+                          cat_file, self.paths_and_dests, 4)
+
+    def test_empty(self):
+        _cat_in_threads(self.cat_file, [], 4)
+
+        self.assertFalse(self.log.info.called)
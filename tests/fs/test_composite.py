@@ -125,3 +125,83 @@ class CompositeFilesystemTestCase(BasicTestCase):
         self.assertEqual(fs.cat('s3://walrus/fish'),
                          self.hadoop_fs.cat.return_value)
         self.assertFalse(self.s3_fs.cat.called)
+
+    def test_exists_many(self):
+        fs = CompositeFilesystem()
+
+        fs.add_fs('s3', self.s3_fs)
+        fs.add_fs('hadoop', self.hadoop_fs)
+        fs.add_fs('local', self.local_fs)
+
+        self.s3_fs._exists_many.side_effect = lambda paths: [
+            'fish' in p for p in paths]
+        self.hadoop_fs._exists_many.side_effect = lambda paths: [
+            True for p in paths]
+        self.local_fs._exists_many.side_effect = lambda paths: [
+            False for p in paths]
+
+        self.assertEqual(
+            fs._exists_many(['s3://walrus/fish', '/tmp/foo',
+                             'hdfs:///foo', 's3://walrus/cat']),
+            [True, False, True, False])
+
+        # each filesystem is only called once
+        self.s3_fs._exists_many.assert_called_once_with(
+            ['s3://walrus/fish', 's3://walrus/cat'])
+        self.hadoop_fs._exists_many.assert_called_once_with(['hdfs:///foo'])
+        self.local_fs._exists_many.assert_called_once_with(['/tmp/foo'])
+
+    def test_put_many(self):
+        # the path that matters comes second
+        fs = CompositeFilesystem()
+
+        fs.add_fs('s3', self.s3_fs)
+        fs.add_fs('hadoop', self.hadoop_fs)
+
+        fs._put_many([('/path/to/file', 's3://walrus/file'),
+                      ('/path/to/file2', 'hdfs:///file2')])
+
+        self.s3_fs._put_many.assert_called_once_with(
+            [('/path/to/file', 's3://walrus/file')])
+        self.hadoop_fs._put_many.assert_called_once_with(
+            [('/path/to/file2', 'hdfs:///file2')])
+
+    def test_cat_many(self):
+        # the path that matters comes first
+        fs = CompositeFilesystem()
+
+        fs.add_fs('s3', self.s3_fs)
+        fs.add_fs('hadoop', self.hadoop_fs)
+
+        fs._cat_many([('s3://walrus/file', '/path/to/file'),
+                      ('hdfs:///file2', '/path/to/file2')])
+
+        self.s3_fs._cat_many.assert_called_once_with(
+            [('s3://walrus/file', '/path/to/file')])
+        self.hadoop_fs._cat_many.assert_called_once_with(
+            [('hdfs:///file2', '/path/to/file2')])
+
+    def test_disable_fs_for_many(self):
+        class NoCredentialsError(Exception):
+            pass
+
+        fs = CompositeFilesystem()
+
+        fs.add_fs('s3', self.s3_fs,
+                  disable_if=lambda ex: isinstance(ex, NoCredentialsError))
+        fs.add_fs('hadoop', self.hadoop_fs)
+
+        self.s3_fs._rm_many.side_effect = NoCredentialsError
+
+        fs._rm_many(['s3://walrus/fish', 'hdfs:///fish'])
+
+        self.assertIn('s3', fs._disabled)
+        self.hadoop_fs._rm_many.assert_called_once_with(
+            ['s3://walrus/fish', 'hdfs:///fish'])
+
+    def test_cant_handle_many(self):
+        fs = CompositeFilesystem()
+
+        fs.add_fs('s3', self.s3_fs)
+
+        self.assertRaises(IOError, fs._exists_many, ['s3://walrus/', '/'])
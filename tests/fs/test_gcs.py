@@ -15,6 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import bz2
+import os
 from hashlib import md5
 
 from mrjob.fs.gcs import GCSFilesystem
@@ -68,6 +69,24 @@ class CatTestCase(MockGoogleTestCase):
             len(list(self.fs._cat_file('gs://walrus/data/foo'))),
             1)
 
+    def test_cat_many(self):
+        self.put_gcs_multi({
+            'gs://walrus/data/foo': b'foo\n',
+            'gs://walrus/data/bar.gz': gzip_compress(b'bar\n'),
+        })
+
+        foo_path = os.path.join(self.tmp_dir, 'foo')
+        bar_path = os.path.join(self.tmp_dir, 'bar')
+
+        self.fs._cat_many([('gs://walrus/data/foo', foo_path),
+                           ('gs://walrus/data/bar.gz', bar_path)])
+
+        with open(foo_path, 'rb') as f:
+            self.assertEqual(f.read(), b'foo\n')
+
+        with open(bar_path, 'rb') as f:
+            self.assertEqual(f.read(), b'bar\n')
+
     def test_chunk_boundary(self):
         # trying to read from end of file raises an exception, which we catch
         data = b'a' * _CAT_CHUNK_SIZE + b'b' * _CAT_CHUNK_SIZE
@@ -328,6 +347,28 @@ class GCSFSTestCase(MockGoogleTestCase):
             fs.put(local_path, dest)
             blob_meth.assert_called_once_with(dest, chunk_size=12345)
 
+    def test_put_many(self):
+        self.storage_client().bucket('bar-files').create()
+
+        srcs_and_paths = [
+            (self.makefile('foo%d' % i, contents=b'bar%d' % i),
+             'gs://bar-files/foo%d' % i)
+            for i in range(10)
+        ]
+
+        self.fs._put_many(srcs_and_paths)
+
+        for i, (_, path) in enumerate(srcs_and_paths):
+            self.assertEqual(b''.join(self.fs.cat(path)), b'bar%d' % i)
+
+    def test_put_many_wont_overwrite(self):
+        self.put_gcs_multi({'gs://bar-files/foo': b'baz'})
+
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(IOError, self.fs._put_many,
+                          [(local_path, 'gs://bar-files/foo')])
+
     def test_rm(self):
         self.put_gcs_multi({
             'gs://walrus/foo': b''
@@ -19,6 +19,7 @@
 import bz2
 import os
 from os.path import join
+from subprocess import CalledProcessError
 
 from mrjob.fs.hadoop import HadoopFilesystem
 from mrjob.fs import hadoop as fs_hadoop
@@ -29,6 +30,7 @@ from tests.fs import MockSubprocessTestCase
 from tests.mockhadoop import get_mock_hdfs_root
 from tests.mockhadoop import main as mock_hadoop_main
 from tests.py2 import MagicMock
+from tests.py2 import Mock
 from tests.py2 import patch
 from tests.sandbox import SandboxedTestCase
 
@@ -65,6 +67,11 @@ class HadoopFSTestCase(MockSubprocessTestCase):
         return self.makefile(
             os.path.join(get_mock_hdfs_root(self.env), name), contents)
 
+    def count_popen_calls(self):
+        """Wrap the mock Popen so we can count calls to it."""
+        return self.start(patch.object(
+            fs_hadoop, 'Popen', wraps=fs_hadoop.Popen))
+
     def test_cat_uncompressed(self):
         self.make_mock_file('data/foo', 'foo\nfoo\n')
 
@@ -92,6 +99,27 @@ class HadoopFSTestCase(MockSubprocessTestCase):
             b''.join(self.fs._cat_file(remote_path)),
             b'foo\n' * 10000)
 
+    def test_cat_many(self):
+        self.make_mock_file('data/foo', 'foo\n')
+        self.make_mock_file('data/bar.gz', gzip_compress(b'bar\n'))
+
+        foo_path = os.path.join(self.tmp_dir, 'foo')
+        bar_path = os.path.join(self.tmp_dir, 'bar')
+
+        self.fs._cat_many([('hdfs:///data/foo', foo_path),
+                           ('hdfs:///data/bar.gz', bar_path)])
+
+        with open(foo_path, 'rb') as f:
+            self.assertEqual(f.read(), b'foo\n')
+
+        with open(bar_path, 'rb') as f:
+            self.assertEqual(f.read(), b'bar\n')
+
+    def test_cat_many_missing_file(self):
+        self.assertRaises(
+            IOError, self.fs._cat_many,
+            [('hdfs:///data/foo', os.path.join(self.tmp_dir, 'foo'))])
+
     def test_ls_empty(self):
         self.assertEqual(list(self.fs.ls('hdfs:///')), [])
 
@@ -159,12 +187,139 @@ class HadoopFSTestCase(MockSubprocessTestCase):
         path = 'hdfs:///f'
         self.assertEqual(self.fs.exists(path), True)
 
+    def test_exists_many(self):
+        self.make_mock_file('f')
+        self.make_mock_file('d/g')
+
+        self.assertEqual(
+            self.fs._exists_many(
+                ['hdfs:///f', 'hdfs:///nope', 'hdfs:///d', 'hdfs:///d/*',
+                 'hdfs:///e/*']),
+            [True, False, True, True, False])
+
+    def test_exists_many_runs_hadoop_once(self):
+        self.make_mock_file('f')
+        popen = self.count_popen_calls()
+
+        self.fs._exists_many(['hdfs:///f', 'hdfs:///g', 'hdfs:///h'])
+
+        self.assertEqual(popen.call_count, 1)
+
+    def test_exists_many_hadoop_2_error_format(self):
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=1,
+            communicate=Mock(return_value=(
+                b'', b"ls: `hdfs:///g': No such file or directory\n")))
+
+        self.assertEqual(self.fs._exists_many(['hdfs:///f', 'hdfs:///g']),
+                         [True, False])
+
+    def test_exists_many_other_error(self):
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=255,
+            communicate=Mock(return_value=(b'', b'ls: Connection refused\n')))
+
+        self.assertRaises(IOError, self.fs._exists_many, ['hdfs:///f'])
+
+    def test_exists_many_missing_paths_and_other_error(self):
+        # if hadoop fs -ls reports more than missing paths, check
+        # the other paths individually
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=1,
+            communicate=Mock(return_value=(
+                b'', b"ls: `hdfs:///g': No such file or directory\n"
+                b"ls: Permission denied: user=dave, access=READ_EXECUTE\n")))
+
+        exists = self.start(patch.object(
+            self.fs, 'exists', side_effect=lambda p: p == 'hdfs:///f'))
+
+        self.assertEqual(
+            self.fs._exists_many(['hdfs:///f', 'hdfs:///g', 'hdfs:///h']),
+            [True, False, False])
+
+        # don't need to check hdfs:///g; we know it's missing
+        self.assertEqual(sorted(args for (args,), _ in exists.call_args_list),
+                         ['hdfs:///f', 'hdfs:///h'])
+
+    def test_exists_many_different_form_of_missing_path(self):
+        # hadoop fs -ls echoes back a qualified URI, not the path we gave it
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=1,
+            communicate=Mock(return_value=(
+                b'', b"ls: `hdfs://namenode:8020/g': No such file or"
+                b" directory\n")))
+
+        exists = self.start(patch.object(
+            self.fs, 'exists', side_effect=lambda p: p == 'hdfs:///f'))
+
+        self.assertEqual(self.fs._exists_many(['hdfs:///f', 'hdfs:///g']),
+                         [True, False])
+
+        self.assertEqual(sorted(args for (args,), _ in exists.call_args_list),
+                         ['hdfs:///f', 'hdfs:///g'])
+
+    def test_exists_many_ignores_log4j_warnings(self):
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=1,
+            communicate=Mock(return_value=(
+                b'', b'19/02/26 13:27:11 WARN util.NativeCodeLoader: Unable'
+                b' to load native-hadoop library for your platform...\n'
+                b"ls: `hdfs:///g': No such file or directory\n")))
+
+        exists = self.start(patch.object(self.fs, 'exists'))
+
+        self.assertEqual(self.fs._exists_many(['hdfs:///f', 'hdfs:///g']),
+                         [True, False])
+        self.assertFalse(exists.called)
+
     def test_mkdir(self):
         self.fs.mkdir('hdfs:///d/ave')
         path_in_mock_hdfs = os.path.join(
             get_mock_hdfs_root(self.env), 'd', 'ave')
         self.assertEqual(os.path.isdir(path_in_mock_hdfs), True)
 
+    def test_mkdir_many(self):
+        popen = self.count_popen_calls()
+
+        self.fs._mkdir_many(['hdfs:///d/ave', 'hdfs:///dave'])
+
+        hdfs_root = get_mock_hdfs_root(self.env)
+        self.assertTrue(os.path.isdir(os.path.join(hdfs_root, 'd', 'ave')))
+        self.assertTrue(os.path.isdir(os.path.join(hdfs_root, 'dave')))
+
+        mkdir_calls = [args for (args,), _ in popen.call_args_list
+                       if '-mkdir' in args]
+        self.assertEqual(len(mkdir_calls), 1)
+
+    def mock_mkdir_stderr(self, stderr):
+        self.start(patch('mrjob.fs.hadoop.Popen')).return_value = Mock(
+            returncode=-1, communicate=Mock(return_value=(b'', stderr)))
+        self.start(patch.object(self.fs, 'get_hadoop_version',
+                                return_value='1.2.0'))
+
+    def test_mkdir_many_dirs_exist(self):
+        self.mock_mkdir_stderr(
+            b'19/02/26 13:27:11 WARN util.NativeCodeLoader: Unable to load'
+            b' native-hadoop library for your platform...\n'
+            b'mkdir: cannot create directory hdfs:///d: File exists\n')
+
+        self.fs._mkdir_many(['hdfs:///c', 'hdfs:///d'])
+
+    def test_mkdir_many_dir_exists_and_other_error(self):
+        # "File exists" for one dir shouldn't hide errors for another
+        self.mock_mkdir_stderr(
+            b'mkdir: cannot create directory hdfs:///d: File exists\n'
+            b'mkdir: Permission denied: user=dave, access=WRITE,'
+            b' inode="/":hdfs:supergroup:drwxr-xr-x\n')
+
+        self.assertRaises(IOError, self.fs._mkdir_many,
+                          ['hdfs:///c', 'hdfs:///d'])
+
+    def test_mkdir_many_failure_with_no_stderr(self):
+        self.mock_mkdir_stderr(b'')
+
+        self.assertRaises(IOError, self.fs._mkdir_many, ['hdfs:///c'])
+
     def test_put(self):
         local_path = self.makefile('foo', contents=b'bar')
         dest = 'hdfs:///bar'
@@ -172,6 +327,83 @@ class HadoopFSTestCase(MockSubprocessTestCase):
         self.fs.put(local_path, dest)
         self.assertEqual(b''.join(self.fs.cat(dest)), b'bar')
 
+    def test_put_many(self):
+        foo_path = self.makefile('foo', contents=b'foo')
+        bar_path = self.makefile('bar', contents=b'bar')
+        baz_path = self.makefile('baz', contents=b'baz')
+
+        popen = self.count_popen_calls()
+
+        self.fs._put_many([
+            (foo_path, 'hdfs:///files/foo'),
+            (bar_path, 'hdfs:///files/bar'),
+            (baz_path, 'hdfs:///files/qux'),  # renamed
+        ])
+
+        self.assertEqual(b''.join(self.fs.cat('hdfs:///files/foo')), b'foo')
+        self.assertEqual(b''.join(self.fs.cat('hdfs:///files/bar')), b'bar')
+        self.assertEqual(b''.join(self.fs.cat('hdfs:///files/qux')), b'baz')
+
+        # put foo and bar (fails), mkdir files/, put foo and bar, put baz
+        put_calls = [args for (args,), _ in popen.call_args_list
+                     if '-put' in args]
+        self.assertEqual(len(put_calls), 3)
+
+    def test_put_many_renamed_file_to_new_dir(self):
+        foo_path = self.makefile('foo', contents=b'foo')
+
+        self.fs._put_many([(foo_path, 'hdfs:///files/bar')])
+
+        self.assertEqual(b''.join(self.fs.cat('hdfs:///files/bar')), b'foo')
+
+    def test_put_to_missing_dir(self):
+        # like real Hadoop, put() doesn't create directories
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(CalledProcessError,
+                          self.fs.put, local_path, 'hdfs:///files/bar')
+
+    def test_put_many_mkdir_after_log4j_warning(self):
+        foo_path = self.makefile('foo', contents=b'foo')
+        bar_path = self.makefile('bar', contents=b'bar')
+
+        def mock_popen(args, *args_, **kwargs):
+            if '-put' in args and not mock_popen.put_called:
+                mock_popen.put_called = True
+                stderr = (b'19/02/26 13:27:11 WARN util.NativeCodeLoader:'
+                          b' Unable to load native-hadoop library\n'
+                          b"put: `hdfs:///files': No such file or"
+                          b' directory\n')
+                return Mock(returncode=1,
+                            communicate=Mock(return_value=(b'', stderr)))
+            else:
+                return Mock(returncode=0,
+                            communicate=Mock(return_value=(b'', b'')))
+
+        mock_popen.put_called = False
+
+        popen = self.start(patch('mrjob.fs.hadoop.Popen',
+                                 side_effect=mock_popen))
+        self.start(patch.object(self.fs, 'get_hadoop_version',
+                                return_value='2.7.1'))
+
+        self.fs._put_many([
+            (foo_path, 'hdfs:///files/foo'),
+            (bar_path, 'hdfs:///files/bar'),
+        ])
+
+        calls = [args for (args,), _ in popen.call_args_list]
+        self.assertEqual(len(calls), 3)
+        self.assertIn('-put', calls[0])
+        self.assertIn('-mkdir', calls[1])
+        self.assertEqual(calls[2], calls[0])
+
+    def test_put_many_no_put_to_dir(self):
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(ValueError, self.fs._put_many,
+                          [(local_path, 'hdfs:///')])
+
     def test_no_put_to_dir(self):
         local_path = self.makefile('foo', contents=b'bar')
 
@@ -192,6 +424,23 @@ class HadoopFSTestCase(MockSubprocessTestCase):
     def test_rm_nonexistent(self):
         self.fs.rm('hdfs:///baz')
 
+    def test_rm_many(self):
+        path1 = self.make_mock_file('foo/bar')
+        path2 = self.make_mock_file('baz')
+        path3 = self.make_mock_file('qux')
+
+        popen = self.count_popen_calls()
+
+        self.fs._rm_many(['hdfs:///foo', 'hdfs:///baz'])
+
+        self.assertEqual(os.path.exists(path1), False)
+        self.assertEqual(os.path.exists(path2), False)
+        self.assertEqual(os.path.exists(path3), True)
+
+        rm_calls = [args for (args,), _ in popen.call_args_list
+                    if '-rm' in args or '-rmr' in args]
+        self.assertEqual(len(rm_calls), 1)
+
     def test_touchz(self):
         self.assertEqual(list(self.fs.ls('hdfs:///')), [])
 
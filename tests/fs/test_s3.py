@@ -16,6 +16,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import bz2
+import os
 
 from botocore.exceptions import ClientError
 
@@ -65,6 +66,30 @@ class CatTestCase(MockBoto3TestCase):
             len(list(self.fs._cat_file('s3://walrus/data/foo'))),
             1)
 
+    def test_cat_many(self):
+        self.add_mock_s3_data(
+            {'walrus': {'data/foo': b'foo\n',
+                        'data/bar.gz': gzip_compress(b'bar\n')}})
+
+        foo_path = os.path.join(self.tmp_dir, 'foo')
+        bar_path = os.path.join(self.tmp_dir, 'bar')
+
+        self.fs._cat_many([('s3://walrus/data/foo', foo_path),
+                           ('s3://walrus/data/bar.gz', bar_path)])
+
+        with open(foo_path, 'rb') as f:
+            self.assertEqual(f.read(), b'foo\n')
+
+        with open(bar_path, 'rb') as f:
+            self.assertEqual(f.read(), b'bar\n')
+
+    def test_cat_many_missing_file(self):
+        self.add_mock_s3_data({'walrus': {}})
+
+        self.assertRaises(
+            ClientError, self.fs._cat_many,
+            [('s3://walrus/data/foo', os.path.join(self.tmp_dir, 'foo'))])
+
 
 class S3FSTestCase(MockBoto3TestCase):
 
@@ -189,6 +214,48 @@ class S3FSTestCase(MockBoto3TestCase):
             multipart_threshold=12345,
         )
 
+    def test_put_many(self):
+        self.add_mock_s3_data({'bar-files': {}, 'baz-files': {}})
+
+        srcs_and_paths = [
+            (self.makefile('foo%d' % i, contents=b'bar%d' % i),
+             's3://%s/foo%d' % ('bar-files' if i % 2 else 'baz-files', i))
+            for i in range(10)
+        ]
+
+        self.fs._put_many(srcs_and_paths)
+
+        for i, (_, path) in enumerate(srcs_and_paths):
+            self.assertEqual(b''.join(self.fs.cat(path)), b'bar%d' % i)
+
+        self.TransferConfig.assert_called_once_with(
+            multipart_chunksize=_HUGE_PART_SIZE,
+            multipart_threshold=_HUGE_PART_SIZE,
+        )
+
+    def test_put_many_shares_clients(self):
+        self.add_mock_s3_data({'bar-files': {}}, location='us-west-1')
+        self.add_mock_s3_data({'baz-files': {}}, location='us-west-1')
+
+        srcs_and_paths = [
+            (self.makefile('foo%d' % i, contents=b'bar'),
+             's3://%s/foo%d' % ('bar-files' if i % 2 else 'baz-files', i))
+            for i in range(10)
+        ]
+
+        with patch.object(self.fs, 'make_s3_client',
+                          wraps=self.fs.make_s3_client) as make_s3_client:
+            self.fs._put_many(srcs_and_paths)
+
+        # one client to upload, and one to look up each bucket's region
+        self.assertEqual(make_s3_client.call_count, 3)
+
+    def test_put_many_to_missing_bucket(self):
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(ClientError, self.fs._put_many,
+                          [(local_path, 's3://bar-files/foo')])
+
     def test_rm(self):
         self.add_mock_s3_data({
             'walrus': {'foo': b''}})
@@ -258,6 +325,16 @@ class S3FSTestCase(MockBoto3TestCase):
 
         self.assertEqual(list(self.fs.ls('s3://walrus/')), [])
 
+    def test_mkdir_many_checks_each_bucket_once(self):
+        self.add_mock_s3_data({'walrus': {}})
+
+        with patch.object(self.fs, 'mkdir') as mkdir:
+            self.fs._mkdir_many(['s3://walrus/cas/a', 's3://walrus/cas/b',
+                                 's3://kitteh/cas/c'])
+
+        self.assertEqual(sorted(args for (args,), _ in mkdir.call_args_list),
+                         ['s3://kitteh/', 's3://walrus/'])
+
     # S3-specific utilities
 
     def test_get_all_bucket_names(self):
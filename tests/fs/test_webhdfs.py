@@ -0,0 +1,376 @@
+# Copyright 2020 Affirm, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import bz2
+import os
+import socket
+from os.path import exists
+from os.path import isdir
+from os.path import join
+
+from mrjob.fs.composite import CompositeFilesystem
+from mrjob.fs.webhdfs import WebHDFSFilesystem
+from mrjob.fs.webhdfs import _is_unreachable
+from mrjob.hadoop import HadoopJobRunner
+
+from tests.compress import gzip_compress
+from tests.mockwebhdfs import MockWebHDFSServer
+from tests.py2 import Mock
+from tests.sandbox import SandboxedTestCase
+
+
+class WebHDFSFSTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(WebHDFSFSTestCase, self).setUp()
+
+        self.hdfs_root = self.makedirs('mock_hdfs')
+
+        self.server = MockWebHDFSServer(self.hdfs_root)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        self.fs = WebHDFSFilesystem(webhdfs_url=self.server.url,
+                                    user_name='mrjob_tests')
+
+    def make_mock_file(self, name, contents='contents'):
+        return self.makefile(join(self.hdfs_root, name), contents)
+
+    def test_can_handle_path(self):
+        self.assertTrue(self.fs.can_handle_path('hdfs:///data'))
+        self.assertTrue(self.fs.can_handle_path('webhdfs://nn:9870/data'))
+        self.assertTrue(self.fs.can_handle_path('swebhdfs://nn:9871/data'))
+        self.assertFalse(self.fs.can_handle_path('s3://walrus/data'))
+        self.assertFalse(self.fs.can_handle_path('/tmp/data'))
+
+    def test_only_handle_hdfs_uris_with_webhdfs_url(self):
+        fs = WebHDFSFilesystem()
+
+        self.assertFalse(fs.can_handle_path('hdfs:///data'))
+        self.assertTrue(fs.can_handle_path('webhdfs://nn:9870/data'))
+
+    def test_only_handle_hdfs_uris_on_same_cluster(self):
+        fs = WebHDFSFilesystem(webhdfs_url='http://nn:9870')
+
+        self.assertTrue(fs.can_handle_path('hdfs:///data'))
+        self.assertTrue(fs.can_handle_path('hdfs://nn/data'))
+        self.assertTrue(fs.can_handle_path('hdfs://NN:8020/data'))
+        self.assertFalse(fs.can_handle_path('hdfs://other-nn/data'))
+        self.assertFalse(fs.can_handle_path('hdfs://other-nn:9870/data'))
+
+    def test_other_cluster_is_an_error(self):
+        self.make_mock_file('data/foo', 'foo\n')
+
+        self.assertRaises(IOError, self.fs._cat_file,
+                          'hdfs://other-nn:8020/data/foo')
+        self.assertRaises(IOError, self.fs.exists,
+                          'hdfs://other-nn:8020/data/foo')
+
+    def test_cat_uncompressed(self):
+        self.make_mock_file('data/foo', 'foo\nfoo\n')
+
+        self.assertEqual(
+            b''.join(self.fs._cat_file('hdfs:///data/foo')),
+            b'foo\nfoo\n')
+
+    def test_cat_bz2(self):
+        self.make_mock_file('data/foo.bz2', bz2.compress(b'foo\n' * 1000))
+
+        self.assertEqual(
+            b''.join(self.fs._cat_file('hdfs:///data/foo.bz2')),
+            b'foo\n' * 1000)
+
+    def test_cat_gz(self):
+        self.make_mock_file('data/foo.gz', gzip_compress(b'foo\n' * 10000))
+
+        self.assertEqual(
+            b''.join(self.fs._cat_file('hdfs:///data/foo.gz')),
+            b'foo\n' * 10000)
+
+    def test_cat_large_file_in_chunks(self):
+        data = b'abcdefghij' * 20000
+        self.make_mock_file('big', data)
+
+        chunks = list(self.fs._cat_file('hdfs:///big'))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), data)
+
+    def test_cat_missing_file(self):
+        self.assertRaises(IOError, self.fs._cat_file, 'hdfs:///nope')
+
+    def test_cat_glob(self):
+        self.make_mock_file('data/a', 'a\n')
+        self.make_mock_file('data/b', 'b\n')
+
+        self.assertEqual(b''.join(self.fs.cat('hdfs:///data/*')), b'a\nb\n')
+
+    def test_cat_many(self):
+        for i in range(10):
+            self.make_mock_file('data/%d' % i, '%d\n' % i)
+
+        paths_and_dests = [('hdfs:///data/%d' % i, join(self.tmp_dir, str(i)))
+                           for i in range(10)]
+
+        self.fs._cat_many(paths_and_dests)
+
+        for i, (_, dest) in enumerate(paths_and_dests):
+            with open(dest, 'rb') as f:
+                self.assertEqual(f.read(), ('%d\n' % i).encode('ascii'))
+
+        # idle connections are re-used
+        self.assertLessEqual(self.server.num_connections, 8)
+
+    def test_cat_many_missing_file(self):
+        self.assertRaises(IOError, self.fs._cat_many,
+                          [('hdfs:///nope', join(self.tmp_dir, 'nope'))])
+
+    def test_ls_empty(self):
+        self.assertEqual(list(self.fs.ls('hdfs:///')), [])
+
+    def test_ls_basic(self):
+        self.make_mock_file('f')
+        self.assertEqual(list(self.fs.ls('hdfs:///')), ['hdfs:///f'])
+
+    def test_ls_recurse(self):
+        self.make_mock_file('f')
+        self.make_mock_file('d/f2')
+        self.make_mock_file('d/e/f3')
+
+        self.assertEqual(list(self.fs.ls('hdfs:///')),
+                         ['hdfs:///d/e/f3', 'hdfs:///d/f2', 'hdfs:///f'])
+
+    def test_ls_file(self):
+        self.make_mock_file('d/f')
+        self.assertEqual(list(self.fs.ls('hdfs:///d/f')), ['hdfs:///d/f'])
+
+    def test_ls_missing(self):
+        self.assertEqual(list(self.fs.ls('hdfs:///nope')), [])
+
+    def test_ls_glob(self):
+        self.make_mock_file('logs/2020-01/part-00000')
+        self.make_mock_file('logs/2020-02/part-00000')
+        self.make_mock_file('logs/2020-02/part-00001')
+        self.make_mock_file('logs/2019-12/part-00000')
+        self.make_mock_file('logs/2020-03/_SUCCESS')
+
+        self.assertEqual(
+            list(self.fs.ls('hdfs:///logs/2020-*/part-*')),
+            ['hdfs:///logs/2020-01/part-00000',
+             'hdfs:///logs/2020-02/part-00000',
+             'hdfs:///logs/2020-02/part-00001'])
+
+    def test_ls_space(self):
+        self.make_mock_file('foo  bar')
+        self.assertEqual(list(self.fs.ls('hdfs:///')), ['hdfs:///foo  bar'])
+
+    def test_ls_keeps_netloc(self):
+        self.make_mock_file('d/f')
+        # namenode RPC port, not the HTTP port
+        self.assertEqual(list(self.fs.ls('hdfs://127.0.0.1:8020/d')),
+                         ['hdfs://127.0.0.1:8020/d/f'])
+
+    def test_ls_webhdfs_uri(self):
+        self.make_mock_file('d/f')
+
+        uri = 'webhdfs://%s/d' % self.server.netloc
+
+        self.assertEqual(list(WebHDFSFilesystem().ls(uri)), [uri + '/f'])
+
+    def test_du(self):
+        self.make_mock_file('data1', 'abcd')
+        self.make_mock_file('more/data2', 'defg')
+        self.make_mock_file('more/data3', 'hijk')
+
+        self.assertEqual(self.fs.du('hdfs:///'), 12)
+        self.assertEqual(self.fs.du('hdfs:///data1'), 4)
+        self.assertEqual(self.fs.du('hdfs:///more'), 8)
+        self.assertEqual(self.fs.du('hdfs:///more/*'), 8)
+        self.assertEqual(self.fs.du('hdfs:///more/data2'), 4)
+
+    def test_du_non_existent(self):
+        self.assertEqual(self.fs.du('hdfs:///does-not-exist'), 0)
+
+    def test_exists(self):
+        self.make_mock_file('f')
+        self.makedirs(join(self.hdfs_root, 'empty'))
+
+        self.assertEqual(self.fs.exists('hdfs:///f'), True)
+        self.assertEqual(self.fs.exists('hdfs:///empty'), True)
+        self.assertEqual(self.fs.exists('hdfs:///f*'), True)
+        self.assertEqual(self.fs.exists('hdfs:///g'), False)
+        self.assertEqual(self.fs.exists('hdfs:///g*'), False)
+
+    def test_mkdir(self):
+        self.fs.mkdir('hdfs:///d/ave')
+        self.assertEqual(isdir(join(self.hdfs_root, 'd', 'ave')), True)
+
+    def test_put(self):
+        local_path = self.makefile('foo', contents=b'bar')
+        dest = 'hdfs:///bar'
+
+        self.fs.put(local_path, dest)
+        self.assertEqual(b''.join(self.fs.cat(dest)), b'bar')
+
+    def test_put_empty_file(self):
+        local_path = self.makefile('foo', contents=b'')
+
+        self.fs.put(local_path, 'hdfs:///foo')
+        self.assertEqual(os.path.getsize(join(self.hdfs_root, 'foo')), 0)
+
+    def test_no_put_to_dir(self):
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(ValueError, self.fs.put, local_path, 'hdfs:///')
+
+    def test_put_wont_overwrite(self):
+        self.make_mock_file('bar')
+        local_path = self.makefile('foo', contents=b'bar')
+
+        self.assertRaises(IOError, self.fs.put, local_path, 'hdfs:///bar')
+
+    def test_error_message(self):
+        self.make_mock_file('bar')
+        local_path = self.makefile('foo', contents=b'bar')
+
+        try:
+            self.fs.put(local_path, 'hdfs:///bar')
+        except IOError as ex:
+            self.assertIn('FileAlreadyExistsException', str(ex))
+            self.assertFalse(_is_unreachable(ex))
+        else:
+            self.fail('Expected IOError')
+
+    def test_rm(self):
+        path = self.make_mock_file('f')
+        self.fs.rm('hdfs:///f')
+        self.assertEqual(exists(path), False)
+
+    def test_rm_recursive(self):
+        path = self.make_mock_file('foo/bar')
+        self.fs.rm('hdfs:///foo')
+        self.assertEqual(exists(path), False)
+
+    def test_rm_glob(self):
+        path1 = self.make_mock_file('foo/bar')
+        path2 = self.make_mock_file('foo/baz')
+        path3 = self.make_mock_file('foo/qux')
+
+        self.fs.rm('hdfs:///foo/ba*')
+
+        self.assertEqual(exists(path1), False)
+        self.assertEqual(exists(path2), False)
+        self.assertEqual(exists(path3), True)
+
+    def test_rm_nonexistent(self):
+        self.fs.rm('hdfs:///baz')
+
+    def test_touchz(self):
+        self.fs.touchz('hdfs:///empty')
+        self.assertEqual(list(self.fs.ls('hdfs:///')), ['hdfs:///empty'])
+
+        # okay to touchz an empty file again
+        self.fs.touchz('hdfs:///empty')
+
+    def test_touchz_non_empty_file(self):
+        self.make_mock_file('full', 'data')
+        self.assertRaises(IOError, self.fs.touchz, 'hdfs:///full')
+
+    def test_exists_is_one_request(self):
+        self.fs.exists('hdfs:///f')
+
+        self.assertEqual(self.server.requests,
+                         [('GET', 'GETFILESTATUS', '/f')])
+
+    def test_reuses_connections(self):
+        for i in range(10):
+            self.make_mock_file('d/%d' % i)
+
+        self.fs = WebHDFSFilesystem(webhdfs_url=self.server.url,
+                                    list_threads=1)
+
+        for _ in range(3):
+            self.assertEqual(len(list(self.fs.ls('hdfs:///d'))), 10)
+            self.assertEqual(b''.join(self.fs.cat('hdfs:///d/*')),
+                             b'contents' * 10)
+
+        self.assertEqual(self.server.num_connections, 1)
+
+    def test_webhdfs_url_with_api_path(self):
+        self.make_mock_file('f')
+
+        fs = WebHDFSFilesystem(webhdfs_url=self.server.url + '/webhdfs/v1/')
+
+        self.assertEqual(list(fs.ls('hdfs:///')), ['hdfs:///f'])
+
+
+class UnreachableTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(UnreachableTestCase, self).setUp()
+
+        # find a port nobody is listening on
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        self.url = 'http://127.0.0.1:%d' % s.getsockname()[1]
+        s.close()
+
+    def test_connection_refused(self):
+        fs = WebHDFSFilesystem(webhdfs_url=self.url)
+
+        try:
+            fs.exists('hdfs:///f')
+        except Exception as ex:
+            self.assertTrue(_is_unreachable(ex))
+        else:
+            self.fail('Expected exception')
+
+    def test_composite_fs_falls_back(self):
+        fs = CompositeFilesystem()
+
+        fs.add_fs('webhdfs', WebHDFSFilesystem(webhdfs_url=self.url),
+                  disable_if=_is_unreachable)
+        fallback_fs = Mock()
+        fs.add_fs('hadoop', fallback_fs)
+
+        fallback_fs.ls.return_value = iter(['hdfs:///f'])
+
+        self.assertEqual(list(fs.ls('hdfs:///')), ['hdfs:///f'])
+        self.assertIn('webhdfs', fs._disabled)
+
+
+class HadoopRunnerWebHDFSTestCase(SandboxedTestCase):
+
+    def test_default(self):
+        runner = HadoopJobRunner()
+
+        self.assertFalse(runner.fs.webhdfs.can_handle_path('hdfs:///'))
+        self.assertTrue(runner.fs.webhdfs.can_handle_path('webhdfs://nn/'))
+
+    def test_webhdfs_url(self):
+        runner = HadoopJobRunner(webhdfs_url='http://nn:9870')
+
+        self.assertTrue(runner.fs.webhdfs.can_handle_path('hdfs:///'))
+
+    def test_comes_before_hadoop_fs(self):
+        runner = HadoopJobRunner(webhdfs_url='http://nn:9870')
+
+        self.assertEqual(runner.fs._fs_names[:2], ['webhdfs', 'hadoop'])
+
+    def test_other_clusters_use_hadoop_fs(self):
+        runner = HadoopJobRunner(webhdfs_url='http://nn:9870')
+
+        self.assertFalse(
+            runner.fs.webhdfs.can_handle_path('hdfs://other-nn/data'))
+        self.assertTrue(
+            runner.fs.hadoop.can_handle_path('hdfs://other-nn/data'))
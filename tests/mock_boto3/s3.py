@@ -110,6 +110,9 @@ class MockS3Client(object):
         # "Location" here actually refers to the bucket name
         return dict(Location=('/' + Bucket))
 
+    def get_object(self, Bucket, Key):
+        return MockS3Object(self, Bucket, Key).get()
+
     def get_bucket_location(self, Bucket):
         self._check_bucket_exists(Bucket, 'GetBucketLocation')
 
@@ -122,6 +125,10 @@ class MockS3Client(object):
 
         return dict()
 
+    def upload_file(self, Filename, Bucket, Key, Config=None):
+        return MockS3Object(self, Bucket, Key).upload_file(
+            Filename, Config=Config)
+
     def list_buckets(self):
         buckets = [
             dict(CreationDate=b['creation_date'], Name=name)
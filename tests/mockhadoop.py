@@ -42,11 +42,17 @@ import glob
 import json
 import os
 import os.path
-import pipes
 import shutil
 import stat
 import sys
 
+# importing pipes prints a DeprecationWarning on Python 3.11+, which would
+# show up in mock hadoop's stderr
+try:
+    from shlex import quote
+except ImportError:
+    from pipes import quote
+
 from mrjob.compat import uses_yarn
 from mrjob.hadoop import _HADOOP_STREAMING_JAR_RE
 from mrjob.parse import urlparse
@@ -101,8 +107,8 @@ def create_mock_hadoop_script(path):
     with open(path, 'w') as f:
         f.write('#!/bin/sh\n')
         f.write('%s %s "$@"\n' % (
-            pipes.quote(sys.executable),
-            pipes.quote(os.path.abspath(__file__))))
+            quote(sys.executable),
+            quote(os.path.abspath(__file__))))
     os.chmod(path, stat.S_IREAD | stat.S_IEXEC)
 
 
@@ -257,7 +263,7 @@ def main(stdin, stdout, stderr, argv, environ):
     # log what commands we ran
     cmd_log_path = os.path.join(get_mock_dir(environ=environ), 'cmd.log')
     with open(cmd_log_path, 'a') as cmd_log:
-        cmd_log.write(' '.join(pipes.quote(arg) for arg in argv[1:]))
+        cmd_log.write(' '.join(quote(arg) for arg in argv[1:]))
         cmd_log.write('\n')
         cmd_log.flush()
 
@@ -554,9 +560,13 @@ def hadoop_fs_put(stdout, stderr, environ, *args):
 
     real_dst = hdfs_uri_to_real_path(dst, environ)
     real_dir = os.path.dirname(real_dst)
-    # dst could be a dir or a filename; we don't know
-    if not (os.path.isdir(real_dst) or os.path.isdir(real_dir)):
-        os.makedirs(real_dir)
+
+    # like real Hadoop, don't create missing directories. dst could be a
+    # dir or a filename, but it must be a dir if there are several srcs
+    if not (os.path.isdir(real_dst) or
+            (len(srcs) == 1 and os.path.isdir(real_dir))):
+        print("put: `%s': No such file or directory" % dst, file=stderr)
+        return 1
 
     for src in srcs:
         shutil.copy(src, real_dst)
@@ -0,0 +1,286 @@
+# Copyright 2020 Affirm, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A fake WebHDFS server that actually manipulates the local filesystem.
+This imitates only the operations that mrjob actually uses.
+
+Use it like this::
+
+    server = MockWebHDFSServer(root)
+    server.start()
+    ...  # talk to server.url
+    server.stop()
+
+Like a real namenode, it redirects ``OPEN`` and ``CREATE`` requests (to
+itself), and it keeps connections alive.
+"""
+import json
+import os
+import shutil
+import threading
+from os.path import exists
+from os.path import getsize
+from os.path import isdir
+from os.path import join
+
+from mrjob.py2 import PY2
+from mrjob.py2 import urlparse
+
+if PY2:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+    from urlparse import parse_qs
+else:
+    from http.server import BaseHTTPRequestHandler
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+    from urllib.parse import unquote
+
+_API_PREFIX = '/webhdfs/v1'
+
+
+class MockWebHDFSServer(ThreadingMixIn, HTTPServer):
+    """Serve WebHDFS requests for a fake HDFS rooted at *root*, on a
+    random port on localhost.
+
+    *requests* is a list of ``(method, op, path)`` for each request
+    received, and *num_connections* counts connections accepted.
+    """
+    daemon_threads = True
+
+    def __init__(self, root):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _MockWebHDFSHandler)
+
+        self.root = root
+        self.requests = []
+        self.num_connections = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    @property
+    def netloc(self):
+        return '127.0.0.1:%d' % self.server_address[1]
+
+    def start(self):
+        # poll often, so that stop() is quick
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        kwargs=dict(poll_interval=0.01))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def process_request(self, request, client_address):
+        self.num_connections += 1
+        return ThreadingMixIn.process_request(self, request, client_address)
+
+    def real_path(self, hdfs_path):
+        return join(self.root, hdfs_path.lstrip('/'))
+
+
+class _MockWebHDFSHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass  # keep test output clean
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def _handle(self, method):
+        parsed = urlparse(self.path)
+        params = dict((k, v[0]) for k, v in parse_qs(parsed.query).items())
+
+        if not parsed.path.startswith(_API_PREFIX):
+            self._send_error(404, 'FileNotFoundException', parsed.path)
+            return
+
+        hdfs_path = unquote(parsed.path[len(_API_PREFIX):]) or '/'
+        op = params.get('op', '')
+
+        self.server.requests.append((method, op, hdfs_path))
+
+        handler = getattr(self, '_%s_%s' % (method, op.lower()), None)
+        if handler is None:
+            self._send_error(400, 'IllegalArgumentException',
+                             'Invalid value for webhdfs parameter "op"')
+            return
+
+        handler(hdfs_path, self.server.real_path(hdfs_path), params)
+
+    # GET
+
+    def _GET_getfilestatus(self, hdfs_path, real_path, params):
+        if not exists(real_path):
+            self._send_not_found(hdfs_path)
+        else:
+            self._send_json(dict(FileStatus=_file_status(real_path, '')))
+
+    def _GET_liststatus(self, hdfs_path, real_path, params):
+        if not exists(real_path):
+            self._send_not_found(hdfs_path)
+        elif isdir(real_path):
+            statuses = [_file_status(join(real_path, name), name)
+                        for name in sorted(os.listdir(real_path))]
+            self._send_json(dict(FileStatuses=dict(FileStatus=statuses)))
+        else:
+            self._send_json(dict(FileStatuses=dict(
+                FileStatus=[_file_status(real_path, '')])))
+
+    def _GET_getcontentsummary(self, hdfs_path, real_path, params):
+        if not exists(real_path):
+            self._send_not_found(hdfs_path)
+            return
+
+        length = 0
+        file_count = 0
+        directory_count = 0
+
+        for dirpath, dirnames, filenames in os.walk(real_path):
+            directory_count += 1
+            for filename in filenames:
+                file_count += 1
+                length += getsize(join(dirpath, filename))
+
+        self._send_json(dict(ContentSummary=dict(
+            directoryCount=directory_count,
+            fileCount=file_count,
+            length=length,
+        )))
+
+    def _GET_open(self, hdfs_path, real_path, params):
+        if 'datanode' not in params:
+            self._send_redirect()
+        elif not exists(real_path) or isdir(real_path):
+            self._send_not_found(hdfs_path)
+        else:
+            with open(real_path, 'rb') as f:
+                data = f.read()
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    # PUT
+
+    def _PUT_mkdirs(self, hdfs_path, real_path, params):
+        if not isdir(real_path):
+            os.makedirs(real_path)
+
+        self._send_json(dict(boolean=True))
+
+    def _PUT_create(self, hdfs_path, real_path, params):
+        # the namenode doesn't accept data
+        if 'datanode' not in params:
+            self._read_body()
+            self._send_redirect()
+            return
+
+        data = self._read_body()
+
+        if exists(real_path) and params.get('overwrite') != 'true':
+            self._send_error(
+                403, 'FileAlreadyExistsException',
+                '%s for client 127.0.0.1 already exists' % hdfs_path)
+            return
+
+        parent = os.path.dirname(real_path)
+        if not isdir(parent):
+            os.makedirs(parent)
+
+        with open(real_path, 'wb') as f:
+            f.write(data)
+
+        self.send_response(201)
+        self.send_header('Location', 'hdfs://%s' % hdfs_path)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    # DELETE
+
+    def _DELETE_delete(self, hdfs_path, real_path, params):
+        if not exists(real_path):
+            self._send_json(dict(boolean=False))
+        elif isdir(real_path):
+            if os.listdir(real_path) and params.get('recursive') != 'true':
+                self._send_error(
+                    403, 'PathIsNotEmptyDirectoryException',
+                    '%s is non empty' % hdfs_path)
+                return
+
+            shutil.rmtree(real_path)
+            self._send_json(dict(boolean=True))
+        else:
+            os.remove(real_path)
+            self._send_json(dict(boolean=True))
+
+    # helpers
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf_8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, exception, message):
+        self._send_json(dict(RemoteException=dict(
+            exception=exception,
+            javaClassName='org.apache.hadoop.' + exception,
+            message=message,
+        )), status=status)
+
+    def _send_not_found(self, hdfs_path):
+        self._send_error(404, 'FileNotFoundException',
+                         'File does not exist: %s' % hdfs_path)
+
+    def _send_redirect(self):
+        # pretend to be a datanode
+        location = '%s%s&datanode=true' % (self.server.url, self.path)
+
+        self.send_response(307)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def _file_status(real_path, path_suffix):
+    if isdir(real_path):
+        return dict(length=0, pathSuffix=path_suffix, type='DIRECTORY')
+    else:
+        return dict(length=getsize(real_path), pathSuffix=path_suffix,
+                    type='FILE')
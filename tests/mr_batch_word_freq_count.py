@@ -0,0 +1,42 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Count the frequency of words, using the batch versions of mapper,
+combiner, and reducer."""
+import re
+from collections import Counter
+
+from mrjob.job import MRJob
+
+WORD_RE = re.compile(r"[\w']+")
+
+
+class MRBatchWordFreqCount(MRJob):
+
+    def mapper_batch(self, _, lines):
+        self.increment_counter('batch', 'mapper', 1)
+
+        counts = Counter(
+            word.lower() for line in lines for word in WORD_RE.findall(line))
+
+        return counts.items()
+
+    def combiner_batch(self, word, counts):
+        yield (word, sum(counts))
+
+    def reducer_batch(self, word, counts):
+        yield (word, sum(counts))
+
+
+if __name__ == '__main__':
+    MRBatchWordFreqCount.run()
@@ -0,0 +1,33 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Job that reports which process loaded its script, and which process
+ran each task."""
+import os
+
+from mrjob.job import MRJob
+
+LOAD_PID = os.getpid()
+
+
+class MRLoadPIDJob(MRJob):
+
+    def mapper(self, _, line):
+        pass
+
+    def mapper_final(self):
+        yield LOAD_PID, os.getpid()
+
+
+if __name__ == '__main__':
+    MRLoadPIDJob.run()
@@ -0,0 +1,55 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Count words by their first letter and length, passing tuples and bytes
+between steps with MarshalProtocol."""
+from mrjob.job import MRJob
+from mrjob.protocol import MarshalProtocol
+from mrjob.step import MRStep
+
+
+class MRMarshalInternalJob(MRJob):
+
+    INTERNAL_PROTOCOL = MarshalProtocol
+
+    def steps(self):
+        return [
+            MRStep(mapper=self.mapper,
+                   combiner=self.combiner,
+                   reducer=self.reducer),
+            MRStep(reducer=self.reducer_check_types),
+        ]
+
+    def mapper(self, _, line):
+        for word in line.split():
+            # tabs and newlines in keys and values, to exercise escaping
+            yield (word[0], len(word), '\t\n'), word.encode('utf_8')
+
+    def combiner(self, key, words):
+        yield key, set(words)
+
+    def reducer(self, key, word_sets):
+        yield key, set().union(*word_sets)
+
+    def reducer_check_types(self, key, word_sets):
+        for words in word_sets:
+            assert isinstance(key, tuple)
+            assert all(isinstance(word, bytes) for word in words)
+
+            letter, length, _ = key
+            yield '%s%d' % (letter, length), sorted(
+                word.decode('utf_8') for word in words)
+
+
+if __name__ == '__main__':
+    MRMarshalInternalJob.run()
@@ -0,0 +1,36 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sum numbers under one key, which the mapper yields both as an
+interned string and as an equal string built at runtime, passing data
+between mapper and reducer with MarshalProtocol."""
+from mrjob.job import MRJob
+from mrjob.protocol import MarshalProtocol
+
+
+class MRMarshalTotalJob(MRJob):
+
+    INTERNAL_PROTOCOL = MarshalProtocol
+
+    def mapper(self, _, line):
+        n = int(line)
+
+        yield 'total', n
+        yield ''.join(['to', 'tal']), n * 2
+
+    def reducer(self, key, values):
+        yield key, sum(values)
+
+
+if __name__ == '__main__':
+    MRMarshalTotalJob.run()
@@ -0,0 +1,41 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Job that pickles instances of a class defined in the job script
+between mapper and reducer."""
+from mrjob.job import MRJob
+from mrjob.protocol import PickleProtocol
+
+
+class Pt(object):
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class MRPickleScriptClass(MRJob):
+
+    INTERNAL_PROTOCOL = PickleProtocol
+
+    def mapper(self, _, line):
+        x, y = line.split()
+        yield 'pt', Pt(int(x), int(y))
+
+    def reducer(self, key, pts):
+        pts = list(pts)
+        yield key, [sum(pt.x for pt in pts), sum(pt.y for pt in pts)]
+
+
+if __name__ == '__main__':
+    MRPickleScriptClass.run()
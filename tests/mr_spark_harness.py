@@ -24,6 +24,7 @@ _PASSTHRU_OPTION_STRINGS = {
 # handled separately because these are also runner options
 _PASSTHRU_OPTION_STRINGS.update({
     '--emulate-map-input-file',
+    '--fuse-steps',
     '--max-output-files',
     '--skip-internal-protocol',
 })
@@ -45,6 +46,7 @@ class MRSparkHarness(MRJob):
 
         # these are both runner and harness switches
         self.pass_arg_through('--emulate-map-input-file')
+        self.pass_arg_through('--fuse-steps')
         self.pass_arg_through('--max-output-files')
         self.pass_arg_through('--skip-internal-protocol')
 
@@ -0,0 +1,90 @@
+# Copyright 2020 Affirm, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the Spark harness's cache of job instances."""
+from mrjob.job import MRJob
+from mrjob.spark.cache import _JOB_CACHE
+from mrjob.spark.cache import _get_job
+
+from tests.sandbox import BasicTestCase
+
+
+class MRCountConstructionsJob(MRJob):
+
+    num_constructed = 0
+    num_worker_inits = 0
+
+    def __init__(self, *args, **kwargs):
+        super(MRCountConstructionsJob, self).__init__(*args, **kwargs)
+        MRCountConstructionsJob.num_constructed += 1
+
+    def worker_init(self):
+        MRCountConstructionsJob.num_worker_inits += 1
+        self.model = dict(loaded=True)
+
+    def mapper(self, key, value):
+        yield key, value
+
+
+class GetJobTestCase(BasicTestCase):
+
+    def setUp(self):
+        super(GetJobTestCase, self).setUp()
+
+        _JOB_CACHE.clear()
+        self.addCleanup(_JOB_CACHE.clear)
+
+        MRCountConstructionsJob.num_constructed = 0
+        MRCountConstructionsJob.num_worker_inits = 0
+
+    def test_construct_and_init_once(self):
+        args = ['--mapper', '--step-num=0']
+
+        job1 = _get_job(MRCountConstructionsJob, args)
+        job2 = _get_job(MRCountConstructionsJob, args)
+
+        self.assertEqual(MRCountConstructionsJob.num_constructed, 1)
+        self.assertEqual(MRCountConstructionsJob.num_worker_inits, 1)
+
+        self.assertTrue(job1.options.run_mapper)
+        # worker_init() state is shared
+        self.assertIs(job1.model, job2.model)
+
+    def test_returns_copies(self):
+        args = ['--mapper', '--step-num=0']
+
+        job1 = _get_job(MRCountConstructionsJob, args)
+        job1.increment_counter = None
+
+        job2 = _get_job(MRCountConstructionsJob, args)
+
+        self.assertIsNot(job1, job2)
+        self.assertIsNotNone(job2.increment_counter)
+
+    def test_keyed_by_args(self):
+        mapper_job = _get_job(
+            MRCountConstructionsJob, ['--mapper', '--step-num=0'])
+        reducer_job = _get_job(
+            MRCountConstructionsJob, ['--reducer', '--step-num=0'])
+
+        self.assertEqual(MRCountConstructionsJob.num_constructed, 2)
+        self.assertTrue(mapper_job.options.run_mapper)
+        self.assertTrue(reducer_job.options.run_reducer)
+
+    def test_keyed_by_job_class(self):
+        args = ['--mapper', '--step-num=0']
+
+        _get_job(MRCountConstructionsJob, args)
+        job = _get_job(MRJob, args)
+
+        self.assertEqual(type(job), MRJob)
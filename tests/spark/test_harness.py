@@ -18,6 +18,7 @@ import random
 import string
 import json
 from io import BytesIO
+from collections import defaultdict
 from contextlib import contextmanager
 from os import listdir
 from os.path import abspath
@@ -34,10 +35,12 @@ from mrjob.examples.mr_nick_nack_input_format import \
     MRNickNackWithHadoopInputFormat
 from mrjob.examples.mr_word_freq_count import MRWordFreqCount
 from mrjob.job import MRJob
+from mrjob.step import MRStep
 from mrjob.util import cmd_line
 from mrjob.util import to_lines
 
 # tests.mr_spark_harness is imported below because it requires pyspark
+from tests.mr_batch_word_freq_count import MRBatchWordFreqCount
 from tests.mr_counting_job import MRCountingJob
 from tests.mr_doubler import MRDoubler
 from tests.mr_no_mapper import MRNoMapper
@@ -49,6 +52,8 @@ from tests.mr_two_step_job import MRTwoStepJob
 from tests.mr_word_freq_count_with_combiner_cmd import \
     MRWordFreqCountWithCombinerCmd
 from tests.py2 import Mock
+from tests.py2 import patch
+from tests.sandbox import BasicTestCase
 from tests.sandbox import pyspark  # None if not installed
 from tests.sandbox import SandboxedTestCase
 from tests.sandbox import SingleSparkContextTestCase
@@ -75,6 +80,12 @@ class MRWordFreqCountFailingCombiner(MRWordFreqCount):
         raise Exception(self.unique_exception_str)
 
 
+class MRWordFreqCountNoReducer(MRWordFreqCount):
+
+    def steps(self):
+        return [MRStep(mapper=self.mapper, combiner=self.combiner)]
+
+
 class MRSumValuesByWord(MRJob):
     # if combiner is run, keys with values that sum to 0
     # will be eliminated
@@ -108,6 +119,21 @@ class MRSumValuesByWordWithNoCombinerJobs(MRSumValuesByWord):
             raise NotImplementedError("Can't init combiner jobs")
 
 
+class MRTupleThenTypeName(MRJob):
+    """Two mapper-only steps. The first yields a tuple, and the second
+    yields the name of the type it receives."""
+
+    def steps(self):
+        return [MRStep(mapper=self.mapper_tuple),
+                MRStep(mapper=self.mapper_type_name)]
+
+    def mapper_tuple(self, _, line):
+        yield line, (1, 2)
+
+    def mapper_type_name(self, key, value):
+        yield key, type(value).__name__
+
+
 @skipIf(pyspark is None, 'no pyspark module')
 class SparkHarnessOutputComparisonBaseTestCase(
         SandboxedTestCase, SingleSparkContextTestCase):
@@ -138,7 +164,7 @@ class SparkHarnessOutputComparisonBaseTestCase(
             last_step_num=None, counter_output_dir=None,
             num_reducers=None, max_output_files=None,
             emulate_map_input_file=False,
-            skip_internal_protocol=False):
+            skip_internal_protocol=False, fuse_steps=False):
         from tests.mr_spark_harness import MRSparkHarness
 
         job_class_path = '%s.%s' % (job_class.__module__, job_class.__name__)
@@ -174,6 +200,9 @@ class SparkHarnessOutputComparisonBaseTestCase(
         if skip_internal_protocol:
             harness_job_args.append('--skip-internal-protocol')
 
+        if fuse_steps:
+            harness_job_args.append('--fuse-steps')
+
         harness_job_args.extend(input_paths)
 
         harness_job = MRSparkHarness(harness_job_args)
@@ -191,7 +220,8 @@ class SparkHarnessOutputComparisonBaseTestCase(
     def _assert_output_matches(
             self, job_class, input_bytes=b'', input_paths=(), job_args=[],
             num_reducers=None, max_output_files=None,
-            emulate_map_input_file=False, skip_internal_protocol=False):
+            emulate_map_input_file=False, skip_internal_protocol=False,
+            fuse_steps=False):
 
         # run classes defined in this module in inline mode, classes
         # with their own script files in local mode. used by
@@ -228,6 +258,7 @@ class SparkHarnessOutputComparisonBaseTestCase(
             num_reducers=num_reducers,
             emulate_map_input_file=emulate_map_input_file,
             skip_internal_protocol=skip_internal_protocol,
+            fuse_steps=fuse_steps,
             runner_alias=harness_job_runner_alias)
 
         with harness_job.make_runner() as runner:
@@ -246,6 +277,12 @@ class SparkHarnessOutputComparisonTestCase(
 
         self._assert_output_matches(MRWordFreqCount, input_bytes=input_bytes)
 
+    def test_batch_job(self):
+        input_bytes = b'one fish\ntwo fish\nred fish\nblue fish\n'
+
+        self._assert_output_matches(
+            MRBatchWordFreqCount, input_bytes=input_bytes)
+
     def test_two_step_job(self):
         input_bytes = b'foo\nbar\n'
 
@@ -365,12 +402,12 @@ class SparkHarnessOutputComparisonTestCase(
             input_bytes=input_bytes)
 
         # Given that the combiner for this job yields the count and 1000 for
-        # each word and the Spark harness' combiner helper stops running
-        # jobs' combiners if they do not reduce the mapper's output to a single
-        # value per key, we expect the combiner to run once per word, resulting
+        # each word and the Spark harness stops running jobs' combiners on
+        # keys where they do not reduce the mapper's output to a single
+        # value, we expect the combiner to run once per word, resulting
         # in an extra 1000 being added to each word's count.
         #
-        # Note that if combiner_helper did not stop running the combiner in
+        # Note that if the harness did not stop running the combiner in
         # this case, we would expect 2000 to be added to each word's count
         # since each word appears 3 times, resulting in 2 calls to
         # combine_pairs.
@@ -413,6 +450,19 @@ class SparkHarnessOutputComparisonTestCase(
                 dict(happy=7),  # combiner should eliminate sad=0
             )
 
+    def test_combiner_without_reducer(self):
+        input_bytes = b'one two three one two three one two three'
+
+        job = self._harness_job(
+            MRWordFreqCountNoReducer, input_bytes=input_bytes)
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                sorted(job.parse_output(runner.cat_output())),
+                [('one', 3), ('three', 3), ('two', 3)])
+
     def test_skip_combiner_if_runs_subprocesses(self):
         # same as above, but we have to skip combiner because of its pre-filter
         input_bytes = b'happy\t5\nsad\t3\nhappy\t2\nsad\t-3\n'
@@ -556,6 +606,35 @@ class SkipInternalProtocolTestCase(
                     b=['baby', 'balloon', 'bowling']))
 
 
+class FuseStepsTestCase(SparkHarnessOutputComparisonBaseTestCase):
+
+    def test_two_step_job(self):
+        input_bytes = b'foo\nbar\n'
+
+        self._assert_output_matches(
+            MRTwoStepJob, input_bytes=input_bytes, fuse_steps=True)
+
+    def test_mapper_only_steps(self):
+        input_bytes = b'"three"\t3\n"five"\t5'
+
+        self._assert_output_matches(
+            MRDoubler, input_bytes=input_bytes, job_args=['-n', '5'],
+            fuse_steps=True)
+
+    def test_job_with_no_mapper_in_second_step(self):
+        input_bytes = b'one fish\ntwo fish\nred fish\nblue fish\n'
+
+        self._assert_output_matches(
+            MRNoMapper, input_bytes=input_bytes, fuse_steps=True)
+
+    def test_skip_internal_protocol(self):
+        input_bytes = b'foo\nbar\n'
+
+        self._assert_output_matches(
+            MRTwoStepJob, input_bytes=input_bytes, fuse_steps=True,
+            skip_internal_protocol=True)
+
+
 class SparkConfigureReducerTestCase(SparkHarnessOutputComparisonBaseTestCase):
 
     def _assert_partition_count_different(self, cls, num_reducers):
@@ -766,6 +845,272 @@ class EmulateMapInputFileTestCase(SparkHarnessOutputComparisonBaseTestCase):
             input_paths=[two_lines_path])
 
 
+@skipIf(pyspark is None, 'no pyspark module')
+class ShuffleAndSortTestCase(SingleSparkContextTestCase):
+
+    LINES = [b'"b"\t2', b'"a"\t3', b'"b"\t1', b'"c"\t1', b'"a"\t1',
+             b'"a"\t2', b'"c"\t0']
+
+    def shuffle_and_sort(self, **kwargs):
+        from mrjob.spark.harness import _shuffle_and_sort
+
+        rdd = self.spark_context.parallelize(self.LINES, numSlices=3)
+
+        return _shuffle_and_sort(rdd, **kwargs).glom().collect()
+
+    def assert_keys_are_adjacent(self, partitions):
+        seen_keys = set()
+
+        for partition in partitions:
+            keys = [line.split(b'\t')[0] for line in partition]
+
+            for i, key in enumerate(keys):
+                if i == 0 or key != keys[i - 1]:
+                    self.assertNotIn(key, seen_keys)
+                    seen_keys.add(key)
+
+        self.assertEqual(seen_keys, set([b'"a"', b'"b"', b'"c"']))
+
+    def test_groups_by_key(self):
+        partitions = self.shuffle_and_sort()
+
+        self.assert_keys_are_adjacent(partitions)
+        self.assertEqual(sorted(sum(partitions, [])), sorted(self.LINES))
+
+    def test_sort_values(self):
+        partitions = self.shuffle_and_sort(sort_values=True)
+
+        self.assert_keys_are_adjacent(partitions)
+        for partition in partitions:
+            self.assertEqual(partition, sorted(partition))
+
+    def test_num_reducers(self):
+        partitions = self.shuffle_and_sort(num_reducers=2)
+
+        self.assertEqual(len(partitions), 2)
+        self.assert_keys_are_adjacent(partitions)
+
+
+@skipIf(pyspark is None, 'no pyspark module')
+class RunSubstepsTestCase(BasicTestCase):
+
+    def run_substeps(self, job_class, substeps, lines, job_args=(), **kwargs):
+        """Run the function that :py:func:`_run_substeps` passes to
+        ``mapPartitions()`` on *lines*. Return the lines it yields, and
+        the (mrc, step_num) of each job instance it makes."""
+        from mrjob.spark.harness import _run_substeps
+
+        made_jobs = []
+
+        def make_mrc_job(mrc, step_num):
+            made_jobs.append((mrc, step_num))
+            return job_class(list(job_args) + [
+                '--%s' % mrc, '--step-num=%d' % step_num])
+
+        rdd = Mock()
+        _run_substeps(make_mrc_job, substeps, rdd, **kwargs)
+
+        (run_lines,), _ = rdd.mapPartitions.call_args
+
+        return list(run_lines(iter(lines))), made_jobs
+
+    def test_mapper_only_steps(self):
+        substeps = [('mapper', 0), ('mapper', 1), ('mapper', 2)]
+
+        for fuse_steps in (False, True):
+            output, made_jobs = self.run_substeps(
+                MRDoubler, substeps, [b'"three"\t3', b'"five"\t5'],
+                job_args=['-n', '3'], fuse_steps=fuse_steps)
+
+            self.assertEqual(output, [b'"three"\t24', b'"five"\t40'])
+            # one job instance per substep
+            self.assertEqual(made_jobs, substeps)
+
+    def test_reducer_and_mapper(self):
+        # MRTwoStepJob's reducer counts values, and the second step's
+        # mapper swaps keys and values
+        substeps = [('reducer', 0), ('mapper', 1)]
+
+        output, made_jobs = self.run_substeps(
+            MRTwoStepJob, substeps,
+            [b'"bar"\t1', b'"foo"\t1', b'"foo"\t1'])
+
+        self.assertEqual(output, [b'1\t"bar"', b'2\t"foo"'])
+        self.assertEqual(made_jobs, substeps)
+
+    def test_internal_protocol_used_between_steps(self):
+        output, _ = self.run_substeps(
+            MRTupleThenTypeName, [('mapper', 0), ('mapper', 1)], [b'a'])
+
+        # JSON turns tuples into lists
+        self.assertEqual(output, [b'"a"\t"list"'])
+
+    def test_fuse_steps(self):
+        output, _ = self.run_substeps(
+            MRTupleThenTypeName, [('mapper', 0), ('mapper', 1)], [b'a'],
+            fuse_steps=True)
+
+        self.assertEqual(output, [b'"a"\t"tuple"'])
+
+
+@skipIf(pyspark is None, 'no pyspark module')
+class RunStepsTestCase(BasicTestCase):
+
+    def run_steps(self, job_class):
+        """Run :py:func:`_run_steps` on a mock RDD, with
+        :py:func:`_run_substeps`, :py:func:`_run_combiner`, and
+        :py:func:`_shuffle_and_sort` patched out. Return a list of
+        which of those were called, in order (with a copy of *substeps*
+        for :py:func:`_run_substeps`)."""
+        from mrjob.spark.harness import _run_steps
+
+        steps = list(enumerate(job_class([])._steps_desc()))
+
+        calls = []
+
+        def run_substeps(make_mrc_job, substeps, rdd, **kwargs):
+            calls.append(('run_substeps', list(substeps)))
+            return rdd
+
+        def run_combiner(make_mrc_job, step_num, rdd, **kwargs):
+            calls.append(('run_combiner', step_num))
+            return rdd
+
+        def shuffle_and_sort(rdd, **kwargs):
+            calls.append(('shuffle_and_sort',))
+            return rdd
+
+        self.start(patch('mrjob.spark.harness._run_substeps',
+                         side_effect=run_substeps))
+        self.start(patch('mrjob.spark.harness._run_combiner',
+                         side_effect=run_combiner))
+        self.start(patch('mrjob.spark.harness._shuffle_and_sort',
+                         side_effect=shuffle_and_sort))
+
+        _run_steps(steps, Mock(), Mock())
+
+        return calls
+
+    def test_mapper_combiner_and_reducer(self):
+        self.assertEqual(
+            self.run_steps(MRWordFreqCount),
+            [('run_substeps', [('mapper', 0)]),
+             ('run_combiner', 0),
+             ('run_substeps', [('reducer', 0)])])
+
+    def test_mapper_and_combiner(self):
+        self.assertEqual(
+            self.run_steps(MRWordFreqCountNoReducer),
+            [('run_substeps', [('mapper', 0)]),
+             ('run_combiner', 0)])
+
+    def test_mapper_only_steps(self):
+        self.assertEqual(
+            self.run_steps(MRDoubler),
+            [('run_substeps', [('mapper', 0)])])
+
+
+def _sum_values(pairs):
+    return [(pairs[0][0], sum(v for _, v in pairs))]
+
+
+def _sum_values_and_add_1000(pairs):
+    return _sum_values(pairs) + [(pairs[0][0], 1000)]
+
+
+@skipIf(pyspark is None, 'no pyspark module')
+class BoundedCombinerTestCase(BasicTestCase):
+
+    def combine_partitions(self, combine, partitions, max_keys=10000):
+        """Run *combine* on each partition, shuffle, and combine again.
+        Return a map from key to sorted values, and a dict of stats."""
+        from mrjob.spark.harness import _combine_pairs_by_key
+        from mrjob.spark.harness import _merge_combined_chunks
+
+        stats = defaultdict(int)
+
+        key_to_chunks = defaultdict(list)
+        for pairs in partitions:
+            for k, chunk in _combine_pairs_by_key(
+                    combine, iter(pairs), max_keys, stats):
+                key_to_chunks[k].append(chunk)
+
+        key_to_values = dict(
+            (k, sorted(v for _, v in _merge_combined_chunks(
+                combine, chunks, stats)))
+            for k, chunks in key_to_chunks.items())
+
+        return key_to_values, dict(stats)
+
+    def test_combine_within_and_across_partitions(self):
+        values, stats = self.combine_partitions(
+            _sum_values, [[('a', 1), ('a', 1), ('b', 1)], [('a', 1)]])
+
+        self.assertEqual(values, dict(a=[3], b=[1]))
+        self.assertEqual(stats['combine input records'], 4)
+        self.assertEqual(stats['combine output records'], 2)
+        self.assertEqual(stats['keys with 1-9 input records'], 2)
+        self.assertNotIn('non-reducing keys', stats)
+
+    def test_stop_combining_non_reducing_key(self):
+        values, stats = self.combine_partitions(
+            _sum_values_and_add_1000, [[('one', 1)] * 3])
+
+        self.assertEqual(values, dict(one=[1, 2, 1000]))
+        self.assertEqual(stats['non-reducing keys'], 1)
+        self.assertEqual(stats['combine input records'], 2)
+
+    def test_hot_non_reducing_key_isnt_held_in_memory(self):
+        from mrjob.spark.harness import _combine_pairs_by_key
+
+        stats = defaultdict(int)
+        chunks = _combine_pairs_by_key(
+            _sum_values_and_add_1000, iter([('hot', 1)] * 1000), 10, stats)
+
+        # after the first combine, pairs for this key pass right through
+        self.assertEqual(next(chunks), ('hot', (False, [('hot', 2),
+                                                        ('hot', 1000)])))
+        self.assertEqual(next(chunks), ('hot', (False, [('hot', 1)])))
+        self.assertEqual(len(list(chunks)), 997)
+
+    def test_remember_non_reducing_key_past_max_keys(self):
+        from mrjob.spark.harness import _combine_pairs_by_key
+
+        pairs = ([('hot', 1)] * 2 + [(i, 1) for i in range(5)] +
+                 [('hot', 1)] * 2)
+
+        stats = defaultdict(int)
+        chunks = list(_combine_pairs_by_key(
+            _sum_values_and_add_1000, iter(pairs), 3, stats))
+
+        # we only tried to combine the hot key once, and only counted it once
+        self.assertEqual(
+            [chunk for k, chunk in chunks if k == 'hot'],
+            [(False, [('hot', 2), ('hot', 1000)]),
+             (False, [('hot', 1)]),
+             (False, [('hot', 1)])])
+        self.assertEqual(stats['non-reducing keys'], 1)
+        self.assertEqual(stats['combine input records'], 2)
+
+    def test_max_keys(self):
+        pairs = [(i % 7, 1) for i in range(70)]
+
+        values, stats = self.combine_partitions(
+            _sum_values, [pairs], max_keys=3)
+
+        self.assertEqual(values, dict((i, [10]) for i in range(7)))
+        # we had to pass on each pair before we could combine it
+        self.assertEqual(stats['keys with 10-99 input records'], 7)
+
+    def test_fan_in_counter(self):
+        from mrjob.spark.harness import _fan_in_counter
+
+        self.assertEqual(_fan_in_counter(1), 'keys with 1-9 input records')
+        self.assertEqual(_fan_in_counter(10), 'keys with 10-99 input records')
+        self.assertEqual(_fan_in_counter(999),
+                         'keys with 100-999 input records')
+
+
 @skipIf(pyspark is None, 'no pyspark module')
 class PreservesPartitioningTestCase(SandboxedTestCase):
 
@@ -783,9 +1128,11 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
             'combineByKey',
             'flatMap',
             'groupBy',
+            'groupByKey',
             'map',
             'mapPartitions',
             'mapValues',
+            'repartitionAndSortWithinPartitions',
         ]
 
         rdd = Mock(spec=method_names)
@@ -809,42 +1156,32 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
 
         rdd = self.mock_rdd()
 
-        combiner_job = Mock()
-        combiner_job.pick_protocols.return_value = (Mock(), Mock())
+        def make_mock_mrc_job(mrc, step_num):
+            job = Mock()
+            job.pick_protocols.return_value = (Mock(), Mock())
+
+            return job
 
         final_rdd = _run_combiner(
-            combiner_job, rdd,
+            make_mock_mrc_job, 0, rdd,
             sort_values=sort_values, num_reducers=num_reducers)
         self.assertEqual(final_rdd, rdd)  # mock RDD's methods return it
 
-        # check that we preserve partitions after calling combineByKey()
+        # check that we preserve partitions after calling groupByKey()
         #
         # Python 3.4 and 3.5's mock modules have slightly different ways
         # of tracking function calls. to work around this, we avoid calling
         # assert_called() and just inspect `method_calls` directly
-        called_combineByKey = False
+        called_groupByKey = False
         for name, args, kwargs in rdd.method_calls:
-            if called_combineByKey:
-                # mapValues() doesn't have to use preservesPartitioning
-                # because it's just encoding the list of all values for a key
-                if name == 'mapValues':
-                    f = args[0]
-                    self._assert_maps_list_to_list_of_same_size(f)
-                else:
-                    self.assertEqual(kwargs.get('preservesPartitioning'), True)
-            elif name == 'combineByKey':
-                called_combineByKey = True
-
-        # check that combineByKey() was actually called
-        self.assertTrue(called_combineByKey)
-
-    def _assert_maps_list_to_list_of_same_size(self, f):
-        # used by _test_run_combiner() to ensure that our call to
-        # mapValues() doesn't split keys between partitions
-        f_of_values = f([('k', 'v1'), ('k', 'v2')])
-        self.assertEqual(type(f_of_values), list)
-        self.assertEqual(len(f_of_values), 2)
-        self.assertRaises(TypeError, f, 123)  # iterables only, fools
+            if called_groupByKey:
+                self.assertEqual(kwargs.get('preservesPartitioning'), True)
+            elif name == 'groupByKey':
+                called_groupByKey = True
+                self.assertEqual(kwargs.get('numPartitions'), num_reducers)
+
+        # check that groupByKey() was actually called
+        self.assertTrue(called_groupByKey)
 
     def test_shuffle_and_sort_with_sort_values(self):
         self._test_shuffle_and_sort(sort_values=True)
@@ -855,27 +1192,36 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
     def test_shuffle_and_sort_without_sort_values_and_num_reducers(self):
         self._test_shuffle_and_sort()
 
-    def _test_shuffle_and_sort(self, sort_values=False, num_reducers=None):
+    def test_shuffle_and_sort_skip_internal_protocol(self):
+        self._test_shuffle_and_sort(
+            skip_internal_protocol=True, shuffle_method='groupBy')
+
+    def _test_shuffle_and_sort(
+            self, sort_values=False, num_reducers=None,
+            skip_internal_protocol=False,
+            shuffle_method='repartitionAndSortWithinPartitions'):
         from mrjob.spark.harness import _shuffle_and_sort
 
         rdd = self.mock_rdd()
 
         final_rdd = _shuffle_and_sort(
-            rdd, sort_values=sort_values, num_reducers=num_reducers)
+            rdd, sort_values=sort_values, num_reducers=num_reducers,
+            skip_internal_protocol=skip_internal_protocol)
         self.assertEqual(final_rdd, rdd)  # mock RDD's methods return it
 
-        # check that we always preserve partitioning after groupBy()
-        called_groupBy = False
+        # check that we always preserve partitioning after shuffling
+        shuffled = False
         for name, args, kwargs in rdd.method_calls:
-            if called_groupBy:
+            if shuffled:
                 if '.' in name:
                     continue  # Python 3.4/3.5 tracks groupBy.assert_called()
                 self.assertEqual(kwargs.get('preservesPartitioning'), True)
-            elif name == 'groupBy':
-                called_groupBy = True
+            elif name == shuffle_method:
+                shuffled = True
+                self.assertEqual(kwargs.get('numPartitions'), num_reducers)
 
-        # check that groupBy() was actually called
-        self.assertTrue(called_groupBy)
+        # check that we actually shuffled
+        self.assertTrue(shuffled)
 
     def test_run_reducer_with_num_reducers(self):
         self._test_run_reducer(num_reducers=1)
@@ -883,8 +1229,19 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
     def test_run_reducer_without_num_reducers(self):
         self._test_run_reducer()
 
-    def _test_run_reducer(self, num_reducers=None):
-        from mrjob.spark.harness import _run_reducer
+    def test_run_reducer_and_mapper_with_num_reducers(self):
+        # mapper changes keys, so partitioning isn't preserved
+        self._test_run_reducer(
+            num_reducers=1, substeps=[('reducer', 0), ('mapper', 1)],
+            preserves_partitioning=False)
+
+    def _test_run_reducer(self, num_reducers=None,
+                          substeps=[('reducer', 0)],
+                          preserves_partitioning=None):
+        from mrjob.spark.harness import _run_substeps
+
+        if preserves_partitioning is None:
+            preserves_partitioning = bool(num_reducers)
 
         rdd = self.mock_rdd()
 
@@ -894,8 +1251,8 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
 
             return job
 
-        final_rdd = _run_reducer(
-            make_mock_mrc_job, 0, rdd, num_reducers=num_reducers)
+        final_rdd = _run_substeps(
+            make_mock_mrc_job, substeps, rdd, num_reducers=num_reducers)
         self.assertEqual(final_rdd, rdd)  # mock RDD's methods return it
 
         called_mapPartitions = False
@@ -918,7 +1275,8 @@ class PreservesPartitioningTestCase(SandboxedTestCase):
             # partitions if the user explicitly requested a certain number
             else:
                 self.assertEqual(
-                    kwargs.get('preservesPartitioning'), bool(num_reducers))
+                    kwargs.get('preservesPartitioning'),
+                    preserves_partitioning)
 
         # sanity-check that mapPartitions() was actually called
         self.assertTrue(called_mapPartitions)
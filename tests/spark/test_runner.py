@@ -261,6 +261,22 @@ class SparkStepsDescTestCase(MockFilesystemsTestCase):
                              runner._get_steps())
 
 
+class SparkFuseStepsTestCase(MockFilesystemsTestCase):
+
+    def _harness_args(self, *args):
+        job = MRTwoStepJob(['-r', 'spark'] + list(args))
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            return runner._spark_script_args(step_num=0, last_step_num=1)
+
+    def test_default(self):
+        self.assertNotIn('--fuse-steps', self._harness_args())
+
+    def test_fuse_steps(self):
+        self.assertIn('--fuse-steps', self._harness_args('--fuse-steps'))
+
+
 @skipIf(pyspark is None, 'no pyspark module')
 class SparkWorkingDirTestCase(MockFilesystemsTestCase):
     # regression tests for #1922
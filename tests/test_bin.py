@@ -39,6 +39,7 @@ from mrjob.py2 import PY2
 from mrjob.step import StepFailedException
 from mrjob.util import cmd_line
 from mrjob.util import which
+from mrjob.util import _zip_files
 
 from tests.mockhadoop import MockHadoopTestCase
 from tests.mr_cmd_job import MRCmdJob
@@ -82,6 +83,7 @@ def _mock_upload_mgr():
     m.uri = Mock(side_effect=mock_uri)
 
     m.prefix = 'uri-of://files'
+    m.cas_prefix = None
 
     return m
 
@@ -1612,6 +1614,30 @@ class CreateMrjobZipTestCase(SandboxedTestCase):
             compileall.compile_dir(join(self.tmp_dir, 'mrjob'),
                                    quiet=1))
 
+    def test_mrjob_zip_is_reproducible(self):
+        mrjob_zip_contents = []
+
+        for _ in range(2):
+            with LocalMRJobRunner(conf_paths=[]) as runner:
+                with open(runner._create_mrjob_zip(), 'rb') as f:
+                    mrjob_zip_contents.append(f.read())
+
+        self.assertEqual(mrjob_zip_contents[0], mrjob_zip_contents[1])
+
+    def test_archive_cache(self):
+        cache_dir = join(self.tmp_dir, 'cache')
+
+        zip_files = self.start(patch('mrjob.bin._zip_files',
+                                     side_effect=_zip_files))
+
+        for _ in range(2):
+            with LocalMRJobRunner(conf_paths=[], archive_cache=True,
+                                  cache_dir=cache_dir) as runner:
+                mrjob_zip = runner._create_mrjob_zip()
+                self.assertIn('mrjob/job.py', ZipFile(mrjob_zip).namelist())
+
+        self.assertEqual(zip_files.call_count, 1)
+
 
 class PySparkPythonTestCase(MockHadoopTestCase):
 
@@ -0,0 +1,73 @@
+# Copyright 2019 Yelp
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import bz2
+import random
+from io import BytesIO
+
+from mrjob.cat import bunzip2_block
+from mrjob.cat import find_bz2_blocks
+
+from tests.sandbox import BasicTestCase
+
+
+class Bz2BlocksTestCase(BasicTestCase):
+
+    def setUp(self):
+        r = random.Random(0)
+
+        self.data = ''.join(
+            '%d %d\n' % (i, r.randint(0, 2 ** 32)) for i in range(50000)
+        ).encode('ascii')
+
+    def test_one_block(self):
+        f = BytesIO(bz2.compress(b'one fish\ntwo fish\n'))
+
+        blocks = find_bz2_blocks(f)
+
+        self.assertEqual(len(blocks), 1)
+        # first block starts right after the stream header
+        self.assertEqual(blocks[0][0], 32)
+        self.assertEqual(bunzip2_block(f, *blocks[0]),
+                         b'one fish\ntwo fish\n')
+
+    def test_many_blocks(self):
+        # use the smallest block size (100k)
+        f = BytesIO(bz2.compress(self.data, 1))
+
+        blocks = find_bz2_blocks(f)
+
+        self.assertGreater(len(blocks), 3)
+        self.assertEqual(
+            b''.join(bunzip2_block(f, *block) for block in blocks),
+            self.data)
+
+    def test_small_read_buffer(self):
+        f = BytesIO(bz2.compress(self.data, 1))
+        blocks = find_bz2_blocks(f)
+
+        f.seek(0)
+        self.assertEqual(find_bz2_blocks(f, bufsize=7), blocks)
+
+    def test_multiple_streams(self):
+        f = BytesIO(bz2.compress(self.data, 1) + bz2.compress(b'the end\n'))
+
+        blocks = find_bz2_blocks(f)
+
+        self.assertEqual(
+            b''.join(bunzip2_block(f, *block) for block in blocks),
+            self.data + b'the end\n')
+
+    def test_empty(self):
+        self.assertEqual(find_bz2_blocks(BytesIO(bz2.compress(b''))), [])
+        self.assertEqual(find_bz2_blocks(BytesIO(b'')), [])
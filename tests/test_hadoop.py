@@ -21,6 +21,7 @@
 import getpass
 import os
 import os.path
+import posixpath
 from io import BytesIO
 from subprocess import check_call
 from subprocess import PIPE
@@ -627,6 +628,7 @@ class HadoopJobRunnerEndToEndTestCase(MockHadoopTestCase):
         with open(input_to_upload, 'w') as input_to_upload_file:
             input_to_upload_file.write('foo\n')
         remote_input_path = 'hdfs:///data/foo'
+        os.makedirs(os.path.join(get_mock_hdfs_root(), 'data'))
         check_call([self.hadoop_bin,
                     'fs', '-put', input_to_upload, remote_input_path])
 
@@ -1237,6 +1239,199 @@ class BadHadoopBinAfterFork(MockHadoopTestCase):
             self.assertRaises(StepFailedException, runner.run)
 
 
+class BatchedHadoopFsTestCase(MockHadoopTestCase):
+    # hadoop fs should be run once for all paths, not once per path
+
+    def hadoop_fs_cmds(self, cmd):
+        return [args for args in get_mock_hadoop_cmd_args()
+                if args[:2] == ['fs', cmd]]
+
+    def put_remote_inputs(self, n):
+        input_path = self.makefile('input', b'foo\n')
+
+        # hadoop fs -put doesn't create directories
+        os.makedirs(os.path.join(get_mock_hdfs_root(), 'data'))
+
+        uris = ['hdfs:///data/%d' % i for i in range(n)]
+        for uri in uris:
+            check_call([self.hadoop_bin, 'fs', '-put', input_path, uri])
+
+        return uris
+
+    def test_check_input_paths(self):
+        uris = self.put_remote_inputs(5)
+
+        job = MRTwoStepJob(['-r', 'hadoop'] + uris)
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner._check_input_paths()
+
+        self.assertEqual(len(self.hadoop_fs_cmds('-ls')), 1)
+
+    def test_missing_input_path(self):
+        uris = self.put_remote_inputs(3)
+
+        job = MRTwoStepJob(['-r', 'hadoop'] + uris + ['hdfs:///data/nope'])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            self.assertRaises(IOError, runner._check_input_paths)
+
+    def test_copy_files_to_wd_mirror(self):
+        paths = [self.makefile('file%d' % i, b'data') for i in range(5)]
+
+        job = MRTwoStepJob(['-r', 'hadoop'] +
+                           ['--file=%s' % path for path in paths])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner._copy_files_to_wd_mirror()
+
+            uploaded = set(posixpath.basename(uri)
+                           for uri in runner.fs.ls(runner._wd_mirror()))
+
+            for path in paths:
+                self.assertIn(os.path.basename(path), uploaded)
+
+        self.assertEqual(len(self.hadoop_fs_cmds('-put')), 1)
+
+
+class UploadCacheTestCase(MockHadoopTestCase):
+
+    def setUp(self):
+        super(UploadCacheTestCase, self).setUp()
+
+        self.cache_dir = self.makedirs('cache')
+        self.input_path = self.makefile('input', b'foo\nbar\n')
+
+    def make_runner(self, *args):
+        job = MRTwoStepJob(['-r', 'hadoop', '--upload-cache',
+                            '--cache-dir', self.cache_dir, self.input_path] +
+                           list(args))
+        job.sandbox()
+
+        return job.make_runner()
+
+    def upload_files(self, runner):
+        runner._add_input_files_for_upload()
+        runner._upload_local_files()
+
+    def put_uris(self):
+        return [args[-1] for args in get_mock_hadoop_cmd_args()
+                if args[:2] == ['fs', '-put']]
+
+    def test_default(self):
+        job = MRTwoStepJob(['-r', 'hadoop', self.input_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            self.assertIsNone(runner._upload_mgr.cas_prefix)
+
+    def test_upload_to_cas(self):
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+
+            cas_prefix = runner._upload_mgr.cas_prefix
+            self.assertEqual(cas_prefix, 'hdfs:///user/%s/tmp/mrjob/cas/' %
+                             getpass.getuser())
+
+            input_uri = runner._upload_mgr.uri(self.input_path)
+            self.assertTrue(input_uri.startswith(cas_prefix))
+            self.assertTrue(runner.fs.exists(input_uri))
+
+        # cleanup doesn't touch cas/
+        self.assertTrue(runner.fs.exists(input_uri))
+
+    def test_skip_files_already_uploaded(self):
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+            input_uri = runner._upload_mgr.uri(self.input_path)
+
+        self.assertIn(input_uri, self.put_uris())
+
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+            self.assertEqual(runner._upload_mgr.uri(self.input_path),
+                             input_uri)
+
+        self.assertEqual(self.put_uris().count(input_uri), 1)
+
+    def test_reupload_missing_files(self):
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+            input_uri = runner._upload_mgr.uri(self.input_path)
+
+            runner.fs.rm(input_uri)
+
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+
+        self.assertEqual(self.put_uris().count(input_uri), 2)
+
+    def test_file_uploaded_by_another_host(self):
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+            input_uri = runner._upload_mgr.uri(self.input_path)
+
+        # forget what we uploaded
+        os.remove(os.path.join(self.cache_dir, 'uploads.json'))
+
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+
+        self.assertEqual(self.put_uris().count(input_uri), 1)
+
+    def test_working_dir_files(self):
+        foo_path = self.makefile('foo.py', b'foo')
+
+        with self.make_runner('--file', foo_path) as runner:
+            self.upload_files(runner)
+
+            foo_uri = runner._dest_in_wd_mirror(foo_path, 'foo.py')
+            self.assertTrue(foo_uri.startswith(runner._upload_mgr.cas_prefix))
+            self.assertEqual(posixpath.basename(foo_uri), 'foo.py')
+            self.assertTrue(runner.fs.exists(foo_uri))
+
+        with self.make_runner('--file', foo_path) as runner:
+            self.upload_files(runner)
+
+            self.assertEqual(
+                runner._dest_in_wd_mirror(foo_path, 'foo.py'), foo_uri)
+
+        self.assertEqual(self.put_uris().count(foo_uri), 1)
+
+    def test_mkdir_cas_dirs_at_once(self):
+        foo_path = self.makefile('foo', b'foo\n')
+        bar_path = self.makefile('bar', b'bar\n')
+
+        with self.make_runner(foo_path, bar_path) as runner:
+            self.upload_files(runner)
+
+            cas_dirs = set()
+            for path in (self.input_path, foo_path, bar_path):
+                uri = runner._upload_mgr.uri(path)
+                self.assertTrue(runner.fs.exists(uri))
+                cas_dirs.add(posixpath.dirname(uri))
+
+        # all input files' directories are created by one command
+        mkdir_cmds = [args for args in get_mock_hadoop_cmd_args()
+                      if args[:2] == ['fs', '-mkdir'] and
+                      cas_dirs & set(args)]
+        self.assertEqual(len(mkdir_cmds), 1)
+        self.assertEqual(set(mkdir_cmds[0][2:]), cas_dirs)
+
+    def test_corrupt_index(self):
+        with open(os.path.join(self.cache_dir, 'uploads.json'), 'w') as f:
+            f.write('{')
+
+        with self.make_runner() as runner:
+            self.upload_files(runner)
+            input_uri = runner._upload_mgr.uri(self.input_path)
+
+        self.assertIn(input_uri, self.put_uris())
+
+
 class SparkPyFilesTestCase(MockHadoopTestCase):
 
     def test_eggs(self):
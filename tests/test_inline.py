@@ -21,9 +21,11 @@
 import gzip
 import os
 import os.path
+import time
 from os.path import exists
 from os.path import join
 from io import BytesIO
+from subprocess import Popen
 from unittest import skipIf
 
 from warcio.warcwriter import WARCWriter
@@ -45,6 +47,7 @@ from mrjob.util import to_lines
 from tests.examples.test_mr_phone_to_url import write_conversion_record
 from tests.job import run_job
 from tests.mr_cmd_job import MRCmdJob
+from tests.mr_counting_job import MRCountingJob
 from tests.mr_filter_job import MRFilterJob
 from tests.mr_test_cmdenv import MRTestCmdenv
 from tests.mr_two_step_job import MRTwoStepJob
@@ -232,12 +235,110 @@ class WhileReadingFromTestCase(SandboxedTestCase):
             self.assertNotIn(input_path, error_log)
 
     def test_regular_job(self):
-        self._test_reading_from(MRNope, expect_input_path=False)
+        # mappers read their split directly from the input file
+        self._test_reading_from(MRNope, expect_input_path=True)
 
     def test_input_manifest(self):
         self._test_reading_from(MRManifestNope, expect_input_path=True)
 
 
+class MRUnpicklableError(MRJob):
+    def mapper_init(self):
+        class UnpicklableError(Exception):
+            pass
+
+        raise UnpicklableError('nope')
+
+
+@skipIf(not hasattr(os, 'fork'), 'no os.fork()')
+class ForkTasksTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(ForkTasksTestCase, self).setUp()
+
+        self.fork = self.start(patch('os.fork', wraps=os.fork))
+
+    def test_fork_tasks(self):
+        job = MRTwoStepJob(['--fork-tasks', '--num-cores', '3'])
+        job.sandbox(stdin=BytesIO(b'foo\nbar\nfoo\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                sorted(job.parse_output(runner.cat_output())),
+                [(1, 'bar'), (2, 'foo'), (3, None)])
+
+            self.assertTrue(self.fork.called)
+
+    def test_leave_other_children_alone(self):
+        # a child process of ours that the job doesn't know about
+        proc = Popen(['sh', '-c', 'exit 3'])
+        time.sleep(0.1)  # let it exit before the job waits for its tasks
+
+        job = MRTwoStepJob(['--fork-tasks', '--num-cores', '3'])
+        job.sandbox(stdin=BytesIO(b'foo\nbar\nfoo\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+        self.assertEqual(proc.wait(), 3)
+
+    def test_no_fork_by_default(self):
+        job = MRTwoStepJob([])
+        job.sandbox(stdin=BytesIO(b'foo\nbar\nfoo\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+        self.assertFalse(self.fork.called)
+
+    def test_counters(self):
+        job = MRCountingJob(['--fork-tasks'])
+        job.sandbox(stdin=BytesIO(b'foo\nbar\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                runner.counters(),
+                [{'group': {'counter_name': 2}}] * 3)
+
+    def _run_and_catch(self, job):
+        with job.make_runner() as runner:
+            try:
+                runner.run()
+            except Exception as ex:
+                return ex
+
+        self.fail('job should have failed')
+
+    def test_surface_original_exception(self):
+        input_path = self.makefile('input.txt', b'one\n')
+
+        job = MRNope(['--fork-tasks', input_path])
+        job.sandbox()
+
+        log = self.start(patch('mrjob.inline.log'))
+
+        ex = self._run_and_catch(job)
+
+        self.assertIsInstance(ex, NotImplementedError)
+        # traceback from the forked process
+        self.assertIn('mapper_init', str(ex.__cause__))
+
+        error_log = ''.join(a[0][0] for a in log.error.call_args_list)
+        self.assertIn(input_path, error_log)
+
+    def test_unpicklable_exception(self):
+        job = MRUnpicklableError(['--fork-tasks'])
+        job.sandbox(stdin=BytesIO(b'one\n'))
+
+        ex = self._run_and_catch(job)
+
+        self.assertIn('UnpicklableError: nope', str(ex))
+
+
 class UnsupportedStepsTestCase(SandboxedTestCase):
 
     def test_no_command_steps(self):
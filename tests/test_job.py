@@ -31,6 +31,7 @@ from mrjob.conf import combine_envs
 from mrjob.examples.mr_wc import MRWordCountUtility
 from mrjob.job import MRJob
 from mrjob.job import UsageError
+from mrjob.job import _group_lines_by_raw_key
 from mrjob.job import _im_func
 from mrjob.options import _RUNNER_ALIASES
 from mrjob.options import _RUNNER_OPTS
@@ -177,6 +178,38 @@ class MRInitTestCase(EmptyMrjobConfTestCase):
         self.assertEqual(results[0][1], num_inputs * 10 * 10 * 2)
 
 
+class MRWorkerInitJob(MRJob):
+
+    def worker_init(self):
+        self.prefix = 'loaded:'
+
+    def mapper(self, key, value):
+        yield (None, self.prefix + value)
+
+
+class WorkerInitTestCase(BasicTestCase):
+
+    def test_not_called_by_constructor(self):
+        job = MRWorkerInitJob([])
+        self.assertFalse(hasattr(job, 'prefix'))
+
+    def test_called_before_mapper(self):
+        job = MRWorkerInitJob(['--mapper']).sandbox(stdin=[b'x\n'])
+        job.execute()
+
+        self.assertEqual(job.stdout.getvalue(), b'null\t"loaded:x"\n')
+
+    def test_runs_on_inline_runner(self):
+        job = MRWorkerInitJob(['-r', 'inline', '-']).sandbox(
+            stdin=BytesIO(b'x\ny\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+            self.assertEqual(
+                sorted(v for _, v in job.parse_output(runner.cat_output())),
+                ['loaded:x', 'loaded:y'])
+
+
 class ParseOutputTestCase(BasicTestCase):
 
     def test_default_protocol(self):
@@ -286,6 +319,86 @@ class CountersAndStatusTestCase(BasicTestCase):
                           'girl; interrupted': {'movie': 1}})
 
 
+class MRCountingRecordsJob(MRJob):
+
+    def mapper(self, key, value):
+        self.increment_counter('Records', 'mapped')
+        if value == 'BOOM':
+            raise ValueError
+        yield key, value
+
+
+class CoalesceCountersTestCase(BasicTestCase):
+
+    def run_mapper(self, stdin):
+        mr_job = MRCountingRecordsJob(['--mapper']).sandbox(stdin=stdin)
+        try:
+            mr_job.run_mapper()
+        finally:
+            self.stderr_lines = mr_job.stderr.getvalue().splitlines()
+
+    def test_counters_written_once_at_end_of_task(self):
+        self.run_mapper([b'a\n', b'b\n', b'c\n'])
+
+        self.assertEqual(self.stderr_lines,
+                         [b'reporter:counter:Records,mapped,3'])
+
+    def test_counters_written_periodically(self):
+        self.start(patch('mrjob.job._COUNTER_FLUSH_INTERVAL', 0))
+
+        self.run_mapper([b'a\n', b'b\n', b'c\n'])
+
+        self.assertEqual(self.stderr_lines,
+                         [b'reporter:counter:Records,mapped,1'] * 3)
+
+    def test_counters_written_if_task_fails(self):
+        self.assertRaises(ValueError, self.run_mapper,
+                          [b'a\n', b'b\n', b'BOOM\n'])
+
+        self.assertEqual(self.stderr_lines,
+                         [b'reporter:counter:Records,mapped,3'])
+
+    def test_status_flushes_counters(self):
+        mr_job = MRJob([]).sandbox()
+
+        with mr_job._coalesce_counters():
+            mr_job.increment_counter('Foo', 'Bar')
+            mr_job.set_status('Halfway there')
+            mr_job.increment_counter('Foo', 'Bar')
+
+        self.assertEqual(mr_job.stderr.getvalue().splitlines(),
+                         [b'reporter:counter:Foo,Bar,1',
+                          b'reporter:status:Halfway there',
+                          b'reporter:counter:Foo,Bar,1'])
+
+
+class OutputBufferTestCase(BasicTestCase):
+
+    INPUT = [('%d\n' % i).encode('ascii') for i in range(100)]
+
+    def run_mapper(self, buffer_size):
+        stdout = Mock(wraps=BytesIO())
+
+        mr_job = MRBoringJob(['--mapper']).sandbox(
+            stdin=self.INPUT, stdout=stdout)
+        mr_job.OUTPUT_BUFFER_SIZE = buffer_size
+        mr_job.run_mapper()
+
+        self.assertEqual(
+            b''.join(call[0][0] for call in stdout.write.call_args_list),
+            ''.join('null\t"%d"\n' % i for i in range(100)).encode('ascii'))
+
+        return stdout.write.call_count
+
+    def test_one_write_per_buffer(self):
+        self.assertEqual(self.run_mapper(buffer_size=64 * 1024), 1)
+
+    def test_small_buffer(self):
+        self.start(patch('mrjob.job._PROTOCOL_BATCH_SIZE', 10))
+
+        self.assertEqual(self.run_mapper(buffer_size=1), 10)
+
+
 class ProtocolsTestCase(BasicTestCase):
     # not putting these in their own files because we're not going to invoke
     # it as a script anyway.
@@ -385,6 +498,225 @@ class ProtocolsTestCase(BasicTestCase):
                          RAW_INPUT.getvalue())
 
 
+class ShoutingJSONProtocol(StandardJSONProtocol):
+    # overriding read() should disable the inherited read_many()
+
+    def read(self, line):
+        key, value = super(ShoutingJSONProtocol, self).read(line)
+        return key, value.upper()
+
+
+class ProtocolBatchesTestCase(BasicTestCase):
+
+    class MRStandardJSONJob(MRBoringJob):
+        INPUT_PROTOCOL = StandardJSONProtocol
+        INTERNAL_PROTOCOL = StandardJSONProtocol
+        OUTPUT_PROTOCOL = StandardJSONProtocol
+
+    class MRShoutingJob(MRBoringJob):
+        INTERNAL_PROTOCOL = ShoutingJSONProtocol
+
+    def setUp(self):
+        super(ProtocolBatchesTestCase, self).setUp()
+
+        # use small batches, so we can test running over batch boundaries
+        self.start(patch('mrjob.job._PROTOCOL_BATCH_SIZE', 2))
+
+    def test_reducer_over_several_batches(self):
+        mr_job = MRBoringJob(['--reducer'])
+        mr_job.sandbox(stdin=BytesIO(b'"foo"\t"bar"\n' +
+                                     b'"foo"\t"baz"\n' +
+                                     b'"foo"\t"qux"\n' +
+                                     b'"bar"\t"qux"\n' +
+                                     b'"baz"\t"qux"\n'))
+        mr_job.run_reducer()
+
+        self.assertEqual(mr_job.stdout.getvalue().replace(b' ', b''),
+                         (b'"foo"\t["bar","baz","qux"]\n' +
+                          b'"bar"\t["qux"]\n' +
+                          b'"baz"\t["qux"]\n'))
+
+    def test_uses_read_many_and_write_many(self):
+        read_many = self.start(patch.object(
+            StandardJSONProtocol, 'read_many',
+            side_effect=StandardJSONProtocol.read_many, autospec=True))
+        write_many = self.start(patch.object(
+            StandardJSONProtocol, 'write_many',
+            side_effect=StandardJSONProtocol.write_many, autospec=True))
+
+        mr_job = self.MRStandardJSONJob(['--mapper'])
+        mr_job.sandbox(stdin=BytesIO(b'"foo"\t"bar"\n' * 3))
+        mr_job.run_mapper()
+
+        self.assertEqual(read_many.call_count, 2)
+        self.assertTrue(write_many.called)
+
+    def test_overridden_read_disables_read_many(self):
+        mr_job = self.MRShoutingJob(['--reducer'])
+        mr_job.sandbox(stdin=BytesIO(b'"foo"\t"bar"\n' +
+                                     b'"foo"\t"baz"\n' +
+                                     b'"foo"\t"qux"\n'))
+        mr_job.run_reducer()
+
+        self.assertEqual(mr_job.stdout.getvalue().replace(b' ', b''),
+                         b'"foo"\t["BAR","BAZ","QUX"]\n')
+
+
+class GroupLinesByRawKeyTestCase(BasicTestCase):
+
+    LINES = [b'"a"\t1\n', b'"a"\t2\n', b'"b"\t3\r\n', b'"c"\t4']
+
+    def setUp(self):
+        super(GroupLinesByRawKeyTestCase, self).setUp()
+
+        self.decoded = []
+
+    def loads(self, raw):
+        self.decoded.append(raw)
+        return StandardJSONProtocol()._loads(raw)
+
+    def test_groups(self):
+        self.assertEqual(
+            [(k, list(vs)) for k, vs in
+             _group_lines_by_raw_key(self.LINES, self.loads)],
+            [('a', [1, 2]), ('b', [3]), ('c', [4])])
+
+    def test_empty(self):
+        self.assertEqual(
+            list(_group_lines_by_raw_key([], self.loads)), [])
+
+    def test_only_decodes_keys_of_skipped_groups(self):
+        self.assertEqual(
+            [k for k, vs in _group_lines_by_raw_key(self.LINES, self.loads)],
+            ['a', 'b', 'c'])
+
+        self.assertEqual(self.decoded, [b'"a"', b'"b"', b'"c"'])
+
+    def test_values_are_decoded_lazily(self):
+        groups = _group_lines_by_raw_key(self.LINES, self.loads)
+
+        key, values = next(groups)
+        self.assertEqual(key, 'a')
+        self.assertEqual(next(values), 1)
+
+        self.assertEqual(self.decoded, [b'"a"', b'1'])
+
+        # the rest of a's values are skipped
+        key, values = next(groups)
+        self.assertEqual(key, 'b')
+        self.assertEqual(self.decoded, [b'"a"', b'1', b'"b"'])
+
+    def test_stale_values_are_empty(self):
+        groups = _group_lines_by_raw_key(
+            [b'"a"\t1', b'"b"\t2', b'"a"\t3'], self.loads)
+
+        _, a_values = next(groups)
+        _, b_values = next(groups)
+        _, a_values_2 = next(groups)
+
+        self.assertEqual(list(a_values), [])
+        self.assertEqual(list(b_values), [])
+        self.assertEqual(list(a_values_2), [3])
+
+    def test_keys_compared_as_bytes(self):
+        # Hadoop groups keys by their encoded value too
+        self.assertEqual(
+            [(k, list(vs)) for k, vs in
+             _group_lines_by_raw_key([b'1\t1', b'1.0\t2'], self.loads)],
+            [(1, [1]), (1.0, [2])])
+
+    def test_no_tab(self):
+        self.assertRaises(
+            ValueError, list,
+            _group_lines_by_raw_key([b'"a"\t1', b'"b"'], self.loads))
+
+
+class MRKeysOnlyJob(MRJob):
+    INTERNAL_PROTOCOL = StandardJSONProtocol
+
+    def reducer(self, key, values):
+        yield key, None
+
+
+class MRKeysOnlyPairsJob(MRKeysOnlyJob):
+
+    def reduce_pairs(self, pairs, step_num=0):
+        for k, v in super(MRKeysOnlyPairsJob, self).reduce_pairs(
+                pairs, step_num=step_num):
+            yield k, v
+
+
+class ReducerRawKeyGroupingTestCase(BasicTestCase):
+
+    INPUT = b'"a"\t1\n"a"\t2\n"b"\t3\n'
+
+    def setUp(self):
+        super(ReducerRawKeyGroupingTestCase, self).setUp()
+
+        self.loads = self.start(patch.object(
+            StandardJSONProtocol, '_loads',
+            side_effect=StandardJSONProtocol._loads, autospec=True))
+
+    def run_reducer(self, job_class):
+        mr_job = job_class(['--reducer']).sandbox(stdin=BytesIO(self.INPUT))
+        mr_job.run_reducer()
+
+        self.assertEqual(
+            mr_job.stdout.getvalue().replace(b' ', b''),
+            b'"a"\tnull\n"b"\tnull\n')
+
+    def test_unused_values_are_not_decoded(self):
+        self.run_reducer(MRKeysOnlyJob)
+
+        self.assertEqual(self.loads.call_count, 2)
+
+    def test_overridden_reduce_pairs(self):
+        self.run_reducer(MRKeysOnlyPairsJob)
+
+        # should fall back to decoding every line with read_many(), which
+        # decodes a whole batch at once rather than calling _loads()
+        self.assertEqual(self.loads.call_count, 0)
+
+
+class MRBatchSizesJob(MRJob):
+    BATCH_SIZE = 2
+
+    def mapper_batch(self, keys, values):
+        yield len(values), values
+
+    def reducer_batch(self, key, values):
+        yield key, [type(values).__name__, sorted(values)]
+
+
+class BatchMethodsTestCase(BasicTestCase):
+
+    def test_mapper_batch(self):
+        mr_job = MRBatchSizesJob(['--mapper']).sandbox(
+            stdin=BytesIO(b'a\nb\nc\nd\ne\n'))
+        mr_job.run_mapper()
+
+        self.assertEqual(
+            mr_job.stdout.getvalue().replace(b' ', b''),
+            b'2\t["a","b"]\n2\t["c","d"]\n1\t["e"]\n')
+
+    def test_reducer_batch(self):
+        mr_job = MRBatchSizesJob(['--reducer']).sandbox(
+            stdin=BytesIO(b'1\t"b"\n1\t"a"\n2\t"c"\n'))
+        mr_job.run_reducer()
+
+        self.assertEqual(
+            mr_job.stdout.getvalue().replace(b' ', b''),
+            b'1\t["list",["a","b"]]\n2\t["list",["c"]]\n')
+
+    def test_steps(self):
+        mr_job = MRBatchSizesJob([])
+
+        self.assertEqual(
+            mr_job.steps(),
+            [MRStep(mapper_batch=mr_job.mapper_batch,
+                    reducer_batch=mr_job.reducer_batch)])
+
+
 class ProtocolErrorsTestCase(EmptyMrjobConfTestCase):
 
     class MRBoringReprAndJSONJob(MRBoringJob):
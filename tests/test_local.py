@@ -17,6 +17,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for LocalMRJobRunner"""
+import ast
 import gzip
 import os
 import stat
@@ -44,8 +45,10 @@ from mrjob.examples.mr_spark_wordcount import MRSparkWordcount
 from mrjob.examples.mr_spark_wordcount_script import MRSparkScriptWordcount
 from mrjob.examples.mr_sparkaboom import MRSparKaboom
 from mrjob.local import LocalMRJobRunner
-from mrjob.local import _sort_lines_in_memory
+from mrjob.local import _job_cls_name_from_main_block
+from mrjob.local import _sort_lines_externally
 from mrjob.parse import is_uri
+from mrjob.sim import SimMRJobRunner
 from mrjob.step import StepFailedException
 from mrjob.util import cmd_line
 from mrjob.util import safeeval
@@ -59,6 +62,8 @@ from tests.mr_exit_42_job import MRExit42Job
 from tests.mr_filter_job import MRFilterJob
 from tests.mr_group import MRGroup
 from tests.mr_job_where_are_you import MRJobWhereAreYou
+from tests.mr_load_pid_job import MRLoadPIDJob
+from tests.mr_pickle_script_class import MRPickleScriptClass
 from tests.mr_just_a_jar import MRJustAJar
 from tests.mr_sort_and_group import MRSortAndGroup
 from tests.mr_spark_os_walk import MRSparkOSWalk
@@ -72,7 +77,12 @@ from tests.sandbox import EmptyMrjobConfTestCase
 from tests.sandbox import SandboxedTestCase
 from tests.sandbox import mrjob_conf_patcher
 from tests.test_inline import InlineInputManifestTestCase
+from tests.test_sim import BatchMethodsTestCase
 from tests.test_sim import LocalFSTestCase
+from tests.test_sim import MapOutputPartitionTestCase
+from tests.test_sim import MarshalInternalProtocolTestCase
+from tests.test_sim import MapperInputSplitTestCase
+from tests.test_sim import MapperToCombinerInMemoryTestCase
 from tests.test_sim import SimRunnerJobConfTestCase
 from tests.test_sim import SimRunnerNoMapperTestCase
 from tests.test_sim import SortValuesTestCase
@@ -152,6 +162,167 @@ class NumCoresTestCase(SandboxedTestCase):
             self.pool.assert_called_with(processes=3)
 
 
+class WorkerPoolTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(WorkerPoolTestCase, self).setUp()
+
+        self.pool = self.start(patch('mrjob.local.Pool', wraps=Pool))
+
+    def test_reuse_pool_for_all_steps(self):
+        mr_job = MRTwoStepJob(['-r', 'local'])
+        mr_job.sandbox(stdin=BytesIO(b'foo\nbar\n'))
+
+        with mr_job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                sorted(mr_job.parse_output(runner.cat_output())),
+                [(1, 'bar'), (1, 'foo'), (2, None)])
+
+            self.assertEqual(self.pool.call_count, 1)
+            self.assertIsNotNone(runner._pool)
+
+        # cleanup() shuts down the pool
+        self.assertIsNone(runner._pool)
+
+    def test_pool_shut_down_after_failure(self):
+        mr_job = MRExit42Job(['-r', 'local'])
+        mr_job.sandbox()
+
+        with mr_job.make_runner() as runner:
+            self.assertRaises(StepFailedException, runner.run)
+            self.assertIsNone(runner._pool)
+
+
+@skipIf(not hasattr(os, 'fork'), 'no os.fork()')
+class RunTasksInWorkerTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(RunTasksInWorkerTestCase, self).setUp()
+
+        # run tasks in this process, so we can see calls to check_call()
+        self.start(patch.object(LocalMRJobRunner, '_run_multiple',
+                                SimMRJobRunner._run_multiple))
+
+        self.check_call = self.start(
+            patch('mrjob.local.check_call', wraps=check_call))
+
+    def _run_job(self, *args):
+        mr_job = MRTwoStepJob(['-r', 'local'] + list(args))
+        mr_job.sandbox(stdin=BytesIO(b'foo\nbar\n'))
+
+        with mr_job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                sorted(mr_job.parse_output(runner.cat_output())),
+                [(1, 'bar'), (1, 'foo'), (2, None)])
+
+    def _task_calls(self):
+        return [c for c in self.check_call.call_args_list
+                if 'cwd' in c[1]]
+
+    def test_no_subprocesses_by_default(self):
+        self._run_job()
+
+        self.assertEqual(self._task_calls(), [])
+
+    def test_setup_requires_subprocess(self):
+        self._run_job('--setup', 'true')
+
+        self.assertNotEqual(self._task_calls(), [])
+
+    def test_bootstrap_mrjob_requires_subprocess(self):
+        self._run_job('--bootstrap-mrjob')
+
+        self.assertNotEqual(self._task_calls(), [])
+
+    def test_python_bin_requires_subprocess(self):
+        self._run_job('--python-bin', cmd_line([sys.executable, '-v']))
+
+        self.assertNotEqual(self._task_calls(), [])
+
+
+@skipIf(not hasattr(os, 'fork'), 'no os.fork()')
+class LoadJobScriptOnceTestCase(SandboxedTestCase):
+
+    def test_load_script_once_per_worker(self):
+        mr_job = MRLoadPIDJob(['-r', 'local', '--num-cores', '1'])
+        mr_job.sandbox(stdin=BytesIO(b'foo\nbar\nbaz\n'))
+
+        with mr_job.make_runner() as runner:
+            runner.run()
+
+            load_and_task_pids = list(
+                mr_job.parse_output(runner.cat_output()))
+
+        self.assertGreater(len(load_and_task_pids), 1)
+
+        # one worker loaded the script, and forked each task
+        load_pids = set(load_pid for load_pid, _ in load_and_task_pids)
+        self.assertEqual(len(load_pids), 1)
+        self.assertNotIn(os.getpid(), load_pids)
+
+        task_pids = set(task_pid for _, task_pid in load_and_task_pids)
+        self.assertEqual(len(task_pids), len(load_and_task_pids))
+        self.assertFalse(load_pids & task_pids)
+
+    def run_pickle_script_class_job(self):
+        mr_job = MRPickleScriptClass(['-r', 'local'])
+        mr_job.sandbox(stdin=BytesIO(b'1 2\n3 4\n'))
+
+        with mr_job.make_runner() as runner:
+            runner.run()
+
+            return list(mr_job.parse_output(runner.cat_output()))
+
+    def test_pickle_class_defined_in_script(self):
+        self.assertEqual(self.run_pickle_script_class_job(),
+                         [('pt', [4, 6])])
+
+    def test_pickle_class_defined_in_script_without_preloading(self):
+        # run the whole script in each task
+        self.start(patch('mrjob.local._job_cls_name_from_main_block',
+                         return_value=None))
+
+        self.assertEqual(self.run_pickle_script_class_job(),
+                         [('pt', [4, 6])])
+
+
+class JobClsNameFromMainBlockTestCase(BasicTestCase):
+
+    def job_cls_name(self, source):
+        return _job_cls_name_from_main_block(ast.parse(source))
+
+    def test_run_job_cls(self):
+        self.assertEqual(
+            self.job_cls_name(
+                "if __name__ == '__main__':\n    MRFoo.run()\n"),
+            'MRFoo')
+
+    def test_double_quotes(self):
+        self.assertEqual(
+            self.job_cls_name('if __name__ == "__main__": MRFoo.run()'),
+            'MRFoo')
+
+    def test_other_statements_in_main_block(self):
+        self.assertIsNone(self.job_cls_name(
+            "if __name__ == '__main__':\n    setup()\n    MRFoo.run()\n"))
+
+    def test_not_run(self):
+        self.assertIsNone(self.job_cls_name(
+            "if __name__ == '__main__':\n    MRFoo.main()\n"))
+
+    def test_run_with_args(self):
+        self.assertIsNone(self.job_cls_name(
+            "if __name__ == '__main__':\n    MRFoo.run(42)\n"))
+
+    def test_no_main_block(self):
+        self.assertIsNone(self.job_cls_name('MRFoo.run()\n'))
+        self.assertIsNone(self.job_cls_name(''))
+
+
 # TODO: these belong in tests of the sim runner
 class TestsToPort:
 
@@ -496,6 +667,28 @@ class LocalMRJobRunnerNoMapperTestCase(SimRunnerNoMapperTestCase):
     RUNNER = 'local'
 
 
+class LocalBatchMethodsTestCase(BatchMethodsTestCase):
+    RUNNER = 'local'
+
+
+class LocalMarshalInternalProtocolTestCase(MarshalInternalProtocolTestCase):
+    # also tests that the sort binary can handle binary data
+    RUNNER = 'local'
+
+
+class LocalMapOutputPartitionTestCase(MapOutputPartitionTestCase):
+    RUNNER = 'local'
+
+
+class LocalMapperToCombinerInMemoryTestCase(
+        MapperToCombinerInMemoryTestCase):
+    RUNNER = 'local'
+
+
+class LocalMapperInputSplitTestCase(MapperInputSplitTestCase):
+    RUNNER = 'local'
+
+
 class LocalMRJobRunnerFSTestCase(LocalFSTestCase):
     RUNNER_CLASS = LocalMRJobRunner
 
@@ -784,9 +977,20 @@ class SortBinTestCase(SandboxedTestCase):
         self.check_call = self.start(patch(
             'mrjob.local.check_call', wraps=check_call))
 
-        self._sort_lines_in_memory = self.start(patch(
-            'mrjob.local._sort_lines_in_memory',
-            wraps=_sort_lines_in_memory))
+        self._sort_lines_externally = self.start(patch(
+            'mrjob.local._sort_lines_externally',
+            wraps=_sort_lines_externally))
+
+        # map tasks sort their own output, so run tasks in this process,
+        # where the patches above can see them
+        self.start(patch.object(LocalMRJobRunner, '_run_multiple',
+                                SimMRJobRunner._run_multiple))
+
+    def _sort_calls(self):
+        """Calls to check_call() that ran the sort binary, rather than
+        a task (tasks have a working directory)."""
+        return [c for c in self.check_call.call_args_list
+                if 'cwd' not in c[1]]
 
     def test_default_sort_bin(self):
         job = MRGroup(['-r', 'local'])
@@ -800,10 +1004,10 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['buffaloes', 'bears'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertFalse(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertFalse(self._sort_lines_externally.called)
 
-        sort_args = self.check_call.call_args[0][0]
+        sort_args = self._sort_calls()[-1][0][0]
         self.assertEqual(sort_args[:6],
                          ['sort', '-t', '\t', '-k', '1,1', '-s'])
 
@@ -819,15 +1023,53 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['bears', 'buffaloes'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertFalse(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertFalse(self._sort_lines_externally.called)
 
-        sort_args = self.check_call.call_args[0][0]
+        sort_args = self._sort_calls()[-1][0][0]
 
         self.assertEqual(sort_args[:1], ['sort'])
         self.assertNotEqual(sort_args[:6],
                             ['sort', '-t', '\t', '-k', '1,1', '-s'])
 
+    def test_default_sort_bin_merges_reducer_input(self):
+        job = MRGroup(['-r', 'local'])
+        job.sandbox(stdin=BytesIO(
+            b'apples\nbuffaloes\nbears'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+        self.assertTrue(any('-m' in c[0][0] for c in self._sort_calls()))
+
+    def test_merge_agrees_with_map_side_sort(self):
+        # sort and Python order lines without a tab differently
+        chunks = [[b'a\tb\n', b'a\n'], [b'a b\n', b'a\tc\n']]
+
+        job = MRGroup(['-r', 'local'])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            sort_input = runner._sort_input_func(0)
+
+            unsorted_paths = []
+            sorted_paths = []
+            for i, chunk in enumerate(chunks):
+                unsorted_paths.append(
+                    self.makefile('unsorted-%d' % i, b''.join(chunk)))
+                sorted_paths.append(join(self.tmp_dir, 'sorted-%d' % i))
+                sort_input([unsorted_paths[-1]], sorted_paths[-1])
+
+            all_sorted_path = join(self.tmp_dir, 'all-sorted')
+            sort_input(unsorted_paths, all_sorted_path)
+            with open(all_sorted_path, 'rb') as f:
+                all_sorted = list(f)
+
+            merge_input = runner._merge_input_func(0)
+            with merge_input(sorted_paths,
+                             join(self.tmp_dir, 'merged')) as lines:
+                self.assertEqual(list(lines), all_sorted)
+
     def test_custom_sort_bin(self):
         job = MRGroup(['-r', 'local', '--sort-bin', 'sort -r'])
         job.sandbox(stdin=BytesIO(
@@ -841,8 +1083,8 @@ class SortBinTestCase(SandboxedTestCase):
                 [('a', ['apples']),
                  ('b', ['buffaloes', 'bicycles', 'bears', 'babies'])])
 
-        self.assertTrue(self.check_call.called)
-        sort_args = self.check_call.call_args[0][0]
+        self.assertTrue(self._sort_calls())
+        sort_args = self._sort_calls()[-1][0][0]
 
         self.assertEqual(sort_args[:2], ['sort', '-r'])
 
@@ -860,10 +1102,10 @@ class SortBinTestCase(SandboxedTestCase):
                 [('a', ['apples']),
                  ('b', ['buffaloes', 'bicycles', 'bears', 'babies'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertFalse(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertFalse(self._sort_lines_externally.called)
 
-        sort_args = self.check_call.call_args[0][0]
+        sort_args = self._sort_calls()[-1][0][0]
 
         self.assertEqual(sort_args[:2], ['sort', '-r'])
 
@@ -879,10 +1121,10 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['buffaloes', 'bears'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertFalse(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertFalse(self._sort_lines_externally.called)
 
-        sort_args = self.check_call.call_args[0][0]
+        sort_args = self._sort_calls()[-1][0][0]
         self.assertEqual(sort_args[:6],
                          ['sort', '-t', '\t', '-k', '1,1', '-s'])
 
@@ -900,8 +1142,8 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['buffaloes', 'bears'])])
 
-        self.assertFalse(self.check_call.called)
-        # checking that _sort_lines_in_memory() was called gets messy.
+        self.assertFalse(self._sort_calls())
+        # checking that _sort_lines_externally() was called gets messy.
         # we can assume it got called because check_call() didn't
 
     def test_bad_sort_bin(self):
@@ -918,8 +1160,8 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['buffaloes', 'bears'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertTrue(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertTrue(self._sort_lines_externally.called)
 
     def test_missing_sort_bin(self):
         # patching check_call to raise an exception causes pickling issues in
@@ -935,8 +1177,8 @@ class SortBinTestCase(SandboxedTestCase):
                 sorted(job.parse_output(runner.cat_output())),
                 [('a', ['apples']), ('b', ['buffaloes', 'bears'])])
 
-        self.assertTrue(self.check_call.called)
-        self.assertTrue(self._sort_lines_in_memory.called)
+        self.assertTrue(self._sort_calls())
+        self.assertTrue(self._sort_lines_externally.called)
 
     def _test_environment_variables(self, *args):
         job = MRGroup(['-r', 'local'])
@@ -948,8 +1190,8 @@ class SortBinTestCase(SandboxedTestCase):
 
             # don't bother with output; already tested this above
 
-            self.assertTrue(self.check_call.called)
-            env = self.check_call.call_args[1]['env']
+            self.assertTrue(self._sort_calls())
+            env = self._sort_calls()[-1][1]['env']
 
             self.assertEqual(env['LC_ALL'], 'C')
             self.assertEqual(env['TMP'], runner._get_local_tmp_dir())
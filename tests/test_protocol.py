@@ -22,8 +22,16 @@ from unittest import skipIf
 
 from mrjob.protocol import BytesProtocol
 from mrjob.protocol import BytesValueProtocol
+from mrjob.protocol import FastJSONProtocol
+from mrjob.protocol import FastJSONValueProtocol
 from mrjob.protocol import JSONProtocol
 from mrjob.protocol import JSONValueProtocol
+from mrjob.protocol import MarshalProtocol
+from mrjob.protocol import MarshalValueProtocol
+from mrjob.protocol import MsgspecJSONProtocol
+from mrjob.protocol import MsgspecJSONValueProtocol
+from mrjob.protocol import OrJSONProtocol
+from mrjob.protocol import OrJSONValueProtocol
 from mrjob.protocol import PickleProtocol
 from mrjob.protocol import PickleValueProtocol
 from mrjob.protocol import RapidJSONProtocol
@@ -40,6 +48,8 @@ from mrjob.protocol import TextProtocol
 from mrjob.protocol import TextValueProtocol
 from mrjob.protocol import UltraJSONProtocol
 from mrjob.protocol import UltraJSONValueProtocol
+from mrjob.protocol import msgspec
+from mrjob.protocol import orjson
 from mrjob.protocol import rapidjson
 from mrjob.protocol import simplejson
 from mrjob.protocol import ujson
@@ -112,6 +122,20 @@ class ProtocolTestCase(BasicTestCase):
     def assertCantDecode(self, protocol, data):
         self.assertRaises(Exception, protocol.read, data)
 
+    def assertReadManyOK(self, protocol, lines):
+        """Assert that ``read_many()`` decodes *lines* the same way
+        as ``read()``."""
+        self.assertEqual(
+            protocol.read_many(lines),
+            [protocol.__class__().read(line) for line in lines])
+
+    def assertWriteManyOK(self, protocol, pairs):
+        """Assert that ``write_many()`` encodes *pairs* the same way
+        as ``write()``."""
+        self.assertEqual(
+            protocol.write_many(pairs),
+            [protocol.write(k, v) for k, v in pairs])
+
 
 class JSONProtocolAliasesTestCase(BasicTestCase):
 
@@ -131,6 +155,20 @@ class JSONProtocolAliasesTestCase(BasicTestCase):
             self.assertEqual(JSONProtocol, StandardJSONProtocol)
             self.assertEqual(JSONValueProtocol, StandardJSONValueProtocol)
 
+    def test_fast_json_uses_fastest_installed_library(self):
+        if orjson and not PY2:
+            self.assertEqual(FastJSONProtocol, OrJSONProtocol)
+            self.assertEqual(FastJSONValueProtocol, OrJSONValueProtocol)
+        elif msgspec and not PY2:
+            self.assertEqual(FastJSONProtocol, MsgspecJSONProtocol)
+            self.assertEqual(FastJSONValueProtocol, MsgspecJSONValueProtocol)
+        elif ujson:
+            self.assertEqual(FastJSONProtocol, UltraJSONProtocol)
+            self.assertEqual(FastJSONValueProtocol, UltraJSONValueProtocol)
+        else:
+            self.assertEqual(FastJSONProtocol, StandardJSONProtocol)
+            self.assertEqual(FastJSONValueProtocol, StandardJSONValueProtocol)
+
 
 class StandardJSONProtocolTestCase(ProtocolTestCase):
 
@@ -169,6 +207,50 @@ class StandardJSONProtocolTestCase(ProtocolTestCase):
     def test_bad_data(self):
         self.assertCantDecode(self.PROTOCOL, b'{@#$@#!^&*$%^')
 
+    def test_read_many(self):
+        self.assertReadManyOK(
+            self.PROTOCOL,
+            [self.PROTOCOL.write(k, v) for k, v in JSON_KEYS_AND_VALUES])
+
+    def test_read_many_with_repeated_keys(self):
+        lines = [b'"a"\t1', b'"a"\t2', b'"b"\t3', b'"a"\t4']
+
+        self.assertReadManyOK(self.PROTOCOL, lines)
+
+        # cache keys across batches, like read()
+        protocol = self.PROTOCOL.__class__()
+        pairs = protocol.read_many(lines[:2]) + protocol.read_many(lines[2:])
+        self.assertIs(pairs[0][0], pairs[1][0])
+
+    def test_read_many_empty(self):
+        self.assertEqual(self.PROTOCOL.read_many([]), [])
+
+    def test_read_many_bad_data(self):
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'"a"\t1', b'{@#$@#!^&*$%^'])
+
+    def test_read_many_doesnt_join_lines(self):
+        # each of these lines is valid JSON when joined with commas
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'1,2\t3', b'"a"\t1'])
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'"a"\t'])
+
+    def test_read_many_doesnt_join_malformed_lines(self):
+        # these lines decode to the right number of values when joined
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'"a"\t[1', b'"b"\t2]', b'"c"\t3'])
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'[[1\t2', b'2]]\t3', b'"c"\t3],[4'])
+
+    def test_read_many_brackets_in_strings(self):
+        self.assertReadManyOK(
+            self.PROTOCOL,
+            [b'"[a"\t"b]"', b'"c\\"{"\t{"d": "}"}', b'[1, [2]]\t"e,f"'])
+
+    def test_write_many(self):
+        self.assertWriteManyOK(self.PROTOCOL, JSON_KEYS_AND_VALUES)
+
     def test_bad_keys_and_values(self):
         # only unicodes (or bytes in utf-8) are allowed
         self.assertCantEncode(self.PROTOCOL, b'0\xa2', b'\xe9')
@@ -219,6 +301,36 @@ class UltraJSONProtocolTestCase(StandardJSONProtocolTestCase):
         self.assertCantEncode(self.PROTOCOL, b'0\xa2', b'\xe9')
 
 
+@skipIf(orjson is None, 'orjson module not installed')
+class OrJSONProtocolTestCase(StandardJSONProtocolTestCase):
+
+    PROTOCOL = OrJSONProtocol()
+
+    def test_no_spaces(self):
+        self.assertEqual(self.PROTOCOL.write(['a', 1], {'foo': 'bar'}),
+                         b'["a",1]\t{"foo":"bar"}')
+
+    def test_falls_back_to_standard_json(self):
+        # orjson only handles 64-bit integers
+        self.assertRoundTripOK(self.PROTOCOL, 2 ** 64, -2 ** 64)
+
+        # orjson doesn't read NaN and Infinity, which json writes
+        key, value = self.PROTOCOL.read(
+            StandardJSONProtocol().write(float('inf'), [float('nan')]))
+        self.assertEqual(key, float('inf'))
+        self.assertNotEqual(value[0], value[0])
+
+
+@skipIf(msgspec is None, 'msgspec module not installed')
+class MsgspecJSONProtocolTestCase(StandardJSONProtocolTestCase):
+
+    PROTOCOL = MsgspecJSONProtocol()
+
+    def test_bad_keys_and_values(self):
+        # msgspec encodes sets (and even bytes), but not arbitrary objects
+        self.assertCantEncode(self.PROTOCOL, Point(2, 3), Point(1, 4))
+
+
 class StandardJSONValueProtocolTestCase(ProtocolTestCase):
 
     PROTOCOL = StandardJSONValueProtocol()
@@ -254,6 +366,37 @@ class StandardJSONValueProtocolTestCase(ProtocolTestCase):
     def test_bad_data(self):
         self.assertCantDecode(self.PROTOCOL, b'{@#$@#!^&*$%^')
 
+    def test_read_many(self):
+        self.assertReadManyOK(
+            self.PROTOCOL,
+            [self.PROTOCOL.write(None, v) for _, v in JSON_KEYS_AND_VALUES])
+
+    def test_read_many_empty(self):
+        self.assertEqual(self.PROTOCOL.read_many([]), [])
+
+    def test_read_many_bad_data(self):
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'1', b'{@#$@#!^&*$%^'])
+
+    def test_read_many_doesnt_join_lines(self):
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'1,2', b'3'])
+
+    def test_read_many_doesnt_join_malformed_lines(self):
+        # these lines decode to the right number of values when joined
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'[1', b'2]', b'3,4'])
+        self.assertRaises(Exception, self.PROTOCOL.read_many,
+                          [b'[[1', b'2]]', b'3],[4'])
+
+    def test_read_many_brackets_in_strings(self):
+        self.assertReadManyOK(
+            self.PROTOCOL,
+            [b'"[a"', b'"b\\"]"', b'{"c": "}"}', b'[1, [2]]', b'"d,e"'])
+
+    def test_write_many(self):
+        self.assertWriteManyOK(self.PROTOCOL, JSON_KEYS_AND_VALUES)
+
     def test_bad_keys_and_values(self):
         # seems like the only thing ujson won't encode is non-UTF-8 bytes
         self.assertCantEncode(self.PROTOCOL, None, b'\xe9')
@@ -311,6 +454,46 @@ class UltraJSONValueProtocolTestCase(StandardJSONValueProtocolTestCase):
         self.assertCantEncode(self.PROTOCOL, None, b'\xe9')
 
 
+@skipIf(orjson is None, 'orjson module not installed')
+class OrJSONValueProtocolTestCase(StandardJSONValueProtocolTestCase):
+
+    PROTOCOL = OrJSONValueProtocol()
+
+    def test_uses_json_format(self):
+        VALUE = {'foo': 'bar'}
+        ENCODED = b'{"foo":"bar"}'  # no whitespace in orjson
+
+        self.assertEqual((None, VALUE), self.PROTOCOL.read(ENCODED))
+        self.assertEqual(self.PROTOCOL.write(None, VALUE), ENCODED)
+
+    def test_falls_back_to_standard_json(self):
+        self.assertRoundTripOK(self.PROTOCOL, None, 2 ** 64)
+
+        self.assertEqual(
+            self.PROTOCOL.read_many([b'1', b'Infinity']),
+            [(None, 1), (None, float('inf'))])
+
+    def test_write_many_falls_back_to_standard_json(self):
+        self.assertWriteManyOK(self.PROTOCOL, [(None, 1), (None, 2 ** 64)])
+
+
+@skipIf(msgspec is None, 'msgspec module not installed')
+class MsgspecJSONValueProtocolTestCase(StandardJSONValueProtocolTestCase):
+
+    PROTOCOL = MsgspecJSONValueProtocol()
+
+    def test_uses_json_format(self):
+        VALUE = {'foo': 'bar'}
+        ENCODED = b'{"foo":"bar"}'  # no whitespace in msgspec
+
+        self.assertEqual((None, VALUE), self.PROTOCOL.read(ENCODED))
+        self.assertEqual(self.PROTOCOL.write(None, VALUE), ENCODED)
+
+    def test_bad_keys_and_values(self):
+        # msgspec encodes sets (and even bytes), but not arbitrary objects
+        self.assertCantEncode(self.PROTOCOL, None, Point(1, 4))
+
+
 class PickleProtocolTestCase(ProtocolTestCase):
 
     def test_round_trip(self):
@@ -324,6 +507,13 @@ class PickleProtocolTestCase(ProtocolTestCase):
     def test_bad_data(self):
         self.assertCantDecode(PickleProtocol(), b'{@#$@#!^&*$%^')
 
+    def test_read_and_write_many(self):
+        protocol = PickleProtocol()
+
+        self.assertEqual(
+            protocol.read_many(protocol.write_many(PICKLE_KEYS_AND_VALUES)),
+            PICKLE_KEYS_AND_VALUES)
+
     # no tests of what encoded data looks like; pickle is an opaque protocol
 
 
@@ -344,6 +534,71 @@ class PickleValueProtocolTestCase(ProtocolTestCase):
     # no tests of what encoded data looks like; pickle is an opaque protocol
 
 
+class MarshalProtocolTestCase(ProtocolTestCase):
+
+    def test_round_trip(self):
+        for k, v in REPR_KEYS_AND_VALUES:
+            self.assertRoundTripOK(MarshalProtocol(), k, v)
+
+    def test_round_trip_with_trailing_tab(self):
+        for k, v in REPR_KEYS_AND_VALUES:
+            self.assertRoundTripWithTrailingTabOK(MarshalProtocol(), k, v)
+
+    def test_escapes_tabs_and_newlines(self):
+        for k, v in REPR_KEYS_AND_VALUES + [
+                (b'\x7f\x01', b'\x7f\x02\x7f'), (u'\t' * 9, u'\n' * 10)]:
+            line = MarshalProtocol().write(k, v)
+
+            self.assertEqual(line.count(b'\t'), 1)
+            self.assertNotIn(b'\n', line)
+            self.assertNotIn(b'\r', line)
+            self.assertEqual(MarshalProtocol().read(line), (k, v))
+
+    def test_equal_keys_encode_the_same(self):
+        # marshal version 3+ would encode a repeated object as a reference
+        key = u''.join([u'ab', u'c'])
+
+        self.assertEqual(
+            MarshalProtocol().write((key, key), None),
+            MarshalProtocol().write((u'abc', u''.join([u'a', u'bc'])), None))
+
+    def test_interned_and_computed_keys_encode_the_same(self):
+        # on Python 2, marshal version 1+ tags interned strs differently
+        self.assertEqual(
+            MarshalProtocol().write('total', 1),
+            MarshalProtocol().write(''.join(['to', 'tal']), 1))
+
+    def test_bad_data(self):
+        self.assertCantDecode(MarshalProtocol(), b'{@#$@#!^&*$%^')
+
+    def test_cant_encode_objects(self):
+        self.assertCantEncode(MarshalProtocol(), Point(2, 3), Point(1, 4))
+
+    def test_read_and_write_many(self):
+        protocol = MarshalProtocol()
+
+        self.assertEqual(
+            protocol.read_many(protocol.write_many(REPR_KEYS_AND_VALUES)),
+            REPR_KEYS_AND_VALUES)
+
+        self.assertWriteManyOK(protocol, REPR_KEYS_AND_VALUES)
+
+
+class MarshalValueProtocolTestCase(ProtocolTestCase):
+
+    def test_round_trip(self):
+        for _, v in REPR_KEYS_AND_VALUES:
+            self.assertRoundTripOK(MarshalValueProtocol(), None, v)
+
+    def test_round_trip_with_trailing_tab(self):
+        for _, v in REPR_KEYS_AND_VALUES:
+            self.assertRoundTripWithTrailingTabOK(
+                MarshalValueProtocol(), None, v)
+
+    def test_bad_data(self):
+        self.assertCantDecode(MarshalValueProtocol(), b'{@#$@#!^&*$%^')
+
+
 class RawProtocolAliasesTestCase(BasicTestCase):
 
     def test_raw_protocol_aliases(self):
@@ -371,6 +626,11 @@ class BytesValueProtocolTestCase(ProtocolTestCase):
         self.assertEqual(BytesValueProtocol().read(b'foo\t \n\n'),
                          (None, b'foo\t \n\n'))
 
+    def test_read_and_write_many(self):
+        self.assertReadManyOK(BytesValueProtocol(), [b'foo', b'\xe9', b''])
+        self.assertWriteManyOK(BytesValueProtocol(),
+                               [(b'foo', b'bar'), (None, b'\xe9')])
+
 
 class TextValueProtocolTestCase(ProtocolTestCase):
 
@@ -393,6 +653,19 @@ class TextValueProtocolTestCase(ProtocolTestCase):
         self.assertEqual(TextValueProtocol().read(b'foo\t \n\n'),
                          (None, u'foo\t \n\n'))
 
+    def test_read_many(self):
+        self.assertReadManyOK(TextValueProtocol(),
+                              [b'foo', b'caf\xc3\xa9', b'', b'\t'])
+
+    def test_read_many_falls_back_to_latin_1_per_line(self):
+        self.assertEqual(TextValueProtocol().read_many(
+            [b'caf\xc3\xa9', b'caf\xe9']),
+            [(None, u'caf\xe9'), (None, u'caf\xe9')])
+
+    def test_write_many(self):
+        self.assertWriteManyOK(TextValueProtocol(),
+                               [(u'foo', u'bar'), (None, u'caf\xe9')])
+
 
 class BytesProtocolTestCase(ProtocolTestCase):
 
@@ -424,6 +697,12 @@ class BytesProtocolTestCase(ProtocolTestCase):
         self.assertEqual(BytesProtocol().read(b'foo\t \n\n'),
                          (b'foo', b' \n\n'))
 
+    def test_read_and_write_many(self):
+        self.assertReadManyOK(BytesProtocol(),
+                              [b'foo\tbar', b'foo', b'', b'a\tb\tc'])
+        self.assertWriteManyOK(BytesProtocol(),
+                               [(b'foo', b'bar'), (b'foo', None)])
+
 
 class TextProtocolTestCase(ProtocolTestCase):
 
@@ -464,6 +743,14 @@ class TextProtocolTestCase(ProtocolTestCase):
         self.assertEqual(TextProtocol().read(b'caf\xe9\tol\xc3\xa9'),
                          (u'caf\xe9', u'ol\xc3\xa9'))
 
+    def test_read_and_write_many(self):
+        self.assertReadManyOK(
+            TextProtocol(),
+            [b'foo\tbar', b'foo', b'caf\xc3\xa9\tol\xc3\xa9',
+             b'caf\xe9\tol\xc3\xa9'])
+        self.assertWriteManyOK(TextProtocol(),
+                               [(u'foo', u'bar'), (u'caf\xe9', None)])
+
 
 class ReprProtocolTestCase(ProtocolTestCase):
 
@@ -37,6 +37,7 @@ from mrjob.step import INPUT
 from mrjob.step import MRStep
 from mrjob.step import OUTPUT
 from mrjob.tools.emr.audit_usage import _JOB_KEY_RE
+from mrjob.util import _tar_and_gzip_files
 from mrjob.util import to_lines
 
 from tests.mock_boto3 import MockBoto3TestCase
@@ -596,6 +597,96 @@ class CreateDirArchiveTestCase(SandboxedTestCase):
 
         self.assertRaises(OSError, runner._create_dir_archive, qux_path)
 
+    def test_archive_is_reproducible(self):
+        tar_gz_contents = []
+
+        for _ in range(2):
+            runner = InlineMRJobRunner()
+
+            tar_gz_path = runner._dir_archive_path(self._to_archive)
+            runner._create_dir_archive(self._to_archive)
+
+            with open(tar_gz_path, 'rb') as f:
+                tar_gz_contents.append(f.read())
+
+            runner.cleanup()
+
+        self.assertEqual(tar_gz_contents[0], tar_gz_contents[1])
+
+
+class ArchiveCacheTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(ArchiveCacheTestCase, self).setUp()
+
+        self._to_archive = self.makedirs('archive')
+        self.makefile(os.path.join('archive', 'foo'), b'foo')
+
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+
+        self.tar_and_gzip_files = self.start(patch(
+            'mrjob.runner._tar_and_gzip_files',
+            side_effect=_tar_and_gzip_files))
+
+    def create_archive(self, archive_cache=True):
+        runner = InlineMRJobRunner(archive_cache=archive_cache,
+                                   cache_dir=self.cache_dir)
+        self.addCleanup(runner.cleanup)
+
+        tar_gz_path = runner._dir_archive_path(self._to_archive)
+        runner._create_dir_archive(self._to_archive)
+
+        with tarfile.open(tar_gz_path, 'r:gz') as tar_gz:
+            self.assertEqual(tar_gz.getnames(), ['foo'])
+
+        return tar_gz_path
+
+    def test_off_by_default(self):
+        self.create_archive(archive_cache=False)
+
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_reuse_archive(self):
+        self.create_archive()
+        self.assertEqual(self.tar_and_gzip_files.call_count, 1)
+
+        self.create_archive()
+        self.assertEqual(self.tar_and_gzip_files.call_count, 1)
+
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.cache_dir, 'archives'))), 1)
+
+    def test_rebuild_when_files_change(self):
+        self.create_archive()
+
+        foo_path = os.path.join(self._to_archive, 'foo')
+        with open(foo_path, 'w') as f:
+            f.write('food')
+
+        self.create_archive()
+        self.assertEqual(self.tar_and_gzip_files.call_count, 2)
+
+    def test_rebuild_when_files_added(self):
+        self.create_archive()
+
+        self.makefile(os.path.join('archive', '.bar'), b'bar')
+
+        runner = InlineMRJobRunner(archive_cache=True,
+                                   cache_dir=self.cache_dir)
+        self.addCleanup(runner.cleanup)
+
+        tar_gz_path = runner._dir_archive_path(self._to_archive)
+        runner._create_dir_archive(self._to_archive)
+
+        with tarfile.open(tar_gz_path, 'r:gz') as tar_gz:
+            self.assertEqual(tar_gz.getnames(), ['.bar', 'foo'])
+
+    def test_unwritable_cache_dir(self):
+        # cache_dir is a file
+        self.cache_dir = self.makefile('cache')
+
+        self.create_archive()
+
 
 class RemoteCreateDirArchiveTestCase(MockBoto3TestCase):
     # additional test cases that archive stuff from (mock) S3
@@ -14,6 +14,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import os
 
 from mrjob.setup import UploadDirManager
@@ -24,6 +25,7 @@ from mrjob.setup import parse_setup_cmd
 
 from tests.py2 import patch
 from tests.sandbox import BasicTestCase
+from tests.sandbox import SandboxedTestCase
 
 
 class ParseSetupCmdTestCase(BasicTestCase):
@@ -440,6 +442,71 @@ class UploadDirManagerTestCase(BasicTestCase):
                           '._foo': 'hdfs:///foo'})
 
 
+class ContentAddressedUploadDirManagerTestCase(SandboxedTestCase):
+
+    def sha256(self, data):
+        return hashlib.sha256(data).hexdigest()
+
+    def test_uri_includes_hash(self):
+        foo_path = self.makefile('foo.py', b'foo')
+
+        sd = UploadDirManager('s3://walrus/tmp/job/files/',
+                              cas_prefix='s3://walrus/tmp/cas/')
+        sd.add(foo_path)
+
+        self.assertEqual(
+            sd.path_to_uri(),
+            {foo_path: 's3://walrus/tmp/cas/%s/foo.py' % self.sha256(b'foo')})
+
+    def test_same_name_different_contents(self):
+        foo1_path = self.makefile(os.path.join('1', 'foo.py'), b'foo')
+        foo2_path = self.makefile(os.path.join('2', 'foo.py'), b'bar')
+
+        sd = UploadDirManager('hdfs:///job/files/', cas_prefix='hdfs:///cas/')
+        sd.add(foo1_path)
+        sd.add(foo2_path)
+
+        # no need to rename foo.py to foo-1.py
+        self.assertEqual(
+            sd.path_to_uri(),
+            {foo1_path: 'hdfs:///cas/%s/foo.py' % self.sha256(b'foo'),
+             foo2_path: 'hdfs:///cas/%s/foo.py' % self.sha256(b'bar')})
+
+    def test_same_contents_same_uri(self):
+        foo1_path = self.makefile(os.path.join('1', 'foo.py'), b'foo')
+        foo2_path = self.makefile(os.path.join('2', 'foo.py'), b'foo')
+
+        sd = UploadDirManager('hdfs:///job/files/', cas_prefix='hdfs:///cas/')
+
+        self.assertEqual(sd.add(foo1_path), sd.add(foo2_path))
+
+    def test_unhide_files(self):
+        bar_path = self.makefile('_bar.txt', b'bar')
+
+        sd = UploadDirManager('hdfs:///job/files/', cas_prefix='hdfs:///cas/')
+
+        self.assertEqual(sd.add(bar_path),
+                         'hdfs:///cas/%s/bar.txt' % self.sha256(b'bar'))
+
+    def test_uris_pass_through(self):
+        sd = UploadDirManager('hdfs:///job/files/', cas_prefix='hdfs:///cas/')
+
+        self.assertEqual(sd.add('hdfs:///data/foo.py'), 'hdfs:///data/foo.py')
+        self.assertEqual(sd.path_to_uri(), {})
+
+    def test_hash_is_computed_once(self):
+        foo_path = self.makefile('foo.py', b'foo')
+
+        sd = UploadDirManager('hdfs:///job/files/', cas_prefix='hdfs:///cas/')
+        uri = sd.add(foo_path)
+
+        # changing the file doesn't change its URI
+        with open(foo_path, 'wb') as f:
+            f.write(b'bar')
+
+        self.assertEqual(sd.uri(foo_path), uri)
+
+
 class WorkingDirManagerTestCase(BasicTestCase):
 
     def test_empty(self):
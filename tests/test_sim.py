@@ -13,9 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from io import BytesIO
+import bz2
 import gzip
 import os
+import random
 import stat
+import zlib
 from os.path import join
 from shutil import make_archive
 
@@ -23,10 +26,26 @@ from mrjob import conf
 from mrjob.examples.mr_word_freq_count import MRWordFreqCount
 from mrjob.inline import InlineMRJobRunner
 from mrjob.job import MRJob
+from mrjob.compat import jobconf_from_env
 from mrjob.protocol import JSONValueProtocol
+from mrjob.protocol import RawProtocol
+from mrjob.sim import _hash_partition
+from mrjob.sim import _key_field_partition
+from mrjob.sim import _largest_first
+from mrjob.sim import _open_bz2_split
+from mrjob.sim import _parse_key_fields
+from mrjob.sim import _sample_input_file
+from mrjob.sim import _sort_lines_externally
+from mrjob.sim import _split_bz2_file
+from mrjob.sim import _split_file_on_lines
+from mrjob.sim import _SortBuffer
 from mrjob.step import MRStep
+from mrjob.util import to_lines
 
+from tests.mr_batch_word_freq_count import MRBatchWordFreqCount
 from tests.mr_group import MRGroup
+from tests.mr_marshal_internal_job import MRMarshalInternalJob
+from tests.mr_marshal_total_job import MRMarshalTotalJob
 from tests.mr_no_mapper import MRNoMapper
 from tests.mr_os_walk_job import MROSWalkJob
 from tests.mr_sort_and_group import MRSortAndGroup
@@ -72,6 +91,29 @@ class MRFilePermissionsJob(MRJob):
             yield path, os.stat(path).st_mode
 
 
+class MRReducerNumJob(MRJob):
+    """Output which reducer (partition) each key went to."""
+
+    INTERNAL_PROTOCOL = RawProtocol
+
+    def mapper(self, _, line):
+        yield line.rstrip(), ''
+
+    def reducer(self, key, _):
+        yield key, int(jobconf_from_env('mapreduce.task.partition'))
+
+
+class MRPartitionByPrefixJob(MRReducerNumJob):
+    """Send keys with the same prefix (before ``.``) to the same reducer."""
+
+    PARTITIONER = 'org.apache.hadoop.mapred.lib.KeyFieldBasedPartitioner'
+
+    JOBCONF = {
+        'mapreduce.map.output.key.field.separator': '.',
+        'mapreduce.partition.keypartitioner.options': '-k1,1',
+    }
+
+
 class SortValuesTestCase(SandboxedTestCase):
     # inline runner doesn't have its own sorting logic
     RUNNER = 'inline'
@@ -120,6 +162,790 @@ class SortValuesTestCase(SandboxedTestCase):
                  ('a', ['aardvark'])])
 
 
+class SortLinesExternallyTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(SortLinesExternallyTestCase, self).setUp()
+
+        self.input1 = self.makefile(
+            'input1', b'b\tbowling\na\talligator\nc\tcactus\n')
+        self.input2 = self.makefile(
+            'input2', b'a\tactuary\nb\tbaby\na\tartichoke\n')
+
+        self.output = join(self.tmp_dir, 'output')
+        self.sort_tmp_dir = self.makedirs('sort-tmp')
+
+    def sort(self, **kwargs):
+        _sort_lines_externally([self.input1, self.input2], self.output,
+                               tmp_dir=self.sort_tmp_dir, **kwargs)
+
+        with open(self.output, 'rb') as f:
+            return f.read()
+
+    def test_in_memory(self):
+        self.assertEqual(
+            self.sort(),
+            b'a\talligator\na\tactuary\na\tartichoke\n'
+            b'b\tbowling\nb\tbaby\nc\tcactus\n')
+
+    def test_spill_to_disk(self):
+        # keep values in the same order, like sort -s
+        self.assertEqual(
+            self.sort(buffer_size=10),
+            b'a\talligator\na\tactuary\na\tartichoke\n'
+            b'b\tbowling\nb\tbaby\nc\tcactus\n')
+
+    def test_spill_to_disk_with_sort_values(self):
+        self.assertEqual(
+            self.sort(buffer_size=10, sort_values=True),
+            b'a\tactuary\na\talligator\na\tartichoke\n'
+            b'b\tbaby\nb\tbowling\nc\tcactus\n')
+
+    def test_multiple_merge_passes(self):
+        self.assertEqual(
+            self.sort(buffer_size=1, merge_factor=2, sort_values=True),
+            b'a\tactuary\na\talligator\na\tartichoke\n'
+            b'b\tbaby\nb\tbowling\nc\tcactus\n')
+
+    def test_cleans_up_sorted_runs(self):
+        self.sort(buffer_size=10, merge_factor=2)
+
+        self.assertEqual(os.listdir(self.sort_tmp_dir), [])
+
+    def test_missing_final_newline(self):
+        input3 = self.makefile('input3', b'a\tapple')
+
+        _sort_lines_externally([input3, self.input2], self.output,
+                               tmp_dir=self.sort_tmp_dir, buffer_size=1)
+
+        with open(self.output, 'rb') as f:
+            self.assertEqual(
+                f.read(),
+                b'a\tapple\na\tactuary\na\tartichoke\nb\tbaby\n')
+
+    def test_empty_input(self):
+        _sort_lines_externally([], self.output, tmp_dir=self.sort_tmp_dir)
+
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read(), b'')
+
+
+class SortBufferJobConfTestCase(SortValuesTestCase):
+
+    def _run_job(self, job_class, extra_args=()):
+        job = job_class(['-r', self.RUNNER,
+                         '-D', 'mapreduce.task.io.sort.mb=0.00001',
+                         '-D', 'mapreduce.task.io.sort.factor=2'] +
+                        list(extra_args))
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        with job.make_runner() as runner:
+            runner.run()
+            return sorted(job.parse_output(runner.cat_output()))
+
+    def test_no_sort_values_with_tiny_sort_buffer(self):
+        self.assertEqual(
+            self._run_job(MRGroup),
+            [('a', ['alligator', 'actuary', 'artichoke']),
+             ('b', ['bowling', 'balloon', 'baby'])])
+
+    def test_sort_values_with_tiny_sort_buffer(self):
+        self.assertEqual(
+            self._run_job(MRSortAndGroup),
+            [('a', ['actuary', 'alligator', 'artichoke']),
+             ('b', ['baby', 'balloon', 'bowling'])])
+
+
+class SortBufferTestCase(SandboxedTestCase):
+
+    def setUp(self):
+        super(SortBufferTestCase, self).setUp()
+
+        self.sort_tmp_dir = self.makedirs('sort-tmp')
+
+    def sorted_lines(self, data, **kwargs):
+        sort_buffer = _SortBuffer(tmp_dir=self.sort_tmp_dir, **kwargs)
+        try:
+            for chunk in data:
+                sort_buffer.write(chunk)
+
+            with sort_buffer.sorted_lines() as lines:
+                return list(lines)
+        finally:
+            sort_buffer.cleanup()
+
+    def test_in_memory(self):
+        self.assertEqual(
+            self.sorted_lines([b'b\tbaby\na\tapple\n']),
+            [b'a\tapple\n', b'b\tbaby\n'])
+        self.assertEqual(os.listdir(self.sort_tmp_dir), [])
+
+    def test_writes_split_across_lines(self):
+        self.assertEqual(
+            self.sorted_lines([b'b\tba', b'by\na\t', b'apple']),
+            [b'a\tapple\n', b'b\tbaby\n'])
+
+    def test_spill_to_disk(self):
+        self.assertEqual(
+            self.sorted_lines([b'b\tbaby\na\tapple\n', b'a\tactuary\n'],
+                              buffer_size=1),
+            [b'a\tapple\n', b'a\tactuary\n', b'b\tbaby\n'])
+
+    def test_cleanup(self):
+        sort_buffer = _SortBuffer(tmp_dir=self.sort_tmp_dir, buffer_size=1)
+        sort_buffer.write(b'b\tbaby\na\tapple\n')
+
+        self.assertNotEqual(os.listdir(self.sort_tmp_dir), [])
+
+        sort_buffer.cleanup()
+
+        self.assertEqual(os.listdir(self.sort_tmp_dir), [])
+
+
+class MapperToCombinerInMemoryTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    _INPUT = b'one fish two fish\nred fish blue fish\n'
+
+    def _run_job(self, extra_args=()):
+        job = MRWordFreqCount(['-r', self.RUNNER] + list(extra_args))
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            # mapper output goes straight to the combiner
+            for task_type in ('mapper', 'combiner'):
+                self.assertEqual(
+                    list(runner.fs.ls(join(
+                        runner._step_dir(0), task_type, '*', 'input'))), [])
+            self.assertEqual(
+                list(runner.fs.ls(join(
+                    runner._step_dir(0), 'mapper', '*', 'output'))), [])
+
+            # combiner output goes straight to sorted partitions
+            self.assertEqual(
+                list(runner.fs.ls(join(
+                    runner._step_dir(0), 'combiner', '*', 'output'))), [])
+            self.assertEqual(
+                list(runner.fs.ls(join(
+                    runner._step_dir(0), 'mapper', '*', '*.unsorted'))), [])
+
+            for path in runner.fs.ls(join(
+                    runner._step_dir(0), 'mapper', '*', 'partition-*')):
+                with open(path, 'rb') as f:
+                    keys = [line.split(b'\t')[0] for line in f]
+                self.assertEqual(keys, sorted(keys))
+
+            return dict(job.parse_output(runner.cat_output()))
+
+    def test_mapper_and_combiner(self):
+        self.assertEqual(
+            self._run_job(),
+            dict(blue=1, fish=4, one=1, red=1, two=1))
+
+    def test_tiny_sort_buffer(self):
+        self.assertEqual(
+            self._run_job(['-D', 'mapreduce.task.io.sort.mb=0.00001',
+                           '-D', 'mapreduce.task.io.sort.factor=2']),
+            dict(blue=1, fish=4, one=1, red=1, two=1))
+
+    def test_multiple_reducers(self):
+        self.assertEqual(
+            self._run_job(['-D', 'mapreduce.job.reduces=3']),
+            dict(blue=1, fish=4, one=1, red=1, two=1))
+
+    def test_multiple_reducers_and_tiny_sort_buffer(self):
+        self.assertEqual(
+            self._run_job(['-D', 'mapreduce.job.reduces=3',
+                           '-D', 'mapreduce.task.io.sort.mb=0.00001',
+                           '-D', 'mapreduce.task.io.sort.factor=2']),
+            dict(blue=1, fish=4, one=1, red=1, two=1))
+
+
+class BatchMethodsTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def test_batch_word_freq_count(self):
+        job = MRBatchWordFreqCount(['-r', self.RUNNER])
+        job.sandbox(stdin=BytesIO(
+            b'one fish two fish\nred fish blue fish\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                dict(job.parse_output(runner.cat_output())),
+                dict(blue=1, fish=4, one=1, red=1, two=1))
+
+            self.assertGreater(
+                runner.counters()[0]['batch']['mapper'], 0)
+
+
+class MarshalInternalProtocolTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def test_binary_internal_protocol(self):
+        job = MRMarshalInternalJob(['-r', self.RUNNER, '--num-cores', '2'])
+        job.sandbox(stdin=BytesIO(
+            b'one fish two fish\nred fish blue fish\nthree four\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                dict(job.parse_output(runner.cat_output())),
+                dict(b4=['blue'], f4=['fish', 'four'], o3=['one'],
+                     r3=['red'], t3=['two'], t5=['three']))
+
+    def test_interned_and_computed_keys_group_together(self):
+        job = MRMarshalTotalJob(['-r', self.RUNNER])
+        job.sandbox(stdin=BytesIO(b'1\n2\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(list(job.parse_output(runner.cat_output())),
+                             [('total', 9)])
+
+
+class MapOutputPartitionTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def test_map_tasks_partition_and_sort_output(self):
+        job = MRWordFreqCount(['-r', self.RUNNER, '--num-cores', '3'])
+        job.sandbox(stdin=BytesIO(
+            b'one fish two fish\nred fish blue fish\n'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                dict(job.parse_output(runner.cat_output())),
+                dict(blue=1, fish=4, one=1, red=1, two=1))
+
+            # one output file per reducer, even if some are empty
+            output_paths = list(runner.fs.ls(
+                join(runner.get_output_dir(), 'part-*')))
+            self.assertEqual(len(output_paths), 3)
+
+            reducer_to_keys = {}
+
+            for reducer_num in range(3):
+                partition_paths = list(runner.fs.ls(join(
+                    runner._step_dir(0), 'mapper', '*',
+                    'partition-%05d' % reducer_num)))
+                self.assertGreater(len(partition_paths), 0)
+
+                for path in partition_paths:
+                    with open(path, 'rb') as f:
+                        keys = [line.split(b'\t')[0] for line in f]
+
+                    self.assertEqual(keys, sorted(keys))
+                    reducer_to_keys.setdefault(reducer_num, set()).update(
+                        keys)
+
+            # each key goes to exactly one reducer
+            all_keys = [k for keys in reducer_to_keys.values() for k in keys]
+            self.assertEqual(len(all_keys), len(set(all_keys)))
+            self.assertEqual(len(all_keys), 5)
+
+    def test_empty_input(self):
+        job = MRWordFreqCount(['-r', self.RUNNER, '--num-cores', '2'])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(list(job.parse_output(runner.cat_output())), [])
+
+
+class MapperInputSplitTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def test_split_without_copying_input(self):
+        input_path = self.makefile(
+            'input.txt', ''.join('%d fish\n' % i for i in range(100)))
+
+        job = MRWordFreqCount(
+            ['-r', self.RUNNER, '--num-cores', '4', input_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            output = dict(job.parse_output(runner.cat_output()))
+            self.assertEqual(output['fish'], 100)
+            self.assertEqual(len(output), 101)
+
+            splits = runner._step_to_map_splits[0]
+            self.assertEqual(len(splits), 8)
+
+            # splits cover the file, end to end
+            start = 0
+            for split in splits:
+                self.assertEqual(split['file'], input_path)
+                self.assertEqual(split['start'], start)
+                self.assertNotIn('input', split)
+                start += split['length']
+            self.assertEqual(start, os.stat(input_path).st_size)
+
+            # didn't copy the input
+            self.assertEqual(
+                list(runner.fs.ls(join(
+                    runner._step_dir(0), 'mapper', '*', 'input'))),
+                [])
+
+    def test_decompress_in_map_tasks(self):
+        input_gz_path = join(self.tmp_dir, 'input.gz')
+        with gzip.GzipFile(input_gz_path, 'wb') as input_gz:
+            input_gz.write(b'one fish two fish\n')
+
+        job = MRWordFreqCount(['-r', self.RUNNER, input_gz_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                dict(job.parse_output(runner.cat_output())),
+                dict(fish=2, one=1, two=1))
+
+            splits = runner._step_to_map_splits[0]
+            self.assertEqual(len(splits), 1)
+            self.assertNotIn('input', splits[0])
+
+    def test_split_bz2_on_blocks(self):
+        # use the smallest block size (100k) so we get several blocks
+        input_bz2_path = self.makefile('input.bz2', bz2.compress(
+            _random_lines(20000), 1))
+
+        job = MRWordFreqCount(
+            ['-r', self.RUNNER, '--num-cores', '4', input_bz2_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            output = dict(job.parse_output(runner.cat_output()))
+            self.assertEqual(output['fish'], 20000)
+
+            splits = runner._step_to_map_splits[0]
+            self.assertGreater(len(splits), 1)
+            self.assertEqual(sum(s['num_blocks'] for s in splits),
+                             len(splits[0]['bz2_blocks']))
+
+
+class AutoTuneTasksTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def _make_runner(self, input_paths, *args):
+        job = MRWordFreqCount(
+            ['-r', self.RUNNER, '--auto-tune-tasks'] + list(args) +
+            list(input_paths))
+        job.sandbox()
+
+        return job.make_runner()
+
+    def test_split_by_uncompressed_size(self):
+        # an uncompressed file, and a .bz2 file that decompresses to
+        # the same number of bytes
+        data = _random_lines(20000)
+        input_path = self.makefile('input.txt', data)
+        input_bz2_path = self.makefile('input.bz2', bz2.compress(data, 1))
+
+        with self._make_runner([input_path, input_bz2_path],
+                               '--num-cores', '4') as runner:
+            splits = runner._split_mapper_input(
+                [input_path, input_bz2_path], 0)
+
+        # the uncompressed file should get about half of the 8 splits,
+        # rather than nearly all of them
+        txt_splits = [s for s in splits if s['file'] == input_path]
+        self.assertLessEqual(len(txt_splits), 5)
+
+    def test_min_lines_per_split(self):
+        input_path = self.makefile(
+            'input.txt', ''.join('%d fish\n' % i for i in range(100)))
+
+        job = MRWordFreqCount(
+            ['-r', self.RUNNER, '--auto-tune-tasks', '--num-cores', '4',
+             input_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            # too few lines to bother splitting
+            self.assertEqual(len(runner._step_to_map_splits[0]), 1)
+
+            output = dict(job.parse_output(runner.cat_output()))
+            self.assertEqual(output['fish'], 100)
+
+    def test_small_input_gets_one_reducer(self):
+        input_path = self.makefile('input.txt', b'one fish two fish\n')
+
+        with self._make_runner([input_path], '--num-cores', '4') as runner:
+            runner.run()
+
+            self.assertEqual(runner._num_reducers(0), 1)
+            self.assertEqual(
+                len(list(runner.fs.ls(
+                    join(runner.get_output_dir(), 'part-*')))), 1)
+
+    def test_mapreduce_job_reduces_overrides(self):
+        input_path = self.makefile('input.txt', b'one fish two fish\n')
+
+        with self._make_runner([input_path], '--num-cores', '4',
+                               '-D', 'mapreduce.job.reduces=3') as runner:
+            self.assertEqual(runner._num_reducers(0), 3)
+
+    def test_off_by_default(self):
+        input_path = self.makefile('input.txt', b'one fish two fish\n')
+
+        job = MRWordFreqCount(['-r', self.RUNNER, '--num-cores', '4',
+                               input_path])
+        job.sandbox()
+
+        with job.make_runner() as runner:
+            self.assertEqual(runner._num_reducers(0), 4)
+
+
+class LargestFirstTestCase(BasicTestCase):
+
+    def test_empty(self):
+        self.assertEqual(_largest_first([]), [])
+
+    def test_largest_first(self):
+        self.assertEqual(_largest_first([10, 300, 20]), [1, 2, 0])
+
+    def test_ties_stay_in_order(self):
+        self.assertEqual(_largest_first([5, 7, 5, 7]), [1, 3, 0, 2])
+
+
+class TaskOrderTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    def test_biggest_tasks_run_first(self):
+        small_path = self.makefile('small.txt', b'one fish\n')
+        big_path = self.makefile(
+            'big.txt', b''.join(b'%d fish\n' % i for i in range(1000)))
+
+        job = MRWordFreqCount(['-r', self.RUNNER, '--num-cores', '2',
+                               small_path, big_path])
+        job.sandbox()
+
+        task_order = []
+
+        with job.make_runner() as runner:
+            real_mapper_func = runner._run_mapper_and_combiner_func
+            real_reducer_func = runner._run_reducer_func
+
+            def run_mapper_and_combiner_func(step_num, task_num, map_split):
+                task_order.append(('mapper', task_num, map_split['length']))
+                return real_mapper_func(step_num, task_num, map_split)
+
+            def run_reducer_func(step_num, task_num, num_map_tasks):
+                task_order.append(('reducer', task_num, None))
+                return real_reducer_func(step_num, task_num, num_map_tasks)
+
+            self.start(patch.object(runner, '_run_mapper_and_combiner_func',
+                                    side_effect=run_mapper_and_combiner_func))
+            self.start(patch.object(runner, '_run_reducer_func',
+                                    side_effect=run_reducer_func))
+
+            runner.run()
+
+            output = dict(job.parse_output(runner.cat_output()))
+            self.assertEqual(output['fish'], 1001)
+
+        map_sizes = [size for task_type, _, size in task_order
+                     if task_type == 'mapper']
+        self.assertEqual(map_sizes, sorted(map_sizes, reverse=True))
+
+        # the small file is the first split, but it should run last
+        map_task_nums = [task_num for task_type, task_num, _ in task_order
+                         if task_type == 'mapper']
+        self.assertEqual(map_task_nums[-1], 0)
+        self.assertEqual(sorted(map_task_nums),
+                         list(range(len(map_task_nums))))
+
+        reducer_task_nums = [task_num for task_type, task_num, _ in task_order
+                             if task_type == 'reducer']
+        self.assertEqual(sorted(reducer_task_nums), [0, 1])
+
+
+class SampleInputFileTestCase(SandboxedTestCase):
+
+    def test_uncompressed(self):
+        path = self.makefile('input.txt', b'a\t1\nb\t2\na\t3\n')
+
+        self.assertEqual(_sample_input_file(path), dict(
+            size=12,
+            uncompressed_size=12,
+            num_lines=3,
+            keys={b'a', b'b'},
+            complete=True,
+        ))
+
+    def test_empty(self):
+        path = self.makefile('empty.txt', b'')
+
+        sample = _sample_input_file(path)
+        self.assertEqual(sample['uncompressed_size'], 0)
+        self.assertEqual(sample['num_lines'], 0)
+        self.assertTrue(sample['complete'])
+
+    def test_gz_estimate(self):
+        data = _random_lines(20000)
+        path = join(self.tmp_dir, 'input.gz')
+        with gzip.GzipFile(path, 'wb') as f:
+            f.write(data)
+
+        sample = _sample_input_file(path, sample_size=10000)
+
+        self.assertFalse(sample['complete'])
+        self.assertLess(sample['size'], len(data))
+        # should be within a factor of two
+        self.assertGreater(sample['uncompressed_size'], len(data) // 2)
+        self.assertLess(sample['uncompressed_size'], len(data) * 2)
+        self.assertGreater(sample['num_lines'], 10000)
+        self.assertLess(sample['num_lines'], 40000)
+
+    def test_gz_complete(self):
+        data = b'one fish\ntwo fish\n'
+        path = join(self.tmp_dir, 'input.gz')
+        with gzip.GzipFile(path, 'wb') as f:
+            f.write(data)
+
+        sample = _sample_input_file(path)
+
+        self.assertTrue(sample['complete'])
+        self.assertEqual(sample['uncompressed_size'], len(data))
+        self.assertEqual(sample['num_lines'], 2)
+
+
+def _random_lines(num_lines, seed=0):
+    r = random.Random(seed)
+
+    return ''.join(
+        '%d fish %d\n' % (i, r.randint(0, 2 ** 32)) for i in range(num_lines)
+    ).encode('ascii')
+
+
+class SplitBz2FileTestCase(SandboxedTestCase):
+
+    def _read_splits(self, data, split_size):
+        path = self.makefile('input.bz2', data)
+
+        lines = []
+        splits = list(_split_bz2_file(path, split_size))
+
+        for split in splits:
+            with _open_bz2_split(path, split['bz2_blocks'],
+                                 split['first_block'],
+                                 split['num_blocks']) as split_lines:
+                lines.extend(split_lines)
+
+        return splits, lines
+
+    def test_lines_across_blocks(self):
+        data = _random_lines(20000)
+
+        for split_size in (1, 50000, 100000, 10 ** 9):
+            splits, lines = self._read_splits(bz2.compress(data, 1),
+                                              split_size)
+            self.assertEqual(b''.join(lines), data)
+
+        self.assertEqual(len(splits), 1)
+
+    def test_line_spanning_several_blocks(self):
+        data = b'short\n' + _random_lines(20000).replace(b'\n', b' ') + (
+            b'\nshort\n')
+
+        splits, lines = self._read_splits(bz2.compress(data, 1), 1)
+
+        self.assertGreater(len(splits), 2)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(b''.join(lines), data)
+
+    def test_no_trailing_newline(self):
+        data = _random_lines(20000) + b'no newline'
+
+        splits, lines = self._read_splits(bz2.compress(data, 1), 1)
+        self.assertEqual(b''.join(lines), data)
+
+    def test_empty_file(self):
+        path = self.makefile('input.bz2', bz2.compress(b''))
+
+        splits = list(_split_bz2_file(path, 1))
+
+        # falls back to decompressing the whole file
+        self.assertEqual(len(splits), 1)
+        self.assertNotIn('bz2_blocks', splits[0])
+
+
+class SplitFileOnLinesTestCase(SandboxedTestCase):
+
+    def test_empty_file(self):
+        path = self.makefile('empty')
+
+        self.assertEqual(list(_split_file_on_lines(path, 10)), [(0, 0)])
+
+    def test_splits_end_on_line_boundaries(self):
+        path = self.makefile('input', b'aaa\nbb\nc\ndddd\n')
+
+        self.assertEqual(list(_split_file_on_lines(path, 3)),
+                         [(0, 4), (4, 3), (7, 7)])
+
+        self.assertEqual(list(_split_file_on_lines(path, 5)),
+                         [(0, 7), (7, 7)])
+
+    def test_no_trailing_newline(self):
+        path = self.makefile('input', b'aaa\nbbb')
+
+        self.assertEqual(list(_split_file_on_lines(path, 2)),
+                         [(0, 4), (4, 3)])
+
+    def test_split_bigger_than_file(self):
+        path = self.makefile('input', b'aaa\nbbb\n')
+
+        self.assertEqual(list(_split_file_on_lines(path, 100)), [(0, 8)])
+
+
+class PartitionerTestCase(SandboxedTestCase):
+
+    RUNNER = 'inline'
+
+    _INPUT = b'apple.1\napple.2\napple.3\nbanana.1\nbanana.2\ncherry.1\n'
+
+    def _key_to_reducer(self, job_class, *args):
+        job = job_class(['-r', self.RUNNER] + list(args))
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            return dict(job.parse_output(runner.cat_output()))
+
+    def test_num_reducers_from_jobconf(self):
+        key_to_reducer = self._key_to_reducer(
+            MRReducerNumJob, '-D', 'mapreduce.job.reduces=2')
+
+        self.assertEqual(len(key_to_reducer), 6)
+        self.assertEqual(set(key_to_reducer.values()), set([0, 1]))
+
+    def test_num_reducers_from_hadoop_1_jobconf(self):
+        key_to_reducer = self._key_to_reducer(
+            MRReducerNumJob, '-D', 'mapred.reduce.tasks=1')
+
+        self.assertEqual(set(key_to_reducer.values()), set([0]))
+
+    def test_zero_reducers_means_map_only(self):
+        job = MRReducerNumJob(
+            ['-r', self.RUNNER, '-D', 'mapreduce.job.reduces=0'])
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            # mapper output, written straight to the step's output
+            self.assertEqual(
+                sorted(to_lines(runner.cat_output())),
+                [line + b'\t\n' for line in self._INPUT.splitlines()])
+
+            self.assertFalse(
+                os.path.exists(join(runner._step_dir(0), 'reducer')))
+
+    def test_negative_reducers(self):
+        job = MRReducerNumJob(
+            ['-r', self.RUNNER, '-D', 'mapreduce.job.reduces=-1'])
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        with job.make_runner() as runner:
+            self.assertRaises(ValueError, runner.run)
+
+    def test_hash_partitioner(self):
+        key_to_reducer = self._key_to_reducer(
+            MRReducerNumJob, '-D', 'mapreduce.job.reduces=4')
+
+        for key, reducer_num in key_to_reducer.items():
+            self.assertEqual(
+                reducer_num, _hash_partition(key.encode('utf_8'), 4))
+
+        # with these keys, apples are split between reducers
+        self.assertNotEqual(key_to_reducer['apple.1'],
+                            key_to_reducer['apple.2'])
+
+    def test_key_field_based_partitioner(self):
+        key_to_reducer = self._key_to_reducer(
+            MRPartitionByPrefixJob, '-D', 'mapreduce.job.reduces=4')
+
+        self.assertEqual(len(key_to_reducer), 6)
+
+        self.assertEqual(key_to_reducer['apple.1'], key_to_reducer['apple.2'])
+        self.assertEqual(key_to_reducer['apple.1'], key_to_reducer['apple.3'])
+        self.assertEqual(key_to_reducer['banana.1'],
+                         key_to_reducer['banana.2'])
+
+    def test_unsupported_partitioner(self):
+        log = self.start(patch('mrjob.sim.log'))
+
+        job = MRReducerNumJob(['-r', self.RUNNER])
+        job.sandbox(stdin=BytesIO(self._INPUT))
+
+        self.start(patch.object(job, 'partitioner',
+                                return_value='com.example.MyPartitioner'))
+
+        with job.make_runner() as runner:
+            runner.run()
+
+            self.assertEqual(
+                len(dict(job.parse_output(runner.cat_output()))), 6)
+
+        self.assertTrue(log.warning.called)
+        self.assertIn('partitioner', log.warning.call_args[0][0])
+
+
+class KeyFieldPartitionTestCase(BasicTestCase):
+
+    def test_parse_key_fields(self):
+        self.assertEqual(_parse_key_fields(None), [])
+        self.assertEqual(_parse_key_fields('-k1,1'), [(1, 1)])
+        self.assertEqual(_parse_key_fields('-k2'), [(2, None)])
+        self.assertEqual(_parse_key_fields('-k1.2,3.4n -k 5'),
+                         [(1, 3), (5, None)])
+
+    def test_whole_key_by_default(self):
+        self.assertEqual(
+            _key_field_partition(b'a.b\tc', 7),
+            _hash_partition(b'a.b', 7))
+
+    def test_fields_of_key(self):
+        self.assertEqual(
+            _key_field_partition(b'a.b\tc', 7, key_fields=[(1, 1)],
+                                 field_separator=b'.'),
+            _hash_partition(b'a', 7))
+
+    def test_multiple_key_fields(self):
+        # this is how SORT_VALUES works
+        self.assertEqual(
+            _key_field_partition(b'a\tb\tc', 7, key_fields=[(1, 1)],
+                                 num_key_fields=2),
+            _hash_partition(b'a', 7))
+
+        self.assertEqual(
+            _key_field_partition(b'a\tb\tc', 7, num_key_fields=2),
+            zlib.crc32(b'a\tb') % 7)
+
+
 class MRJobFileOptionsTestCase(SandboxedTestCase):
 
     def setUp(self):
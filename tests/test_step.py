@@ -41,6 +41,15 @@ def null_mapper_raw(input_path, input_uri):
     pass
 
 
+def identity_mapper_batch(keys, values):
+    return zip(keys, values)
+
+
+def identity_reducer_batch(k, vals):
+    for v in vals:
+        yield k, v
+
+
 def spark_func(input_path, output_path):
     pass
 
@@ -226,6 +235,17 @@ class MRStepInitTestCase(BasicTestCase):
     def test_explict_mapper_raw(self):
         self._test_explicit(mapper_raw=null_mapper_raw, m=True)
 
+    # batch
+
+    def test_explicit_mapper_batch(self):
+        self._test_explicit(mapper_batch=identity_mapper_batch, m=True)
+
+    def test_explicit_combiner_batch(self):
+        self._test_explicit(combiner_batch=identity_reducer_batch, c=True)
+
+    def test_explicit_reducer_batch(self):
+        self._test_explicit(reducer_batch=identity_reducer_batch, r=True)
+
     ### Conflicts ###
 
     def _test_conflict(self, **kwargs):
@@ -241,9 +261,25 @@ class MRStepInitTestCase(BasicTestCase):
         self._test_conflict(mapper_pre_filter='cat',
                             mapper_raw=null_mapper_raw)
 
+    def test_conflict_mapper_batch_and_mapper(self):
+        self._test_conflict(mapper=identity_mapper,
+                            mapper_batch=identity_mapper_batch)
+
+    def test_conflict_mapper_batch_and_mapper_raw(self):
+        self._test_conflict(mapper_raw=null_mapper_raw,
+                            mapper_batch=identity_mapper_batch)
+
     def test_conflict_combiner(self):
         self._test_conflict(combiner_cmd='cat', combiner=identity_reducer)
 
+    def test_conflict_combiner_batch_and_combiner(self):
+        self._test_conflict(combiner=identity_reducer,
+                            combiner_batch=identity_reducer_batch)
+
+    def test_conflict_reducer_batch_and_reducer(self):
+        self._test_conflict(reducer=identity_reducer,
+                            reducer_batch=identity_reducer_batch)
+
     def test_conflict_reducer(self):
         self._test_conflict(reducer_cmd='cat', reducer=identity_reducer)
 
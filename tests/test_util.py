@@ -16,11 +16,13 @@
 """Tests of all the amazing utilities in mrjob.util"""
 import os
 import shutil
+import stat
 import sys
 import tempfile
 from io import BytesIO
 from subprocess import PIPE
 from subprocess import Popen
+from zipfile import ZipFile
 
 from mrjob.py2 import PY2
 from mrjob.util import cmd_line
@@ -32,6 +34,9 @@ from mrjob.util import to_lines
 from mrjob.util import unarchive
 from mrjob.util import unique
 from mrjob.util import which
+from mrjob.util import zip_dir
+from mrjob.util import _dir_files
+from mrjob.util import _tar_and_gzip_files
 
 from tests.py2 import Mock
 from tests.py2 import patch
@@ -281,6 +286,100 @@ class ArchiveTestCase(BasicTestCase):
             IOError,
             unarchive, join(self.tmp_dir, 'a', 'foo'), join(self.tmp_dir, 'b'))
 
+    def test_zip_dir(self):
+        join = os.path.join
+
+        zip_path = join(self.tmp_dir, 'a.zip')
+        zip_dir(join(self.tmp_dir, 'a'), zip_path,
+                filter=lambda path: path != 'baz')
+
+        unarchive(zip_path, join(self.tmp_dir, 'b'))
+
+        self.ensure_expected_results(excluded_files=['baz'])
+
+    def test_zip_dir_is_reproducible(self):
+        join = os.path.join
+
+        zip_dir(join(self.tmp_dir, 'a'), join(self.tmp_dir, 'a1.zip'))
+
+        # archive contents don't depend on mtime
+        os.utime(join(self.tmp_dir, 'a', 'foo'), (0, 0))
+
+        zip_dir(join(self.tmp_dir, 'a'), join(self.tmp_dir, 'a2.zip'))
+
+        with open(join(self.tmp_dir, 'a1.zip'), 'rb') as a1:
+            with open(join(self.tmp_dir, 'a2.zip'), 'rb') as a2:
+                self.assertEqual(a1.read(), a2.read())
+
+    def test_zip_dir_before_python_3_6(self):
+        # ZipFile.open() can't write files before Python 3.6
+        join = os.path.join
+
+        os.chmod(join(self.tmp_dir, 'a', 'foo'), 0o755)
+
+        zip_path = join(self.tmp_dir, 'a.zip')
+        with patch.object(sys, 'version_info', (3, 5, 0)):
+            zip_dir(join(self.tmp_dir, 'a'), zip_path)
+
+        with ZipFile(zip_path) as zip_file:
+            mode = zip_file.getinfo('foo').external_attr >> 16
+
+        self.assertEqual(stat.S_IMODE(mode), 0o755)
+
+        unarchive(zip_path, join(self.tmp_dir, 'b'))
+
+        self.ensure_expected_results()
+
+    def test_zip_dir_keeps_permissions(self):
+        join = os.path.join
+
+        os.chmod(join(self.tmp_dir, 'a', 'foo'), 0o755)
+
+        zip_path = join(self.tmp_dir, 'a.zip')
+        zip_dir(join(self.tmp_dir, 'a'), zip_path)
+
+        with ZipFile(zip_path) as zip_file:
+            mode = zip_file.getinfo('foo').external_attr >> 16
+
+        self.assertEqual(stat.S_IMODE(mode), 0o755)
+
+    def test_tar_and_gzip_files(self):
+        join = os.path.join
+
+        tar_gz_path = join(self.tmp_dir, 'a.tar.gz')
+        _tar_and_gzip_files(_dir_files(join(self.tmp_dir, 'a')), tar_gz_path)
+
+        unarchive(tar_gz_path, join(self.tmp_dir, 'b'))
+
+        self.ensure_expected_results()
+
+    def test_tar_and_gzip_files_is_reproducible(self):
+        join = os.path.join
+
+        paths_and_names = _dir_files(join(self.tmp_dir, 'a'))
+
+        _tar_and_gzip_files(paths_and_names, join(self.tmp_dir, 'a1.tar.gz'))
+
+        os.utime(join(self.tmp_dir, 'a', 'foo'), (0, 0))
+
+        _tar_and_gzip_files(paths_and_names, join(self.tmp_dir, 'a2.tar.gz'))
+
+        with open(join(self.tmp_dir, 'a1.tar.gz'), 'rb') as a1:
+            with open(join(self.tmp_dir, 'a2.tar.gz'), 'rb') as a2:
+                self.assertEqual(a1.read(), a2.read())
+
+    def test_dir_files(self):
+        join = os.path.join
+
+        a_dir = join(os.path.realpath(self.tmp_dir), 'a')
+
+        # symlinks are resolved, and results are sorted by name
+        self.assertEqual(
+            _dir_files(a_dir, prefix='a', filter=lambda path: path != 'baz'),
+            [(join(a_dir, 'foo'), join('a', 'bar')),
+             (join(a_dir, 'foo'), join('a', 'foo')),
+             (join(a_dir, 'qux', 'quux'), join('a', 'qux', 'quux'))])
+
 
 class OnlyReadWrapper(object):
     """Restrict a file object to only the read() method (used by